@@ -0,0 +1,50 @@
+
+
+# ./Commands/Data/ExportData_Command.py
+
+import os
+
+from Utils.logger import log_info, log_error
+from Utils.paths import get_clients_db_path, get_projects_db_path
+
+
+class ExportPrettyJSON:
+    """
+    Exporta clientes y proyectos a JSON indentado (legible/editable a mano) en
+    <carpeta de datos>/export/, cualquiera sea el formato en disco (JSON
+    compacto, binario o SQLite).
+    """
+
+    def GetResources(self):
+        return {
+            "MenuText": "Exportar datos (JSON legible)",
+            "ToolTip": "Exporta clientes y proyectos a JSON indentado en la carpeta export/",
+        }
+
+    def Activated(self):
+        from Utils.db_manager import get_db_manager
+
+        export_dir = os.path.join(os.path.dirname(get_clients_db_path()), "export")
+        clients_path = os.path.join(export_dir, os.path.basename(get_clients_db_path()))
+        projects_path = os.path.join(export_dir, os.path.basename(get_projects_db_path()))
+        db = None
+        try:
+            os.makedirs(export_dir, exist_ok=True)
+            db = get_db_manager()
+            ok = db.export_json(clients_path, projects_path, fmt="pretty")
+        except Exception as e:
+            log_error("./Commands/Data", "ExportData_Command.py", f"Error exportando datos → {e}")
+            ok = False
+        finally:
+            if db is not None:
+                db.close()  # libera la conexión (SQLite) aunque la exportación falle
+
+        try:
+            from Utils.helper_gui import show_info_dialog, show_error_dialog
+            if ok:
+                log_info("./Commands/Data", "ExportData_Command.py", f"Datos exportados en {export_dir}")
+                show_info_dialog("Electrical Workbench - Exportar datos", f"Datos exportados en:\n{clients_path}\n{projects_path}")
+            else:
+                show_error_dialog("Electrical Workbench - Exportar datos", "No se pudieron exportar los datos (ver log).")
+        except Exception as e:
+            log_error("./Commands/Data", "ExportData_Command.py", f"No se pudo mostrar el diálogo → {e}")
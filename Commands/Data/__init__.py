@@ -0,0 +1,3 @@
+
+
+# ./Commands/Data/__init__.py
@@ -0,0 +1,31 @@
+
+
+# ./Commands/Diagnostics/StartupProfile_Command.py
+
+from Utils.logger import log_info, log_error
+from Utils.profiler import format_report, dump_report, ENABLED
+
+
+class StartupProfile:
+    """
+    Muestra el reporte de tiempos de arranque/carga de comandos (Utils.profiler)
+    y lo guarda como JSON en la carpeta de datos.
+    """
+
+    def GetResources(self):
+        return {
+            "MenuText": "Reporte de arranque",
+            "ToolTip": "Tiempos de carga del workbench y de cada módulo de comandos",
+        }
+
+    def Activated(self):
+        text = format_report()
+        path = dump_report() if ENABLED else None
+        if path:
+            text += f"\n\nJSON: {path}"
+        log_info("./Commands/Diagnostics", "StartupProfile_Command.py", "\n" + text)
+        try:
+            from Utils.helper_gui import show_info_dialog
+            show_info_dialog("Electrical Workbench - Reporte de arranque", text)
+        except Exception as e:
+            log_error("./Commands/Diagnostics", "StartupProfile_Command.py", f"No se pudo mostrar el diálogo → {e}")
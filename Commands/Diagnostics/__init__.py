@@ -0,0 +1,3 @@
+
+
+# ./Commands/Diagnostics/__init__.py
@@ -3,9 +3,12 @@
 # ./Commands/__init__.py
 
 import os
+import json
 import importlib
 import FreeCADGui
 from Utils.logger import log_error, log_info
+from Utils.paths import get_commands_manifest_path
+from Utils.profiler import profile, profiled
 
 REGISTERED_COMMANDS = []
 
@@ -14,17 +17,155 @@ IGNORED_FOLDERS = [
     "__pycache__",
 ]
 
+# Versión del formato del manifiesto: si cambia, se regenera completo.
+MANIFEST_VERSION = 1
 
+
+# ---------------------------
+# PROXY DE CARGA DIFERIDA
+# ---------------------------
+class _LazyCommand:
+    """
+    Comando registrado desde el manifiesto sin importar su módulo.
+    GetResources() responde con lo cacheado; el módulo real se importa
+    recién en el primer Activated() y desde ahí se delega todo.
+    """
+
+    def __init__(self, command_name, import_path, class_name, resources):
+        self._command_name = command_name
+        self._import_path = import_path
+        self._class_name = class_name
+        self._resources = resources
+        self._real = None
+
+    def _load(self):
+        if self._real is None:
+            with profile(self._import_path, "lazy-import"):
+                module = importlib.import_module(self._import_path)
+            self._real = getattr(module, self._class_name)()
+            log_info("./Commands", "__init__.py",
+                     f"Carga diferida → {self._import_path} ({self._command_name})")
+        return self._real
+
+    def GetResources(self):
+        if self._real is not None:
+            return self._real.GetResources()
+        return dict(self._resources)
+
+    def IsActive(self):
+        # sólo se cargan en diferido clases sin IsActive propio (ver _is_lazy_safe)
+        if self._real is not None and hasattr(self._real, "IsActive"):
+            return self._real.IsActive()
+        return True
+
+    def Activated(self, *args):
+        try:
+            real = self._load()
+        except Exception as e:
+            log_error("./Commands", "__init__.py",
+                      f"Error al importar {self._import_path} → {e}")
+            return None
+        return real.Activated(*args)
+
+
+# ---------------------------
+# MANIFIESTO
+# ---------------------------
+def _load_manifest() -> dict:
+    try:
+        with open(get_commands_manifest_path(), "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("version") == MANIFEST_VERSION:
+            return manifest
+    except Exception:
+        pass
+    return {"version": MANIFEST_VERSION, "files": {}}
+
+
+def _save_manifest(manifest: dict):
+    path = get_commands_manifest_path()
+    tmp = path + ".tmp"
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=4, ensure_ascii=False)
+        os.replace(tmp, path)
+    except Exception as e:
+        log_error("./Commands", "__init__.py", f"No se pudo guardar el manifiesto → {e}")
+
+
+def _file_key(file_path: str):
+    st = os.stat(file_path)
+    return [st.st_mtime_ns, st.st_size]
+
+
+def _jsonable(value):
+    """GetResources() debería devolver strings; cualquier otra cosa se guarda como str."""
+    try:
+        json.dumps(value)
+        return value
+    except (TypeError, ValueError):
+        return str(value)
+
+
+def _is_lazy_safe(cls) -> bool:
+    """
+    Un comando con IsActive propio depende del estado de FreeCAD (documento
+    activo, selección...) desde el arranque: se registra cargado, no en diferido.
+    """
+    return not hasattr(cls, "IsActive")
+
+
+def _scan_module(module):
+    """Retorna [(attr_name, cls)] de las clases de comando del módulo."""
+    found = []
+    for attr_name in dir(module):
+        attr = getattr(module, attr_name)
+
+        if (
+            isinstance(attr, type)
+            and hasattr(attr, "Activated")
+            and hasattr(attr, "GetResources")
+        ):
+            found.append((attr_name, attr))
+    return found
+
+
+def _add_command(folder, command_name, command_instance):
+    if command_name in REGISTERED_COMMANDS:
+        return
+    try:
+        with profile(f"addCommand {command_name}", "addCommand"):
+            FreeCADGui.addCommand(command_name, command_instance)
+        REGISTERED_COMMANDS.append(command_name)
+        log_info("./Commands", "__init__.py",
+                 f"[{folder}] → Comando {command_name} Registrado")
+    except Exception as e:
+        log_error("./Commands", "__init__.py",
+                  f"[{folder}] → Error registrando {command_name} → {e}")
+
+
+@profiled("register_all_commands", "commands")
 def register_all_commands():
     """
     Carga TODOS los comandos que cumplan con formato *_Command.py
     dentro de cada subcarpeta en Commands/.
+
+    Usa un manifiesto persistido (nombre de comando + GetResources() por
+    archivo, indexado por mtime/tamaño): los archivos sin cambios se registran
+    como proxies _LazyCommand sin importar el módulo; sólo los archivos
+    nuevos o modificados se importan y actualizan el manifiesto.
     """
 
     global REGISTERED_COMMANDS
 
     commands_dir = os.path.dirname(__file__)
 
+    with profile("load manifest", "commands"):
+        manifest = _load_manifest()
+    old_files = manifest.get("files", {})
+    new_files = {}
+    changed = False
+
     for folder in os.listdir(commands_dir):
         folder_path = os.path.join(commands_dir, folder)
 
@@ -55,9 +196,30 @@ def register_all_commands():
 
             module_name = file.replace(".py", "")
             import_path = f"Commands.{folder}.{module_name}"
+            rel_key = f"{folder}/{file}"
+
+            try:
+                file_key = _file_key(os.path.join(folder_path, file))
+            except OSError:
+                continue
+
+            # ---------------------------
+            # MANIFIESTO VIGENTE → PROXIES
+            # ---------------------------
+            cached = old_files.get(rel_key)
+            if cached and cached.get("key") == file_key and all(c.get("lazy") for c in cached.get("commands", [])):
+                new_files[rel_key] = cached
+                for cmd in cached.get("commands", []):
+                    proxy = _LazyCommand(cmd["name"], import_path, cmd["class"], cmd.get("resources", {}))
+                    _add_command(folder, cmd["name"], proxy)
+                continue
 
+            # ---------------------------
+            # ARCHIVO NUEVO/MODIFICADO (o con comandos no diferibles) → IMPORTAR
+            # ---------------------------
             try:
-                module = importlib.import_module(import_path)
+                with profile(import_path, "import"):
+                    module = importlib.import_module(import_path)
                 log_info("./Commands", "__init__.py",
                          f"[{folder}] → Cargando el módulo → {module_name}")
             except Exception as e:
@@ -68,25 +230,33 @@ def register_all_commands():
             # ---------------------------
             # BUSCAR CLASES DE COMANDO
             # ---------------------------
-            for attr_name in dir(module):
-                attr = getattr(module, attr_name)
-
-                if (
-                    isinstance(attr, type)
-                    and hasattr(attr, "Activated")
-                    and hasattr(attr, "GetResources")
-                ):
+            entries = []
+            for attr_name, attr in _scan_module(module):
+                command_name = f"EW_{attr_name}"
+                try:
                     command_instance = attr()
-                    command_name = f"EW_{attr_name}"
-
-                    if command_name not in REGISTERED_COMMANDS:
-                        try:
-                            FreeCADGui.addCommand(command_name, command_instance)
-                            REGISTERED_COMMANDS.append(command_name)
-                            log_info("./Commands", "__init__.py",
-                                     f"[{folder}] → Comando {command_name} Registrado")
-                        except Exception as e:
-                            log_error("./Commands", "__init__.py",
-                                      f"[{folder}] → Error registrando {command_name} → {e}")
+                    resources = {k: _jsonable(v) for k, v in (command_instance.GetResources() or {}).items()}
+                except Exception as e:
+                    log_error("./Commands", "__init__.py",
+                              f"[{folder}] → Error instanciando {attr_name} → {e}")
+                    continue
+                entries.append({
+                    "name": command_name,
+                    "class": attr_name,
+                    "resources": resources,
+                    "lazy": _is_lazy_safe(attr),
+                })
+                _add_command(folder, command_name, command_instance)
+
+            entry = {"key": file_key, "commands": entries}
+            if cached != entry:
+                changed = True
+            new_files[rel_key] = entry
+
+    if changed or set(new_files) != set(old_files):
+        manifest["files"] = new_files
+        with profile("save manifest", "commands"):
+            _save_manifest(manifest)
+        log_info("./Commands", "__init__.py", "Manifiesto de comandos regenerado.")
 
     return REGISTERED_COMMANDS
@@ -3,9 +3,12 @@
 # ./Init.py
 
 import FreeCAD
-from Utils.logger import log_info, log_error
+from Utils.profiler import profile
 
-log_info(".", "Init.py", "Cargando núcleo...")
+with profile("Init.py", "startup"):
+    from Utils.logger import log_info, log_error
+
+    log_info(".", "Init.py", "Cargando núcleo...")
 
 def Initialize():
     log_info(".", "Init.py", "Inicializado correctamente.")
@@ -2,12 +2,16 @@
 
 # ./InitGui.py
 
-from Utils.logger import log_info, log_error
-from workbench import ElectricalWorkbenchClass
+from Utils.profiler import profile
 
-log_info(".", "InitGui.py", "Cargando GUI...")
+with profile("InitGui.py", "startup"):
+    from Utils.logger import log_info, log_error
+    from workbench import ElectricalWorkbenchClass
+
+    log_info(".", "InitGui.py", "Cargando GUI...")
 
 class ElectricalWorkbench(ElectricalWorkbenchClass):
     pass
 
-FreeCADGui.addWorkbench(ElectricalWorkbench())
\ No newline at end of file
+with profile("FreeCADGui.addWorkbench", "startup"):
+    FreeCADGui.addWorkbench(ElectricalWorkbench())
\ No newline at end of file
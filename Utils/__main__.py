@@ -0,0 +1,13 @@
+
+
+# ./Utils/__main__.py
+
+"""
+python -m Utils: línea de comandos de la capa de datos (ver Utils/cli.py).
+"""
+
+import sys
+
+from Utils.cli import main
+
+sys.exit(main())
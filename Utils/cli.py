@@ -0,0 +1,437 @@
+
+
+# ./Utils/cli.py
+
+"""
+Utils/cli.py
+
+Línea de comandos de la capa de datos, sin FreeCAD (tareas batch, cron):
+
+    python -m Utils list projects --status "En proceso" --order -updated_at --limit 50
+    python -m Utils list clients --format table
+    python -m Utils search "tablero norte" --kind projects
+    python -m Utils upsert clients --set cuit=30712345678 --set name="ACME SA"
+    python -m Utils upsert projects --json '{"id": "...", "status": "Aprobado"}' --no-current
+    python -m Utils import clientes.csv --kind clients --progress
+    python -m Utils import proyectos.ndjson --kind projects
+    python -m Utils export --dir /backups/ew --format pretty
+    python -m Utils export --output proyectos.csv --kind projects   # con nombre/CUIT del cliente
+    python -m Utils compact
+    python -m Utils history projects <id>                       # cambios por campo
+    python -m Utils history projects <id> --at 2025-03-01T12:00  # registro en esa fecha
+    python -m Utils history projects --at 2025-03-01 --format table
+    python -m Utils history projects --compact --retention-days 180
+    python -m Utils files scan            # índice de carpetas de proyecto (Utils/project_files.py)
+    python -m Utils files missing --format table
+
+Ejecutar desde la carpeta del workbench. --data-dir (o EW_DATA_DIR) elige la
+carpeta de datos; por defecto la misma que usa el workbench.
+
+Salida: registros en NDJSON (uno por línea) por defecto, o --format json/table.
+Los logs van a stderr (nivel WARNING; -v para INFO). Código de salida 0 si
+todo salió bien, 1 si alguna operación falló, 2 ante argumentos inválidos.
+
+Los módulos de datos se importan recién al ejecutar el comando: --help y los
+errores de argumentos no los cargan.
+"""
+
+import argparse
+import json
+import os
+import sys
+from typing import Dict, Iterable, List, Optional
+
+KINDS = ("clients", "projects")
+
+# Columnas de --format table
+_TABLE_COLUMNS = {
+    "clients": ("id", "name", "cuit", "contact_email", "updated_at"),
+    "projects": ("id", "name", "code", "status", "client_id", "updated_at"),
+}
+
+
+# -------------------------
+# SALIDA
+# -------------------------
+
+def _emit(records: Iterable[Dict], fmt: str, kind: str, out=None) -> int:
+    """Escribe los registros en el formato pedido; retorna la cantidad."""
+    out = out or sys.stdout
+    count = 0
+    if fmt == "json":
+        records = list(records)
+        json.dump(records, out, ensure_ascii=False, indent=2)
+        out.write("\n")
+        return len(records)
+    if fmt == "table":
+        columns = _TABLE_COLUMNS[kind]
+        out.write("\t".join(columns) + "\n")
+        for record in records:
+            out.write("\t".join("" if record.get(c) is None else str(record.get(c)) for c in columns) + "\n")
+            count += 1
+        return count
+    for record in records:
+        out.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n")
+        count += 1
+    return count
+
+
+def _fail(message: str) -> int:
+    print(f"error: {message}", file=sys.stderr)
+    return 1
+
+
+def _parse_value(text: str):
+    """
+    Valor de --set/--where: true/false/null y objetos/listas JSON se convierten;
+    el resto queda como texto (un CUIT o un id numérico no deben volverse int).
+    Para otros tipos usar --json.
+    """
+    if text in ("true", "false", "null") or text[:1] in ("[", "{"):
+        try:
+            return json.loads(text)
+        except ValueError:
+            pass
+    return text
+
+
+def _pairs(items: Optional[List[str]], option: str) -> Dict:
+    values = {}
+    for item in items or []:
+        key, sep, value = item.partition("=")
+        if not sep or not key:
+            raise ValueError(f"{option} espera campo=valor, no '{item}'")
+        values[key.strip()] = _parse_value(value)
+    return values
+
+
+# -------------------------
+# COMANDOS
+# -------------------------
+
+def _manager(args):
+    from Utils.db_manager import get_db_manager
+    # escritura síncrona y sin vigilante de archivos: el proceso termina apenas
+    # vuelve el comando. compact aplica el journal existente en cualquier modo
+    # y lo elimina.
+    return get_db_manager(write_behind=False, journal=args.journal, watch=False)
+
+
+def _cmd_list(db, args) -> int:
+    filters = _pairs(args.where, "--where")
+    if args.kind == "projects":
+        for field in ("status", "client_id", "type"):
+            if getattr(args, field, None):
+                filters[field] = getattr(args, field)
+        if args.macro is not None:
+            filters["is_macro"] = args.macro
+        if filters or args.order or args.limit is not None or args.offset:
+            records = db.query_projects(filters or None, args.order, args.limit, args.offset)
+        else:
+            records = db.iter_projects()
+    else:
+        records = db.iter_clients()
+        if filters:
+            records = (c for c in records if all(c.get(k) == v for k, v in filters.items()))
+        if args.offset or args.limit is not None:
+            stop = None if args.limit is None else args.offset + args.limit
+            records = list(records)[args.offset:stop]
+    _emit(records, args.format, args.kind)
+    return 0
+
+
+def _cmd_search(db, args) -> int:
+    kinds = [args.kind] if args.kind else list(KINDS)
+    hits = db.search(args.query, kinds, args.limit)
+    if args.format == "table":
+        sys.stdout.write("kind\tscore\tid\tname\n")
+        for hit in hits:
+            sys.stdout.write(f"{hit['kind']}\t{hit['score']}\t{hit['id']}\t{hit['record'].get('name', '')}\n")
+    else:
+        _emit(hits, args.format, "projects")
+    return 0
+
+
+def _cmd_upsert(db, args) -> int:
+    try:
+        record = json.loads(args.json) if args.json else {}
+        if not isinstance(record, dict):
+            return _fail("--json debe ser un objeto")
+        record.update(_pairs(args.set, "--set"))
+    except ValueError as e:
+        return _fail(str(e))
+    if not record:
+        return _fail("nada que guardar (usar --set campo=valor o --json)")
+    if args.kind == "clients":
+        saved = db.add_or_update_client(record)
+    else:
+        saved = db.add_or_update_project(record, mark_current=not args.no_current)
+    _emit([saved], args.format, args.kind)
+    return 0
+
+
+def _read_records(path: str, kind: str) -> List[Dict]:
+    """
+    Registros de un archivo de datos (cualquier formato de Utils/serialization.py:
+    {"clients": [...]}, {"projects": [...]} o una lista) o NDJSON (uno por línea).
+    """
+    from Utils.serialization import read_file
+    try:
+        data = read_file(path)
+    except ValueError:
+        # no es un documento único: NDJSON
+        with open(path, "r", encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+    if isinstance(data, dict):
+        # archivo de datos ({"clients": [...]}) o un único registro
+        data = data[kind] if kind in data else [data]
+    if not isinstance(data, list):
+        raise ValueError(f"{path}: se esperaba una lista de {kind}")
+    return data
+
+
+def _print_progress(stats: Dict):
+    print(f"{stats['rows']} filas, {stats['rows_per_s']:.0f} filas/s", file=sys.stderr, flush=True)
+
+
+def _cmd_import(db, args) -> int:
+    from Utils.data_exchange import resolve_exchange_format, import_file
+    try:
+        fmt = resolve_exchange_format(args.file)
+    except ValueError:
+        fmt = None
+    if fmt is not None:
+        # CSV / NDJSON: en streaming, por lotes y con validación de CUIT (Utils/data_exchange.py)
+        stats = import_file(db, args.kind, args.file, fmt, batch_size=args.batch_size,
+                            validate_cuit=not args.no_validate_cuit,
+                            progress=_print_progress if args.progress else None)
+        if stats is None:
+            return _fail(f"no se pudo leer {args.file}")
+        print(json.dumps({"kind": args.kind, **stats}, ensure_ascii=False))
+        return 0
+    try:
+        records = _read_records(args.file, args.kind)
+    except (OSError, ValueError) as e:
+        return _fail(f"no se pudo leer {args.file}: {e}")
+    if not all(isinstance(r, dict) for r in records):
+        return _fail(f"{args.file}: todos los registros deben ser objetos")
+    if args.kind == "clients":
+        saved = db.bulk_upsert_clients(records)
+    else:
+        saved = db.bulk_upsert_projects(records)
+    print(json.dumps({"kind": args.kind, "imported": len(saved)}))
+    return 0
+
+
+def _cmd_export(db, args) -> int:
+    if args.output:
+        from Utils.data_exchange import export_file
+        try:
+            stats = export_file(db, args.kind, args.output,
+                                progress=_print_progress if args.progress else None)
+        except ValueError as e:
+            return _fail(str(e))
+        if stats is None:
+            return _fail("la exportación falló (ver log)")
+        print(json.dumps({"kind": args.kind, **stats}, ensure_ascii=False))
+        return 0
+    clients_path = projects_path = None
+    if args.dir:
+        clients_path = os.path.join(args.dir, "clients.json")
+        projects_path = os.path.join(args.dir, "projects.json")
+    if not db.export_json(clients_path, projects_path, args.format):
+        return _fail("la exportación falló (ver log)")
+    return 0
+
+
+def _cmd_files(db, args) -> int:
+    from Utils.project_files import ProjectFileIndex
+    index = ProjectFileIndex()
+    if args.action == "scan":
+        stats = index.scan(db, full=args.full, workers=args.workers)
+        print(json.dumps(stats))
+        return 0
+    if args.action == "totals":
+        print(json.dumps(index.totals()))
+        return 0
+    if args.action == "documents":
+        if not args.project_id:
+            return _fail("documents requiere el id del proyecto")
+        for name in index.documents(args.project_id):
+            print(name)
+        return 0
+    if args.action == "missing":
+        records = index.missing()
+    elif args.action == "largest":
+        records = index.largest(args.limit)
+    else:
+        records = index.recently_modified(args.limit)
+    if args.format == "table":
+        sys.stdout.write("project_id\tsize\tfiles\tdocuments\tpath\terror\n")
+        for r in records:
+            sys.stdout.write(f"{r['project_id']}\t{r['size']}\t{r['files']}\t{len(r['documents'])}\t"
+                             f"{r['path']}\t{r['error'] or ''}\n")
+    else:
+        _emit(records, args.format, "projects")
+    return 0
+
+
+def _cmd_history(db, args) -> int:
+    if args.compact:
+        removed = db.compact_history(args.retention_days)
+        print(json.dumps({"removed_segments": removed}))
+        return 0
+    if args.stats:
+        print(json.dumps(db.history_stats(args.kind)))
+        return 0
+    try:
+        if args.at is not None and args.record_id:
+            record = db.record_at(args.kind, args.record_id, args.at)
+            if record is None:
+                return _fail(f"{args.record_id} no existía en {args.at} (o es anterior al historial)")
+            _emit([record], args.format, args.kind)
+            return 0
+        if args.at is not None:
+            records = db.records_at(args.kind, args.at)
+            if records is None:
+                return _fail(f"{args.at} es anterior al historial disponible")
+            _emit(records, args.format, args.kind)
+            return 0
+    except ValueError as e:
+        return _fail(f"fecha inválida: {e}")
+    if not args.record_id:
+        return _fail("history requiere el id del registro, --at, --stats o --compact")
+    for change in db.record_changes(args.kind, args.record_id):
+        print(json.dumps(change, ensure_ascii=False, default=str))
+    return 0
+
+
+def _cmd_compact(db, args) -> int:
+    if not db.compact(args.kind):
+        return _fail("la compactación falló (ver log)")
+    return 0
+
+
+# -------------------------
+# ARGUMENTOS
+# -------------------------
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m Utils", description="Datos de ElectricalWorkbench sin FreeCAD")
+    parser.add_argument("--data-dir", default=None, help="carpeta de datos (default: EW_DATA_DIR o la del workbench)")
+    parser.add_argument("--journal", action="store_true", default=None, help="forzar el modo journal de DBManager")
+    parser.add_argument("-v", "--verbose", action="store_true", help="logs INFO en stderr")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    def output(p, default="ndjson"):
+        p.add_argument("--format", choices=("ndjson", "json", "table"), default=default, help="formato de salida")
+
+    p = sub.add_parser("list", help="listar clientes o proyectos")
+    p.add_argument("kind", choices=KINDS)
+    p.add_argument("--status")
+    p.add_argument("--client-id", dest="client_id")
+    p.add_argument("--type")
+    p.add_argument("--macro", action="store_true", default=None, help="sólo macro proyectos")
+    p.add_argument("--where", action="append", metavar="CAMPO=VALOR", help="filtro por igualdad (repetible)")
+    p.add_argument("--order", default=None, help="campo de orden (prefijo - descendente), sólo proyectos")
+    p.add_argument("--limit", type=int, default=None)
+    p.add_argument("--offset", type=int, default=0)
+    output(p)
+    p.set_defaults(func=_cmd_list)
+
+    p = sub.add_parser("search", help="búsqueda de texto rankeada")
+    p.add_argument("query")
+    p.add_argument("--kind", choices=KINDS, default=None)
+    p.add_argument("--limit", type=int, default=10)
+    output(p)
+    p.set_defaults(func=_cmd_search)
+
+    p = sub.add_parser("upsert", help="alta o modificación de un registro")
+    p.add_argument("kind", choices=KINDS)
+    p.add_argument("--set", action="append", metavar="CAMPO=VALOR", help="campo a guardar (repetible)")
+    p.add_argument("--json", default=None, help="registro como objeto JSON")
+    p.add_argument("--no-current", action="store_true", help="proyectos: no marcarlo como actual")
+    output(p)
+    p.set_defaults(func=_cmd_upsert)
+
+    p = sub.add_parser("import", help="alta masiva desde CSV / NDJSON / JSON / snapshot")
+    p.add_argument("file", help=".csv, .ndjson o .jsonl en streaming; otro archivo se lee completo")
+    p.add_argument("--kind", choices=KINDS, required=True)
+    p.add_argument("--batch-size", dest="batch_size", type=int, default=5000, help="CSV/NDJSON: filas por lote")
+    p.add_argument("--no-validate-cuit", dest="no_validate_cuit", action="store_true",
+                   help="CSV/NDJSON: aceptar CUIT con dígito verificador incorrecto")
+    p.add_argument("--progress", action="store_true", help="CSV/NDJSON: progreso en stderr")
+    p.set_defaults(func=_cmd_import)
+
+    p = sub.add_parser("export", help="exportar clientes y proyectos")
+    p.add_argument("--dir", default=None, help="carpeta destino (default: <datos>/export)")
+    p.add_argument("--format", choices=("pretty", "json", "orjson", "binary"), default="pretty")
+    p.add_argument("--output", default=None, help="archivo .csv / .ndjson con un solo kind (en streaming)")
+    p.add_argument("--kind", choices=KINDS, default="projects", help="--output: qué exportar")
+    p.add_argument("--progress", action="store_true", help="--output: progreso en stderr")
+    p.set_defaults(func=_cmd_export)
+
+    p = sub.add_parser("files", help="índice de archivos de las carpetas de proyecto")
+    p.add_argument("action", choices=("scan", "missing", "largest", "recent", "documents", "totals"))
+    p.add_argument("project_id", nargs="?", default=None, help="documents: id del proyecto")
+    p.add_argument("--full", action="store_true", help="scan: volver a listar todas las carpetas")
+    p.add_argument("--workers", type=int, default=8, help="scan: hilos en paralelo")
+    p.add_argument("--limit", type=int, default=10)
+    output(p)
+    p.set_defaults(func=_cmd_files)
+
+    p = sub.add_parser("history", help="historial de cambios (Database/history)")
+    p.add_argument("kind", choices=KINDS)
+    p.add_argument("record_id", nargs="?", default=None)
+    p.add_argument("--at", default=None, help="fecha ISO 8601 o epoch: estado en ese instante")
+    p.add_argument("--stats", action="store_true", help="segmentos y bytes del historial")
+    p.add_argument("--compact", action="store_true", help="eliminar los segmentos fuera de retención")
+    p.add_argument("--retention-days", dest="retention_days", type=float, default=None)
+    output(p)
+    p.set_defaults(func=_cmd_history)
+
+    p = sub.add_parser("compact", help="compactar journal / base de datos")
+    p.add_argument("kind", choices=KINDS, nargs="?", default=None)
+    p.set_defaults(func=_cmd_compact)
+    return parser
+
+
+def _join_order(argv: List[str]) -> List[str]:
+    """
+    "--order -campo" -> "--order=-campo": argparse toma un valor que empieza
+    con "-" como otra opción y el orden descendente quedaría inaccesible.
+    """
+    out = []
+    i = 0
+    while i < len(argv):
+        if argv[i] == "--order" and i + 1 < len(argv) and argv[i + 1][:1] == "-" and argv[i + 1][1:2] != "-":
+            out.append(f"--order={argv[i + 1]}")
+            i += 2
+        else:
+            out.append(argv[i])
+            i += 1
+    return out
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(_join_order(sys.argv[1:] if argv is None else list(argv)))
+    if args.data_dir:
+        os.environ["EW_DATA_DIR"] = os.path.abspath(args.data_dir)
+
+    from Utils import logger
+    logger.set_level("INFO" if args.verbose else "WARNING")
+
+    try:
+        db = _manager(args)
+    except ValueError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+    try:
+        return args.func(db, args)
+    except BrokenPipeError:
+        # salida cortada por el consumidor (| head): no es un error
+        sys.stderr.close()
+        return 0
+    finally:
+        db.close()
+        logger.flush()
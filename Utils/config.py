@@ -11,23 +11,38 @@ Provee:
   - DEV_MODE: flag global para logs/diagnóstico (True en desarrollo).
   - Config: objeto compatible para importaciones que esperan 'Config'.
   - save_setting / get_setting: helpers ligeros para persistir parámetros
-    usando FreeCAD.ParamGet cuando FreeCAD está disponible.
+    usando FreeCAD.ParamGet cuando FreeCAD está disponible (con caché en
+    memoria compartida, ver Utils/settings_store.py).
+  - get_freecad: enlace perezoso al módulo FreeCAD. La capa de datos
+    (config, logger, paths, db_manager) no importa FreeCAD: usa el módulo sólo
+    si el proceso ya lo cargó (dentro de FreeCAD siempre es así). Fuera de
+    FreeCAD (scripts, cron, python -m Utils) funciona sin él: settings en
+    archivos .cfg, logs a stderr.
   
 Comentarios en español y diseño para compatibilidad retroactiva.
 """
 
 from types import SimpleNamespace
 import os
+import sys
 
-# Intentamos importar FreeCAD sólo si estamos ejecutando dentro de FreeCAD.
-# Si no está, exponemos una API mínima para evitar que el módulo falle
-# en entornos de test o linters.
-try:
-    import FreeCAD
-    _HAS_FREECAD = True
-except Exception:
-    FreeCAD = None
-    _HAS_FREECAD = False
+# FreeCAD sólo si el proceso ya lo cargó: importarlo desde un intérprete
+# común arranca la aplicación completa (segundos). Un script que quiera los
+# parámetros y carpetas de FreeCAD debe importar FreeCAD antes que Utils.
+FreeCAD = sys.modules.get("FreeCAD")
+_HAS_FREECAD = FreeCAD is not None
+
+
+def get_freecad():
+    """
+    Módulo FreeCAD si el proceso lo tiene cargado, None en modo headless.
+    Nunca lo importa; se enlaza la primera vez que aparece en sys.modules.
+    """
+    global FreeCAD, _HAS_FREECAD
+    if FreeCAD is None:
+        FreeCAD = sys.modules.get("FreeCAD")
+        _HAS_FREECAD = FreeCAD is not None
+    return FreeCAD
 
 # -----------------------
 # CONFIGURACIÓN GLOBAL
@@ -49,26 +64,31 @@ Config = SimpleNamespace(
 # HELPERS DE PERSISTENCIA
 # -----------------------
 
+_STORE = None
+
+
+def get_settings_store():
+    """
+    Almacén de settings compartido (Utils/settings_store.py): caché en memoria
+    por grupo sobre FreeCAD.ParamGet o, sin FreeCAD, sobre archivos <grupo>.cfg.
+    """
+    global _STORE
+    if _STORE is None:
+        from Utils.settings_store import SettingsStore
+        fallback_dir = os.path.join(Config.USER_APP_DIR, "ElectricalWorkbench")
+        _STORE = SettingsStore(fallback_dir, get_freecad())
+    return _STORE
+
+
 def save_setting(group: str, key: str, value):
     """
     Guarda una configuración usando FreeCAD.ParamGet cuando FreeCAD está disponible.
     group/key son concatenados para organización interna.
-    Si FreeCAD no está disponible, intenta guardar en un archivo JSON en el user app dir.
+    Si FreeCAD no está disponible, la guarda en <group>.cfg en el user app dir.
+    Acepta valores tipados: str, int, float, bool o JSON (dict/list).
     """
     try:
-        if _HAS_FREECAD:
-            param = FreeCAD.ParamGet("User parameter:Plugins/ElectricalWorkbench")
-            param.SetString(f"{group}/{key}", str(value))
-            return True
-        else:
-            # fallback simple: guardar en archivo de texto (no crítico)
-            fallback_dir = os.path.join(Config.USER_APP_DIR, "ElectricalWorkbench")
-            os.makedirs(fallback_dir, exist_ok=True)
-            # archivo por grupo
-            file_path = os.path.join(fallback_dir, f"{group}.cfg")
-            with open(file_path, "a", encoding="utf-8") as f:
-                f.write(f"{key}={value}\n")
-            return True
+        return get_settings_store().set(group, key, value)
     except Exception as e:
         # No usar log_error aquí para evitar import ciclo; imprimir simple si DEV_MODE.
         if DEV_MODE:
@@ -79,31 +99,14 @@ def save_setting(group: str, key: str, value):
         return False
 
 
-def get_setting(group: str, key: str, default=None):
+def get_setting(group: str, key: str, default=None, type_=None):
     """
-    Recupera una configuración. Primero intenta ParamGet (FreeCAD). Si falla,
-    intenta lectura simple del fallback file.
+    Recupera una configuración desde la caché compartida (la primera lectura
+    de cada grupo consulta ParamGet o el .cfg; las siguientes no tocan disco).
+    Si se pasa type_ (o default no es None) el valor se convierte a ese tipo.
     """
     try:
-        if _HAS_FREECAD:
-            param = FreeCAD.ParamGet("User parameter:Plugins/ElectricalWorkbench")
-            return param.GetString(f"{group}/{key}", default)
-        else:
-            # fallback: leer archivo simple si existe
-            fallback_dir = os.path.join(Config.USER_APP_DIR, "ElectricalWorkbench")
-            file_path = os.path.join(fallback_dir, f"{group}.cfg")
-            if not os.path.isfile(file_path):
-                return default
-            try:
-                with open(file_path, "r", encoding="utf-8") as f:
-                    for line in f:
-                        if "=" in line:
-                            k, v = line.rstrip("\n").split("=", 1)
-                            if k == key:
-                                return v
-                return default
-            except Exception:
-                return default
+        return get_settings_store().get(group, key, default, type_)
     except Exception as e:
         if DEV_MODE:
             try:
@@ -122,8 +125,9 @@ def get_user_app_dir() -> str:
     Ruta base para datos del usuario. Si FreeCAD está presente usa getUserAppDataDir(),
     si no, devuelve una ruta en $HOME/.local/share/FreeCAD.
     """
-    if _HAS_FREECAD:
-        return FreeCAD.getUserAppDataDir()
+    freecad = get_freecad()
+    if freecad is not None:
+        return freecad.getUserAppDataDir()
     return Config.USER_APP_DIR
 
 
@@ -133,5 +137,7 @@ __all__ = [
     "Config",
     "save_setting",
     "get_setting",
+    "get_settings_store",
     "get_user_app_dir",
+    "get_freecad",
 ]
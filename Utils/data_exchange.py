@@ -0,0 +1,402 @@
+
+
+# ./Utils/data_exchange.py
+
+"""
+Utils/data_exchange.py
+
+Importación / exportación de clientes y proyectos en CSV y NDJSON (un objeto
+JSON por línea), para intercambiar listados con contabilidad u otros sistemas.
+
+    stats = export_file(db, "projects", "proyectos.csv")     # con columnas del cliente
+    stats = import_file(db, "clients", "clientes.csv", progress=print)
+
+Exportación (iter_export_rows -> iter_csv / iter_ndjson -> archivo):
+ - Generadores de punta a punta: los proyectos se leen de a uno
+   (db.iter_projects, en streaming si la caché está fría) y cada fila se
+   escribe apenas se arma. La memoria no crece con la cantidad de proyectos.
+ - Cada proyecto se une con su cliente por client_id (columnas client_name,
+   client_cuit). Del lado de los clientes (el lado chico) se guarda sólo
+   id -> (nombre, CUIT), leído en streaming una vez.
+ - Escritura atómica (tmp + os.replace).
+
+Importación:
+ - El archivo se lee de a filas (csv.reader / una línea de NDJSON) y se
+   agrupa en lotes de batch_size que se pasan a bulk_upsert_*: la memoria queda
+   acotada por el lote, no por el archivo.
+ - CUIT: se normaliza a 11 dígitos sin guiones y se valida el dígito
+   verificador. Las filas con CUIT inválido (o clientes sin CUIT, que no se
+   pueden deduplicar) se rechazan y se informan con su número de línea.
+ - Proyectos: una columna client_cuit (la que genera la exportación) se
+   resuelve a client_id buscando el cliente por CUIT.
+ - Celdas vacías no pisan lo guardado: la fila sólo actualiza las columnas
+   con valor. '_rev' y las fechas las administra DBManager y se ignoran.
+ - Todo el archivo se confirma en una sola transacción: una escritura por
+   archivo al final, también en modo journal (un lote supera el umbral de
+   compactación y confirmar por lote reescribiría el snapshot cada vez). Ante
+   una excepción no se guarda nada.
+
+progress(stats) se llama cada progress_every filas y al terminar, con
+{"rows", "imported", "rejected", "seconds", "rows_per_s"}.
+
+El formato sale de la extensión (.csv, .ndjson / .jsonl) o del argumento fmt.
+"""
+
+import os
+import io
+import csv
+import json
+import time
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from Utils.logger import log_info, log_error
+from Utils.records import Client, Project, as_dict
+
+FORMATS = ("csv", "ndjson")
+DEFAULT_BATCH_SIZE = 5000
+DEFAULT_PROGRESS_EVERY = 50000
+MAX_REPORTED_ERRORS = 100
+
+_CUIT_WEIGHTS = (5, 4, 3, 2, 7, 6, 5, 4, 3, 2)
+_CUIT_SEPARATORS = str.maketrans("", "", "-. /")
+_TRUE = ("1", "true", "yes", "si", "sí", "on", "x")
+_EXTENSIONS = {".csv": "csv", ".ndjson": "ndjson", ".jsonl": "ndjson"}
+
+# Columnas exportadas (las de la base salvo '_rev') y columnas del cliente unido
+EXPORT_COLUMNS = {
+    "clients": tuple(f for f in Client.FIELDS if f != "_rev"),
+    "projects": tuple(f for f in Project.FIELDS if f != "_rev") + ("client_name", "client_cuit"),
+}
+# Columnas que no se importan: las administra DBManager o vienen de la unión
+_IMPORT_IGNORED = frozenset(("_rev", "created_at", "updated_at", "client_name"))
+
+
+def resolve_exchange_format(path: str, fmt: Optional[str] = None) -> str:
+    """'csv' o 'ndjson' según fmt o la extensión de 'path'. ValueError si no se reconoce."""
+    if fmt:
+        fmt = fmt.strip().lower()
+        if fmt in ("jsonl", "json-lines"):
+            fmt = "ndjson"
+        if fmt not in FORMATS:
+            raise ValueError(f"formato de intercambio desconocido: {fmt}")
+        return fmt
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in _EXTENSIONS:
+        raise ValueError(f"{path}: extensión no reconocida (usar .csv, .ndjson o .jsonl)")
+    return _EXTENSIONS[ext]
+
+
+# -------------------------
+# CUIT
+# -------------------------
+def cuit_check_digit(first_ten: str) -> Optional[int]:
+    """Dígito verificador para los 10 primeros dígitos de un CUIT/CUIL (None si no tiene)."""
+    remainder = 11 - sum(int(d) * w for d, w in zip(first_ten, _CUIT_WEIGHTS)) % 11
+    if remainder == 11:
+        return 0
+    return None if remainder == 10 else remainder
+
+
+def normalize_cuit(value) -> Optional[str]:
+    """
+    CUIT/CUIL como 11 dígitos sin separadores ("30-71234567-1" -> "30712345671"),
+    o None si no es válido (largo, caracteres o dígito verificador).
+    """
+    if value is None:
+        return None
+    digits = str(value).strip().translate(_CUIT_SEPARATORS)
+    if len(digits) != 11 or not digits.isascii() or not digits.isdigit():
+        return None
+    return digits if cuit_check_digit(digits[:10]) == int(digits[10]) else None
+
+
+# -------------------------
+# EXPORTACIÓN
+# -------------------------
+def _iter_kind(db, kind: str) -> Iterable[Dict]:
+    return db.iter_clients() if kind == "clients" else db.iter_projects()
+
+
+def iter_export_rows(db, kind: str, join_clients: bool = True) -> Iterator[Dict]:
+    """
+    Registros de 'kind' listos para exportar, de a uno. Los proyectos llevan
+    client_name / client_cuit de su cliente (vacíos si no tiene o no existe).
+    """
+    if kind == "clients":
+        for client in _iter_kind(db, "clients"):
+            yield as_dict(client)
+        return
+    clients = {}
+    if join_clients:
+        clients = {c.get("id"): (c.get("name") or "", c.get("cuit") or "") for c in _iter_kind(db, "clients")}
+    for project in _iter_kind(db, "projects"):
+        row = as_dict(project)
+        row["client_name"], row["client_cuit"] = clients.get(row.get("client_id"), ("", ""))
+        yield row
+
+
+def _cell(value) -> str:
+    if value is None:
+        return ""
+    if value is True or value is False:
+        return "true" if value else "false"
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+    return str(value)
+
+
+def iter_csv(rows: Iterable[Dict], columns: Iterable[str], delimiter: str = ",") -> Iterator[str]:
+    """Líneas CSV de 'rows' (primero el encabezado), de a una. Claves fuera de 'columns' se omiten."""
+    columns = tuple(columns)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, delimiter=delimiter, lineterminator="\n")
+    writer.writerow(columns)
+    yield buffer.getvalue()
+    for row in rows:
+        buffer.seek(0)
+        buffer.truncate()
+        get = row.get
+        writer.writerow([_cell(get(c)) for c in columns])
+        yield buffer.getvalue()
+
+
+def iter_ndjson(rows: Iterable[Dict]) -> Iterator[str]:
+    """Líneas NDJSON de 'rows', de a una."""
+    encode = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+    for row in rows:
+        yield encode(row) + "\n"
+
+
+def export_file(db, kind: str, path: str, fmt: Optional[str] = None, join_clients: bool = True,
+                delimiter: str = ",", progress: Optional[Callable[[Dict], None]] = None,
+                progress_every: int = DEFAULT_PROGRESS_EVERY) -> Optional[Dict]:
+    """
+    Exporta 'clients' o 'projects' a 'path' (CSV o NDJSON) con escritura atómica.
+    Retorna {"path", "format", "rows", "seconds", "rows_per_s"} o None si falló.
+    """
+    fmt = resolve_exchange_format(path, fmt)
+    start = time.perf_counter()
+    stats = {"path": path, "format": fmt, "rows": 0, "seconds": 0.0, "rows_per_s": 0.0}
+    rows = iter_export_rows(db, kind, join_clients)
+    if fmt == "csv":
+        columns = EXPORT_COLUMNS[kind]
+        if not join_clients and kind == "projects":
+            columns = columns[:-2]
+        lines = iter_csv(rows, columns, delimiter)
+        next_line = next(lines)  # encabezado: no cuenta como fila
+    else:
+        lines = iter_ndjson(rows)
+        next_line = ""
+    tmp = path + ".tmp"
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(tmp, "w", encoding="utf-8", newline="", buffering=1024 * 1024) as f:
+            f.write(next_line)
+            write = f.write
+            count = 0
+            for line in lines:
+                write(line)
+                count += 1
+                if progress is not None and count % progress_every == 0:
+                    progress(_rate(stats, count, start))
+        os.replace(tmp, path)
+    except Exception as e:
+        log_error("./Utils", "data_exchange.py", f"No se pudo exportar {kind} a {path}: {e}")
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        return None
+    _rate(stats, count, start)
+    if progress is not None:
+        progress(stats)
+    log_info("./Utils", "data_exchange.py",
+             f"Exportados {count} {kind} a {path} ({stats['seconds']} s, {stats['rows_per_s']:.0f} filas/s)")
+    return stats
+
+
+def _rate(stats: Dict, rows: int, start: float) -> Dict:
+    seconds = time.perf_counter() - start
+    stats["rows"] = rows
+    stats["seconds"] = round(seconds, 3)
+    stats["rows_per_s"] = round(rows / seconds, 1) if seconds > 0 else 0.0
+    return stats
+
+
+# -------------------------
+# IMPORTACIÓN
+# -------------------------
+def _sniff_delimiter(header: str) -> str:
+    """Separador de un CSV según su encabezado (Excel en español suele usar ';')."""
+    counts = {d: header.count(d) for d in (",", ";", "\t")}
+    return max(counts, key=counts.get) if any(counts.values()) else ","
+
+
+def iter_import_rows(path: str, fmt: Optional[str] = None,
+                     delimiter: Optional[str] = None) -> Iterator[Tuple[int, object]]:
+    """
+    Filas de un CSV / NDJSON como (número de línea, dict), de a una. Una línea
+    NDJSON inválida se genera como (línea, ValueError) para que quien importa
+    la informe y siga.
+    """
+    fmt = resolve_exchange_format(path, fmt)
+    # utf-8-sig: los CSV guardados desde Excel empiezan con BOM
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        if fmt == "ndjson":
+            for number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except ValueError as e:
+                    yield number, ValueError(f"JSON inválido: {e}")
+                    continue
+                yield number, row if isinstance(row, dict) else ValueError("se esperaba un objeto")
+            return
+        header = f.readline()
+        if not header:
+            return
+        if delimiter is None:
+            delimiter = _sniff_delimiter(header)
+        columns = [c.strip() for c in next(csv.reader([header], delimiter=delimiter))]
+        reader = csv.reader(f, delimiter=delimiter)
+        for values in reader:
+            if not values or (len(values) == 1 and not values[0].strip()):
+                continue
+            yield reader.line_num + 1, dict(zip(columns, values))
+
+
+def _clean(row: Dict) -> Dict:
+    """Quita espacios y columnas vacías o administradas por DBManager."""
+    clean = {}
+    for key, value in row.items():
+        if key is None or key in _IMPORT_IGNORED:
+            continue
+        if isinstance(value, str):
+            value = value.strip()
+            if not value:
+                continue
+        elif value is None:
+            continue
+        clean[key] = value
+    return clean
+
+
+class _Importer:
+    """Valida y normaliza filas de un kind; prepare() retorna el registro o lanza ValueError."""
+
+    def __init__(self, db, kind: str, validate_cuit: bool):
+        self.db = db
+        self.kind = kind
+        self.validate_cuit = validate_cuit
+        # CUIT -> id de cliente (proyectos con client_cuit): consultas repetidas entre filas
+        self._client_ids: Dict[str, Optional[str]] = {}
+
+    def prepare(self, row: Dict) -> Dict:
+        row = _clean(row)
+        return self._client(row) if self.kind == "clients" else self._project(row)
+
+    def _cuit(self, value) -> str:
+        cuit = normalize_cuit(value)
+        if cuit is None:
+            if self.validate_cuit:
+                raise ValueError(f"CUIT inválido: {value!r}")
+            cuit = str(value).strip()
+        return cuit
+
+    def _find_client(self, cuit: str, raw) -> Optional[Dict]:
+        """
+        Cliente por CUIT normalizado o, si no, tal como vino o con guiones
+        (clientes guardados antes de normalizar: "30-71234567-1").
+        """
+        candidates = [cuit, str(raw).strip()]
+        if len(cuit) == 11:
+            candidates.append(f"{cuit[:2]}-{cuit[2:10]}-{cuit[10]}")
+        for candidate in dict.fromkeys(candidates):
+            client = self.db.find_client_by_cuit(candidate)
+            if client is not None:
+                return client
+        return None
+
+    def _client(self, row: Dict) -> Dict:
+        raw = row.pop("cuit", None) or row.pop("Cuit", None)
+        if not raw:
+            raise ValueError("cliente sin CUIT")
+        cuit = self._cuit(raw)
+        existing = self._find_client(cuit, raw)
+        # si ya existe guardado con otro formato, actualizarlo en lugar de duplicarlo
+        row["cuit"] = existing.get("cuit") if existing is not None else cuit
+        row.pop("id", None)  # el id del cliente es su CUIT
+        return row
+
+    def _project(self, row: Dict) -> Dict:
+        raw = row.pop("client_cuit", None)
+        if raw and not row.get("client_id"):
+            cuit = self._cuit(raw)
+            if cuit not in self._client_ids:
+                client = self._find_client(cuit, raw)
+                self._client_ids[cuit] = client.get("id") if client else None
+            if self._client_ids[cuit] is None:
+                raise ValueError(f"no hay cliente con CUIT {cuit}")
+            row["client_id"] = self._client_ids[cuit]
+        macro = row.get("is_macro")
+        if isinstance(macro, str):
+            row["is_macro"] = macro.lower() in _TRUE
+        return row
+
+
+def import_file(db, kind: str, path: str, fmt: Optional[str] = None, delimiter: Optional[str] = None,
+                batch_size: int = DEFAULT_BATCH_SIZE, validate_cuit: bool = True,
+                progress: Optional[Callable[[Dict], None]] = None,
+                progress_every: int = DEFAULT_PROGRESS_EVERY) -> Optional[Dict]:
+    """
+    Importa 'clients' o 'projects' desde un CSV / NDJSON en lotes de batch_size.
+    validate_cuit=False acepta CUIT con dígito verificador incorrecto (igual se
+    normalizan los separadores cuando es posible).
+    Retorna {"path", "format", "rows", "imported", "rejected", "errors",
+    "seconds", "rows_per_s"} (errors: [{"line", "error"}], hasta
+    MAX_REPORTED_ERRORS) o None si el archivo no se pudo leer.
+    """
+    fmt = resolve_exchange_format(path, fmt)
+    bulk = db.bulk_upsert_clients if kind == "clients" else db.bulk_upsert_projects
+    importer = _Importer(db, kind, validate_cuit)
+    start = time.perf_counter()
+    stats = {"path": path, "format": fmt, "rows": 0, "imported": 0, "rejected": 0, "errors": [],
+             "seconds": 0.0, "rows_per_s": 0.0}
+
+    def reject(line: int, error: Exception):
+        stats["rejected"] += 1
+        if len(stats["errors"]) < MAX_REPORTED_ERRORS:
+            stats["errors"].append({"line": line, "error": str(error)})
+
+    batch: List[Dict] = []
+    rows = 0
+    try:
+        # una sola escritura por archivo al final (ver docstring del módulo)
+        with db.transaction():
+            for line, row in iter_import_rows(path, fmt, delimiter):
+                rows += 1
+                if isinstance(row, Exception):
+                    reject(line, row)
+                else:
+                    try:
+                        batch.append(importer.prepare(row))
+                    except ValueError as e:
+                        reject(line, e)
+                if len(batch) >= batch_size:
+                    stats["imported"] += len(bulk(batch))
+                    batch = []
+                if progress is not None and rows % progress_every == 0:
+                    progress(_rate(stats, rows, start))
+            if batch:
+                stats["imported"] += len(bulk(batch))
+    except (OSError, ValueError, csv.Error) as e:
+        log_error("./Utils", "data_exchange.py", f"No se pudo importar {path}: {e}")
+        return None
+    _rate(stats, rows, start)
+    if progress is not None:
+        progress(stats)
+    log_info("./Utils", "data_exchange.py",
+             f"Importados {stats['imported']} {kind} de {path} ({stats['rejected']} rechazados, "
+             f"{stats['seconds']} s, {stats['rows_per_s']:.0f} filas/s)")
+    return stats
@@ -0,0 +1,278 @@
+
+
+# ./Utils/db_async.py
+
+"""
+Utils/db_async.py
+
+Fachada asíncrona de DBManager para no bloquear el hilo de la GUI con E/S.
+
+    db = AsyncDBManager()                         # envuelve get_db_manager()
+
+    # asyncio
+    projects = await db.query_projects({"status": "En proceso"}, "-updated_at", limit=50)
+
+    # Qt / callbacks: el callback corre en el hilo de la GUI
+    db.call("load_projects", callback=self.populate, errback=self.show_error)
+
+    # concurrent.futures
+    future = db.submit("add_or_update_client", {...})
+
+Garantías:
+ - Executor acotado (max_workers hilos) compartido por lecturas y escrituras.
+ - Escrituras serializadas por archivo y en orden de envío (FIFO por archivo);
+   archivos distintos se escriben en paralelo, salvo las altas masivas, que
+   abren una transacción y excluyen todo lo demás. Las lecturas esperan a las
+   escrituras enviadas antes sobre su archivo (leen lo que ya se escribió).
+ - Lecturas idénticas en vuelo se unifican: la segunda llamada recibe el mismo
+   future, no encola trabajo duplicado. El resultado es compartido entre
+   quienes lo esperan: tratarlo como sólo lectura.
+
+Mientras se use la fachada, todo acceso al gestor envuelto debe pasar por ella.
+Con el backend SQLite (una sola conexión) todas las operaciones comparten un
+único candado.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Optional, Tuple
+
+from Utils.logger import log_error
+
+DEFAULT_MAX_WORKERS = 2
+
+_CLIENTS = ("clients",)
+_PROJECTS = ("projects",)
+_BOTH = ("clients", "projects")
+
+# método -> (archivos que toca, es escritura). Los métodos que abren una
+# transacción van con ambos archivos: la transacción de DBManager es de toda la
+# instancia y una escritura concurrente sobre el otro archivo quedaría dentro
+# de ella (y se perdería en un rollback).
+_METHODS: Dict[str, Tuple[Tuple[str, ...], bool]] = {
+    "load_clients": (_CLIENTS, False),
+    "find_client_by_cuit": (_CLIENTS, False),
+    "search_clients": (_CLIENTS, False),
+    "load_projects_data": (_PROJECTS, False),
+    "load_projects": (_PROJECTS, False),
+    "find_project_by_id": (_PROJECTS, False),
+    "get_current_project": (_PROJECTS, False),
+    "query_projects": (_PROJECTS, False),
+    "count_projects": (_PROJECTS, False),
+    "get_client_projects": (_PROJECTS, False),
+    "get_client_summary": (_PROJECTS, False),
+    "search_projects": (_PROJECTS, False),
+    "get_client_summaries": (_BOTH, False),
+    "search": (_BOTH, False),
+    "save_clients": (_CLIENTS, True),
+    "add_or_update_client": (_CLIENTS, True),
+    "bulk_upsert_clients": (_BOTH, True),
+    "remove_client": (_CLIENTS, True),
+    "save_projects_data": (_PROJECTS, True),
+    "add_or_update_project": (_PROJECTS, True),
+    "bulk_upsert_projects": (_BOTH, True),
+    "set_current_project": (_PROJECTS, True),
+    "remove_project": (_PROJECTS, True),
+    "compact": (_BOTH, True),
+    "reload": (_BOTH, True),
+    "persist_search_index": (_BOTH, True),
+}
+
+
+def _read_key(name: str, args, kwargs):
+    """Clave de unificación de lecturas (hashable aunque los argumentos sean dicts/listas)."""
+    key = (name, args, tuple(sorted(kwargs.items())))
+    try:
+        hash(key)
+        return key
+    except TypeError:
+        return (name, repr(args), repr(sorted(kwargs.items())))
+
+
+# ---------------------------------------------------------------------------
+# Entrega de callbacks en el hilo de la GUI
+# ---------------------------------------------------------------------------
+
+_qt_invoker = None
+
+
+def qt_dispatcher() -> Optional[Callable[[Callable], None]]:
+    """
+    Función que ejecuta un callable en el hilo de la aplicación Qt (señal con
+    conexión encolada). None si no hay PySide2 o QApplication (modo sin GUI).
+    """
+    global _qt_invoker
+    if _qt_invoker is not None:
+        return _qt_invoker.invoke.emit
+    try:
+        from PySide2 import QtCore
+    except ImportError:
+        return None
+    app = QtCore.QCoreApplication.instance()
+    if app is None:
+        return None
+
+    class _Invoker(QtCore.QObject):
+        invoke = QtCore.Signal(object)
+
+        def __init__(self):
+            super().__init__()
+            self.moveToThread(app.thread())
+            self.invoke.connect(self._run, QtCore.Qt.QueuedConnection)
+
+        @staticmethod
+        def _run(fn):
+            fn()
+
+    _qt_invoker = _Invoker()
+    return _qt_invoker.invoke.emit
+
+
+# ---------------------------------------------------------------------------
+# AsyncDBManager
+# ---------------------------------------------------------------------------
+
+class AsyncDBManager:
+    """
+    Ejecuta los métodos de DBManager/SQLiteDBManager en un pool de hilos acotado.
+
+    Métodos awaitables: los mismos nombres que el gestor envuelto
+    (await db.load_projects(), await db.add_or_update_project({...}), ...).
+    Deben llamarse con un event loop en ejecución.
+    """
+
+    def __init__(self, manager=None, max_workers: int = DEFAULT_MAX_WORKERS,
+                 dispatcher: Optional[Callable[[Callable], None]] = None):
+        """
+        manager: gestor a envolver (None -> Utils.db_manager.get_db_manager()).
+        dispatcher: función que ejecuta un callable en el hilo de la GUI para los
+                    callbacks de call() (None -> Qt si está disponible, si no directo).
+        """
+        if manager is None:
+            from Utils.db_manager import get_db_manager
+            manager = get_db_manager()
+        self.manager = manager
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="ew-db")
+        self._dispatcher = dispatcher
+
+        # DBManager cachea cada archivo por separado: un candado por archivo.
+        # SQLite comparte una conexión: un único candado.
+        from Utils.db_manager import DBManager
+        self._per_file = isinstance(manager, DBManager)
+        self._locks = {k: threading.Lock() for k in (_BOTH if self._per_file else ("db",))}
+
+        # Estado de planificación (protegido por _state_lock)
+        self._state_lock = threading.Lock()
+        self._tails: Dict[str, Future] = {}            # última escritura enviada por archivo
+        self._inflight: Dict[object, Tuple[Future, Tuple[str, ...]]] = {}
+        self.coalesced = 0
+
+    # -------------------------
+    # PLANIFICACIÓN
+    # -------------------------
+    def _lock_names(self, kinds: Tuple[str, ...]) -> Tuple[str, ...]:
+        return kinds if self._per_file else ("db",)
+
+    def _run(self, name: str, args, kwargs, locks: Tuple[str, ...], after):
+        if after:
+            wait(after)
+        acquired = []
+        try:
+            for lock_name in locks:  # orden fijo: evita interbloqueos
+                self._locks[lock_name].acquire()
+                acquired.append(lock_name)
+            return getattr(self.manager, name)(*args, **kwargs)
+        finally:
+            for lock_name in reversed(acquired):
+                self._locks[lock_name].release()
+
+    def submit(self, name: str, *args, **kwargs) -> Future:
+        """Encola la llamada y retorna un concurrent.futures.Future."""
+        if name not in _METHODS:
+            raise AttributeError(f"{type(self.manager).__name__} no expone '{name}' en la fachada asíncrona")
+        kinds, is_write = _METHODS[name]
+        locks = self._lock_names(kinds)
+        with self._state_lock:
+            after = [self._tails[k] for k in locks if k in self._tails and not self._tails[k].done()]
+            if is_write:
+                future = self._executor.submit(self._run, name, args, kwargs, locks, after)
+                for k in locks:
+                    self._tails[k] = future
+                # lecturas posteriores no deben unirse a lecturas previas a esta escritura
+                for key in [key for key, (_, ks) in self._inflight.items() if set(ks) & set(kinds)]:
+                    del self._inflight[key]
+                return future
+
+            key = _read_key(name, args, kwargs)
+            current = self._inflight.get(key)
+            if current is not None and not current[0].done():
+                self.coalesced += 1
+                return current[0]
+            future = self._executor.submit(self._run, name, args, kwargs, locks, after)
+            self._inflight[key] = (future, kinds)
+        future.add_done_callback(lambda f, key=key: self._forget(key, f))
+        return future
+
+    def _forget(self, key, future: Future):
+        with self._state_lock:
+            current = self._inflight.get(key)
+            if current is not None and current[0] is future:
+                del self._inflight[key]
+
+    # -------------------------
+    # API
+    # -------------------------
+    def __getattr__(self, name: str):
+        if name.startswith("_") or name not in _METHODS:
+            raise AttributeError(name)
+
+        def method(*args, **kwargs):
+            # se encola al llamar (no al hacer await): el orden de envío es el de las llamadas
+            return asyncio.wrap_future(self.submit(name, *args, **kwargs))
+
+        method.__name__ = name
+        method.__doc__ = getattr(getattr(self.manager, name, None), "__doc__", None)
+        return method
+
+    def call(self, name: str, *args, callback: Optional[Callable] = None,
+             errback: Optional[Callable] = None, **kwargs) -> Future:
+        """
+        Variante con callbacks (Qt): callback(resultado) o errback(excepción) se
+        ejecutan en el hilo de la GUI. Sin errback, los errores se registran en el log.
+        """
+        future = self.submit(name, *args, **kwargs)
+
+        def deliver(f: Future):
+            error = f.exception()
+            if error is not None:
+                if errback is not None:
+                    errback(error)
+                else:
+                    log_error("./Utils", "db_async.py", f"{name} falló: {error}")
+            elif callback is not None:
+                callback(f.result())
+
+        def done(f: Future):
+            dispatch = self._dispatcher or qt_dispatcher()
+            try:
+                if dispatch is None:
+                    deliver(f)
+                else:
+                    dispatch(lambda: deliver(f))
+            except Exception as e:
+                log_error("./Utils", "db_async.py", f"Error en callback de {name}: {e}")
+
+        future.add_done_callback(done)
+        return future
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Espera a que terminen las escrituras enviadas hasta ahora. Retorna False si venció timeout."""
+        with self._state_lock:
+            pending = [f for f in self._tails.values() if not f.done()]
+        _, not_done = wait(pending, timeout=timeout)
+        return not not_done
+
+    def close(self, wait_pending: bool = True):
+        """Detiene el executor (por defecto espera lo encolado)."""
+        self._executor.shutdown(wait=wait_pending)
@@ -0,0 +1,213 @@
+
+
+# ./Utils/db_journal.py
+
+"""
+Utils/db_journal.py
+
+Journal (log append-only) para los JSON de la 'DB' local.
+
+En modo journal, DBManager no reescribe clients.json / projects.json en cada
+cambio: agrega una línea compacta por mutación a '<archivo>.journal'.
+El JSON sigue siendo el formato canónico (snapshot); el estado real es
+snapshot + replay del journal, y la compactación vuelca todo a un snapshot
+nuevo (tmp + os.replace) y descarta el journal.
+
+Formato del journal (una línea JSON por registro):
+  {"op": "base", "sig": [ino, size, mtime_ns]}   -> cabecera: snapshot sobre el que aplica
+  {"op": "put", "rec": {...}}                    -> alta/modificación (registro completo)
+  {"op": "del", "id": "..."}                     -> baja por id
+  {"op": "set", "key": "...", "value": ...}      -> clave de primer nivel (ej. current_project_id)
+
+Si la cabecera no coincide con la firma actual del snapshot (por ejemplo, otro
+proceso compactó o alguien editó el JSON a mano) el journal se considera obsoleto
+y se ignora: el snapshot manda.
+
+Sólo usa la librería estándar para poder importarse desde Utils.paths.
+"""
+
+import os
+import json
+from typing import Optional, Dict, List, Tuple, Iterator
+
+
+def file_signature(path: str) -> Optional[Tuple[int, int, int]]:
+    """
+    Firma barata de un archivo: (inode, tamaño, mtime_ns).
+    Cambia si el archivo se reescribe o se reemplaza (os.replace cambia el inode).
+    Retorna None si el archivo no existe.
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+
+def journal_path(path: str) -> str:
+    """Ruta del journal asociado a un JSON de datos."""
+    return path + ".journal"
+
+
+def _dumps(record: dict) -> str:
+    return json.dumps(record, separators=(",", ":"), ensure_ascii=False)
+
+
+def append_ops(path: str, ops: List[Dict], base_signature, fresh: bool) -> Optional[Tuple[int, int, int]]:
+    """
+    Agrega 'ops' al journal de 'path'. Si fresh=True, lo reinicia con una cabecera
+    que apunta a 'base_signature' (firma del snapshot vigente).
+    Retorna la firma del journal tras escribir, o None si falló.
+    """
+    jpath = journal_path(path)
+    lines = []
+    if fresh:
+        lines.append(_dumps({"op": "base", "sig": list(base_signature) if base_signature else None}))
+    lines.extend(_dumps(op) for op in ops)
+    try:
+        with open(jpath, "w" if fresh else "a", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        return file_signature(jpath)
+    except Exception:
+        return None
+
+
+def read_ops(path: str, base_signature) -> Optional[List[Dict]]:
+    """
+    Lee las operaciones del journal de 'path'.
+    Retorna None si no hay journal o si es obsoleto (cabecera distinta de base_signature).
+    Una última línea truncada (corte durante un append) se ignora.
+    """
+    jpath = journal_path(path)
+    try:
+        with open(jpath, "r", encoding="utf-8") as f:
+            raw = f.read().splitlines()
+    except OSError:
+        return None
+
+    ops = []
+    for i, line in enumerate(raw):
+        if not line:
+            continue
+        try:
+            op = json.loads(line)
+        except ValueError:
+            if i == len(raw) - 1:
+                break
+            continue
+        ops.append(op)
+
+    if not ops or ops[0].get("op") != "base":
+        return None
+    sig = ops[0].get("sig")
+    if base_signature is None or sig is None or tuple(sig) != tuple(base_signature):
+        return None
+    return ops[1:]
+
+
+def apply_ops(data: dict, list_key: str, ops: List[Dict]) -> dict:
+    """
+    Aplica 'ops' sobre 'data' (in situ) y lo retorna.
+    'list_key' es la clave de la lista de registros ("clients" / "projects").
+    """
+    if not ops:
+        return data
+    records = data.setdefault(list_key, [])
+    position = {}
+    for i, r in enumerate(records):
+        position.setdefault(r.get("id"), i)
+
+    removed = False
+    for op in ops:
+        kind = op.get("op")
+        if kind == "put":
+            rec = op.get("rec") or {}
+            i = position.get(rec.get("id"))
+            if i is not None and records[i] is not None:
+                records[i] = rec
+            else:
+                position[rec.get("id")] = len(records)
+                records.append(rec)
+        elif kind == "del":
+            rid = op.get("id")
+            i = position.pop(rid, None)
+            if i is not None:
+                records[i] = None
+                removed = True
+        elif kind == "set":
+            data[op.get("key")] = op.get("value")
+
+    if removed:
+        data[list_key] = [r for r in records if r is not None]
+    return data
+
+
+def load_journaled(path: str, data: dict, list_key: str) -> dict:
+    """
+    Aplica sobre 'data' (snapshot ya leído de 'path') el journal vigente, si existe.
+    """
+    ops = read_ops(path, file_signature(path))
+    if ops:
+        apply_ops(data, list_key, ops)
+    return data
+
+
+def iter_journaled(path: str, list_key: str) -> Iterator[Tuple[str, object]]:
+    """
+    Versión en streaming de snapshot + journal (ver Utils/json_stream.iter_document):
+    genera (clave, valor) por cada miembro de primer nivel y (list_key, registro)
+    por cada registro, con el journal vigente ya aplicado, sin materializar el
+    snapshot. El journal se lee completo (es chico: se compacta por umbral).
+    Mismo resultado y orden que apply_ops sobre el snapshot completo.
+    """
+    from Utils.json_stream import iter_document
+
+    ops = read_ops(path, file_signature(path)) or []
+    inplace: Dict[object, Tuple[int, Dict]] = {}  # reemplazan al registro del snapshot (o altas)
+    tail: Dict[object, Tuple[int, Dict]] = {}     # altas posteriores a una baja: van al final
+    deleted = set()
+    scalars: Dict[str, object] = {}
+    for seq, op in enumerate(ops):
+        kind = op.get("op")
+        if kind == "put":
+            rec = op.get("rec") or {}
+            rid = rec.get("id")
+            if rid in deleted or rid in tail:
+                tail[rid] = (tail.get(rid, (seq,))[0], rec)
+            else:
+                inplace[rid] = (inplace.get(rid, (seq,))[0], rec)
+        elif kind == "del":
+            rid = op.get("id")
+            if rid in tail:
+                del tail[rid]
+            else:
+                inplace.pop(rid, None)
+                deleted.add(rid)
+        elif kind == "set":
+            scalars[op.get("key")] = op.get("value")
+
+    for key, value in iter_document(path, list_key):
+        if key != list_key:
+            yield key, scalars.pop(key, value)
+            continue
+        rid = value.get("id") if isinstance(value, dict) else None
+        if rid in deleted:
+            deleted.discard(rid)  # sólo la primera aparición, como apply_ops
+            continue
+        replaced = inplace.pop(rid, None)
+        yield key, replaced[1] if replaced is not None else value
+    for _, rec in sorted(list(inplace.values()) + list(tail.values()), key=lambda item: item[0]):
+        yield list_key, rec
+    for key, value in scalars.items():
+        yield key, value
+
+
+def remove_journal(path: str) -> bool:
+    """Elimina el journal de 'path' (tras compactar). Retorna True si no queda journal."""
+    try:
+        os.remove(journal_path(path))
+    except FileNotFoundError:
+        pass
+    except OSError:
+        return False
+    return True
@@ -11,19 +11,105 @@ Provee operaciones CRUD atómicas para:
 
 Características:
  - Uso de CUIT/CUIL como ID de cliente cuando exista.
- - Escritura atómica (tmp + os.replace).
+ - Escritura atómica (tmp + os.replace) en el formato del setting Database/format
+   (Utils/serialization.py): JSON compacto (por defecto), orjson, snapshot
+   binario o JSON indentado. La lectura autodetecta el formato; export_json
+   genera una copia legible (JSON indentado) a pedido.
+ - Caché en memoria de los JSON parseados, revalidada por firma de archivo
+   (inode, tamaño, mtime) y actualizada in situ en cada escritura. Con el
+   vigilante de archivos (Utils/file_watcher.py, inotify) la revalidación se
+   hace sólo tras un aviso de cambio: las lecturas con caché vigente no hacen
+   stat. Sin inotify (polling), o si la carpeta de datos está en un sistema de
+   archivos de red (NFS, SMB: inotify no ve lo que escriben otros hosts), se
+   sigue revalidando en cada lectura.
+ - Índices hash (cuit/id de clientes, id/path de proyectos) para búsquedas O(1).
+ - Consultas de proyectos filtradas/ordenadas/paginadas (query_projects) sobre
+   índices secundarios (Utils/project_index.py) mantenidos incrementalmente,
+   incluido el índice inverso cliente -> proyectos con agregados por cliente
+   (get_client_projects / get_client_summary / get_client_summaries).
+ - Transacciones (with db.transaction():) y altas masivas: N cambios en memoria,
+   una sola escritura atómica por archivo al confirmar, rollback ante excepción.
+ - Modo journal opcional (ver Utils/db_journal.py): cada mutación se agrega
+   como una línea compacta y se compacta a snapshot al superar un umbral.
+   El journal vigente se aplica al leer en cualquier modo: sin journal, la
+   primera escritura lo vuelca al snapshot y lo elimina.
+ - Búsqueda de texto rankeada (search / search_clients / search_projects) con
+   índice invertido + trigramas (Utils/search_index.py), mantenido
+   incrementalmente y persistido junto a cada JSON (<archivo>.search).
+ - Varias instancias (procesos) sobre los mismos archivos: candado advisory
+   por archivo (Utils/file_lock.py) sólo durante la ventana de commit y
+   concurrencia optimista por registro ('_rev', se incrementa en cada cambio).
+   Si otro proceso escribió desde nuestra lectura, los cambios propios se
+   fusionan sobre el contenido actual del disco (campo a campo) antes de
+   escribir; ante cambios al mismo campo gana el que confirmó primero.
+ - Lectura en streaming (iter_clients / iter_projects, Utils/json_stream.py):
+   recorre los registros con memoria acotada sin cargar la caché; con la
+   caché fría find_project_by_id corta la lectura al encontrar el proyecto.
+ - Modo write-behind opcional: las mutaciones se aplican en memoria y un hilo
+   en segundo plano las vuelca (una escritura por archivo) tras una ventana
+   de debounce o un máximo de tiempo sucio. flush() fuerza el volcado; se
+   vuelca también al desactivar el workbench y al salir del intérprete.
+   Un cambio de proyecto actual (o de su path) se vuelca en el momento:
+   get_project_path() lee projects.json del disco.
+ - Registros tipados opcionales (DBManager(records=True) o setting
+   Database/records): las lecturas retornan Client / Project con __slots__
+   (Utils/records.py) en lugar de dicts; las escrituras aceptan ambos. status
+   y type de los proyectos se internan también en la caché.
+ - Historial de cambios opcional (DBManager(history=True) o setting
+   Database/history, ver Utils/record_history.py): cada confirmación agrega
+   los campos modificados de cada registro a '<archivo>.history/', con
+   checkpoints periódicos y retención (Database/history_retention_days).
+   record_at / records_at / record_changes consultan un instante pasado.
  - API en forma de clase DBManager para fácil reutilización.
  - Logs con Utils.logger.
 """
 
 import os
 import json
+import time
 import uuid
+import heapq
+import atexit
+import weakref
 import datetime
-from typing import Optional, Dict, List
+import functools
+import threading
+from contextlib import contextmanager, nullcontext, ExitStack
+from typing import Optional, Dict, List, Tuple, Iterable, Iterator
 
-from Utils.paths import get_clients_db_path, get_projects_db_path, _ensure_json_exists
+from Utils.paths import (
+    get_clients_db_path, get_projects_db_path, _ensure_json_exists, invalidate_project_path_cache,
+    get_project_path,
+)
 from Utils.logger import log_info, log_error
+from Utils.config import get_setting
+from Utils.db_journal import (
+    file_signature, journal_path, append_ops, read_ops, apply_ops, remove_journal, iter_journaled,
+)
+from Utils.file_lock import file_lock
+from Utils.serialization import DEFAULT_FORMAT, dumps, read_file, resolve_format
+from Utils.search_index import SearchIndex, CLIENT_FIELDS, PROJECT_FIELDS
+from Utils.project_index import ProjectIndex
+from Utils.records import Client, Project, as_dict, intern_project
+from Utils.record_history import RecordHistory, DEFAULT_RETENTION_DAYS, diff_record
+
+# Operaciones en journal antes de compactar a snapshot (por archivo)
+DEFAULT_COMPACT_THRESHOLD = 1000
+
+# Write-behind: segundos sin cambios antes de volcar un archivo (debounce) y
+# segundos máximos que un archivo puede quedar sin persistir con cambios continuos
+DEFAULT_DEBOUNCE = 0.5
+DEFAULT_MAX_DIRTY = 5.0
+
+_TRUE = ("1", "true", "yes", "si", "sí")
+
+# Campos que no cuentan como conflicto al fusionar un registro con el disco
+_MERGE_IGNORED = ("_rev", "created_at", "updated_at")
+
+_SEARCH_FIELDS = {"clients": CLIENT_FIELDS, "projects": PROJECT_FIELDS}
+
+# Instancias vivas: al salir se persisten los índices de búsqueda modificados
+_LIVE_MANAGERS = weakref.WeakSet()
 
 # ---------------------------------------------------------------------------
 # Helpers
@@ -33,17 +119,37 @@ def _now_iso() -> str:
     return datetime.datetime.utcnow().isoformat() + "Z"
 
 
-def _atomic_write(path: str, data: dict) -> bool:
+def _configured_format() -> str:
+    """Formato de escritura de los archivos de datos (setting Database/format)."""
+    return resolve_format(get_setting("Database", "format", DEFAULT_FORMAT))
+
+
+def _atomic_write(path: str, data: dict, fmt: str = DEFAULT_FORMAT) -> bool:
     """
     Escritura atómica: guarda en path + '.tmp' y luego renombra con os.replace.
+    fmt: formato de Utils/serialization.py ("json", "orjson", "binary", "pretty").
     Retorna True si se completó correctamente.
     """
+    return _atomic_write_signed(path, data, fmt) is not None
+
+
+def _atomic_write_signed(path: str, data: dict, fmt: str = DEFAULT_FORMAT) -> Optional[Tuple[int, int, int]]:
+    """
+    Igual que _atomic_write, pero retorna la firma del archivo escrito (o None si falló).
+    La firma se toma del .tmp antes del os.replace (el rename conserva inode,
+    tamaño y mtime), así una escritura de otro proceso posterior no queda oculta.
+    """
     tmp = path + ".tmp"
+    # miembros escalares antes que las listas: los lectores en streaming
+    # (get_project_path) encuentran current_project_id sin recorrer los proyectos
+    data = dict(sorted(data.items(), key=lambda item: isinstance(item[1], list)))
     try:
-        with open(tmp, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=4, ensure_ascii=False)
+        raw = dumps(data, fmt)
+        with open(tmp, "wb") as f:
+            f.write(raw)
+        signature = file_signature(tmp)
         os.replace(tmp, path)
-        return True
+        return signature
     except Exception as e:
         log_error("./Utils", "db_manager.py", f"Error guardando {path}: {e}")
         try:
@@ -51,58 +157,1037 @@ def _atomic_write(path: str, data: dict) -> bool:
                 os.remove(tmp)
         except Exception:
             pass
-        return False
+        return None
+
+
+def _synchronized(method):
+    """Ejecuta el método con el candado de la instancia (no-op fuera de write-behind)."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+# Campos editables por add_or_update_* (id, cuit y fechas los administra DBManager)
+_CLIENT_EDITABLE = ("name", "address", "contact_name", "contact_email", "contact_phone")
+_PROJECT_EDITABLE = ("name", "code", "path", "template", "type", "purpose", "client_id", "status", "version")
+
+
+def _merge_client(existing: Dict, client) -> Dict:
+    """Actualiza in situ los campos editables de un cliente existente (client: dict o Client)."""
+    if isinstance(client, Client):
+        client = client.given(_CLIENT_EDITABLE)  # sólo los campos que trae el registro
+    for field in _CLIENT_EDITABLE:
+        if field in client:
+            existing[field] = client[field]
+        elif field not in existing:
+            existing[field] = None
+    existing["updated_at"] = _now_iso()
+    existing["_rev"] = existing.get("_rev", 0) + 1
+    return existing
+
+
+def _new_client(client, cuit: Optional[str]) -> Dict:
+    """Construye un cliente nuevo (id = CUIT si existe, si no uuid)."""
+    new_id = str(cuit) if cuit else str(uuid.uuid4())
+    now = _now_iso()
+    get = client.get
+    return {
+        "id": new_id,
+        "name": get("name", ""),
+        "cuit": cuit or "",
+        "address": get("address", ""),
+        "contact_name": get("contact_name", ""),
+        "contact_email": get("contact_email", ""),
+        "contact_phone": get("contact_phone", ""),
+        "created_at": now,
+        "updated_at": now,
+        "_rev": 1
+    }
+
+
+def _merge_project(existing: Dict, project) -> Dict:
+    """Actualiza in situ los campos editables de un proyecto existente (project: dict o Project)."""
+    if isinstance(project, Project):
+        project = project.given(_PROJECT_EDITABLE + ("is_macro",))  # sólo los campos que trae el registro
+    for field in _PROJECT_EDITABLE:
+        if field in project:
+            existing[field] = project[field]
+        elif field not in existing:
+            existing[field] = None
+    existing["is_macro"] = project.get("is_macro", existing.get("is_macro", False))
+    existing["updated_at"] = _now_iso()
+    existing["_rev"] = existing.get("_rev", 0) + 1
+    return intern_project(existing)
+
+
+def _new_project(project) -> Dict:
+    """Construye un proyecto nuevo con el id recibido (o uuid) y valores por defecto."""
+    now = _now_iso()
+    get = project.get
+    return intern_project({
+        "id": get("id") or str(uuid.uuid4()),
+        "name": get("name", ""),
+        "code": get("code", ""),
+        "path": get("path", ""),
+        "template": get("template", ""),
+        "type": get("type", ""),
+        "purpose": get("purpose", ""),
+        "client_id": get("client_id", ""),
+        "status": get("status", "En proceso"),
+        "version": get("version", "0.1.0"),
+        "is_macro": get("is_macro", False),
+        "created_at": now,
+        "updated_at": now,
+        "_rev": 1
+    })
+
+
+def _rebase_record(base: Optional[Dict], mine: Optional[Dict], theirs: Optional[Dict]) -> Tuple[Optional[Dict], bool]:
+    """
+    Fusión a tres vías de un registro que modificamos (base -> mine) cuando en
+    disco ya hay otra versión (theirs). None = no existe / eliminado.
+    Retorna (registro resultante o None, hubo conflicto). Ante conflicto se
+    conserva lo del disco (ganó quien confirmó primero).
+    """
+    if theirs is None:
+        if base is None or mine is None:
+            return mine, False
+        return None, True  # modificado acá, eliminado en el disco
+    if base is not None and theirs.get("_rev") == base.get("_rev"):
+        return mine, False  # el disco no tocó este registro
+    if mine is None:
+        return theirs, True  # eliminado acá, modificado en el disco
+    base = base or {}
+    merged = dict(theirs)
+    conflict = False
+    for field in set(mine) | set(base):
+        if field in _MERGE_IGNORED:
+            continue
+        ours, old, disk = mine.get(field), base.get(field), theirs.get(field)
+        if ours == old:
+            continue
+        if disk == old or disk == ours:
+            merged[field] = ours
+        else:
+            conflict = True
+    merged["_rev"] = max(theirs.get("_rev", 0), mine.get("_rev", 0)) + 1
+    merged["updated_at"] = max(str(theirs.get("updated_at") or ""), str(mine.get("updated_at") or ""))
+    return merged, conflict
 
 # ---------------------------------------------------------------------------
 # DBManager (OOP)
 # ---------------------------------------------------------------------------
 
+class _CachedFile:
+    """
+    Copia parseada de un JSON junto con la firma del archivo del que se leyó.
+    """
+
+    __slots__ = ("path", "list_key", "fallback", "data", "signature", "pending", "bases", "journal_ops",
+                 "verified")
+
+    def __init__(self, path: str, list_key: str, fallback: dict):
+        self.path = path
+        self.list_key = list_key
+        self.fallback = fallback
+        self.data: Optional[dict] = None
+        self.signature = None
+        # Mutaciones aún no persistidas (para el journal). None = requiere snapshot completo.
+        self.pending: Optional[List[Dict]] = []
+        # Versión en disco (la última leída/escrita) de cada registro modificado
+        # desde entonces: id -> copia del registro, o None si es nuevo
+        self.bases: Dict[str, Optional[Dict]] = {}
+        # Operaciones acumuladas en el journal vigente
+        self.journal_ops = 0
+        # True mientras el vigilante (inotify) no avise cambios desde la última
+        # revalidación: la firma en disco sigue siendo 'signature' sin hacer stat
+        self.verified = False
+
+
 class DBManager:
     """
     Clase responsable de leer/escribir los archivos de datos locales.
-    Crear una instancia y reutilizarla.
+    Crear una instancia y reutilizarla: mantiene en memoria el contenido
+    parseado de cada JSON y sólo lo vuelve a leer si el archivo cambió en disco.
     """
 
-    def __init__(self):
+    def __init__(self, journal: Optional[bool] = None, compact_threshold: Optional[int] = None,
+                 write_behind: Optional[bool] = None, debounce: Optional[float] = None,
+                 max_dirty: Optional[float] = None, locking: Optional[bool] = None,
+                 file_format: Optional[str] = None, records: Optional[bool] = None,
+                 watch: Optional[bool] = None, history: Optional[bool] = None):
+        """
+        journal: activa el modo log-structured (None -> setting Database/journal).
+        compact_threshold: operaciones en journal antes de compactar a snapshot.
+        write_behind: persiste en segundo plano (None -> setting Database/write_behind).
+        debounce / max_dirty: segundos (None -> settings Database/write_behind_debounce
+                              y Database/write_behind_max_dirty).
+        locking: candado entre procesos + fusión al confirmar (None -> setting
+                 Database/locking, activo por defecto).
+        file_format: formato de escritura (None -> setting Database/format, ver
+                     Utils/serialization.py). La lectura acepta cualquiera.
+        records: retorna Client / Project (Utils/records.py) en lugar de dicts
+                 (None -> setting Database/records, desactivado por defecto).
+        watch: revalida la caché sólo ante avisos del vigilante de archivos
+               (None -> activo si el setting Files/watch lo habilita).
+        history: guarda el historial de cambios por registro (None -> setting
+                 Database/history, desactivado por defecto).
+        """
         # Rutas relativas según DEV_MODE y paths
         self.clients_path = get_clients_db_path()
         self.projects_path = get_projects_db_path()
+        self.format = resolve_format(file_format) if file_format else _configured_format()
 
         # Asegurar archivos con estructura mínima
-        _ensure_json_exists(self.clients_path, {"clients": []})
-        _ensure_json_exists(self.projects_path, {"projects": [], "current_project_id": None})
+        _ensure_json_exists(self.clients_path, {"clients": []}, self.format)
+        _ensure_json_exists(self.projects_path, {"current_project_id": None, "projects": []}, self.format)
+
+        # Caché en memoria (una entrada por archivo)
+        self._files = {
+            "clients": _CachedFile(self.clients_path, "clients", {"clients": []}),
+            "projects": _CachedFile(self.projects_path, "projects", {"projects": [], "current_project_id": None}),
+        }
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+        # Tipo de retorno: copias dict (por defecto) o registros con __slots__
+        if records is None:
+            records = str(get_setting("Database", "records", "false")).strip().lower() in _TRUE
+        self.records = bool(records)
+        self._out = {"clients": Client.from_dict, "projects": Project.from_dict} if self.records else {
+            "clients": dict, "projects": dict}
+
+        # Modo journal (append-only + compactación)
+        if journal is None:
+            journal = str(get_setting("Database", "journal", "false")).strip().lower() in _TRUE
+        self.journal = bool(journal)
+        self.compact_threshold = compact_threshold or DEFAULT_COMPACT_THRESHOLD
+
+        # Concurrencia entre procesos: candado por archivo durante el commit y
+        # fusión con lo escrito por otros. conflicts cuenta campos/registros
+        # en conflicto descartados (ganó el disco); merges, fusiones realizadas.
+        if locking is None:
+            locking = str(get_setting("Database", "locking", "true")).strip().lower() in _TRUE
+        self.locking = bool(locking)
+        self.merges = 0
+        self.conflicts = 0
+
+        # Write-behind: archivo -> [primer cambio, último cambio] sin volcar (time.monotonic).
+        # Con write-behind el estado se comparte con el hilo de volcado: los métodos
+        # públicos toman _lock; sin write-behind el candado es un no-op.
+        if write_behind is None:
+            write_behind = str(get_setting("Database", "write_behind", "false")).strip().lower() in _TRUE
+        self.write_behind = bool(write_behind)
+        if debounce is None:
+            debounce = get_setting("Database", "write_behind_debounce", DEFAULT_DEBOUNCE)
+        if max_dirty is None:
+            max_dirty = get_setting("Database", "write_behind_max_dirty", DEFAULT_MAX_DIRTY)
+        self.debounce = max(0.0, float(debounce))
+        self.max_dirty = max(self.debounce, float(max_dirty))
+        self._wb_dirty: Dict[str, List[float]] = {}
+        self._wb_flushing = set()
+        self._wb_thread: Optional[threading.Thread] = None
+        self.flush_count = 0
+        if self.write_behind:
+            self._lock = threading.RLock()
+            self._wb_cond = threading.Condition(self._lock)
+        else:
+            self._lock = nullcontext()
+            self._wb_cond = None
+
+        # Transacciones: profundidad de anidamiento y archivos modificados
+        self._tx_depth = 0
+        self._tx_dirty = set()
+
+        # Índices secundarios: se reconstruyen sólo al (re)leer el archivo
+        # y se mantienen incrementalmente en altas/bajas/modificaciones.
+        self._client_by_cuit: Dict[str, Dict] = {}
+        self._client_by_id: Dict[str, Dict] = {}
+        self._project_by_id: Dict[str, Dict] = {}
+        self._project_by_path: Dict[str, Dict] = {}
+
+        # Índices de búsqueda: se cargan/construyen en la primera búsqueda y desde
+        # entonces se mantienen junto con los índices hash. _search_saved guarda la
+        # firma de datos con la que se persistió cada uno.
+        self._search: Dict[str, Optional[SearchIndex]] = {"clients": None, "projects": None}
+        self._search_saved: Dict[str, object] = {"clients": None, "projects": None}
+        # Índices secundarios de proyectos (status, client_id, type, is_macro, fechas):
+        # se construyen en la primera consulta y luego se mantienen incrementalmente
+        self._project_index: Optional[ProjectIndex] = None
+
+        # Historial de cambios por registro (deltas de campos + checkpoints)
+        if history is None:
+            history = str(get_setting("Database", "history", "false")).strip().lower() in _TRUE
+        self._history: Optional[Dict[str, RecordHistory]] = None
+        if history:
+            retention = get_setting("Database", "history_retention_days", DEFAULT_RETENTION_DAYS)
+            self._history = {kind: RecordHistory(entry.path, entry.list_key, retention)
+                             for kind, entry in self._files.items()}
+
+        # Vigilante de archivos: avisa cambios del snapshot y del journal de cada
+        # archivo (también los de otros procesos) para no hacer stat en cada lectura
+        self._watcher = None
+        self._watch_token = None
+        if watch is None or watch:
+            from Utils.file_watcher import get_watcher
+            self._watcher = get_watcher()
+        if self._watcher is not None:
+            watched = [p for entry in self._files.values() for p in (entry.path, journal_path(entry.path))]
+            self._watch_token = self._watcher.subscribe(watched, self._on_file_event)
+        _LIVE_MANAGERS.add(self)
 
     # -------------------------
-    # CLIENTS
+    # CACHÉ
     # -------------------------
-    def load_clients(self) -> List[Dict]:
-        """Carga y retorna la lista de clientes."""
+    def _data(self, kind: str) -> dict:
+        """
+        Retorna el dict parseado de 'clients' o 'projects' (referencia interna, no copiar).
+        Revalida con la firma del archivo; si cambió, lo vuelve a leer.
+        """
+        entry = self._files[kind]
+        if entry.data is not None and (kind in self._tx_dirty or kind in self._wb_dirty or kind in self._wb_flushing):
+            # cambios sin confirmar (transacción) o sin volcar (write-behind) mandan sobre el disco
+            self.cache_hits += 1
+            return entry.data
+        if entry.verified and entry.data is not None and entry.signature is not None:
+            # sin avisos del vigilante desde la última revalidación: no hace falta stat
+            self.cache_hits += 1
+            return entry.data
+        signature = self._verify(entry)
+        if entry.data is not None and signature == entry.signature:
+            self.cache_hits += 1
+            return entry.data
+
+        self.cache_misses += 1
+        entry.data, entry.signature, entry.journal_ops = self._read_disk(entry, signature)
+        entry.pending = []
+        entry.bases = {}
+        self._rebuild_indexes(kind)
+        return entry.data
+
+    def _read_disk(self, entry: _CachedFile, signature) -> Tuple[dict, object, int]:
+        """
+        Lee y parsea el archivo más su journal vigente, si lo hay. El journal se
+        aplica en cualquier modo: con journal=False (p. ej. tras desactivar el
+        setting) las operaciones que dejó otra instancia no deben perderse; la
+        próxima escritura las vuelca al snapshot y elimina el journal.
+        Retorna (datos, firma o None si falló la lectura, operaciones de journal aplicadas).
+        """
         try:
-            with open(self.clients_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-            return data.get("clients", [])
+            data = read_file(entry.path)
+            if not isinstance(data, dict):
+                raise ValueError("estructura inválida")
         except Exception as e:
-            log_error("./Utils", "db_manager.py", f"load_clients error: {e}")
+            log_error("./Utils", "db_manager.py", f"load_{entry.list_key} error: {e}")
+            data = json.loads(json.dumps(entry.fallback))
+            # no cachear la firma: reintentar en la próxima lectura
+            signature = None
+
+        journal_ops = 0
+        if signature is not None:
+            ops = read_ops(entry.path, signature[0])
+            if ops:
+                apply_ops(data, entry.list_key, ops)
+                journal_ops = len(ops)
+        return data, signature, journal_ops
+
+    def _signature(self, entry: _CachedFile):
+        """Firma del estado en disco: (snapshot, journal). El journal cuenta en cualquier modo."""
+        return (file_signature(entry.path), file_signature(journal_path(entry.path)))
+
+    def _verify(self, entry: _CachedFile):
+        """
+        Firma actual en disco para revalidar la caché. Con inotify marca la
+        entrada como verificada ANTES del stat: un aviso que llegue entre el stat
+        y la lectura vuelve a desmarcarla y la próxima lectura revalida.
+        """
+        entry.verified = self._watcher is not None and self._watcher.is_precise(entry.path)
+        return self._signature(entry)
+
+    def _on_file_event(self, path: str, event: str):
+        """Aviso del vigilante (hilo propio): la próxima lectura de ese archivo revalida con stat."""
+        for entry in self._files.values():
+            if path == entry.path or path == journal_path(entry.path):
+                entry.verified = False
+
+    def close(self):
+        """Vuelca lo pendiente y deja de recibir avisos del vigilante de archivos."""
+        self.flush()
+        if self._watcher is not None and self._watch_token is not None:
+            self._watcher.unsubscribe(self._watch_token)
+            self._watch_token = None
+        for entry in self._files.values():
+            entry.verified = False
+
+    def _record(self, kind: str, op: Optional[Dict]):
+        """
+        Registra una mutación ya aplicada en memoria para el próximo _commit.
+        op=None indica que el cambio no es expresable como operación (requiere snapshot).
+        """
+        entry = self._files[kind]
+        if self._tx_depth:
+            self._tx_dirty.add(kind)
+        if op is None or entry.pending is None:
+            entry.pending = None
+        else:
+            entry.pending.append(op)
+
+    def _commit(self, kind: str) -> bool:
+        """
+        Confirma el contenido en memoria de 'kind': lo persiste (_persist) o, en
+        modo write-behind, lo marca para el próximo volcado en segundo plano.
+        """
+        if self._tx_depth:
+            # se persiste una sola vez al confirmar la transacción
+            self._tx_dirty.add(kind)
+            return True
+        if self.write_behind:
+            now = time.monotonic()
+            stamps = self._wb_dirty.get(kind)
+            if stamps is None:
+                self._wb_dirty[kind] = [now, now]
+            else:
+                stamps[1] = now
+            self._start_flusher()
+            return True
+        return self._persist(kind)
+
+    def _persist(self, kind: str) -> bool:
+        """
+        Persiste el contenido en memoria de 'kind' y actualiza la firma cacheada
+        con la del archivo recién escrito.
+          - modo normal: snapshot atómico completo.
+          - modo journal: append de las operaciones pendientes (compacta si corresponde).
+        Con locking, revalida y escribe con el candado del archivo tomado.
+        """
+        with self._file_lock(kind):
+            entry = self._files[kind]
+            # versiones previas de lo confirmado (el rebase y la escritura las descartan)
+            bases, full = entry.bases, entry.pending is None
+            self._rebase(kind)
+            changes = self._history_changes(kind, bases, full)
+            if not self._persist_locked(kind):
+                return False
+            self._append_history(kind, changes, bases, entry.data.get(entry.list_key, []))
+            return True
+
+    def _persist_locked(self, kind: str) -> bool:
+        entry = self._files[kind]
+        pending, entry.pending = entry.pending, []
+        entry.bases = {}
+
+        if not self.journal or pending is None or entry.signature is None:
+            return self._write_snapshot(kind)
+        if entry.journal_ops + len(pending) >= self.compact_threshold:
+            # el lote completaría el umbral: compactar directamente en una sola escritura
+            return self._write_snapshot(kind)
+        if not pending:
+            return True
+
+        snap_sig, old_journal_sig = entry.signature
+        # si el journal cambió en disco desde nuestra lectura, no ocultarlo: relectura posterior
+        stale = file_signature(journal_path(entry.path)) != old_journal_sig
+        journal_sig = append_ops(entry.path, pending, snap_sig, fresh=entry.journal_ops == 0)
+        if journal_sig is None:
+            log_error("./Utils", "db_manager.py", f"Error agregando al journal de {entry.path}")
+            entry.signature = None
+            return False
+        entry.signature = None if stale else (snap_sig, journal_sig)
+        entry.journal_ops += len(pending)
+        return True
+
+    def _write_snapshot(self, kind: str) -> bool:
+        """Escribe el snapshot completo (tmp + os.replace) y descarta el journal (ya aplicado en memoria)."""
+        entry = self._files[kind]
+        signature = _atomic_write_signed(entry.path, entry.data, self.format)
+        if signature is None:
+            entry.signature = None
+            return False
+        entry.journal_ops = 0
+        entry.pending = []
+        entry.bases = {}
+        # la cabecera del journal viejo apunta al snapshot anterior: aunque
+        # falle el borrado, ya no se aplicaría sobre el nuevo snapshot
+        remove_journal(entry.path)
+        entry.signature = (signature, None)
+        return True
+
+    # -------------------------
+    # CONCURRENCIA ENTRE PROCESOS
+    # -------------------------
+    def _file_lock(self, kind: str):
+        """Candado entre procesos del archivo de 'kind' (no-op sin locking)."""
+        return file_lock(self._files[kind].path) if self.locking else nullcontext()
+
+    # -------------------------
+    # HISTORIAL
+    # -------------------------
+    def _history_changes(self, kind: str, bases: Dict[str, Optional[Dict]], full: bool):
+        """
+        Deltas [(id, delta)] de los registros de 'bases' contra su versión en
+        memoria, o None si es un reemplazo completo de la lista (checkpoint).
+        Se calcula con _lock tomado, antes de escribir.
+        """
+        if self._history is None:
             return []
+        if full:
+            return None
+        by_id = self._client_by_id if kind == "clients" else self._project_by_id
+        changes = []
+        for record_id, base in bases.items():
+            delta = diff_record(base, by_id.get(record_id))
+            if delta is not None:
+                changes.append((record_id, delta))
+        return changes
+
+    def _append_history(self, kind: str, changes, bases: Dict[str, Optional[Dict]], records: List[Dict]):
+        """Agrega al historial lo ya escrito (con el candado del archivo tomado)."""
+        if self._history is None:
+            return
+        history = self._history[kind]
+        ok = history.checkpoint(records) if changes is None else history.append(changes, records, bases)
+        if not ok:
+            log_error("./Utils", "db_manager.py", f"No se pudo actualizar el historial de {kind}")
+
+    def _touch(self, kind: str, record_id, record: Optional[Dict]):
+        """Recuerda la versión previa de un registro ANTES de modificarlo (None = alta)."""
+        if record_id:
+            self._files[kind].bases.setdefault(record_id, dict(record) if record is not None else None)
+
+    def _rebase(self, kind: str) -> bool:
+        """
+        Con el candado tomado: si otro proceso escribió el archivo desde nuestra
+        lectura, vuelve a leerlo y reaplica encima los registros que modificamos
+        (fusión campo a campo, ver _rebase_record). Retorna True si hubo fusión.
+        """
+        if not self.locking:
+            return False
+        entry = self._files[kind]
+        if entry.signature is None or entry.data is None:
+            return False
+        signature = self._signature(entry)
+        if signature == entry.signature:
+            return False
+        theirs, signature, journal_ops = self._read_disk(entry, signature)
+        if signature is None:
+            return False
+
+        mine = entry.data
+        conflicts = []
+        pending = None
+        if entry.pending is None:
+            # reemplazo completo (save_clients/save_projects_data): gana el último
+            theirs = mine
+        else:
+            # las operaciones pendientes se rehacen sobre lo leído: en modo
+            # journal se sigue pudiendo confirmar con un append
+            pending = []
+            records = theirs.setdefault(entry.list_key, [])
+            position = {}
+            for i, r in enumerate(records):
+                position.setdefault(r.get("id"), i)
+            current = {}
+            for r in mine.get(entry.list_key, []):
+                current.setdefault(r.get("id"), r)
+            removed = False
+            for record_id, base in entry.bases.items():
+                i = position.get(record_id)
+                merged, conflict = _rebase_record(base, current.get(record_id), records[i] if i is not None else None)
+                if conflict:
+                    conflicts.append(record_id)
+                if merged is None:
+                    pending.append({"op": "del", "id": record_id})
+                    if i is not None:
+                        records[i] = None
+                        removed = True
+                    continue
+                pending.append({"op": "put", "rec": merged})
+                if i is not None:
+                    records[i] = merged
+                else:
+                    position[record_id] = len(records)
+                    records.append(merged)
+            if removed:
+                theirs[entry.list_key] = [r for r in records if r is not None]
+            for op in entry.pending:
+                if op.get("op") == "set":
+                    theirs[op["key"]] = mine.get(op["key"])
+                    pending.append({"op": "set", "key": op["key"], "value": mine.get(op["key"])})
+
+        entry.data = theirs
+        entry.signature = signature
+        entry.journal_ops = journal_ops
+        entry.pending = pending
+        entry.bases = {}
+        self._rebuild_indexes(kind)
+        self.merges += 1
+        if conflicts:
+            self.conflicts += len(conflicts)
+            log_error("./Utils", "db_manager.py",
+                      f"Conflicto con otra instancia en {os.path.basename(entry.path)}: "
+                      f"se conservaron los cambios del disco para {', '.join(map(str, conflicts[:10]))}")
+        else:
+            log_info("./Utils", "db_manager.py",
+                     f"{os.path.basename(entry.path)} modificado por otra instancia: cambios fusionados.")
+        return True
+
+    # -------------------------
+    # WRITE-BEHIND
+    # -------------------------
+    def _start_flusher(self):
+        """Arranca el hilo de volcado si no está corriendo (se llama con _lock tomado)."""
+        if self._wb_thread is None:
+            self._wb_thread = threading.Thread(target=self._flusher_loop, name="ew-db-flush", daemon=True)
+            self._wb_thread.start()
+
+    def _due(self, now: float) -> Tuple[List[str], Optional[float]]:
+        """(archivos a volcar ya, segundos hasta el próximo vencimiento o None si no hay sucios)."""
+        due, wait = [], None
+        for kind, (first, last) in self._wb_dirty.items():
+            if kind in self._wb_flushing:
+                continue
+            at = min(last + self.debounce, first + self.max_dirty)
+            if at <= now:
+                due.append(kind)
+            else:
+                wait = at - now if wait is None else min(wait, at - now)
+        return due, wait
+
+    def _flusher_loop(self):
+        """
+        Hilo de volcado: vive mientras haya archivos sucios. Cada archivo se vuelca
+        cuando pasó 'debounce' desde su último cambio o 'max_dirty' desde el primero.
+        """
+        while True:
+            with self._lock:
+                due, wait = self._due(time.monotonic())
+                if not due:
+                    if wait is None:
+                        self._wb_thread = None
+                        return
+                    self._wb_cond.wait(wait)
+                    continue
+            for kind in due:
+                self._flush_kind(kind)
+
+    def _flush_kind(self, kind: str) -> bool:
+        """
+        Vuelca 'kind' si tiene cambios sin persistir. El contenido se copia con el
+        candado tomado y se escribe fuera de él: los lectores no esperan al disco.
+        El candado entre procesos se toma siempre después de _lock y se mantiene
+        hasta terminar la escritura.
+        """
+        stack = ExitStack()
+        with self._lock:
+            while kind in self._wb_flushing:
+                self._wb_cond.wait()
+            if kind not in self._wb_dirty or kind in self._tx_dirty:
+                return True
+            del self._wb_dirty[kind]
+            entry = self._files[kind]
+            self.flush_count += 1
+            if (self.journal and entry.pending is not None and entry.signature is not None
+                    and entry.journal_ops + len(entry.pending) < self.compact_threshold):
+                # append al journal: escritura corta, se hace con el candado tomado
+                ok = self._persist(kind)
+                if not ok:
+                    self._wb_dirty.setdefault(kind, [time.monotonic()] * 2)
+                    self._start_flusher()
+                return ok
+            stack.enter_context(self._file_lock(kind))
+            history_bases, full = entry.bases, entry.pending is None
+            try:
+                self._rebase(kind)
+            except BaseException:
+                stack.close()
+                raise
+            changes = self._history_changes(kind, history_bases, full)
+            data = dict(entry.data)
+            data[entry.list_key] = [dict(r) for r in entry.data.get(entry.list_key, [])]
+            mark = None if entry.pending is None else len(entry.pending)
+            # cambios posteriores a la copia parten de lo que se está escribiendo
+            bases, entry.bases = entry.bases, {}
+            self._wb_flushing.add(kind)
+
+        signature = None
+        try:
+            with stack:
+                signature = _atomic_write_signed(entry.path, data, self.format)
+                if signature is not None:
+                    remove_journal(entry.path)
+                if signature is not None:
+                    self._append_history(kind, changes, history_bases, data[entry.list_key])
+        finally:
+            with self._lock:
+                self._wb_flushing.discard(kind)
+                if signature is None:
+                    # el disco quedó con el contenido anterior: reintentar en el próximo ciclo
+                    entry.signature = None
+                    entry.pending = None
+                    entry.bases = {**entry.bases, **bases}
+                    self._wb_dirty.setdefault(kind, [time.monotonic()] * 2)
+                    self._start_flusher()
+                else:
+                    if kind not in self._wb_dirty:
+                        entry.pending = []
+                    elif mark is not None and entry.pending is not None:
+                        # conservar sólo las operaciones posteriores a la copia
+                        entry.pending = entry.pending[mark:]
+                    else:
+                        entry.pending = None
+                    entry.journal_ops = 0
+                    entry.signature = (signature, None)
+                self._wb_cond.notify_all()
+        if signature is None:
+            return False
+        if kind == "projects":
+            invalidate_project_path_cache()
+        return True
+
+    def flush(self, kind: Optional[str] = None) -> bool:
+        """
+        Vuelca ya los cambios pendientes del modo write-behind ('clients',
+        'projects' o ambos). Sin write-behind no hay nada pendiente: retorna True.
+        """
+        ok = True
+        for k in ([kind] if kind else list(self._files)):
+            ok = self._flush_kind(k) and ok
+        return ok
+
+    # -------------------------
+    # TRANSACCIONES
+    # -------------------------
+    @contextmanager
+    def transaction(self):
+        """
+        Unidad de trabajo: las altas/bajas/modificaciones y set_current_project
+        dentro del bloque se aplican sólo en memoria y se confirman al salir con
+        una única escritura atómica por archivo modificado.
+        Si el bloque lanza una excepción se descartan todos los cambios (rollback).
+        Las transacciones anidadas se unen a la exterior.
+
+            with db.transaction():
+                db.add_or_update_client({...})
+                db.remove_project(pid)
+        """
+        if not self._tx_depth:
+            # el rollback relee del disco: no debe haber cambios previos sin volcar
+            self.flush()
+        self._tx_depth += 1
+        try:
+            yield self
+        except BaseException:
+            self._tx_depth -= 1
+            if not self._tx_depth:
+                self._rollback()
+            raise
+        self._tx_depth -= 1
+        if not self._tx_depth:
+            if not self._commit_transaction():
+                log_error("./Utils", "db_manager.py", "No se pudo confirmar la transacción")
 
+    def _rollback(self):
+        """Descarta los cambios sin confirmar: el disco no se tocó, basta con releer."""
+        dirty, self._tx_dirty = self._tx_dirty, set()
+        for kind in dirty:
+            self.reload(kind)
+        if dirty:
+            log_info("./Utils", "db_manager.py", f"Transacción revertida ({', '.join(sorted(dirty))}).")
+
+    def _commit_transaction(self) -> bool:
+        """Persiste una vez cada archivo modificado durante la transacción."""
+        dirty, self._tx_dirty = self._tx_dirty, set()
+        ok = True
+        if "clients" in dirty:
+            ok = self._save_clients() and ok
+        if "projects" in dirty:
+            ok = self._save_projects_data() and ok
+        return ok
+
+    @_synchronized
+    def bulk_upsert_clients(self, clients: Iterable[Dict]) -> List[Dict]:
+        """
+        Alta/modificación masiva de clientes (misma lógica que add_or_update_client)
+        con una sola escritura de clients.json. Retorna los clientes guardados.
+        """
+        with self.transaction():
+            saved = [self.add_or_update_client(c) for c in clients]
+        log_info("./Utils", "db_manager.py", f"Alta masiva de clientes: {len(saved)} registros.")
+        return saved
+
+    @_synchronized
+    def bulk_upsert_projects(self, projects: Iterable[Dict], mark_current: bool = False) -> List[Dict]:
+        """
+        Alta/modificación masiva de proyectos con una sola escritura de projects.json.
+        Con mark_current=True queda como current el último proyecto del lote.
+        """
+        with self.transaction():
+            saved = [self.add_or_update_project(p, mark_current=mark_current) for p in projects]
+        log_info("./Utils", "db_manager.py", f"Alta masiva de proyectos: {len(saved)} registros.")
+        return saved
+
+    def compact(self, kind: Optional[str] = None) -> bool:
+        """
+        Vuelca el estado actual (snapshot + journal) a un snapshot JSON nuevo
+        y elimina el journal. Fuera del modo journal sólo cambia algo si quedó
+        un journal de otra instancia.
+        """
+        ok = self.flush(kind)
+        with self._lock:
+            ok = self._compact(kind) and ok
+        self.persist_search_index()
+        return ok
+
+    def _compact(self, kind: Optional[str]) -> bool:
+        ok = True
+        for k in ([kind] if kind else list(self._files)):
+            self._data(k)
+            with self._file_lock(k):
+                self._rebase(k)
+                written = self._write_snapshot(k)
+            if written:
+                log_info("./Utils", "db_manager.py", f"{os.path.basename(self._files[k].path)} compactado.")
+            else:
+                ok = False
+        return ok
+
+    # -------------------------
+    # ÍNDICES
+    # -------------------------
+    def _rebuild_indexes(self, kind: str):
+        """Reconstruye los índices de 'kind' desde la lista cacheada."""
+        # el índice de búsqueda se vuelve a cargar/construir en la próxima búsqueda
+        self._search[kind] = None
+        if kind == "clients":
+            self._client_by_cuit = {}
+            self._client_by_id = {}
+            for c in self._files["clients"].data.get("clients", []):
+                self._index_client(c)
+        else:
+            self._project_by_id = {}
+            self._project_by_path = {}
+            self._project_index = None
+            for p in self._files["projects"].data.get("projects", []):
+                self._index_project(p)
+
+    def _index_client(self, client: Dict):
+        # setdefault: ante duplicados gana el primero, igual que el recorrido lineal
+        if client.get("cuit"):
+            self._client_by_cuit.setdefault(str(client["cuit"]), client)
+        if client.get("id") and self._client_by_id.setdefault(client["id"], client) is client:
+            if self._search["clients"] is not None:
+                self._search["clients"].add(client)
+
+    def _unindex_client(self, client: Dict):
+        if client.get("cuit") and self._client_by_cuit.get(str(client["cuit"])) is client:
+            del self._client_by_cuit[str(client["cuit"])]
+        if client.get("id") and self._client_by_id.get(client["id"]) is client:
+            del self._client_by_id[client["id"]]
+            if self._search["clients"] is not None:
+                self._search["clients"].remove(client)
+
+    def _index_project(self, project: Dict):
+        if project.get("id") and self._project_by_id.setdefault(project["id"], project) is project:
+            if self._search["projects"] is not None:
+                self._search["projects"].add(project)
+            if self._project_index is not None:
+                self._project_index.add(project)
+        if project.get("path"):
+            self._project_by_path.setdefault(project["path"], project)
+
+    def _unindex_project(self, project: Dict):
+        if project.get("id") and self._project_by_id.get(project["id"]) is project:
+            del self._project_by_id[project["id"]]
+            if self._search["projects"] is not None:
+                self._search["projects"].remove(project)
+            if self._project_index is not None:
+                self._project_index.remove(project)
+        if project.get("path") and self._project_by_path.get(project["path"]) is project:
+            del self._project_by_path[project["path"]]
+
+    def reload(self, kind: Optional[str] = None):
+        """
+        Descarta la caché en memoria (de 'clients', 'projects' o ambas si kind es None).
+        La próxima lectura vuelve a parsear el archivo desde disco.
+        En write-behind primero se vuelcan los cambios pendientes.
+        """
+        self.flush(kind)
+        with self._lock:
+            for k in ([kind] if kind else list(self._files)):
+                self._files[k].data = None
+                self._files[k].signature = None
+                self._files[k].pending = []
+                self._files[k].bases = {}
+
+    def cache_stats(self) -> Dict[str, int]:
+        """Contadores de aciertos/fallos de la caché en memoria."""
+        return {"hits": self.cache_hits, "misses": self.cache_misses}
+
+    def _stream(self, kind: str) -> Iterator[Dict]:
+        """Registros de 'kind' leídos del disco en streaming (journal aplicado), sin cachear."""
+        entry = self._files[kind]
+        try:
+            for key, value in iter_journaled(entry.path, entry.list_key):
+                if key == entry.list_key and isinstance(value, dict):
+                    yield value
+        except Exception as e:
+            log_error("./Utils", "db_manager.py", f"iter_{kind} error: {e}")
+
+    def _iter_records(self, kind: str) -> Iterator[Dict]:
+        """
+        Copias de los registros de 'kind': desde la caché si está vigente (o tiene
+        cambios sin volcar), si no en streaming desde el disco.
+        """
+        with self._lock:
+            entry = self._files[kind]
+            fresh = entry.data is not None and (
+                kind in self._tx_dirty or kind in self._wb_dirty or kind in self._wb_flushing
+                or (entry.verified and entry.signature is not None)
+                or self._verify(entry) == entry.signature)
+            records = list(entry.data.get(entry.list_key, [])) if fresh else None
+        out = self._out[kind]
+        if records is None:
+            for r in self._stream(kind):
+                yield out(r) if self.records else r
+            return
+        for r in records:
+            yield out(r)
+
+    def _clients(self) -> List[Dict]:
+        """Lista interna (cacheada) de clientes."""
+        data = self._data("clients")
+        return data.setdefault("clients", [])
+
+    def _projects(self) -> List[Dict]:
+        """Lista interna (cacheada) de proyectos."""
+        data = self._data("projects")
+        return data.setdefault("projects", [])
+
+    # -------------------------
+    # BÚSQUEDA
+    # -------------------------
+    def _search_path(self, kind: str) -> str:
+        return self._files[kind].path + ".search"
+
+    def _search_index(self, kind: str) -> SearchIndex:
+        """
+        Índice de búsqueda de 'kind', vigente respecto del archivo en disco.
+        Se reutiliza el persistido si corresponde a la firma actual; si no, se
+        construye desde la caché y se persiste.
+        """
+        self._data(kind)  # revalida: si el archivo cambió, descarta el índice
+        index = self._search[kind]
+        if index is not None:
+            return index
+        entry = self._files[kind]
+        clean = entry.signature is not None and kind not in self._tx_dirty and entry.pending == []
+        if clean:
+            index = SearchIndex.load(self._search_path(kind), entry.signature, _SEARCH_FIELDS[kind])
+        if index is None:
+            index = SearchIndex.build(_SEARCH_FIELDS[kind], entry.data.get(entry.list_key, []))
+            log_info("./Utils", "db_manager.py", f"Índice de búsqueda de {kind} construido ({len(index)} registros).")
+            if clean and index.save(self._search_path(kind), entry.signature):
+                self._search_saved[kind] = entry.signature
+        else:
+            self._search_saved[kind] = entry.signature
+        self._search[kind] = index
+        return index
+
+    @_synchronized
+    def persist_search_index(self) -> bool:
+        """
+        Persiste los índices de búsqueda cargados cuya firma quedó desactualizada
+        por escrituras de esta instancia (se llama también al salir del intérprete).
+        """
+        ok = True
+        for kind, index in self._search.items():
+            entry = self._files[kind]
+            if index is None or entry.signature is None or kind in self._tx_dirty:
+                continue
+            if kind in self._wb_dirty or kind in self._wb_flushing:
+                continue
+            if self._search_saved[kind] == entry.signature:
+                continue
+            if index.save(self._search_path(kind), entry.signature):
+                self._search_saved[kind] = entry.signature
+            else:
+                ok = False
+        return ok
+
+    @_synchronized
+    def search(self, query: str, kinds: Iterable[str] = ("clients", "projects"), limit: int = 10,
+               prefix: bool = True, fuzzy: bool = True) -> List[Dict]:
+        """
+        Búsqueda de texto sobre clientes (name, cuit, address, contact_*) y
+        proyectos (name, code, purpose, ...). Coincidencia exacta, por prefijo
+        y aproximada (errores de tipeo), rankeada por campo y cobertura.
+        Retorna hasta 'limit' resultados:
+          [{"kind": "clients"|"projects", "id", "score", "record": dict}]
+        """
+        hits = []
+        for kind in kinds:
+            for doc_id, score in self._search_index(kind).search(query, limit, prefix=prefix, fuzzy=fuzzy):
+                hits.append((score, kind, doc_id))
+        by_id = {"clients": self._client_by_id, "projects": self._project_by_id}
+        results = []
+        for score, kind, doc_id in heapq.nsmallest(limit, hits, key=lambda h: (-h[0], h[1], h[2])):
+            record = by_id[kind].get(doc_id)
+            if record is not None:
+                results.append({"kind": kind, "id": doc_id, "score": round(score, 4), "record": self._out[kind](record)})
+        return results
+
+    @_synchronized
+    def search_clients(self, query: str, limit: int = 10) -> List[Dict]:
+        """Clientes que coinciden con 'query', mejor rankeados primero (copias)."""
+        return [r["record"] for r in self.search(query, ("clients",), limit)]
+
+    @_synchronized
+    def search_projects(self, query: str, limit: int = 10) -> List[Dict]:
+        """Proyectos que coinciden con 'query', mejor rankeados primero (copias)."""
+        return [r["record"] for r in self.search(query, ("projects",), limit)]
+
+    # -------------------------
+    # CLIENTS
+    # -------------------------
+    @_synchronized
+    def load_clients(self) -> List[Dict]:
+        """Carga y retorna la lista de clientes (copias, se pueden modificar libremente)."""
+        return list(map(self._out["clients"], self._clients()))
+
+    def iter_clients(self) -> Iterator[Dict]:
+        """
+        Genera los clientes de a uno (copias) sin materializar la lista completa.
+        Con la caché fría se leen del disco en streaming y la caché no se carga.
+        """
+        return self._iter_records("clients")
+
+    def _save_clients(self) -> bool:
+        """Persiste la lista cacheada de clientes."""
+        ok = self._commit("clients")
+        if ok and not self._tx_depth:
+            log_info("./Utils", "db_manager.py", f"clients.json actualizado ({len(self._clients())} clientes).")
+        return ok
+
+    @_synchronized
     def save_clients(self, clients: List[Dict]) -> bool:
         """Guarda la lista completa de clientes (atómico)."""
-        data = {"clients": clients}
-        ok = _atomic_write(self.clients_path, data)
-        if ok:
-            log_info("./Utils", "db_manager.py", f"clients.json actualizado ({len(clients)} clientes).")
-        return ok
+        self._files["clients"].data = {"clients": [as_dict(c) for c in clients]}
+        self._record("clients", None)
+        self._rebuild_indexes("clients")
+        return self._save_clients()
 
+    @_synchronized
     def find_client_by_cuit(self, cuit: str) -> Optional[Dict]:
         """Busca un cliente por CUIT/CUIL y retorna el dict o None."""
         if not cuit:
             return None
-        clients = self.load_clients()
-        for c in clients:
-            if c.get("cuit") and str(c.get("cuit")) == str(cuit):
-                return c
-        return None
+        self._clients()
+        found = self._client_by_cuit.get(str(cuit))
+        return self._out["clients"](found) if found else None
 
+    @_synchronized
     def add_or_update_client(self, client: Dict) -> Dict:
         """
         Añade o actualiza un cliente.
@@ -110,83 +1195,112 @@ class DBManager:
           { "name", "cuit", "address", "contact_name", "contact_email", "contact_phone" }
         Retorna el cliente guardado (tiene id, created_at, updated_at).
         """
-        clients = self.load_clients()
+        clients = self._clients()
 
         cuit = client.get("cuit") or client.get("Cuit") or None
 
         if cuit:
-            existing = next((c for c in clients if c.get("cuit") and str(c.get("cuit")) == str(cuit)), None)
+            existing = self._client_by_cuit.get(str(cuit))
         else:
             existing = None
 
         if existing:
-            # actualizar campos relevantes y updated_at
-            existing.update({
-                "name": client.get("name", existing.get("name")),
-                "address": client.get("address", existing.get("address")),
-                "contact_name": client.get("contact_name", existing.get("contact_name")),
-                "contact_email": client.get("contact_email", existing.get("contact_email")),
-                "contact_phone": client.get("contact_phone", existing.get("contact_phone")),
-                "updated_at": _now_iso()
-            })
+            # actualizar campos relevantes y updated_at (reindexar: cambian campos buscables)
+            self._touch("clients", existing.get("id"), existing)
+            self._unindex_client(existing)
+            _merge_client(existing, client)
+            self._index_client(existing)
             saved = existing
             action = "actualizado"
         else:
-            new_id = str(cuit) if cuit else str(uuid.uuid4())
-            saved = {
-                "id": new_id,
-                "name": client.get("name", ""),
-                "cuit": cuit or "",
-                "address": client.get("address", ""),
-                "contact_name": client.get("contact_name", ""),
-                "contact_email": client.get("contact_email", ""),
-                "contact_phone": client.get("contact_phone", ""),
-                "created_at": _now_iso(),
-                "updated_at": _now_iso()
-            }
+            saved = _new_client(client, cuit)
+            self._touch("clients", saved["id"], None)
             clients.append(saved)
+            self._index_client(saved)
             action = "creado"
 
-        if self.save_clients(clients):
-            log_info("./Utils", "db_manager.py", f"Cliente {action}: {saved.get('name')}")
+        self._record("clients", {"op": "put", "rec": saved})
+        if self._save_clients():
+            if not self._tx_depth:
+                log_info("./Utils", "db_manager.py", f"Cliente {action}: {saved.get('name')}")
         else:
             log_error("./Utils", "db_manager.py", "No se pudo persistir clients.json")
 
-        return saved
+        return self._out["clients"](saved)
 
     # -------------------------
     # PROJECTS
     # -------------------------
+    @_synchronized
     def load_projects_data(self) -> Dict:
-        """Carga el objeto completo de projects.json."""
-        try:
-            with open(self.projects_path, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except Exception as e:
-            log_error("./Utils", "db_manager.py", f"load_projects_data error: {e}")
-            return {"projects": [], "current_project_id": None}
+        """Carga el objeto completo de projects.json (copia)."""
+        data = dict(self._data("projects"))
+        data["projects"] = [dict(p) for p in data.get("projects", [])]
+        return data
 
-    def save_projects_data(self, data: Dict) -> bool:
-        """Guarda el objeto completo de projects.json de forma atómica."""
-        ok = _atomic_write(self.projects_path, data)
-        if ok:
+    def _save_projects_data(self) -> bool:
+        """Persiste el objeto cacheado de projects.json."""
+        ok = self._commit("projects")
+        if ok and not self._tx_depth:
+            if self.write_behind and self._current_path_changed():
+                # get_project_path() lee el disco: el cambio de proyecto actual no espera al volcado
+                ok = self._flush_kind("projects")
+            # current_project_id o el path del proyecto actual pudieron cambiar
+            invalidate_project_path_cache()
             log_info("./Utils", "db_manager.py", "projects.json actualizado.")
         return ok
 
+    def _current_path_changed(self) -> bool:
+        """True si la ruta del proyecto actual en memoria no es la que get_project_path() lee del disco."""
+        if os.path.abspath(self.projects_path) != os.path.abspath(get_projects_db_path()):
+            return False
+        current_id = self._files["projects"].data.get("current_project_id")
+        current = self._project_by_id.get(current_id) if current_id else None
+        return (current.get("path") if current else None) != get_project_path()
+
+    @_synchronized
+    def save_projects_data(self, data: Dict) -> bool:
+        """Guarda el objeto completo de projects.json de forma atómica."""
+        new_data = dict(data)
+        new_data["projects"] = [as_dict(p) for p in data.get("projects", [])]
+        self._files["projects"].data = new_data
+        self._record("projects", None)
+        self._rebuild_indexes("projects")
+        return self._save_projects_data()
+
+    @_synchronized
     def load_projects(self) -> List[Dict]:
-        """Retorna la lista de proyectos."""
-        data = self.load_projects_data()
-        return data.get("projects", [])
+        """Retorna la lista de proyectos (copias)."""
+        return list(map(self._out["projects"], self._projects()))
 
+    def iter_projects(self) -> Iterator[Dict]:
+        """
+        Genera los proyectos de a uno (copias) sin materializar la lista completa.
+        Con la caché fría se leen del disco en streaming y la caché no se carga:
+        para contar o buscar el primero que cumpla algo, cortar la iteración.
+        """
+        return self._iter_records("projects")
+
+    def _find_project(self, project_id: str) -> Optional[Dict]:
+        """Busca en el índice por id; retorna la referencia interna."""
+        self._projects()
+        return self._project_by_id.get(project_id)
+
+    @_synchronized
     def find_project_by_id(self, project_id: str) -> Optional[Dict]:
+        """
+        Proyecto por id (copia) o None. Con la caché cargada usa el índice; si
+        nadie leyó todavía projects.json, lo busca en streaming y corta al encontrarlo.
+        """
         if not project_id:
             return None
-        projects = self.load_projects()
-        for p in projects:
-            if p.get("id") == project_id:
-                return p
-        return None
+        if self._files["projects"].data is None:
+            found = next((p for p in self._stream("projects") if p.get("id") == project_id), None)
+            return Project.from_dict(found) if found and self.records else found
+        found = self._find_project(project_id)
+        return self._out["projects"](found) if found else None
 
+    @_synchronized
     def add_or_update_project(self, project: Dict, mark_current: bool = True) -> Dict:
         """
         Añade o actualiza un proyecto. Campos recomendados:
@@ -195,103 +1309,299 @@ class DBManager:
         - Si mark_current=True, marca el proyecto como current.
         Retorna el proyecto guardado.
         """
-        data = self.load_projects_data()
-        projects = data.get("projects", [])
+        data = self._data("projects")
+        projects = data.setdefault("projects", [])
 
         proj_id = project.get("id")
         existing = None
         if proj_id:
-            existing = next((p for p in projects if p.get("id") == proj_id), None)
+            existing = self._project_by_id.get(proj_id)
         else:
             path = project.get("path")
             if path:
-                existing = next((p for p in projects if p.get("path") == path), None)
+                existing = self._project_by_path.get(path)
 
         if existing:
-            existing.update({
-                "name": project.get("name", existing.get("name")),
-                "code": project.get("code", existing.get("code")),
-                "path": project.get("path", existing.get("path")),
-                "template": project.get("template", existing.get("template")),
-                "type": project.get("type", existing.get("type")),
-                "purpose": project.get("purpose", existing.get("purpose")),
-                "client_id": project.get("client_id", existing.get("client_id")),
-                "status": project.get("status", existing.get("status")),
-                "version": project.get("version", existing.get("version")),
-                "is_macro": project.get("is_macro", existing.get("is_macro", False)),
-                "updated_at": _now_iso()
-            })
+            # el path puede cambiar: sacar del índice antes de actualizar
+            self._touch("projects", existing.get("id"), existing)
+            self._unindex_project(existing)
+            _merge_project(existing, project)
+            self._index_project(existing)
             saved = existing
             action = "actualizado"
         else:
-            new_id = str(uuid.uuid4())
-            saved = {
-                "id": new_id,
-                "name": project.get("name", ""),
-                "code": project.get("code", ""),
-                "path": project.get("path", ""),
-                "template": project.get("template", ""),
-                "type": project.get("type", ""),
-                "purpose": project.get("purpose", ""),
-                "client_id": project.get("client_id", ""),
-                "status": project.get("status", "En proceso"),
-                "version": project.get("version", "0.1.0"),
-                "is_macro": project.get("is_macro", False),
-                "created_at": _now_iso(),
-                "updated_at": _now_iso()
-            }
+            saved = _new_project(project)
+            self._touch("projects", saved["id"], None)
             projects.append(saved)
+            self._index_project(saved)
             action = "creado"
 
-        data["projects"] = projects
+        self._record("projects", {"op": "put", "rec": saved})
         if mark_current:
             data["current_project_id"] = saved.get("id")
+            self._record("projects", {"op": "set", "key": "current_project_id", "value": saved.get("id")})
 
-        if self.save_projects_data(data):
-            log_info("./Utils", "db_manager.py", f"Proyecto {action}: {saved.get('name')} (id={saved.get('id')})")
+        if self._save_projects_data():
+            if not self._tx_depth:
+                log_info("./Utils", "db_manager.py", f"Proyecto {action}: {saved.get('name')} (id={saved.get('id')})")
         else:
             log_error("./Utils", "db_manager.py", "No se pudo persistir projects.json")
 
-        return saved
+        return self._out["projects"](saved)
 
+    @_synchronized
     def set_current_project(self, project_id: Optional[str]) -> bool:
         """
         Marca el proyecto por id como current. Si project_id es None lo desmarca.
         """
-        data = self.load_projects_data()
+        data = self._data("projects")
         data["current_project_id"] = project_id
-        return self.save_projects_data(data)
+        self._record("projects", {"op": "set", "key": "current_project_id", "value": project_id})
+        return self._save_projects_data()
 
+    @_synchronized
     def get_current_project(self) -> Optional[Dict]:
         """
         Retorna el project dict seleccionado actualmente, o None si no hay.
         """
-        data = self.load_projects_data()
-        current_id = data.get("current_project_id")
+        current_id = self._data("projects").get("current_project_id")
         if not current_id:
             return None
         return self.find_project_by_id(current_id)
 
+    def _projects_index(self) -> ProjectIndex:
+        """Índices secundarios de proyectos, vigentes respecto del archivo en disco."""
+        projects = self._projects()  # revalida: si el archivo cambió, descarta los índices
+        if self._project_index is None:
+            self._project_index = ProjectIndex.build(projects)
+        return self._project_index
+
+    @_synchronized
+    def query_projects(self, filters: Optional[Dict] = None, order_by: Optional[str] = None,
+                       limit: Optional[int] = None, offset: int = 0) -> List[Dict]:
+        """
+        Proyectos filtrados, ordenados y paginados (copias).
+          filters: {"status": "Aprobado", "client_id": [id1, id2], "is_macro": True, ...}
+                   (lista = cualquiera de los valores). status, client_id, type e
+                   is_macro usan índices; otros campos se evalúan sobre los candidatos.
+          order_by: "updated_at" / "created_at" (índice ordenado) u otro campo;
+                    prefijo "-" para descendente. None: orden de alta.
+          limit/offset: página; el costo es proporcional a offset + limit, no al total.
+
+            db.query_projects({"status": "En proceso"}, order_by="-updated_at", limit=50)
+        """
+        index = self._projects_index()
+        found = index.query(filters, order_by, limit, offset, natural=self._projects())
+        return list(map(self._out["projects"], found))
+
+    @_synchronized
+    def count_projects(self, filters: Optional[Dict] = None) -> int:
+        """Cantidad de proyectos que cumplen 'filters' (mismo formato que query_projects)."""
+        return self._projects_index().count(filters)
+
+    # -------------------------
+    # CLIENTE -> PROYECTOS
+    # -------------------------
+    @_synchronized
+    def get_client_projects(self, client_id: str, order_by: Optional[str] = None,
+                            limit: Optional[int] = None, offset: int = 0) -> List[Dict]:
+        """Proyectos de un cliente (índice inverso por client_id; copias)."""
+        return self.query_projects({"client_id": client_id}, order_by, limit, offset)
+
+    @_synchronized
+    def get_client_summary(self, client_id: str) -> Dict:
+        """
+        Agregados de los proyectos de un cliente, sin recorrer proyectos:
+          {"client_id", "projects", "by_status": {status: n}, "macro", "last_updated"}
+        """
+        return self._projects_index().client_summary(client_id)
+
+    @_synchronized
+    def get_client_summaries(self, include_orphans: bool = False) -> Dict[str, Dict]:
+        """
+        Agregados de todos los clientes (id -> resumen), incluidos los que no
+        tienen proyectos. include_orphans: agrega también los client_id de
+        proyectos cuyo cliente ya no existe ("" = proyectos sin cliente).
+        """
+        index = self._projects_index()
+        summaries = {}
+        for client in self._clients():
+            if client.get("id") and client["id"] not in summaries:
+                summaries[client["id"]] = index.client_summary(client["id"])
+        if include_orphans:
+            for client_id in index.client_ids():
+                if client_id not in summaries:
+                    summaries[client_id] = index.client_summary(client_id)
+        return summaries
+
     # -------------------------
     # UTILIDADES
     # -------------------------
+    @_synchronized
     def remove_project(self, project_id: str) -> bool:
         """
         Elimina un proyecto por id (no borra archivos en disco).
         Si era current_project_id lo desmarca.
         """
-        data = self.load_projects_data()
-        projects = data.get("projects", [])
-        new_list = [p for p in projects if p.get("id") != project_id]
-        data["projects"] = new_list
+        data = self._data("projects")
+        removed = self._project_by_id.get(project_id)
+        if removed is not None:
+            self._touch("projects", project_id, removed)
+            data["projects"] = [p for p in data.get("projects", []) if p.get("id") != project_id]
+            self._unindex_project(removed)
+            self._record("projects", {"op": "del", "id": project_id})
+        elif data.get("current_project_id") != project_id:
+            # nada que eliminar: evitar reescribir el archivo
+            return True
         if data.get("current_project_id") == project_id:
             data["current_project_id"] = None
-        return self.save_projects_data(data)
+            self._record("projects", {"op": "set", "key": "current_project_id", "value": None})
+        return self._save_projects_data()
 
+    @_synchronized
     def remove_client(self, client_id_or_cuit: str) -> bool:
         """
         Elimina un cliente por id o por cuit.
         """
-        clients = self.load_clients()
-        new_list = [c for c in clients if not (c.get("id") == client_id_or_cuit or c.get("cuit") == client_id_or_cuit)]
-        return self.save_clients(new_list)
+        data = self._data("clients")
+        key = str(client_id_or_cuit)
+        if key not in self._client_by_id and key not in self._client_by_cuit:
+            # nada que eliminar: evitar reescribir el archivo
+            return True
+        # los índices guardan solo el primero de cada clave: se recorre la lista
+        # para eliminar también los duplicados (como el recorrido lineal original)
+        clients = data.get("clients", [])
+        targets = [c for c in clients if c.get("id") == key or (c.get("cuit") and str(c["cuit"]) == key)]
+        removed = {id(t) for t in targets}
+        data["clients"] = kept = [c for c in clients if id(c) not in removed]
+        ids = [t.get("id") for t in targets]
+        for t in targets:
+            self._touch("clients", t.get("id"), t)
+            self._unindex_client(t)
+        # los sobrevivientes que compartían cuit/id con un eliminado recuperan su entrada
+        for c in kept:
+            self._index_client(c)
+        if all(ids) and len(set(ids)) == len(ids):
+            for rid in ids:
+                self._record("clients", {"op": "del", "id": rid})
+        else:
+            # "del" del journal quita un solo registro por id: requiere snapshot
+            self._record("clients", None)
+        return self._save_clients()
+
+    # -------------------------
+    # HISTORIAL (consultas)
+    # -------------------------
+    def _history_for(self, kind: str) -> RecordHistory:
+        """Historial de 'kind' (también con history=False: se puede consultar lo ya guardado)."""
+        if self._history is not None:
+            return self._history[kind]
+        entry = self._files[kind]
+        return RecordHistory(entry.path, entry.list_key)
+
+    def record_at(self, kind: str, record_id: str, when) -> Optional[Dict]:
+        """
+        Registro de 'kind' ('clients' / 'projects') tal como estaba en 'when'
+        (epoch, datetime o ISO 8601). None si no existía o si 'when' es anterior
+        al historial disponible. Los cambios aún sin volcar (write-behind) no cuentan.
+        """
+        record = self._history_for(kind).record_at(record_id, when)
+        return self._out[kind](record) if record is not None else None
+
+    def records_at(self, kind: str, when) -> Optional[List[Dict]]:
+        """Todos los registros de 'kind' en 'when', o None si es anterior al historial."""
+        records = self._history_for(kind).records_at(when)
+        if records is None:
+            return None
+        out = self._out[kind]
+        return [out(r) for r in records]
+
+    def record_changes(self, kind: str, record_id: str) -> List[Dict]:
+        """Cambios registrados de un registro, del más viejo al más nuevo (ver RecordHistory.changes)."""
+        return list(self._history_for(kind).changes(record_id))
+
+    def history_stats(self, kind: str) -> Dict:
+        """Segmentos y bytes del historial de 'kind' (ver RecordHistory.stats)."""
+        return self._history_for(kind).stats()
+
+    def compact_history(self, retention_days: Optional[float] = None) -> int:
+        """Elimina los segmentos de historial fuera de retención. Retorna cuántos eliminó."""
+        removed = 0
+        for kind, entry in self._files.items():
+            with self._file_lock(kind):
+                removed += self._history_for(kind).compact(retention_days)
+        return removed
+
+    @_synchronized
+    def export_json(self, clients_path: Optional[str] = None, projects_path: Optional[str] = None,
+                    fmt: str = "pretty") -> bool:
+        """
+        Exporta clientes y proyectos (incluidos los cambios sin volcar) a JSON
+        legible, sin tocar los archivos de datos. Por defecto escribe
+        clients.json / projects.json en <carpeta de datos>/export/.
+        """
+        export_dir = os.path.join(os.path.dirname(self.clients_path), "export")
+        clients_path = clients_path or os.path.join(export_dir, os.path.basename(self.clients_path))
+        projects_path = projects_path or os.path.join(export_dir, os.path.basename(self.projects_path))
+        for path in (clients_path, projects_path):
+            if os.path.abspath(path) in (os.path.abspath(self.clients_path), os.path.abspath(self.projects_path)):
+                log_error("./Utils", "db_manager.py", f"export_json: {path} es un archivo de datos en uso")
+                return False
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            except OSError as e:
+                log_error("./Utils", "db_manager.py", f"export_json: no se pudo crear la carpeta de {path}: {e}")
+                return False
+        ok = _atomic_write(clients_path, self._data("clients"), fmt)
+        ok = _atomic_write(projects_path, self._data("projects"), fmt) and ok
+        if ok:
+            log_info("./Utils", "db_manager.py", f"Exportado a {clients_path}, {projects_path}")
+        return ok
+
+
+def flush_all() -> bool:
+    """Vuelca los cambios pendientes (write-behind) de todas las instancias vivas."""
+    ok = True
+    for manager in list(_LIVE_MANAGERS):
+        try:
+            ok = manager.flush() and ok
+        except Exception as e:
+            log_error("./Utils", "db_manager.py", f"Error volcando cambios pendientes: {e}")
+            ok = False
+    return ok
+
+
+@atexit.register
+def _flush_on_exit():
+    # primero los datos: el índice de búsqueda sólo se persiste sobre datos volcados
+    flush_all()
+    for manager in list(_LIVE_MANAGERS):
+        try:
+            manager.persist_search_index()
+        except Exception:
+            pass
+
+
+# Opciones de DBManager que SQLiteDBManager cumple por sí mismo: sin caché que
+# vigilar (watch) y con el bloqueo propio de SQLite (locking)
+_SQLITE_INHERENT = ("watch", "locking")
+
+
+def get_db_manager(**kwargs):
+    """
+    Retorna el gestor de datos según el setting Database/backend:
+      - "json" (por defecto): DBManager sobre clients.json / projects.json.
+      - "sqlite": SQLiteDBManager (Utils/db_sqlite.py), misma API.
+    kwargs se pasan al constructor de DBManager. Con sqlite se pasa 'history';
+    pedir (con un valor verdadero) una opción que sólo existe en el backend
+    JSON (journal, write_behind, records, ...) lanza ValueError.
+    """
+    backend = str(get_setting("Database", "backend", "json")).strip().lower()
+    if backend == "sqlite":
+        from Utils.db_sqlite import SQLiteDBManager
+        history = kwargs.pop("history", None)
+        unsupported = sorted(k for k, v in kwargs.items() if v and k not in _SQLITE_INHERENT)
+        if unsupported:
+            raise ValueError(f"El backend sqlite no soporta: {', '.join(unsupported)}")
+        return SQLiteDBManager(history=history)
+    return DBManager(**kwargs)
@@ -0,0 +1,784 @@
+
+
+# ./Utils/db_sqlite.py
+
+"""
+Utils/db_sqlite.py
+
+Backend SQLite (stdlib sqlite3, modo WAL) para la 'DB' local.
+
+SQLiteDBManager expone exactamente la misma API que DBManager (JSON), así que
+se puede usar en su lugar sin tocar a quien llama. Se elige con el setting
+Database/backend = "sqlite" a través de Utils.db_manager.get_db_manager().
+
+Características:
+ - Tablas 'clients' y 'projects' indexadas (cuit, path, client_id, status, type,
+   is_macro, fechas); query_projects filtra/ordena/pagina en SQL.
+ - Búsquedas y modificaciones de un registro tocan sólo esa fila, no todo el dataset.
+ - Las claves desconocidas de cada registro se conservan en la columna 'extra' (JSON).
+ - Migrador de una sola pasada: clients.json/projects.json -> SQLite y de vuelta.
+ - Búsqueda de texto con el mismo índice que DBManager (Utils/search_index.py),
+   en memoria, mantenido en cada escritura propia y descartado cuando otra
+   conexión modifica la base (PRAGMA data_version).
+ - Historial de cambios opcional (history=True o setting Database/history),
+   con el mismo formato que DBManager (Utils/record_history.py): uno por
+   tabla en '<base>.clients.history/' y '<base>.projects.history/'. Se
+   escribe al confirmar cada transacción; un rollback no deja rastro.
+ - Sin caché ni escrituras diferidas: flush() no tiene nada que volcar y
+   las lecturas siempre ven el estado confirmado de la base.
+"""
+
+import os
+import json
+import heapq
+import sqlite3
+import uuid
+from contextlib import contextmanager
+from typing import Optional, Dict, List, Iterable, Iterator
+
+from Utils.paths import get_clients_db_path, get_projects_db_path, get_sqlite_db_path
+from Utils.logger import log_info, log_error
+from Utils.config import get_setting
+from Utils.db_journal import load_journaled
+from Utils.file_lock import file_lock
+from Utils.serialization import read_file
+from Utils.search_index import SearchIndex, CLIENT_FIELDS, PROJECT_FIELDS
+from Utils.project_index import parse_order
+from Utils.record_history import RecordHistory, DEFAULT_RETENTION_DAYS, diff_record
+from Utils.db_manager import (
+    _TRUE, _atomic_write, _configured_format, _merge_client, _new_client, _merge_project, _new_project,
+)
+
+_KINDS = ("clients", "projects")
+
+CLIENT_COLUMNS = (
+    "id", "name", "cuit", "address", "contact_name", "contact_email", "contact_phone",
+    "created_at", "updated_at",
+)
+
+PROJECT_COLUMNS = (
+    "id", "name", "code", "path", "template", "type", "purpose", "client_id", "status",
+    "version", "is_macro", "created_at", "updated_at",
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS clients (
+    id TEXT PRIMARY KEY,
+    name TEXT, cuit TEXT, address TEXT,
+    contact_name TEXT, contact_email TEXT, contact_phone TEXT,
+    created_at TEXT, updated_at TEXT,
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_clients_cuit ON clients(cuit);
+
+CREATE TABLE IF NOT EXISTS projects (
+    id TEXT PRIMARY KEY,
+    name TEXT, code TEXT, path TEXT, template TEXT, type TEXT, purpose TEXT,
+    client_id TEXT, status TEXT, version TEXT, is_macro INTEGER,
+    created_at TEXT, updated_at TEXT,
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_projects_path ON projects(path);
+CREATE INDEX IF NOT EXISTS idx_projects_client ON projects(client_id);
+CREATE INDEX IF NOT EXISTS idx_projects_status ON projects(status);
+CREATE INDEX IF NOT EXISTS idx_projects_type ON projects(type);
+CREATE INDEX IF NOT EXISTS idx_projects_macro ON projects(is_macro);
+CREATE INDEX IF NOT EXISTS idx_projects_created ON projects(created_at);
+CREATE INDEX IF NOT EXISTS idx_projects_updated ON projects(updated_at);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# ---------------------------------------------------------------------------
+# Conversión fila <-> dict
+# ---------------------------------------------------------------------------
+
+def _to_row(record: Dict, columns) -> tuple:
+    values = []
+    for col in columns:
+        v = record.get(col)
+        if col == "is_macro":
+            v = 1 if v else 0
+        elif col == "cuit" and v is not None:
+            v = str(v)
+        values.append(v)
+    extra = {k: v for k, v in record.items() if k not in columns}
+    values.append(json.dumps(extra, ensure_ascii=False) if extra else None)
+    return tuple(values)
+
+
+def _from_row(row, columns) -> Dict:
+    record = dict(zip(columns, row))
+    if "is_macro" in record:
+        record["is_macro"] = bool(record["is_macro"])
+    extra = row[len(columns)]
+    if extra:
+        try:
+            record.update(json.loads(extra))
+        except ValueError:
+            pass
+    return record
+
+
+def _upsert_sql(table: str, columns) -> str:
+    cols = list(columns) + ["extra"]
+    updates = ", ".join(f"{c}=excluded.{c}" for c in cols if c != "id")
+    return (f"INSERT INTO {table} ({', '.join(cols)}) VALUES ({', '.join('?' for _ in cols)}) "
+            f"ON CONFLICT(id) DO UPDATE SET {updates}")
+
+
+_CLIENT_SELECT = f"SELECT {', '.join(CLIENT_COLUMNS)}, extra FROM clients"
+_PROJECT_SELECT = f"SELECT {', '.join(PROJECT_COLUMNS)}, extra FROM projects"
+_CLIENT_UPSERT = _upsert_sql("clients", CLIENT_COLUMNS)
+_PROJECT_UPSERT = _upsert_sql("projects", PROJECT_COLUMNS)
+
+# ---------------------------------------------------------------------------
+# SQLiteDBManager
+# ---------------------------------------------------------------------------
+
+class SQLiteDBManager:
+    """
+    Misma API que DBManager, persistida en SQLite.
+    Crear una instancia y reutilizarla (mantiene abierta la conexión).
+    """
+
+    def __init__(self, db_path: Optional[str] = None, history: Optional[bool] = None):
+        """
+        db_path: archivo de la base (None -> <carpeta de datos>/electrical.db).
+        history: guarda el historial de cambios por registro (None -> setting
+                 Database/history, desactivado por defecto).
+        """
+        self.db_path = db_path or get_sqlite_db_path()
+        # Rutas JSON de referencia para import/export
+        self.clients_path = get_clients_db_path()
+        self.projects_path = get_projects_db_path()
+
+        # isolation_level=None: autocommit; las transacciones se abren explícitamente
+        self._conn = sqlite3.connect(self.db_path, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._tx_depth = 0
+        # Índices de búsqueda en memoria (lazy) y data_version con que se construyeron
+        self._search: Dict[str, Optional[SearchIndex]] = {"clients": None, "projects": None}
+        self._data_version = None
+
+        # Historial: cambios confirmados se agregan al salir de la transacción.
+        # _history_pending: tabla -> {id: (versión previa, versión actual o None)};
+        # _history_full: tablas reemplazadas completas (abren un checkpoint)
+        if history is None:
+            history = str(get_setting("Database", "history", "false")).strip().lower() in _TRUE
+        self._history: Optional[Dict[str, RecordHistory]] = None
+        if history:
+            retention = get_setting("Database", "history_retention_days", DEFAULT_RETENTION_DAYS)
+            self._history = {kind: RecordHistory(self._history_path(kind), kind, retention) for kind in _KINDS}
+        self._history_pending: Dict[str, Dict] = {kind: {} for kind in _KINDS}
+        self._history_full = set()
+
+    def close(self):
+        """Cierra la conexión."""
+        try:
+            self._conn.close()
+        except Exception:
+            pass
+
+    # -------------------------
+    # TRANSACCIONES
+    # -------------------------
+    @contextmanager
+    def transaction(self):
+        """
+        Unidad de trabajo (BEGIN IMMEDIATE ... COMMIT). Rollback ante excepción.
+        Las transacciones anidadas se unen a la exterior.
+        """
+        if self._tx_depth == 0:
+            self._conn.execute("BEGIN IMMEDIATE")
+        self._tx_depth += 1
+        try:
+            yield self
+        except BaseException:
+            self._tx_depth -= 1
+            if not self._tx_depth:
+                self._conn.execute("ROLLBACK")
+                # los índices de búsqueda pudieron recibir cambios revertidos
+                self._search = {"clients": None, "projects": None}
+                self._history_pending = {kind: {} for kind in _KINDS}
+                self._history_full = set()
+                log_info("./Utils", "db_sqlite.py", "Transacción revertida.")
+            raise
+        self._tx_depth -= 1
+        if not self._tx_depth:
+            self._conn.execute("COMMIT")
+            self._write_history()
+
+    def bulk_upsert_clients(self, clients: Iterable[Dict]) -> List[Dict]:
+        """Alta/modificación masiva de clientes en una sola transacción."""
+        with self.transaction():
+            saved = [self.add_or_update_client(c) for c in clients]
+        log_info("./Utils", "db_sqlite.py", f"Alta masiva de clientes: {len(saved)} registros.")
+        return saved
+
+    def bulk_upsert_projects(self, projects: Iterable[Dict], mark_current: bool = False) -> List[Dict]:
+        """Alta/modificación masiva de proyectos en una sola transacción."""
+        with self.transaction():
+            saved = [self.add_or_update_project(p, mark_current=mark_current) for p in projects]
+        log_info("./Utils", "db_sqlite.py", f"Alta masiva de proyectos: {len(saved)} registros.")
+        return saved
+
+    # -------------------------
+    # CACHÉ / MANTENIMIENTO (compatibilidad con DBManager)
+    # -------------------------
+    def reload(self, kind: Optional[str] = None):
+        """Sin caché en memoria: no hay nada que descartar."""
+
+    def flush(self, kind: Optional[str] = None) -> bool:
+        """Sin escrituras diferidas: todo cambio ya está confirmado en la base."""
+        return True
+
+    def cache_stats(self) -> Dict[str, int]:
+        """Sin caché en memoria: contadores siempre en cero."""
+        return {"hits": 0, "misses": 0}
+
+    def compact(self, kind: Optional[str] = None) -> bool:
+        """Vuelca el WAL a la base principal y actualiza estadísticas del planificador."""
+        try:
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            self._conn.execute("PRAGMA optimize")
+            return True
+        except sqlite3.Error as e:
+            log_error("./Utils", "db_sqlite.py", f"compact error: {e}")
+            return False
+
+    # -------------------------
+    # CLIENTS
+    # -------------------------
+    def load_clients(self) -> List[Dict]:
+        """Retorna la lista de clientes (orden de alta)."""
+        rows = self._conn.execute(f"{_CLIENT_SELECT} ORDER BY rowid").fetchall()
+        return [_from_row(r, CLIENT_COLUMNS) for r in rows]
+
+    def save_clients(self, clients: List[Dict]) -> bool:
+        """Reemplaza la tabla completa de clientes."""
+        try:
+            with self.transaction():
+                self._conn.execute("DELETE FROM clients")
+                self._conn.executemany(_CLIENT_UPSERT, (_to_row(self._with_id(c), CLIENT_COLUMNS) for c in clients))
+                self._note_replace("clients")
+            self._search["clients"] = None
+        except sqlite3.Error as e:
+            log_error("./Utils", "db_sqlite.py", f"save_clients error: {e}")
+            return False
+        log_info("./Utils", "db_sqlite.py", f"clients actualizado ({len(clients)} clientes).")
+        return True
+
+    def iter_clients(self) -> Iterator[Dict]:
+        """Genera los clientes de a uno (orden de alta) sin materializar la lista."""
+        for row in self._conn.execute(f"{_CLIENT_SELECT} ORDER BY rowid"):
+            yield _from_row(row, CLIENT_COLUMNS)
+
+    def find_client_by_cuit(self, cuit: str) -> Optional[Dict]:
+        """Busca un cliente por CUIT/CUIL y retorna el dict o None."""
+        if not cuit:
+            return None
+        row = self._conn.execute(
+            f"{_CLIENT_SELECT} WHERE cuit = ? ORDER BY rowid LIMIT 1", (str(cuit),)
+        ).fetchone()
+        return _from_row(row, CLIENT_COLUMNS) if row else None
+
+    def add_or_update_client(self, client: Dict) -> Dict:
+        """Añade o actualiza un cliente (misma semántica que DBManager)."""
+        cuit = client.get("cuit") or client.get("Cuit") or None
+        existing = self.find_client_by_cuit(cuit) if cuit else None
+
+        previous = dict(existing) if existing else None
+        if existing:
+            saved = _merge_client(existing, client)
+            action = "actualizado"
+        else:
+            saved = _new_client(client, cuit)
+            action = "creado"
+
+        try:
+            self._conn.execute(_CLIENT_UPSERT, _to_row(saved, CLIENT_COLUMNS))
+            self._search_put("clients", saved, previous)
+            self._note_change("clients", saved.get("id"), previous, saved)
+            if not self._tx_depth:
+                log_info("./Utils", "db_sqlite.py", f"Cliente {action}: {saved.get('name')}")
+        except sqlite3.Error as e:
+            log_error("./Utils", "db_sqlite.py", f"No se pudo persistir el cliente: {e}")
+        return saved
+
+    # -------------------------
+    # PROJECTS
+    # -------------------------
+    def _get_current_id(self) -> Optional[str]:
+        row = self._conn.execute("SELECT value FROM meta WHERE key = 'current_project_id'").fetchone()
+        return row[0] if row else None
+
+    def _set_current_id(self, project_id: Optional[str]):
+        self._conn.execute(
+            "INSERT INTO meta (key, value) VALUES ('current_project_id', ?) "
+            "ON CONFLICT(key) DO UPDATE SET value=excluded.value", (project_id,)
+        )
+
+    def load_projects_data(self) -> Dict:
+        """Objeto equivalente a projects.json."""
+        return {"projects": self.load_projects(), "current_project_id": self._get_current_id()}
+
+    def save_projects_data(self, data: Dict) -> bool:
+        """Reemplaza la tabla completa de proyectos y el current_project_id."""
+        projects = data.get("projects", [])
+        try:
+            with self.transaction():
+                self._conn.execute("DELETE FROM projects")
+                self._conn.executemany(_PROJECT_UPSERT, (_to_row(self._with_id(p), PROJECT_COLUMNS) for p in projects))
+                self._set_current_id(data.get("current_project_id"))
+                self._note_replace("projects")
+            self._search["projects"] = None
+        except sqlite3.Error as e:
+            log_error("./Utils", "db_sqlite.py", f"save_projects_data error: {e}")
+            return False
+        log_info("./Utils", "db_sqlite.py", "projects actualizado.")
+        return True
+
+    def load_projects(self) -> List[Dict]:
+        """Retorna la lista de proyectos (orden de alta)."""
+        rows = self._conn.execute(f"{_PROJECT_SELECT} ORDER BY rowid").fetchall()
+        return [_from_row(r, PROJECT_COLUMNS) for r in rows]
+
+    def iter_projects(self) -> Iterator[Dict]:
+        """Genera los proyectos de a uno (orden de alta) sin materializar la lista."""
+        for row in self._conn.execute(f"{_PROJECT_SELECT} ORDER BY rowid"):
+            yield _from_row(row, PROJECT_COLUMNS)
+
+    def find_project_by_id(self, project_id: str) -> Optional[Dict]:
+        if not project_id:
+            return None
+        row = self._conn.execute(f"{_PROJECT_SELECT} WHERE id = ?", (project_id,)).fetchone()
+        return _from_row(row, PROJECT_COLUMNS) if row else None
+
+    def _find_project_by_path(self, path: str) -> Optional[Dict]:
+        row = self._conn.execute(
+            f"{_PROJECT_SELECT} WHERE path = ? ORDER BY rowid LIMIT 1", (path,)
+        ).fetchone()
+        return _from_row(row, PROJECT_COLUMNS) if row else None
+
+    def add_or_update_project(self, project: Dict, mark_current: bool = True) -> Dict:
+        """Añade o actualiza un proyecto (misma semántica que DBManager)."""
+        proj_id = project.get("id")
+        existing = None
+        if proj_id:
+            existing = self.find_project_by_id(proj_id)
+        elif project.get("path"):
+            existing = self._find_project_by_path(project["path"])
+
+        previous = dict(existing) if existing else None
+        if existing:
+            saved = _merge_project(existing, project)
+            action = "actualizado"
+        else:
+            saved = _new_project(project)
+            action = "creado"
+
+        try:
+            with self.transaction():
+                self._conn.execute(_PROJECT_UPSERT, _to_row(saved, PROJECT_COLUMNS))
+                self._search_put("projects", saved, previous)
+                self._note_change("projects", saved.get("id"), previous, saved)
+                if mark_current:
+                    self._set_current_id(saved.get("id"))
+            if not self._tx_depth:
+                log_info("./Utils", "db_sqlite.py", f"Proyecto {action}: {saved.get('name')} (id={saved.get('id')})")
+        except sqlite3.Error as e:
+            log_error("./Utils", "db_sqlite.py", f"No se pudo persistir el proyecto: {e}")
+        return saved
+
+    def set_current_project(self, project_id: Optional[str]) -> bool:
+        """Marca el proyecto por id como current. Si project_id es None lo desmarca."""
+        try:
+            self._set_current_id(project_id)
+            return True
+        except sqlite3.Error as e:
+            log_error("./Utils", "db_sqlite.py", f"set_current_project error: {e}")
+            return False
+
+    def get_current_project(self) -> Optional[Dict]:
+        """Retorna el proyecto current o None."""
+        current_id = self._get_current_id()
+        if not current_id:
+            return None
+        return self.find_project_by_id(current_id)
+
+    @staticmethod
+    def _project_where(filters: Optional[Dict]):
+        """WHERE y parámetros para los filtros de query_projects (mismo formato que DBManager)."""
+        clauses, params = [], []
+        for field, value in (filters or {}).items():
+            if field in PROJECT_COLUMNS:
+                column = field
+            elif field.isidentifier():
+                column = f"json_extract(extra, '$.{field}')"
+            else:
+                raise ValueError(f"campo de filtro inválido: {field!r}")
+            values = value if isinstance(value, (list, tuple, set, frozenset)) else (value,)
+            options = []
+            for v in values:
+                if v is None:
+                    options.append(f"{column} IS NULL")
+                else:
+                    options.append(f"{column} = ?")
+                    params.append((1 if v else 0) if field == "is_macro" else v)
+            clauses.append("(" + " OR ".join(options or ["0"]) + ")")
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def query_projects(self, filters: Optional[Dict] = None, order_by: Optional[str] = None,
+                       limit: Optional[int] = None, offset: int = 0) -> List[Dict]:
+        """Proyectos filtrados, ordenados y paginados (misma semántica que DBManager.query_projects)."""
+        field, descending = parse_order(order_by)
+        if field is not None and field not in PROJECT_COLUMNS:
+            log_error("./Utils", "db_sqlite.py", f"query_projects: orden no soportado '{order_by}'")
+            field = None
+        direction = "DESC" if descending else "ASC"
+        order = f"{field} {direction}, id {direction}" if field else "rowid"
+        try:
+            where, params = self._project_where(filters)
+            rows = self._conn.execute(
+                f"{_PROJECT_SELECT}{where} ORDER BY {order} LIMIT ? OFFSET ?",
+                params + [-1 if limit is None else max(0, limit), max(0, offset or 0)],
+            ).fetchall()
+        except (sqlite3.Error, ValueError) as e:
+            log_error("./Utils", "db_sqlite.py", f"query_projects error: {e}")
+            return []
+        return [_from_row(r, PROJECT_COLUMNS) for r in rows]
+
+    def count_projects(self, filters: Optional[Dict] = None) -> int:
+        """Cantidad de proyectos que cumplen 'filters'."""
+        try:
+            where, params = self._project_where(filters)
+            return self._conn.execute(f"SELECT COUNT(*) FROM projects{where}", params).fetchone()[0]
+        except (sqlite3.Error, ValueError) as e:
+            log_error("./Utils", "db_sqlite.py", f"count_projects error: {e}")
+            return 0
+
+    # -------------------------
+    # CLIENTE -> PROYECTOS
+    # -------------------------
+    def get_client_projects(self, client_id: str, order_by: Optional[str] = None,
+                            limit: Optional[int] = None, offset: int = 0) -> List[Dict]:
+        """Proyectos de un cliente (índice idx_projects_client)."""
+        return self.query_projects({"client_id": client_id}, order_by, limit, offset)
+
+    def _client_aggregates(self, where: str = "", params=()) -> Dict[str, Dict]:
+        rows = self._conn.execute(
+            "SELECT COALESCE(client_id, ''), COALESCE(status, ''), COUNT(*), SUM(is_macro), MAX(updated_at) "
+            f"FROM projects{where} GROUP BY 1, 2", params,
+        ).fetchall()
+        summaries: Dict[str, Dict] = {}
+        for client_id, status, count, macro, latest in rows:
+            summary = summaries.setdefault(client_id, {
+                "client_id": client_id, "projects": 0, "by_status": {}, "macro": 0, "last_updated": None,
+            })
+            summary["projects"] += count
+            summary["by_status"][status] = count
+            summary["macro"] += macro or 0
+            if latest and (summary["last_updated"] is None or latest > summary["last_updated"]):
+                summary["last_updated"] = latest
+        return summaries
+
+    def get_client_summary(self, client_id: str) -> Dict:
+        """Agregados de los proyectos de un cliente (misma forma que DBManager)."""
+        try:
+            found = self._client_aggregates(" WHERE COALESCE(client_id, '') = ?", (client_id or "",))
+        except sqlite3.Error as e:
+            log_error("./Utils", "db_sqlite.py", f"get_client_summary error: {e}")
+            found = {}
+        summary = found.get(client_id or "")
+        if summary is None:
+            return {"client_id": client_id, "projects": 0, "by_status": {}, "macro": 0, "last_updated": None}
+        summary["client_id"] = client_id
+        return summary
+
+    def get_client_summaries(self, include_orphans: bool = False) -> Dict[str, Dict]:
+        """Agregados de todos los clientes (misma semántica que DBManager)."""
+        try:
+            found = self._client_aggregates()
+            client_ids = [r[0] for r in self._conn.execute("SELECT id FROM clients ORDER BY rowid")]
+        except sqlite3.Error as e:
+            log_error("./Utils", "db_sqlite.py", f"get_client_summaries error: {e}")
+            return {}
+        summaries = {}
+        for client_id in client_ids:
+            summaries[client_id] = found.pop(client_id, None) or {
+                "client_id": client_id, "projects": 0, "by_status": {}, "macro": 0, "last_updated": None,
+            }
+        if include_orphans:
+            summaries.update(found)
+        return summaries
+
+    # -------------------------
+    # UTILIDADES
+    # -------------------------
+    def remove_project(self, project_id: str) -> bool:
+        """Elimina un proyecto por id; si era el current lo desmarca."""
+        try:
+            with self.transaction():
+                removed = self.find_project_by_id(project_id)
+                self._conn.execute("DELETE FROM projects WHERE id = ?", (project_id,))
+                self._search_drop("projects", [removed] if removed else [])
+                if removed:
+                    self._note_change("projects", project_id, removed, None)
+                if self._get_current_id() == project_id:
+                    self._set_current_id(None)
+            return True
+        except sqlite3.Error as e:
+            log_error("./Utils", "db_sqlite.py", f"remove_project error: {e}")
+            return False
+
+    def remove_client(self, client_id_or_cuit: str) -> bool:
+        """Elimina un cliente por id o por cuit."""
+        key = str(client_id_or_cuit)
+        try:
+            with self.transaction():
+                rows = self._conn.execute(f"{_CLIENT_SELECT} WHERE id = ? OR cuit = ?", (key, key)).fetchall()
+                self._conn.execute("DELETE FROM clients WHERE id = ? OR cuit = ?", (key, key))
+                removed = [_from_row(r, CLIENT_COLUMNS) for r in rows]
+                self._search_drop("clients", removed)
+                for client in removed:
+                    self._note_change("clients", client.get("id"), client, None)
+            return True
+        except sqlite3.Error as e:
+            log_error("./Utils", "db_sqlite.py", f"remove_client error: {e}")
+            return False
+
+    # -------------------------
+    # HISTORIAL
+    # -------------------------
+    def _history_path(self, kind: str) -> str:
+        """Ruta base del historial de una tabla ('<base>.<tabla>' -> '<base>.<tabla>.history/')."""
+        return f"{self.db_path}.{kind}"
+
+    def _note_change(self, kind: str, record_id, previous: Optional[Dict], current: Optional[Dict]):
+        """Registra el cambio de un registro para el historial (se escribe al confirmar)."""
+        if self._history is None or not record_id:
+            return
+        pending = self._history_pending[kind]
+        base = pending[record_id][0] if record_id in pending else previous
+        pending[record_id] = (base, dict(current) if current is not None else None)
+        if not self._tx_depth:
+            self._write_history()
+
+    def _note_replace(self, kind: str):
+        """Reemplazo completo de una tabla: el historial abre un checkpoint al confirmar."""
+        if self._history is not None:
+            self._history_full.add(kind)
+            self._history_pending[kind] = {}
+
+    def _write_history(self):
+        """Agrega al historial lo recién confirmado (candado por tabla entre procesos)."""
+        if self._history is None:
+            return
+        pending, full = self._history_pending, self._history_full
+        self._history_pending = {kind: {} for kind in _KINDS}
+        self._history_full = set()
+        for kind, history in self._history.items():
+            if kind not in full and not pending[kind]:
+                continue
+            load = self.load_clients if kind == "clients" else self.load_projects
+            with file_lock(history.dir):
+                if kind in full:
+                    ok = history.checkpoint(load())
+                else:
+                    changes, bases = [], {}
+                    for record_id, (base, current) in pending[kind].items():
+                        bases[record_id] = base
+                        delta = diff_record(base, current)
+                        if delta is not None:
+                            changes.append((record_id, delta))
+                    ok = history.append(changes, load, bases)
+            if not ok:
+                log_error("./Utils", "db_sqlite.py", f"No se pudo actualizar el historial de {kind}")
+
+    def _history_for(self, kind: str) -> RecordHistory:
+        """Historial de 'kind' (también con history=False: se puede consultar lo ya guardado)."""
+        if kind not in _KINDS:
+            raise KeyError(kind)
+        if self._history is not None:
+            return self._history[kind]
+        return RecordHistory(self._history_path(kind), kind)
+
+    def record_at(self, kind: str, record_id: str, when) -> Optional[Dict]:
+        """Registro de 'kind' tal como estaba en 'when' (misma semántica que DBManager.record_at)."""
+        return self._history_for(kind).record_at(record_id, when)
+
+    def records_at(self, kind: str, when) -> Optional[List[Dict]]:
+        """Todos los registros de 'kind' en 'when', o None si es anterior al historial."""
+        return self._history_for(kind).records_at(when)
+
+    def record_changes(self, kind: str, record_id: str) -> List[Dict]:
+        """Cambios registrados de un registro, del más viejo al más nuevo (ver RecordHistory.changes)."""
+        return list(self._history_for(kind).changes(record_id))
+
+    def history_stats(self, kind: str) -> Dict:
+        """Segmentos y bytes del historial de 'kind' (ver RecordHistory.stats)."""
+        return self._history_for(kind).stats()
+
+    def compact_history(self, retention_days: Optional[float] = None) -> int:
+        """Elimina los segmentos de historial fuera de retención. Retorna cuántos eliminó."""
+        removed = 0
+        for kind in _KINDS:
+            history = self._history_for(kind)
+            with file_lock(history.dir):
+                removed += history.compact(retention_days)
+        return removed
+
+    # -------------------------
+    # BÚSQUEDA
+    # -------------------------
+    def _search_index(self, kind: str) -> SearchIndex:
+        """Índice de 'kind'; se reconstruye si otra conexión modificó la base."""
+        version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        if version != self._data_version:
+            self._search = {"clients": None, "projects": None}
+            self._data_version = version
+        index = self._search[kind]
+        if index is None:
+            if kind == "clients":
+                index = SearchIndex.build(CLIENT_FIELDS, self.load_clients())
+            else:
+                index = SearchIndex.build(PROJECT_FIELDS, self.load_projects())
+            self._search[kind] = index
+        return index
+
+    def _search_put(self, kind: str, record: Dict, previous: Optional[Dict] = None):
+        index = self._search[kind]
+        if index is not None:
+            if previous is not None:
+                index.remove(previous)
+            index.add(record)
+
+    def _search_drop(self, kind: str, records: Iterable[Dict]):
+        index = self._search[kind]
+        if index is not None:
+            for record in records:
+                index.remove(record)
+
+    def persist_search_index(self) -> bool:
+        """Compatibilidad con DBManager: el índice vive sólo en memoria."""
+        return True
+
+    def search(self, query: str, kinds: Iterable[str] = ("clients", "projects"), limit: int = 10,
+               prefix: bool = True, fuzzy: bool = True) -> List[Dict]:
+        """Búsqueda de texto rankeada (misma semántica y formato que DBManager.search)."""
+        hits = []
+        for kind in kinds:
+            for record_id, score in self._search_index(kind).search(query, limit, prefix=prefix, fuzzy=fuzzy):
+                hits.append((score, kind, record_id))
+        results = []
+        for score, kind, record_id in heapq.nsmallest(limit, hits, key=lambda h: (-h[0], h[1], h[2])):
+            if kind == "clients":
+                row = self._conn.execute(f"{_CLIENT_SELECT} WHERE id = ?", (record_id,)).fetchone()
+                record = _from_row(row, CLIENT_COLUMNS) if row else None
+            else:
+                record = self.find_project_by_id(record_id)
+            if record is not None:
+                results.append({"kind": kind, "id": record_id, "score": round(score, 4), "record": record})
+        return results
+
+    def search_clients(self, query: str, limit: int = 10) -> List[Dict]:
+        """Clientes que coinciden con 'query', mejor rankeados primero."""
+        return [r["record"] for r in self.search(query, ("clients",), limit)]
+
+    def search_projects(self, query: str, limit: int = 10) -> List[Dict]:
+        """Proyectos que coinciden con 'query', mejor rankeados primero."""
+        return [r["record"] for r in self.search(query, ("projects",), limit)]
+
+    @staticmethod
+    def _with_id(record: Dict) -> Dict:
+        """Registros importados sin id (editados a mano) reciben uno nuevo."""
+        if record.get("id"):
+            return record
+        return dict(record, id=str(record.get("cuit") or uuid.uuid4()))
+
+    # -------------------------
+    # MIGRACIÓN JSON <-> SQLITE
+    # -------------------------
+    def import_json(self, clients_path: Optional[str] = None, projects_path: Optional[str] = None) -> Dict[str, int]:
+        """
+        Importa clients.json / projects.json (snapshot + journal, si lo hay)
+        reemplazando el contenido de la base. Retorna los conteos importados.
+        """
+        clients_path = clients_path or self.clients_path
+        projects_path = projects_path or self.projects_path
+
+        def _read(path, list_key, fallback):
+            try:
+                data = read_file(path)
+            except FileNotFoundError:
+                return fallback
+            return load_journaled(path, data, list_key)
+
+        clients_data = _read(clients_path, "clients", {"clients": []})
+        projects_data = _read(projects_path, "projects", {"projects": [], "current_project_id": None})
+
+        with self.transaction():
+            self.save_clients(clients_data.get("clients", []))
+            self.save_projects_data(projects_data)
+
+        counts = {
+            "clients": len(clients_data.get("clients", [])),
+            "projects": len(projects_data.get("projects", [])),
+        }
+        log_info("./Utils", "db_sqlite.py",
+                 f"Importado desde JSON: {counts['clients']} clientes, {counts['projects']} proyectos.")
+        return counts
+
+    def export_json(self, clients_path: Optional[str] = None, projects_path: Optional[str] = None,
+                    fmt: str = "pretty") -> bool:
+        """
+        Exporta clientes y proyectos a JSON legible (misma semántica que
+        DBManager.export_json): por defecto clients.json / projects.json en
+        <carpeta de datos>/export/. Nunca sobrescribe los JSON de la carpeta de
+        datos; para volver al backend JSON usar export_sqlite_to_json().
+        """
+        export_dir = os.path.join(os.path.dirname(self.clients_path), "export")
+        clients_path = clients_path or os.path.join(export_dir, os.path.basename(self.clients_path))
+        projects_path = projects_path or os.path.join(export_dir, os.path.basename(self.projects_path))
+        for path in (clients_path, projects_path):
+            if os.path.abspath(path) in (os.path.abspath(self.clients_path), os.path.abspath(self.projects_path)):
+                log_error("./Utils", "db_sqlite.py", f"export_json: {path} es un archivo de datos del backend JSON")
+                return False
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            except OSError as e:
+                log_error("./Utils", "db_sqlite.py", f"export_json: no se pudo crear la carpeta de {path}: {e}")
+                return False
+        return self._write_json(clients_path, projects_path, fmt)
+
+    def _write_json(self, clients_path: str, projects_path: str, fmt: str) -> bool:
+        """Escribe la base como clients.json / projects.json (escritura atómica)."""
+        ok = _atomic_write(clients_path, {"clients": self.load_clients()}, fmt)
+        ok = _atomic_write(projects_path, self.load_projects_data(), fmt) and ok
+        if ok:
+            log_info("./Utils", "db_sqlite.py", f"Exportado a JSON: {clients_path}, {projects_path}")
+        return ok
+
+
+def migrate_json_to_sqlite(db_path: Optional[str] = None) -> Dict[str, int]:
+    """Migración de una sola pasada de los JSON actuales a SQLite."""
+    db = SQLiteDBManager(db_path)
+    try:
+        return db.import_json()
+    finally:
+        db.close()
+
+
+def export_sqlite_to_json(db_path: Optional[str] = None) -> bool:
+    """Exporta la base SQLite de vuelta a clients.json / projects.json (formato Database/format)."""
+    db = SQLiteDBManager(db_path)
+    try:
+        return db._write_json(db.clients_path, db.projects_path, _configured_format())
+    finally:
+        db.close()
@@ -0,0 +1,89 @@
+
+
+# ./Utils/file_lock.py
+
+"""
+Utils/file_lock.py
+
+Candado advisory entre procesos sobre un archivo de datos.
+
+Varias instancias de FreeCAD (o una carpeta .data compartida) pueden escribir
+los mismos JSON. DBManager toma este candado sólo durante la ventana de
+commit (revalidar contra el disco, fusionar y escribir); las lecturas nunca
+lo toman.
+
+    with file_lock(path):
+        ...
+
+El candado vive en '<archivo>.lock' (no en el JSON: os.replace cambia el
+inode del archivo de datos). POSIX usa fcntl.flock; Windows, msvcrt.locking
+sobre el primer byte. Si no hay mecanismo disponible o el .lock no se puede
+crear, se continúa sin candado (comportamiento previo).
+
+Sólo usa la librería estándar.
+"""
+
+import os
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+try:
+    import msvcrt
+except ImportError:  # POSIX
+    msvcrt = None
+
+
+def lock_path(path: str) -> str:
+    """Ruta del archivo de candado asociado a un JSON de datos."""
+    return path + ".lock"
+
+
+def _acquire(fd: int):
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+    elif msvcrt is not None:
+        # LK_LOCK reintenta sólo ~10 s: seguir esperando como flock
+        while True:
+            try:
+                msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+                return
+            except OSError:
+                time.sleep(0.05)
+
+
+def _release(fd: int):
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+    elif msvcrt is not None:
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+
+@contextmanager
+def file_lock(path: str):
+    """
+    Candado exclusivo entre procesos sobre 'path' mientras dura el bloque.
+    No es reentrante: no anidar sobre el mismo archivo.
+    """
+    try:
+        fd = os.open(lock_path(path), os.O_RDWR | os.O_CREAT, 0o666)
+    except OSError:
+        yield False
+        return
+    try:
+        try:
+            _acquire(fd)
+        except OSError:
+            # sistema de archivos sin soporte de candados (algunos montajes de red)
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            _release(fd)
+    finally:
+        os.close(fd)
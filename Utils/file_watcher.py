@@ -0,0 +1,420 @@
+
+
+# ./Utils/file_watcher.py
+
+"""
+Utils/file_watcher.py
+
+Vigilancia de archivos de datos y configuración (clients.json, projects.json,
+sus journals, los .cfg de settings) para invalidar cachés con precisión
+cuando otro proceso los modifica o los reemplaza.
+
+    watcher = get_watcher()             # None si está desactivado
+    token = watcher.subscribe([path], callback)
+    ...
+    watcher.unsubscribe(token)
+
+callback(path, event) se llama desde el hilo del vigilante con event:
+  "changed"    el archivo cambió, se creó, se borró o se reemplazó (os.replace)
+  "unwatched"  el vigilante dejó de poder seguirlo con precisión (p. ej. se
+               borró la carpeta): quien lo use debe volver a revalidar por su cuenta
+
+Backends:
+  - inotify (Linux, vía ctypes): se vigila la CARPETA de cada archivo, no el
+    archivo: os.replace cambia el inode y una vigilancia sobre el archivo se
+    perdería en la primera escritura atómica. Los eventos llegan al instante;
+    is_precise(path) es True y los suscriptores pueden dejar de hacer stat en
+    cada lectura.
+    inotify sólo ve las escrituras hechas desde este host: en una carpeta de
+    un sistema de archivos de red (NFS, SMB/CIFS, sshfs, ... ver
+    NETWORK_FS_TYPES) no avisa lo que escriben otras máquinas, así que esos
+    archivos se vigilan siempre por polling (is_precise False) y quien los
+    use sigue revalidando con stat en cada lectura.
+  - polling (cualquier sistema): stat de los archivos vigilados cada
+    poll_interval segundos (firma inode, tamaño, mtime). Los cambios se
+    detectan con demora: is_precise(path) es False y quien necesite
+    coherencia inmediata sigue revalidando.
+
+Setting Files/watch: "true" (por defecto: inotify o polling), "inotify"
+(sólo inotify, si no hay no se vigila), "poll" (siempre polling), "false".
+El hilo es daemon; los eventos de un lote de lectura se agrupan por archivo.
+
+Sólo usa la librería estándar.
+"""
+
+import os
+import re
+import sys
+import time
+import errno
+import select
+import struct
+import weakref
+import itertools
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+DEFAULT_POLL_INTERVAL = 1.0
+
+# inotify(7)
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+_DIR_MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+             | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR)
+_EVENT = struct.Struct("iIII")
+
+# Tipos de sistema de archivos (columna 3 de /proc/self/mounts) en los que
+# inotify no ve las escrituras de otros hosts
+NETWORK_FS_TYPES = frozenset((
+    "nfs", "nfs4", "cifs", "smb3", "smbfs", "ncpfs", "afs", "9p", "ceph", "glusterfs", "lustre",
+    "gpfs", "davfs", "fuse.sshfs", "fuse.glusterfs", "fuse.cephfs", "fuse.davfs2", "fuse.rclone",
+))
+_MOUNTS_FILE = "/proc/self/mounts"
+
+
+def _stat_signature(path: str):
+    try:
+        st = os.stat(path)
+        return (st.st_ino, st.st_size, st.st_mtime_ns)
+    except OSError:
+        return None
+
+
+def _unescape_mount(field: str) -> str:
+    """Deshace los escapes octales de /proc/self/mounts (espacio = \\040)."""
+    if "\\" not in field:
+        return field
+    return re.sub(r"\\([0-7]{3})", lambda m: chr(int(m.group(1), 8)), field)
+
+
+def _mount_fstype(path: str, mounts_file: str = _MOUNTS_FILE) -> Optional[str]:
+    """Tipo del sistema de archivos montado más cercano a 'path', o None si no se puede saber."""
+    path = os.path.realpath(path)
+    best, fstype = "", None
+    try:
+        with open(mounts_file, "r", encoding="utf-8", errors="replace") as f:
+            for line in f:
+                fields = line.split()
+                if len(fields) < 3:
+                    continue
+                mount_point = _unescape_mount(fields[1])
+                inside = path == mount_point or path.startswith(mount_point.rstrip("/") + "/")
+                if inside and len(mount_point) >= len(best):
+                    best, fstype = mount_point, fields[2]
+    except OSError:
+        return None
+    return fstype
+
+
+def is_network_fs(path: str) -> bool:
+    """True si 'path' está en un sistema de archivos de red (ver NETWORK_FS_TYPES)."""
+    return _mount_fstype(path) in NETWORK_FS_TYPES
+
+
+class _Inotify:
+    """Envoltorio mínimo de inotify_init1 / inotify_add_watch / read vía ctypes."""
+
+    def __init__(self):
+        import ctypes
+        import ctypes.util
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._add = libc.inotify_add_watch
+        self._add.argtypes = (ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32)
+        self._rm = libc.inotify_rm_watch
+        self._rm.argtypes = (ctypes.c_int, ctypes.c_int)
+        self._ctypes = ctypes
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1")
+
+    def add_watch(self, directory: str) -> int:
+        wd = self._add(self.fd, os.fsencode(directory), _DIR_MASK)
+        if wd < 0:
+            err = self._ctypes.get_errno()
+            raise OSError(err, os.strerror(err), directory)
+        return wd
+
+    def rm_watch(self, wd: int):
+        self._rm(self.fd, wd)
+
+    def read(self) -> List[Tuple[int, int, str]]:
+        """Eventos disponibles: [(wd, mask, nombre)] (vacío si no hay)."""
+        try:
+            buf = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        except OSError as e:
+            if e.errno in (errno.EAGAIN, errno.EINTR):
+                return []
+            raise
+        events = []
+        offset = 0
+        while offset + _EVENT.size <= len(buf):
+            wd, mask, _cookie, length = _EVENT.unpack_from(buf, offset)
+            offset += _EVENT.size
+            name = buf[offset:offset + length].rstrip(b"\0")
+            offset += length
+            events.append((wd, mask, os.fsdecode(name)))
+        return events
+
+    def close(self):
+        try:
+            os.close(self.fd)
+        except OSError:
+            pass
+
+
+class FileWatcher:
+    """
+    Vigila archivos y avisa a los suscriptores cuando cambian.
+    Usar get_watcher() para la instancia compartida del proceso.
+    """
+
+    def __init__(self, mode: str = "true", poll_interval: float = DEFAULT_POLL_INTERVAL):
+        self.poll_interval = max(0.05, float(poll_interval))
+        self._lock = threading.RLock()
+        self._tokens = itertools.count(1)
+        # token -> (rutas, callback o weakref.WeakMethod)
+        self._subscribers: Dict[int, Tuple[Tuple[str, ...], object]] = {}
+        # ruta -> tokens
+        self._by_path: Dict[str, Set[int]] = {}
+        # inotify: carpeta -> wd, wd -> carpeta; rutas cubiertas con precisión
+        self._dirs: Dict[str, int] = {}
+        self._wds: Dict[int, str] = {}
+        self._precise: Set[str] = set()
+        # polling: ruta -> firma
+        self._polled: Dict[str, object] = {}
+        self._next_poll = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.events = 0
+
+        self._inotify: Optional[_Inotify] = None
+        if mode in ("true", "inotify") and sys.platform.startswith("linux"):
+            try:
+                self._inotify = _Inotify()
+            except Exception:
+                self._inotify = None
+        self.backend = "inotify" if self._inotify is not None else "polling"
+
+    # -------------------------
+    # SUSCRIPCIONES
+    # -------------------------
+    def subscribe(self, paths: Iterable[str], callback: Callable[[str, str], None]) -> int:
+        """
+        Avisa a callback(path, event) ante cambios en 'paths'. Los métodos
+        ligados se guardan con referencia débil: suscribirse no mantiene vivo
+        al objeto. Retorna un token para unsubscribe().
+        """
+        paths = tuple(os.path.abspath(p) for p in paths)
+        ref = weakref.WeakMethod(callback) if hasattr(callback, "__self__") else callback
+        with self._lock:
+            token = next(self._tokens)
+            self._subscribers[token] = (paths, ref)
+            for path in paths:
+                self._by_path.setdefault(path, set()).add(token)
+                self._watch(path)
+        self._ensure_thread()
+        return token
+
+    def unsubscribe(self, token: int):
+        with self._lock:
+            paths, _ = self._subscribers.pop(token, ((), None))
+            for path in paths:
+                tokens = self._by_path.get(path)
+                if tokens is not None:
+                    tokens.discard(token)
+                    if not tokens:
+                        del self._by_path[path]
+                        self._precise.discard(path)
+                        self._polled.pop(path, None)
+
+    def is_precise(self, path: str) -> bool:
+        """True si los cambios de 'path' se avisan al instante (inotify activo sobre su carpeta)."""
+        return os.path.abspath(path) in self._precise
+
+    def _watch(self, path: str):
+        """Empieza a vigilar 'path' (inotify sobre su carpeta o, si no se puede o es de red, polling)."""
+        if path in self._precise or path in self._polled:
+            return
+        directory = os.path.dirname(path)
+        if self._inotify is not None and directory not in self._dirs and is_network_fs(directory):
+            from Utils.logger import log_info
+            log_info("./Utils", "file_watcher.py", f"{directory} está en un sistema de archivos de red: se vigila por polling")
+            self._polled[path] = _stat_signature(path)
+            return
+        if self._inotify is not None:
+            wd = self._dirs.get(directory)
+            if wd is None:
+                try:
+                    wd = self._inotify.add_watch(directory)
+                    self._dirs[directory] = wd
+                    self._wds[wd] = directory
+                except OSError:
+                    wd = None
+            if wd is not None:
+                self._precise.add(path)
+                return
+        self._polled[path] = _stat_signature(path)
+
+    # -------------------------
+    # HILO
+    # -------------------------
+    def _ensure_thread(self):
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name="EW-watcher", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """
+        Detiene el hilo y libera inotify. Los suscriptores reciben "unwatched"
+        por cada archivo: desde ahí deben revalidar por su cuenta.
+        """
+        self._stop.set()
+        thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=2)
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+        with self._lock:
+            unwatched = {path: "unwatched" for path in self._by_path}
+            self._precise.clear()
+            self._dirs.clear()
+            self._wds.clear()
+        self._dispatch(unwatched)
+
+    def _loop(self):
+        while not self._stop.is_set():
+            timeout = self.poll_interval if self._polled else 0.5
+            changed: Dict[str, str] = {}
+            inotify = self._inotify
+            if inotify is not None:
+                try:
+                    ready, _, _ = select.select([inotify.fd], [], [], timeout)
+                except (OSError, ValueError):
+                    ready = []
+                    self._stop.wait(timeout)
+                if ready:
+                    self._read_inotify(inotify, changed)
+            else:
+                self._stop.wait(timeout)
+            if self._polled and time.monotonic() >= self._next_poll:
+                self._poll(changed)
+                self._next_poll = time.monotonic() + self.poll_interval
+            if changed:
+                self._dispatch(changed)
+
+    def _read_inotify(self, inotify: _Inotify, changed: Dict[str, str]):
+        try:
+            events = inotify.read()
+        except OSError:
+            return
+        with self._lock:
+            for wd, mask, name in events:
+                if mask & IN_Q_OVERFLOW:
+                    # se perdieron eventos: avisar de todo lo vigilado
+                    for path in self._precise:
+                        changed.setdefault(path, "changed")
+                    continue
+                directory = self._wds.get(wd)
+                if directory is None:
+                    continue
+                if mask & (IN_IGNORED | IN_DELETE_SELF | IN_MOVE_SELF):
+                    # la carpeta ya no está: sus archivos pasan a polling
+                    self._wds.pop(wd, None)
+                    self._dirs.pop(directory, None)
+                    for path in [p for p in self._precise if os.path.dirname(p) == directory]:
+                        self._precise.discard(path)
+                        self._polled[path] = _stat_signature(path)
+                        changed[path] = "unwatched"
+                    continue
+                path = os.path.join(directory, name)
+                if path in self._precise:
+                    changed.setdefault(path, "changed")
+
+    def _poll(self, changed: Dict[str, str]):
+        with self._lock:
+            for path, old in list(self._polled.items()):
+                signature = _stat_signature(path)
+                if signature != old:
+                    self._polled[path] = signature
+                    changed.setdefault(path, "changed")
+
+    def _dispatch(self, changed: Dict[str, str]):
+        with self._lock:
+            calls = []
+            for path, event in changed.items():
+                for token in self._by_path.get(path, ()):
+                    _, ref = self._subscribers.get(token, (None, None))
+                    calls.append((token, ref, path, event))
+        self.events += len(changed)
+        for token, ref, path, event in calls:
+            callback = ref() if isinstance(ref, weakref.WeakMethod) else ref
+            if callback is None:
+                self.unsubscribe(token)  # el objeto suscripto ya no existe
+                continue
+            try:
+                callback(path, event)
+            except Exception as e:
+                from Utils.logger import log_error
+                log_error("./Utils", "file_watcher.py", f"Error en suscriptor de {path}: {e}")
+
+
+_WATCHER = None  # FileWatcher, False (desactivado) o None (sin resolver)
+_WATCHER_LOCK = threading.Lock()
+_MODES = ("true", "inotify", "poll", "false")
+
+
+def get_watcher() -> Optional[FileWatcher]:
+    """
+    Vigilante compartido del proceso según el setting Files/watch (ver arriba),
+    o None si está desactivado (o es "inotify" y no hay inotify).
+    """
+    global _WATCHER
+    if _WATCHER is not None:
+        return _WATCHER or None
+    with _WATCHER_LOCK:
+        if _WATCHER is None:
+            from Utils.config import get_setting, get_settings_store
+            mode = str(get_setting("Files", "watch", "true")).strip().lower()
+            if mode in ("1", "yes", "si", "sí", "on"):
+                mode = "true"
+            watcher = None
+            if mode in _MODES and mode != "false":
+                interval = get_setting("Files", "poll_interval", DEFAULT_POLL_INTERVAL)
+                watcher = FileWatcher(mode, interval)
+                if mode == "inotify" and watcher.backend != "inotify":
+                    watcher = None
+            # False: desactivado (no volver a consultar el setting en cada llamada)
+            _WATCHER = watcher or False
+            if watcher is not None:
+                get_settings_store().attach_watcher(watcher)
+    return _WATCHER or None
+
+
+def stop_watcher():
+    """Detiene y descarta el vigilante compartido (el próximo get_watcher() crea otro)."""
+    global _WATCHER
+    with _WATCHER_LOCK:
+        watcher, _WATCHER = _WATCHER, None
+    if watcher:
+        from Utils.config import get_settings_store
+        get_settings_store().attach_watcher(None)
+        watcher.stop()
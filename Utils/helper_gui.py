@@ -10,4 +10,8 @@ def show_error_dialog(title, message):
     
 def select_file_dialog(caption, filter):
     from PySide2 import QtWidgets
-    return QtWidgets.QFileDialog.getOpenFileName(None, caption, "", filter)[0]
\ No newline at end of file
+    return QtWidgets.QFileDialog.getOpenFileName(None, caption, "", filter)[0]
+
+def show_info_dialog(title, message):
+    from PySide2 import QtWidgets
+    QtWidgets.QMessageBox.information(None, title, message)
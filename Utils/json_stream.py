@@ -0,0 +1,150 @@
+
+
+# ./Utils/json_stream.py
+
+"""
+Utils/json_stream.py
+
+Lectura incremental de los JSON de datos ({"clients": [...]} /
+{"current_project_id": ..., "projects": [...]}) sin materializar el archivo.
+
+    for key, value in iter_document(path, "projects"):
+        ...   # ("current_project_id", "abc"), ("projects", {...}), ("projects", {...}), ...
+
+Se lee de a bloques y cada valor se decodifica con el escáner en C de json: la memoria queda acotada por el tamaño de bloque más el
+registro más grande, y quien consume puede cortar apenas encuentra lo que busca
+(el resto del archivo no se lee).
+
+Los snapshots binarios (Utils/serialization.py) no admiten lectura parcial: se
+detectan por la cabecera y se cargan completos.
+
+Sólo usa la librería estándar para poder importarse desde Utils.paths.
+"""
+
+import re
+import json
+from typing import Iterator, Tuple
+
+from Utils.serialization import is_binary, read_file
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+_WS = re.compile(r"[ \t\n\r]*")
+_DELIMITERS = frozenset(" \t\n\r,:]}")
+# escáner en C de json (lo que usa raw_decode, sin su envoltorio en Python)
+_SCAN = json.JSONDecoder().scan_once
+
+
+class _Reader:
+    """Buffer de texto sobre un archivo abierto, con decodificación de a un valor."""
+
+    __slots__ = ("f", "chunk_size", "buf", "pos", "eof")
+
+    def __init__(self, f, chunk_size: int):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self) -> bool:
+        data = self.f.read(self.chunk_size)
+        if not data:
+            self.eof = True
+            return False
+        # descartar lo ya consumido: el buffer no crece con el archivo
+        self.buf = self.buf[self.pos:] + data
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Próximo carácter significativo (sin consumirlo); "" al final del archivo."""
+        while True:
+            self.pos = _WS.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str):
+        if self.peek() != char:
+            raise ValueError(f"se esperaba '{char}' en la posición {self.pos}")
+        self.pos += 1
+
+    def value(self):
+        """Decodifica el próximo valor JSON completo (pide más bloques si hace falta)."""
+        self.peek()
+        while True:
+            try:
+                value, end = _SCAN(self.buf, self.pos)
+            except (StopIteration, ValueError):
+                # valor incompleto (sigue en el próximo bloque) o inválido
+                if self._fill():
+                    continue
+                raise ValueError(f"JSON inválido en la posición {self.pos}") from None
+            # un número cortado por el borde del bloque ("1.5" de "1.5e3") decodifica
+            # igual: sólo es válido si lo sigue un delimitador
+            if not self.eof and (end == len(self.buf) or self.buf[end] not in _DELIMITERS) and self._fill():
+                continue
+            self.pos = end
+            return value
+
+
+def iter_document(path: str, array_key: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Tuple[str, object]]:
+    """
+    Recorre el objeto de nivel superior de 'path' en el orden del archivo:
+    genera (clave, valor) por cada miembro y (array_key, elemento) por cada
+    elemento de la lista 'array_key' (si no es una lista se trata como vacía).
+    Lanza OSError/ValueError si el archivo no existe o no es un objeto JSON válido.
+    """
+    if is_binary(path):
+        data = read_file(path)
+        if not isinstance(data, dict):
+            raise ValueError("estructura inválida")
+        for key, value in data.items():
+            if key != array_key:
+                yield key, value
+            elif isinstance(value, list):
+                for item in value:
+                    yield key, item
+        return
+    with open(path, "r", encoding="utf-8") as f:
+        reader = _Reader(f, chunk_size)
+        reader.expect("{")
+        if reader.peek() == "}":
+            return
+        while True:
+            key = reader.value()
+            if not isinstance(key, str):
+                raise ValueError("clave inválida")
+            reader.expect(":")
+            if key == array_key and reader.peek() != "[":
+                reader.value()
+            elif key == array_key:
+                reader.pos += 1
+                if reader.peek() == "]":
+                    reader.pos += 1
+                else:
+                    while True:
+                        yield key, reader.value()
+                        char = reader.peek()
+                        reader.pos += 1
+                        if char == "]":
+                            break
+                        if char != ",":
+                            raise ValueError(f"se esperaba ',' o ']' en la posición {reader.pos - 1}")
+            else:
+                yield key, reader.value()
+            char = reader.peek()
+            reader.pos += 1
+            if char == "}":
+                return
+            if char != ",":
+                raise ValueError(f"se esperaba ',' o '}}' en la posición {reader.pos - 1}")
+
+
+def iter_array(path: str, array_key: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator:
+    """Elementos de la lista 'array_key' del objeto de nivel superior, de a uno."""
+    for key, value in iter_document(path, array_key, chunk_size):
+        if key == array_key:
+            yield value
@@ -2,33 +2,325 @@
 
 # ./Utils/logger.py
 
-import FreeCAD
-from Utils.config import DEV_MODE
+"""
+Utils/logger.py
+
+Logger del workbench: con niveles, no bloqueante y con salida agrupada.
+
+ - log_info / log_error mantienen su firma (module, file, message) y aceptan
+   además argumentos de formato diferido: log_info(m, f, "%d clientes", n)
+   sólo formatea si el nivel está habilitado, y lo hace el hilo de volcado.
+   message también puede ser un callable sin argumentos (se evalúa tarde).
+ - Los registros van a una cola; un hilo en segundo plano los vuelca en lotes
+   a la consola de FreeCAD (una llamada por lote) y al archivo si está activo.
+   Sin FreeCAD cargado (modo headless) la consola es stderr.
+ - Sink a archivo opcional con rotación por tamaño (enable_file_sink).
+ - Buffer circular en memoria con los últimos registros emitidos (get_recent_records).
+ - Los registros por debajo del nivel se descartan al llamar: no se formatean,
+   no entran a la cola ni al buffer circular y no despiertan al hilo.
+
+Nivel por defecto: INFO con DEV_MODE=True, silencioso con DEV_MODE=False.
+Se puede cambiar con el setting Logging/level (DEBUG, INFO, WARNING, ERROR, OFF)
+o con set_level().
+"""
+
+import os
+import sys
+import time
+import atexit
+import datetime
+import threading
+from collections import deque
+from typing import Optional, List, Dict
+
+from Utils.config import DEV_MODE, get_setting, get_freecad
+
+# -----------------------
+# NIVELES
+# -----------------------
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+OFF = 100
+
+_LEVEL_NAMES = {DEBUG: "DEBUG", INFO: "INFO", WARNING: "WARNING", ERROR: "ERROR", OFF: "OFF"}
+_NAME_LEVELS = {v: k for k, v in _LEVEL_NAMES.items()}
+
+# Intervalo máximo entre volcados y tamaño de lote que despierta al hilo antes
+FLUSH_INTERVAL = 0.2
+FLUSH_BATCH = 200
+RING_SIZE = 1000
+
+
+def _initial_level() -> int:
+    name = str(get_setting("Logging", "level", "INFO" if DEV_MODE else "OFF")).strip().upper()
+    return _NAME_LEVELS.get(name, INFO if DEV_MODE else OFF)
+
+
+_level = _initial_level()
+
+# Cola de registros pendientes: (timestamp, level, module, file, message, args)
+_queue = deque()
+_recent = deque(maxlen=RING_SIZE)
+_wake = threading.Event()
+_flush_lock = threading.Lock()
+_flusher: Optional[threading.Thread] = None
+_file_sink = None
+
+# -----------------------
+# SALIDA
+# -----------------------
+
+# Sin FreeCAD (scripts, CLI) todo va a stderr: stdout queda para la salida del script.
 
 def _write(msg: str):
-    FreeCAD.Console.PrintMessage(msg + "\n")
+    freecad = get_freecad()
+    if freecad is None:
+        print(msg, file=sys.stderr)
+    else:
+        freecad.Console.PrintMessage(msg + "\n")
 
 def _write_error(msg: str):
-    FreeCAD.Console.PrintError(msg + "\n")
+    freecad = get_freecad()
+    if freecad is None:
+        print(msg, file=sys.stderr)
+    else:
+        freecad.Console.PrintError(msg + "\n")
 
 
-def log_info(module: str, file: str, message: str):
+class _RotatingFileSink:
     """
-    Log informativo estándar.
+    Archivo de log con rotación por tamaño: path, path.1, ... path.N.
     """
-    if DEV_MODE:
+
+    def __init__(self, path: str, max_bytes: int, backups: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._f = open(path, "a", encoding="utf-8")
+
+    def write_lines(self, lines: List[str]):
+        self._f.write("\n".join(lines) + "\n")
+        self._f.flush()
+        if self._f.tell() >= self.max_bytes:
+            self._rotate()
+
+    def _rotate(self):
+        self._f.close()
+        for i in range(self.backups - 1, 0, -1):
+            src = f"{self.path}.{i}"
+            if os.path.exists(src):
+                os.replace(src, f"{self.path}.{i + 1}")
+        if self.backups > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+        self._f = open(self.path, "a", encoding="utf-8")
+
+    def close(self):
         try:
-            _write(f"[EW]-[{module}/{file}] → {message}")
+            self._f.close()
         except Exception:
-            print(f"[EW]-[{module}/{file}] → {message}")
+            pass
+
+
+def _render(module: str, file: str, message, args) -> str:
+    try:
+        if callable(message):
+            message = message()
+        text = str(message)
+        if args:
+            text = text % args
+    except Exception as e:
+        text = f"{message!r} (error de formato: {e})"
+    return f"[EW]-[{module}/{file}] → {text}"
+
 
+def _emit_console(level: int, text: str):
+    try:
+        if level >= ERROR:
+            _write_error(text)
+        else:
+            _write(text)
+    except Exception:
+        print(text, file=sys.stderr if level >= ERROR else sys.stdout)
 
-def log_error(module: str, file: str, error: str):
+
+def flush():
     """
-    Log de error estándar.
+    Vuelca ya todos los registros pendientes (consola, archivo y buffer circular).
+    Seguro de llamar desde cualquier hilo.
     """
-    if DEV_MODE:
+    with _flush_lock:
+        if not _queue:
+            return
+        batch = []
+        while _queue:
+            try:
+                batch.append(_queue.popleft())
+            except IndexError:
+                break
+
+        # Consola: una llamada por tramo consecutivo de mismo canal (mensaje/error)
+        chunk, chunk_is_error = [], None
+        file_lines = []
+        for ts, level, module, file, message, args in batch:
+            if level < _level:
+                # el nivel subió después de encolarlo: no se formatea ni se guarda
+                continue
+            text = _render(module, file, message, args)
+            stamp = datetime.datetime.fromtimestamp(ts).isoformat(timespec="milliseconds")
+            _recent.append({"time": stamp, "level": _LEVEL_NAMES.get(level, str(level)),
+                            "module": module, "file": file, "message": text})
+
+            is_error = level >= ERROR
+            if chunk and is_error != chunk_is_error:
+                _emit_console(ERROR if chunk_is_error else INFO, "\n".join(chunk))
+                chunk = []
+            chunk.append(text)
+            chunk_is_error = is_error
+
+            if _file_sink is not None:
+                file_lines.append(f"{stamp} {_LEVEL_NAMES.get(level, level):<7} {text}")
+        if chunk:
+            _emit_console(ERROR if chunk_is_error else INFO, "\n".join(chunk))
+
+        if file_lines and _file_sink is not None:
+            try:
+                _file_sink.write_lines(file_lines)
+            except Exception as e:
+                print(f"[EW]-[./Utils/logger.py] → Error escribiendo log a archivo: {e}", file=sys.stderr)
+
+
+def _flusher_loop():
+    while True:
+        _wake.wait(FLUSH_INTERVAL)
+        _wake.clear()
         try:
-            _write_error(f"[EW]-[{module}/{file}] → {error}")
+            flush()
         except Exception:
-            print(f"[EW]-[{module}/{file}] → {error}")
\ No newline at end of file
+            pass
+
+
+def _ensure_flusher() -> bool:
+    global _flusher
+    if _flusher is not None and _flusher.is_alive():
+        return True
+    try:
+        _flusher = threading.Thread(target=_flusher_loop, name="EW-logger", daemon=True)
+        _flusher.start()
+        return True
+    except RuntimeError:
+        # sin hilos disponibles (ej. intérprete cerrándose): volcado síncrono
+        _flusher = None
+        return False
+
+
+def _enqueue(level: int, module: str, file: str, message, args):
+    if level < _level:
+        return
+    _queue.append((time.time(), level, module, file, message, args))
+    if not _ensure_flusher():
+        flush()
+    elif len(_queue) >= FLUSH_BATCH:
+        _wake.set()
+
+
+atexit.register(flush)
+
+# -----------------------
+# API PÚBLICA
+# -----------------------
+
+def log_debug(module: str, file: str, message, *args):
+    """
+    Log de depuración (sólo con nivel DEBUG).
+    """
+    _enqueue(DEBUG, module, file, message, args)
+
+
+def log_info(module: str, file: str, message, *args):
+    """
+    Log informativo estándar.
+    """
+    _enqueue(INFO, module, file, message, args)
+
+
+def log_warning(module: str, file: str, message, *args):
+    """
+    Log de advertencia.
+    """
+    _enqueue(WARNING, module, file, message, args)
+
+
+def log_error(module: str, file: str, error, *args):
+    """
+    Log de error estándar.
+    """
+    _enqueue(ERROR, module, file, error, args)
+
+
+def set_level(level) -> int:
+    """Cambia el nivel mínimo (int o nombre: "DEBUG", "INFO", ...). Retorna el anterior."""
+    global _level
+    previous = _level
+    if isinstance(level, str):
+        level = _NAME_LEVELS.get(level.strip().upper(), _level)
+    _level = int(level)
+    return previous
+
+
+def get_level() -> int:
+    return _level
+
+
+def is_enabled_for(level: int) -> bool:
+    """Permite evitar trabajo costoso en el sitio de llamada si el nivel no se emite."""
+    return level >= _level
+
+
+def enable_file_sink(path: Optional[str] = None, max_bytes: int = 1024 * 1024, backups: int = 3) -> Optional[str]:
+    """
+    Activa el log a archivo con rotación por tamaño.
+    Por defecto: <carpeta de datos>/logs/electrical_workbench.log
+    Retorna la ruta usada o None si no se pudo abrir.
+    """
+    global _file_sink
+    if path is None:
+        from Utils.paths import get_user_db_dir
+        path = os.path.join(get_user_db_dir(), "logs", "electrical_workbench.log")
+    flush()
+    with _flush_lock:
+        if _file_sink is not None:
+            _file_sink.close()
+        try:
+            _file_sink = _RotatingFileSink(path, max_bytes, backups)
+        except Exception as e:
+            _file_sink = None
+            print(f"[EW]-[./Utils/logger.py] → No se pudo abrir {path}: {e}", file=sys.stderr)
+            return None
+    return path
+
+
+def disable_file_sink():
+    """Desactiva el log a archivo (vuelca lo pendiente antes)."""
+    global _file_sink
+    flush()
+    with _flush_lock:
+        if _file_sink is not None:
+            _file_sink.close()
+        _file_sink = None
+
+
+def get_recent_records(limit: Optional[int] = None) -> List[Dict]:
+    """Últimos registros emitidos (más nuevos al final), para diagnóstico. Con nivel OFF queda vacío."""
+    flush()
+    records = list(_recent)
+    return records[-limit:] if limit else records
+
+
+if str(get_setting("Logging", "file", "false")).strip().lower() in ("1", "true", "yes", "si", "sí"):
+    enable_file_sink()
@@ -9,14 +9,28 @@ Rutas y utilidades relacionadas con paths y archivos de configuración/BD local.
 Reglas:
  - En DEV_MODE=True los JSON y datos se guardan dentro del workbench (.data/) para pruebas rápidas.
  - En DEV_MODE=False los JSON se guardan en FreeCAD.getUserAppDataDir()/ElectricalWorkbench/.
- - get_project_path() lee projects.json y devuelve la ruta del proyecto marcado como actual.
+ - No importa FreeCAD (ver Utils.config.get_freecad): se puede usar desde scripts.
+ - get_project_path() lee projects.json en streaming (Utils/json_stream.py) y devuelve la
+   ruta del proyecto marcado como actual, cortando la lectura al encontrarlo.
+ - Las carpetas se crean una sola vez por proceso y las rutas se memorizan;
+   la ruta del proyecto actual se cachea por firma de projects.json (+ journal).
+   Con el vigilante de archivos (Utils/file_watcher.py) la caché se invalida
+   ante cada aviso de cambio y, mientras inotify lo cubra, no se hace stat en
+   cada llamada.
 """
 
 import os
-import json
-import FreeCAD
+import functools
 
-from Utils.config import DEV_MODE
+from Utils.config import DEV_MODE, get_setting, get_user_app_dir as _app_data_dir
+from Utils.db_journal import iter_journaled, file_signature, journal_path
+from Utils.serialization import DEFAULT_FORMAT, write_file
+
+# Caché de get_project_path(): (firma de projects.json + journal, ruta).
+# "watched": archivo suscripto al vigilante; "verified": sin avisos desde la última lectura
+_PROJECT_PATH_CACHE = {"signature": None, "value": None, "watched": None, "verified": False}
+# JSON ya verificados por _ensure_json_exists en este proceso
+_ENSURED_JSON = set()
 
 def get_workbench_path() -> str:
     """
@@ -33,17 +47,20 @@ def get_icon_path(icon_name: str) -> str:
     return os.path.join(get_workbench_path(), "resources", "icons", icon_name)
 
 
+@functools.lru_cache(maxsize=None)
 def get_user_app_dir() -> str:
     """
     Carpeta de datos del usuario facilitada por FreeCAD.
     /home/user/.FreeCAD (según FreeCAD.getUserAppDataDir()) + ElectricalWorkbench
+    Sin FreeCAD cargado: ~/.local/share/FreeCAD + ElectricalWorkbench.
     """
-    base = FreeCAD.getUserAppDataDir()
+    base = _app_data_dir()
     app_dir = os.path.join(base, "ElectricalWorkbench")
     os.makedirs(app_dir, exist_ok=True)
     return app_dir
 
 
+@functools.lru_cache(maxsize=None)
 def get_workbench_data_dir() -> str:
     """
     Carpeta de datos dentro del propio workbench para pruebas (DEV).
@@ -60,13 +77,19 @@ def get_user_db_dir() -> str:
     Devuelve la carpeta donde guardamos los JSON de la 'DB' local.
     - DEV_MODE True: dentro del workbench (.data) para pruebas
     - DEV_MODE False: en FreeCAD user app dir
+    - Variable de entorno EW_DATA_DIR: carpeta explícita (benchmarks, scripts batch)
     """
+    override = os.environ.get("EW_DATA_DIR")
+    if override:
+        os.makedirs(override, exist_ok=True)
+        return override
     if DEV_MODE:
         return get_workbench_data_dir()
     else:
         return get_user_app_dir()
 
 
+@functools.lru_cache(maxsize=None)
 def get_clients_db_path(filename: str = "clients.json") -> str:
     """
     Ruta completa al archivo clients.json en la carpeta de datos del usuario/workbench.
@@ -74,6 +97,7 @@ def get_clients_db_path(filename: str = "clients.json") -> str:
     return os.path.join(get_user_db_dir(), filename)
 
 
+@functools.lru_cache(maxsize=None)
 def get_projects_db_path(filename: str = "projects.json") -> str:
     """
     Ruta completa al archivo projects.json en la carpeta de datos del usuario/workbench.
@@ -81,6 +105,20 @@ def get_projects_db_path(filename: str = "projects.json") -> str:
     return os.path.join(get_user_db_dir(), filename)
 
 
+def get_sqlite_db_path(filename: str = "electrical.db") -> str:
+    """
+    Ruta completa a la base SQLite (backend alternativo de DBManager).
+    """
+    return os.path.join(get_user_db_dir(), filename)
+
+
+def get_commands_manifest_path(filename: str = "commands_manifest.json") -> str:
+    """
+    Ruta al manifiesto cacheado de comandos (ver Commands/__init__.py).
+    """
+    return os.path.join(get_user_db_dir(), filename)
+
+
 def get_config_path(file_name: str = "config.json") -> str:
     """
     Ruta general de configuración (compatibilidad con implementaciones previas).
@@ -89,17 +127,72 @@ def get_config_path(file_name: str = "config.json") -> str:
     return os.path.join(user_data_path, file_name)
 
 
-def _ensure_json_exists(path: str, fallback: dict):
+def _ensure_json_exists(path: str, fallback: dict, fmt: str | None = None):
     """
-    Helper interno: si el JSON no existe lo crea con 'fallback'.
+    Helper interno: si el archivo de datos no existe lo crea con 'fallback'.
+    fmt: formato de Utils/serialization.py (None -> setting Database/format).
     No lanza excepción si falla: quien llame debe manejar el fallo si es crítico.
     """
+    if path in _ENSURED_JSON:
+        return
     if not os.path.exists(path):
         try:
-            with open(path, "w", encoding="utf-8") as f:
-                json.dump(fallback, f, indent=4, ensure_ascii=False)
+            write_file(path, fallback, fmt or get_setting("Database", "format", DEFAULT_FORMAT))
         except Exception:
-            pass
+            return
+    _ENSURED_JSON.add(path)
+
+
+def clear_path_cache():
+    """
+    Descarta las rutas memorizadas y la caché del proyecto actual
+    (útil si cambian carpetas de datos en tiempo de ejecución, p. ej. en benchmarks).
+    """
+    for func in (get_user_app_dir, get_workbench_data_dir, get_clients_db_path, get_projects_db_path):
+        func.cache_clear()
+    _ENSURED_JSON.clear()
+    invalidate_project_path_cache()
+    _unwatch_projects_file()
+
+
+def invalidate_project_path_cache():
+    """Fuerza que el próximo get_project_path() vuelva a leer projects.json."""
+    _PROJECT_PATH_CACHE["verified"] = False
+    _PROJECT_PATH_CACHE["signature"] = None
+    _PROJECT_PATH_CACHE["value"] = None
+
+
+def _on_projects_file_event(path: str, event: str):
+    """Aviso del vigilante de archivos: projects.json o su journal cambió."""
+    _PROJECT_PATH_CACHE["verified"] = False
+    if event == "unwatched" and _PROJECT_PATH_CACHE["watched"] is not None:
+        # vigilante detenido o carpeta borrada: volver a suscribirse en la próxima llamada
+        _unwatch_projects_file()
+
+
+def _watch_projects_file(projects_file: str) -> bool:
+    """
+    Suscribe projects.json (+ journal) al vigilante la primera vez.
+    Retorna True si sus cambios se avisan al instante (inotify).
+    """
+    cache = _PROJECT_PATH_CACHE
+    if cache["watched"] is None:
+        from Utils.file_watcher import get_watcher
+        watcher = get_watcher()
+        if watcher is None:
+            cache["watched"] = (projects_file, None, None)
+        else:
+            token = watcher.subscribe([projects_file, journal_path(projects_file)], _on_projects_file_event)
+            cache["watched"] = (projects_file, watcher, token)
+    _, watcher, _ = cache["watched"]
+    return watcher is not None and watcher.is_precise(projects_file)
+
+
+def _unwatch_projects_file():
+    watched = _PROJECT_PATH_CACHE["watched"]
+    _PROJECT_PATH_CACHE["watched"] = None
+    if watched is not None and watched[1] is not None:
+        watched[1].unsubscribe(watched[2])
 
 
 def get_project_path() -> str | None:
@@ -107,24 +200,56 @@ def get_project_path() -> str | None:
     Devuelve la ruta del proyecto actualmente marcado como 'current' en projects.json.
 
     Flujo:
-      - Lee projects.json (si no existe, devuelve None)
+      - Lee projects.json (si no existe, devuelve None) y aplica su journal si lo hay
       - Si existe 'current_project_id', busca el proyecto y devuelve su 'path'
       - Si no hay current_project_id, devuelve None
+    El resultado se cachea hasta que cambie projects.json (o su journal) o
+    se llame a invalidate_project_path_cache() (DBManager.set_current_project lo hace).
+    Con inotify un acierto no toca el disco: el vigilante avisa los cambios.
     """
+    cache = _PROJECT_PATH_CACHE
+    if cache["verified"] and cache["signature"] is not None:
+        return cache["value"]
+
     projects_file = get_projects_db_path()
-    _ensure_json_exists(projects_file, {"projects": [], "current_project_id": None})
+    _ensure_json_exists(projects_file, {"current_project_id": None, "projects": []})
 
+    # marcar antes del stat: un aviso posterior vuelve a forzar la revalidación
+    cache["verified"] = _watch_projects_file(projects_file)
+    signature = (file_signature(projects_file), file_signature(journal_path(projects_file)))
+    if signature[0] is not None and signature == cache["signature"]:
+        return cache["value"]
+
+    value = _read_project_path(projects_file)
+    cache["signature"] = signature if signature[0] is not None else None
+    cache["value"] = value
+    return value
+
+
+def _read_project_path(projects_file: str) -> str | None:
+    """
+    Lectura sin caché de la ruta del proyecto current, en streaming y con el
+    journal aplicado (el current_project_id puede estar sólo en el journal).
+    DBManager escribe current_project_id antes de la lista: la lectura se corta
+    en el proyecto buscado. En archivos con la lista primero se recuerda sólo
+    id -> path hasta llegar al current_project_id.
+    """
+    paths = {}
+    current_id = None
+    seen_current = False
     try:
-        with open(projects_file, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        for key, value in iter_journaled(projects_file, "projects"):
+            if key == "current_project_id":
+                current_id, seen_current = value, True
+                if not current_id:
+                    return None
+                if current_id in paths:
+                    return paths[current_id]
+            elif key == "projects" and isinstance(value, dict):
+                if not seen_current:
+                    paths.setdefault(value.get("id"), value.get("path"))
+                elif value.get("id") == current_id:
+                    return value.get("path")
     except Exception:
         return None
-
-    current_id = data.get("current_project_id")
-    if not current_id:
-        return None
-
-    for proj in data.get("projects", []):
-        if proj.get("id") == current_id:
-            return proj.get("path")
     return None
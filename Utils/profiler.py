@@ -0,0 +1,197 @@
+
+
+# ./Utils/profiler.py
+
+"""
+Utils/profiler.py
+
+Instrumentación de arranque y carga de comandos.
+
+Se activa con la variable de entorno EW_PROFILE=1 o con el setting
+Diagnostics/profile = true. Con EW_PROFILE_MEMORY=1 (o Diagnostics/profile_memory)
+además registra deltas de memoria con tracemalloc (más costoso).
+
+Uso:
+    from Utils.profiler import profile
+    with profile("import Commands.Foo.Bar_Command", "import"):
+        ...
+
+Los tiempos usan time.perf_counter_ns (monotónico, alta resolución).
+El reporte se obtiene con get_report() (dict), dump_report() (JSON a disco)
+o format_report() (texto), y se puede ver desde el comando EW_StartupProfile.
+Desactivado, profile() no mide nada y su costo es despreciable.
+"""
+
+import os
+import json
+import time
+import functools
+import tracemalloc
+from contextlib import contextmanager
+from typing import Optional, Dict, List
+
+from Utils.config import get_setting
+
+_TRUE = ("1", "true", "yes", "si", "sí")
+
+
+def _flag(env_name: str, setting_key: str) -> bool:
+    value = os.environ.get(env_name)
+    if value is None:
+        value = get_setting("Diagnostics", setting_key, "false")
+    return str(value).strip().lower() in _TRUE
+
+
+ENABLED = _flag("EW_PROFILE", "profile")
+TRACE_MEMORY = ENABLED and _flag("EW_PROFILE_MEMORY", "profile_memory")
+
+# Origen de tiempos: importación de este módulo (primer import del workbench)
+_T0 = time.perf_counter_ns()
+_SPANS: List[Dict] = []
+_STACK: List[str] = []
+# Pico de memoria (bytes) de cada span abierto, en paralelo a _STACK: tracemalloc
+# tiene un solo pico global, así que cada span lo guarda en su padre antes de
+# reiniciarlo y al cerrar le pasa el suyo.
+_PEAKS: List[int] = []
+
+if TRACE_MEMORY and not tracemalloc.is_tracing():
+    tracemalloc.start()
+
+
+@contextmanager
+def _measure(name: str, category: str):
+    parent = _STACK[-1] if _STACK else None
+    _STACK.append(name)
+    mem_before = None
+    if TRACE_MEMORY:
+        mem_before, peak = tracemalloc.get_traced_memory()
+        if _PEAKS:
+            _PEAKS[-1] = max(_PEAKS[-1], peak)
+        tracemalloc.reset_peak()
+        _PEAKS.append(mem_before)
+    start = time.perf_counter_ns()
+    try:
+        yield
+    finally:
+        end = time.perf_counter_ns()
+        _STACK.pop()
+        span = {
+            "name": name,
+            "category": category,
+            "parent": parent,
+            "depth": len(_STACK),
+            "start_ms": (start - _T0) / 1e6,
+            "duration_ms": (end - start) / 1e6,
+        }
+        if mem_before is not None:
+            current, peak = tracemalloc.get_traced_memory()
+            peak = max(peak, _PEAKS.pop())
+            if _PEAKS:
+                _PEAKS[-1] = max(_PEAKS[-1], peak)
+            span["mem_delta_kb"] = (current - mem_before) / 1024
+            span["mem_peak_kb"] = (peak - mem_before) / 1024
+        _SPANS.append(span)
+
+
+@contextmanager
+def _noop():
+    yield
+
+
+def profiled(name: str, category: str = "general"):
+    """
+    Decorador equivalente a envolver la función con profile(name, category).
+    Desactivado, retorna la función original sin envoltorio.
+    """
+    def decorator(func):
+        if not ENABLED:
+            return func
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with _measure(name, category):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def profile(name: str, category: str = "general"):
+    """
+    Context manager que mide el bloque y lo agrega al reporte.
+    category agrupa spans en el resumen (ej. "startup", "import", "addCommand").
+    """
+    if not ENABLED:
+        return _noop()
+    return _measure(name, category)
+
+
+def reset():
+    """Vacía los spans registrados (útil para medir una recarga)."""
+    _SPANS.clear()
+
+
+def get_report() -> Dict:
+    """
+    Reporte estructurado:
+      { "enabled", "trace_memory", "elapsed_ms", "spans": [...],
+        "by_category": { cat: {"count", "total_ms", "max_ms"} } }
+    """
+    by_category: Dict[str, Dict] = {}
+    for s in _SPANS:
+        agg = by_category.setdefault(s["category"], {"count": 0, "total_ms": 0.0, "max_ms": 0.0})
+        agg["count"] += 1
+        agg["total_ms"] += s["duration_ms"]
+        agg["max_ms"] = max(agg["max_ms"], s["duration_ms"])
+    return {
+        "enabled": ENABLED,
+        "trace_memory": TRACE_MEMORY,
+        "elapsed_ms": (time.perf_counter_ns() - _T0) / 1e6,
+        "spans": sorted(_SPANS, key=lambda s: s["start_ms"]),
+        "by_category": by_category,
+    }
+
+
+def dump_report(path: Optional[str] = None) -> Optional[str]:
+    """
+    Guarda el reporte como JSON (por defecto startup_profile.json en la carpeta de datos).
+    Retorna la ruta escrita o None si falló.
+    """
+    if path is None:
+        from Utils.paths import get_user_db_dir
+        path = os.path.join(get_user_db_dir(), "startup_profile.json")
+    tmp = path + ".tmp"
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(get_report(), f, indent=4, ensure_ascii=False)
+        os.replace(tmp, path)
+        return path
+    except Exception:
+        return None
+
+
+def format_report(top: int = 15) -> str:
+    """Resumen en texto: totales por categoría y los spans más lentos."""
+    report = get_report()
+    if not report["enabled"]:
+        return "Profiling desactivado (EW_PROFILE=1 o setting Diagnostics/profile=true)."
+
+    lines = [f"Tiempo desde la carga: {report['elapsed_ms']:.1f} ms", "", "Por categoría:"]
+    for cat, agg in sorted(report["by_category"].items(), key=lambda kv: -kv[1]["total_ms"]):
+        lines.append(f"  {cat:<12} {agg['count']:>4} x  total {agg['total_ms']:9.2f} ms  máx {agg['max_ms']:8.2f} ms")
+
+    lines += ["", f"Top {top} más lentos:"]
+    for s in sorted(report["spans"], key=lambda s: -s["duration_ms"])[:top]:
+        mem = f"  Δmem {s['mem_delta_kb']:.0f} KB" if "mem_delta_kb" in s else ""
+        lines.append(f"  {s['duration_ms']:9.2f} ms  [{s['category']}] {s['name']}{mem}")
+    return "\n".join(lines)
+
+
+__all__ = [
+    "ENABLED",
+    "profile",
+    "profiled",
+    "reset",
+    "get_report",
+    "dump_report",
+    "format_report",
+]
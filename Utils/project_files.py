@@ -0,0 +1,281 @@
+
+
+# ./Utils/project_files.py
+
+"""
+Utils/project_files.py
+
+Índice de archivos de las carpetas de proyecto (el campo 'path' de cada
+proyecto): si la carpeta existe, cuánto ocupa, qué documentos .FCStd
+contiene y cuándo se modificó por última vez.
+
+    index = ProjectFileIndex()
+    index.scan(db)                  # recorre las carpetas (en paralelo) y persiste
+    index.missing()                 # proyectos cuya carpeta no existe
+    index.largest(10)               # proyectos más pesados
+    index.documents(project_id)     # .FCStd del proyecto (rutas relativas)
+
+Las consultas usan sólo el índice persistido: no vuelven a tocar el disco.
+
+Escaneo:
+ - Un pool acotado de hilos (workers) recorre un proyecto por tarea con
+   os.scandir, sin seguir enlaces simbólicos. Es trabajo de E/S: en un NAS
+   varias carpetas en vuelo ocultan la latencia de cada listado.
+ - Incremental: de cada subcarpeta se guarda su mtime. En un nuevo escaneo,
+   una carpeta con el mismo mtime reutiliza lo guardado (sin listarla) y sólo
+   se revisan (stat) sus subcarpetas. El mtime de una carpeta cambia al crear,
+   borrar o renombrar entradas en ella, no al reescribir un archivo in situ:
+   FreeCAD guarda con archivo temporal + renombrado, así que los .FCStd
+   guardados se detectan; para otros cambios in situ usar scan(full=True).
+
+El índice se guarda en <carpeta de datos>/project_files.index (JSON compacto,
+ver Utils/serialization.py) con escritura atómica.
+"""
+
+import os
+import time
+import heapq
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from Utils.logger import log_info, log_error
+from Utils.paths import get_user_db_dir
+from Utils.serialization import dumps, read_file
+
+INDEX_VERSION = 1
+DEFAULT_WORKERS = 8
+DOCUMENT_SUFFIX = ".fcstd"
+
+
+def get_project_files_index_path(filename: str = "project_files.index") -> str:
+    """Ruta del índice de archivos de proyecto en la carpeta de datos."""
+    return os.path.join(get_user_db_dir(), filename)
+
+
+def _missing(path: str, error: str) -> Dict:
+    return {"path": path, "exists": False, "error": error, "size": 0, "files": 0, "documents": [],
+            "last_modified": None, "scanned_at": time.time(), "dirs": {}}
+
+
+def _list_dir(full_path: str, mtime_ns: int) -> Dict:
+    """Lista una carpeta (sólo su nivel): totales de archivos, .FCStd y subcarpetas."""
+    size = files = 0
+    last_modified = 0.0
+    documents, subdirs = [], []
+    with os.scandir(full_path) as entries:
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.name)
+                elif entry.is_file(follow_symlinks=False):
+                    st = entry.stat(follow_symlinks=False)
+                    size += st.st_size
+                    files += 1
+                    if st.st_mtime > last_modified:
+                        last_modified = st.st_mtime
+                    if entry.name.lower().endswith(DOCUMENT_SUFFIX):
+                        documents.append(entry.name)
+            except OSError:
+                continue  # entrada borrada durante el listado o sin permisos
+    return {"mtime": mtime_ns, "size": size, "files": files, "last_modified": last_modified,
+            "documents": sorted(documents), "subdirs": sorted(subdirs)}
+
+
+def _scan_project(path: str, previous: Optional[Dict], full: bool) -> Tuple[Dict, int, int]:
+    """
+    Recorre la carpeta 'path' reutilizando las subcarpetas sin cambios de
+    'previous' (mismo path). Retorna (entrada del índice, carpetas listadas, reutilizadas).
+    """
+    if not path:
+        return _missing(path, "sin carpeta asignada"), 0, 0
+    try:
+        if not os.path.isdir(path):
+            return _missing(path, "no existe" if not os.path.exists(path) else "no es una carpeta"), 0, 0
+    except OSError as e:
+        return _missing(path, str(e)), 0, 0
+
+    old_dirs = {} if full or not previous or previous.get("path") != path else previous.get("dirs", {})
+    dirs: Dict[str, Dict] = {}
+    listed = reused = 0
+    errors = []
+    stack = [""]
+    while stack:
+        rel = stack.pop()
+        full_path = os.path.join(path, rel) if rel else path
+        try:
+            # la raíz puede ser un enlace (p. ej. a un NAS): su mtime es el de la carpeta real
+            mtime_ns = os.stat(full_path).st_mtime_ns
+            cached = old_dirs.get(rel)
+            if cached is not None and cached.get("mtime") == mtime_ns:
+                node = cached
+                reused += 1
+            else:
+                node = _list_dir(full_path, mtime_ns)
+                listed += 1
+        except OSError as e:
+            errors.append(f"{rel or '.'}: {e.strerror or e}")
+            continue
+        dirs[rel] = node
+        stack.extend(os.path.join(rel, name) if rel else name for name in node["subdirs"])
+
+    documents = [os.path.join(rel, name) if rel else name for rel, node in dirs.items() for name in node["documents"]]
+    entry = {
+        "path": path,
+        "exists": True,
+        "error": "; ".join(errors[:5]) if errors else None,
+        "size": sum(node["size"] for node in dirs.values()),
+        "files": sum(node["files"] for node in dirs.values()),
+        "documents": sorted(documents),
+        "last_modified": max((node["last_modified"] for node in dirs.values()), default=0.0) or None,
+        "scanned_at": time.time(),
+        "dirs": dirs,
+    }
+    return entry, listed, reused
+
+
+class ProjectFileIndex:
+    """
+    Índice persistido de las carpetas de proyecto: project_id -> entrada
+    {"path", "exists", "error", "size", "files", "documents", "last_modified",
+     "scanned_at", "dirs"}. Fechas en segundos desde epoch.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or get_project_files_index_path()
+        self.projects: Dict[str, Dict] = {}
+        self.scanned_at: Optional[float] = None
+        self.load()
+
+    # -------------------------
+    # PERSISTENCIA
+    # -------------------------
+    def load(self) -> bool:
+        """Lee el índice guardado (si no existe o es de otra versión, queda vacío)."""
+        try:
+            state = read_file(self.path)
+        except (OSError, ValueError):
+            return False
+        if not isinstance(state, dict) or state.get("version") != INDEX_VERSION:
+            return False
+        self.projects = state.get("projects", {})
+        self.scanned_at = state.get("scanned_at")
+        return True
+
+    def save(self) -> bool:
+        """Guarda el índice de forma atómica (tmp + os.replace)."""
+        tmp = self.path + ".tmp"
+        state = {"version": INDEX_VERSION, "scanned_at": self.scanned_at, "projects": self.projects}
+        try:
+            with open(tmp, "wb") as f:
+                f.write(dumps(state, "json"))
+            os.replace(tmp, self.path)
+            return True
+        except Exception as e:
+            log_error("./Utils", "project_files.py", f"No se pudo guardar {self.path}: {e}")
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            return False
+
+    # -------------------------
+    # ESCANEO
+    # -------------------------
+    def scan(self, db=None, project_ids: Optional[Iterable[str]] = None, full: bool = False,
+             workers: int = DEFAULT_WORKERS,
+             progress: Optional[Callable[[int, int], None]] = None) -> Dict:
+        """
+        Escanea las carpetas de los proyectos de DBManager (db=None -> get_db_manager()).
+        project_ids: sólo esos proyectos (los demás conservan su entrada).
+        full: ignora lo guardado y lista todas las carpetas.
+        workers: hilos en paralelo. progress(hechos, total) tras cada proyecto.
+        Los proyectos que ya no están en la base salen del índice. Persiste al
+        terminar y retorna estadísticas:
+          {"projects", "missing", "errors", "listed_dirs", "reused_dirs", "seconds"}
+        """
+        if db is None:
+            from Utils.db_manager import get_db_manager
+            db = get_db_manager()
+        start = time.perf_counter()
+        paths = {p.get("id"): p.get("path") or "" for p in db.load_projects() if p.get("id")}
+        wanted = set(project_ids) & paths.keys() if project_ids is not None else set(paths)
+
+        # proyectos eliminados de la base: fuera del índice
+        for project_id in [pid for pid in self.projects if pid not in paths]:
+            del self.projects[project_id]
+
+        stats = {"projects": len(wanted), "missing": 0, "errors": 0, "listed_dirs": 0, "reused_dirs": 0}
+        done = 0
+        with ThreadPoolExecutor(max_workers=max(1, int(workers)), thread_name_prefix="EW-scan") as pool:
+            futures = {
+                pool.submit(_scan_project, paths[pid], self.projects.get(pid), full): pid
+                for pid in sorted(wanted)
+            }
+            for future in as_completed(futures):
+                project_id = futures[future]
+                try:
+                    entry, listed, reused = future.result()
+                except Exception as e:
+                    entry, listed, reused = _missing(paths[project_id], f"error de escaneo: {e}"), 0, 0
+                self.projects[project_id] = entry
+                stats["listed_dirs"] += listed
+                stats["reused_dirs"] += reused
+                stats["missing"] += not entry["exists"]
+                stats["errors"] += bool(entry["exists"] and entry["error"])
+                done += 1
+                if progress is not None:
+                    progress(done, len(wanted))
+
+        self.scanned_at = time.time()
+        self.save()
+        stats["seconds"] = round(time.perf_counter() - start, 3)
+        log_info("./Utils", "project_files.py",
+                 f"Escaneo de carpetas: {stats['projects']} proyectos, {stats['listed_dirs']} carpetas listadas, "
+                 f"{stats['reused_dirs']} sin cambios, {stats['missing']} faltantes ({stats['seconds']} s)")
+        return stats
+
+    # -------------------------
+    # CONSULTAS (sin tocar el disco)
+    # -------------------------
+    @staticmethod
+    def _summary(project_id: str, entry: Dict) -> Dict:
+        """Entrada sin el detalle por carpeta."""
+        summary = {k: v for k, v in entry.items() if k != "dirs"}
+        summary["project_id"] = project_id
+        return summary
+
+    def get(self, project_id: str) -> Optional[Dict]:
+        """Resumen indexado de un proyecto (sin el detalle por carpeta) o None."""
+        entry = self.projects.get(project_id)
+        return self._summary(project_id, entry) if entry else None
+
+    def missing(self) -> List[Dict]:
+        """Proyectos sin carpeta asignada o cuya carpeta no existe."""
+        return [self._summary(pid, e) for pid, e in self.projects.items() if not e.get("exists")]
+
+    def largest(self, limit: int = 10) -> List[Dict]:
+        """Proyectos con más bytes, de mayor a menor."""
+        top = heapq.nlargest(limit, self.projects.items(), key=lambda item: item[1].get("size", 0))
+        return [self._summary(pid, e) for pid, e in top]
+
+    def recently_modified(self, limit: int = 10) -> List[Dict]:
+        """Proyectos con archivos modificados más recientemente."""
+        top = heapq.nlargest(limit, ((pid, e) for pid, e in self.projects.items() if e.get("last_modified")),
+                             key=lambda item: item[1]["last_modified"])
+        return [self._summary(pid, e) for pid, e in top]
+
+    def documents(self, project_id: str) -> List[str]:
+        """Documentos .FCStd del proyecto (rutas relativas a su carpeta)."""
+        return list(self.projects.get(project_id, {}).get("documents", []))
+
+    def totals(self) -> Dict:
+        """Totales del índice: proyectos, faltantes, bytes, archivos y documentos."""
+        entries = self.projects.values()
+        return {
+            "projects": len(self.projects),
+            "missing": sum(1 for e in entries if not e.get("exists")),
+            "size": sum(e.get("size", 0) for e in entries),
+            "files": sum(e.get("files", 0) for e in entries),
+            "documents": sum(len(e.get("documents", [])) for e in entries),
+            "scanned_at": self.scanned_at,
+        }
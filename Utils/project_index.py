@@ -0,0 +1,339 @@
+
+
+# ./Utils/project_index.py
+
+"""
+Utils/project_index.py
+
+Índices secundarios de proyectos para consultas filtradas, ordenadas y paginadas.
+
+ - Índices hash por status, client_id, type e is_macro: valor -> {id: proyecto}.
+ - Índices ordenados por created_at y updated_at: lista de (valor, id) ordenada,
+   mantenida con bisect. Paginar sobre el orden cuesta O(offset + limit) o,
+   sin filtros, sólo O(limit) (slicing directo).
+ - Con filtros selectivos los candidatos salen de intersecar los índices hash
+   (conjuntos en C) y se ordenan con heapq sólo los offset + limit primeros.
+ - Agregados por cliente (ClientStats): cantidad por status, cantidad de macros
+   y último updated_at, actualizados en cada add/remove. El índice por
+   client_id hace de índice inverso cliente -> proyectos.
+
+Los registros indexados son las referencias internas de DBManager; para
+reindexar un proyecto modificado: remove(proyecto) ANTES de modificarlo y
+add(proyecto) después (remove usa los valores con los que fue indexado).
+"""
+
+import heapq
+import bisect
+from typing import Dict, List, Optional, Iterable, Tuple
+
+INDEXED_FIELDS = ("status", "client_id", "type", "is_macro")
+SORTED_FIELDS = ("created_at", "updated_at")
+
+# Si los candidatos filtrados son menos que esta fracción del índice ordenado,
+# se ordenan directamente (heap) en lugar de recorrer el índice
+HEAP_FRACTION = 0.125
+
+_MULTI = (list, tuple, set, frozenset)
+
+
+def _hash_key(field: str, value):
+    if field == "is_macro":
+        return bool(value)
+    return "" if value is None else value
+
+
+def _sort_key(value) -> str:
+    return "" if value is None else str(value)
+
+
+class ClientStats:
+    """
+    Agregados de los proyectos de un cliente. 'latest' se recalcula (sólo sobre
+    los proyectos de ese cliente) si se quitó el proyecto que lo definía.
+    """
+
+    __slots__ = ("count", "by_status", "macro", "latest", "latest_stale")
+
+    def __init__(self):
+        self.count = 0
+        self.by_status: Dict[str, int] = {}
+        self.macro = 0
+        self.latest = ""
+        self.latest_stale = False
+
+    def add(self, project: Dict):
+        self.count += 1
+        status = _hash_key("status", project.get("status"))
+        self.by_status[status] = self.by_status.get(status, 0) + 1
+        if project.get("is_macro"):
+            self.macro += 1
+        updated = _sort_key(project.get("updated_at"))
+        if not self.latest_stale and updated > self.latest:
+            self.latest = updated
+
+    def remove(self, project: Dict):
+        self.count -= 1
+        status = _hash_key("status", project.get("status"))
+        left = self.by_status.get(status, 0) - 1
+        if left > 0:
+            self.by_status[status] = left
+        else:
+            self.by_status.pop(status, None)
+        if project.get("is_macro"):
+            self.macro -= 1
+        if _sort_key(project.get("updated_at")) == self.latest:
+            self.latest_stale = True
+
+
+def parse_order(order_by: Optional[str]) -> Tuple[Optional[str], bool]:
+    """'updated_at' -> ('updated_at', False); '-updated_at' -> ('updated_at', True)."""
+    if not order_by:
+        return None, False
+    if order_by.startswith("-"):
+        return order_by[1:], True
+    return order_by, False
+
+
+class ProjectIndex:
+    """
+    Índices secundarios sobre un conjunto de proyectos (por id).
+    """
+
+    def __init__(self):
+        self.records: Dict[str, Dict] = {}
+        self.by_field: Dict[str, Dict[object, Dict[str, Dict]]] = {f: {} for f in INDEXED_FIELDS}
+        self.ordered: Dict[str, List[Tuple[str, str]]] = {f: [] for f in SORTED_FIELDS}
+        self.client_stats: Dict[str, ClientStats] = {}
+
+    def __len__(self):
+        return len(self.records)
+
+    # -------------------------
+    # MANTENIMIENTO
+    # -------------------------
+    def add(self, project: Dict):
+        pid = project.get("id")
+        if not pid or pid in self.records:
+            return
+        self.records[pid] = project
+        for field in INDEXED_FIELDS:
+            self.by_field[field].setdefault(_hash_key(field, project.get(field)), {})[pid] = project
+        for field in SORTED_FIELDS:
+            bisect.insort(self.ordered[field], (_sort_key(project.get(field)), pid))
+        self._stats_for(project).add(project)
+
+    def remove(self, project: Dict):
+        pid = project.get("id")
+        if not pid or self.records.get(pid) is not project:
+            return
+        del self.records[pid]
+        for field in INDEXED_FIELDS:
+            key = _hash_key(field, project.get(field))
+            bucket = self.by_field[field].get(key)
+            if bucket is not None:
+                bucket.pop(pid, None)
+                if not bucket:
+                    del self.by_field[field][key]
+        for field in SORTED_FIELDS:
+            entries = self.ordered[field]
+            item = (_sort_key(project.get(field)), pid)
+            i = bisect.bisect_left(entries, item)
+            if i < len(entries) and entries[i] == item:
+                del entries[i]
+        client_id = _hash_key("client_id", project.get("client_id"))
+        stats = self.client_stats.get(client_id)
+        if stats is not None:
+            stats.remove(project)
+            if stats.count <= 0:
+                del self.client_stats[client_id]
+
+    @classmethod
+    def build(cls, projects: Iterable[Dict]) -> "ProjectIndex":
+        """Construcción completa (ordena una sola vez al final)."""
+        index = cls()
+        for project in projects:
+            pid = project.get("id")
+            if not pid or pid in index.records:
+                continue
+            index.records[pid] = project
+            for field in INDEXED_FIELDS:
+                index.by_field[field].setdefault(_hash_key(field, project.get(field)), {})[pid] = project
+            index._stats_for(project).add(project)
+        for field in SORTED_FIELDS:
+            index.ordered[field] = sorted((_sort_key(p.get(field)), pid) for pid, p in index.records.items())
+        return index
+
+    def _stats_for(self, project: Dict) -> ClientStats:
+        client_id = _hash_key("client_id", project.get("client_id"))
+        stats = self.client_stats.get(client_id)
+        if stats is None:
+            stats = self.client_stats[client_id] = ClientStats()
+        return stats
+
+    # -------------------------
+    # AGREGADOS POR CLIENTE
+    # -------------------------
+    def client_summary(self, client_id) -> Dict:
+        """
+        {"client_id", "projects", "by_status": {status: n}, "macro", "last_updated"}
+        de los proyectos del cliente (ceros si no tiene proyectos).
+        """
+        key = _hash_key("client_id", client_id)
+        stats = self.client_stats.get(key)
+        if stats is None:
+            return {"client_id": client_id, "projects": 0, "by_status": {}, "macro": 0, "last_updated": None}
+        if stats.latest_stale:
+            bucket = self.by_field["client_id"].get(key, {})
+            stats.latest = max((_sort_key(p.get("updated_at")) for p in bucket.values()), default="")
+            stats.latest_stale = False
+        return {
+            "client_id": client_id,
+            "projects": stats.count,
+            "by_status": dict(stats.by_status),
+            "macro": stats.macro,
+            "last_updated": stats.latest or None,
+        }
+
+    def client_ids(self) -> List:
+        """client_id con al menos un proyecto ("" agrupa los proyectos sin cliente)."""
+        return list(self.client_stats)
+
+    # -------------------------
+    # CONSULTA
+    # -------------------------
+    def values(self, field: str) -> Dict[object, int]:
+        """Valores distintos de un campo indexado y cantidad de proyectos de cada uno."""
+        return {value: len(bucket) for value, bucket in self.by_field[field].items()}
+
+    def _buckets(self, field: str, values) -> List[Dict[str, Dict]]:
+        buckets = [self.by_field[field].get(_hash_key(field, v)) for v in values]
+        return [b for b in buckets if b]
+
+    def _candidates(self, filters: Optional[Dict]):
+        """
+        (ids candidatos o None = todos, filtros residuales sobre campos no indexados).
+        Con un único filtro de un valor se retorna la vista del índice, sin copiar.
+        """
+        sets = []
+        residual = []
+        for field, value in (filters or {}).items():
+            values = value if isinstance(value, _MULTI) else (value,)
+            if field in self.by_field:
+                buckets = self._buckets(field, values)
+                if len(buckets) == 1:
+                    sets.append(buckets[0].keys())
+                else:
+                    ids = set()
+                    for b in buckets:
+                        ids.update(b)
+                    sets.append(ids)
+            else:
+                residual.append((field, values))
+        if not sets:
+            return None, residual
+        if len(sets) == 1:
+            return sets[0], residual
+        sets.sort(key=len)
+        candidates = sets[0] & sets[1]
+        for s in sets[2:]:
+            if not candidates:
+                break
+            candidates &= s
+        return candidates, residual
+
+    @staticmethod
+    def _matches(project: Dict, residual) -> bool:
+        return all(project.get(field) in values for field, values in residual)
+
+    def count(self, filters: Optional[Dict] = None) -> int:
+        if filters and len(filters) == 1:
+            # un solo campo indexado: suma de tamaños de los buckets (disjuntos)
+            (field, value), = filters.items()
+            if field in self.by_field:
+                values = set(_hash_key(field, v) for v in (value if isinstance(value, _MULTI) else (value,)))
+                return sum(len(self.by_field[field].get(v, ())) for v in values)
+        candidates, residual = self._candidates(filters)
+        if candidates is None:
+            candidates = self.records
+        if not residual:
+            return len(candidates)
+        return sum(1 for pid in candidates if self._matches(self.records[pid], residual))
+
+    def query(self, filters: Optional[Dict] = None, order_by: Optional[str] = None,
+              limit: Optional[int] = None, offset: int = 0,
+              natural: Optional[Iterable[Dict]] = None) -> List[Dict]:
+        """
+        Proyectos (referencias) que cumplen 'filters', ordenados y paginados.
+          filters: {campo: valor} o {campo: [valores]} (IN). Campos no indexados se
+                   evalúan sobre los candidatos.
+          order_by: "campo" ascendente o "-campo" descendente. created_at/updated_at
+                    usan el índice ordenado; otros campos ordenan los candidatos.
+                    None: orden de 'natural' (orden de alta del archivo).
+          limit/offset: paginación.
+        Empates ordenados por id.
+        """
+        offset = max(0, offset or 0)
+        if limit is not None and limit <= 0:
+            return []
+        stop = None if limit is None else offset + limit
+        candidates, residual = self._candidates(filters)
+        if candidates is not None and not candidates:
+            return []
+        field, descending = parse_order(order_by)
+
+        def accept(project):
+            return not residual or self._matches(project, residual)
+
+        if field is None:
+            source = natural if natural is not None else self.records.values()
+            out = []
+            for p in source:
+                if (candidates is None or p.get("id") in candidates) and accept(p):
+                    if self.records.get(p.get("id")) is p:
+                        out.append(p)
+                        if stop is not None and len(out) >= stop:
+                            break
+            return out[offset:]
+
+        if field in self.ordered:
+            entries = self.ordered[field]
+            if candidates is None and not residual:
+                # sin filtros: slicing directo sobre el índice ordenado
+                if descending:
+                    hi = len(entries) - offset
+                    lo = 0 if stop is None else max(0, len(entries) - stop)
+                    page = entries[lo:max(lo, hi)][::-1]
+                else:
+                    page = entries[offset:stop]
+                return [self.records[pid] for _, pid in page]
+            if candidates is not None and (stop is None or len(candidates) < HEAP_FRACTION * len(entries)):
+                return self._sort_candidates(candidates, field, descending, offset, stop, accept, _sort_key)
+            # recorrer el índice en orden y cortar al completar la página
+            out = []
+            walk = reversed(entries) if descending else iter(entries)
+            for _, pid in walk:
+                if candidates is not None and pid not in candidates:
+                    continue
+                p = self.records[pid]
+                if accept(p):
+                    out.append(p)
+                    if stop is not None and len(out) >= stop:
+                        break
+            return out[offset:]
+
+        # campo sin índice ordenado: ordenar candidatos
+        return self._sort_candidates(candidates if candidates is not None else self.records,
+                                     field, descending, offset, stop, accept, lambda v: (v is None, _sort_key(v)))
+
+    def _sort_candidates(self, candidates, field, descending, offset, stop, accept, key_fn) -> List[Dict]:
+        records = self.records
+        pool = [records[pid] for pid in candidates if accept(records[pid])]
+
+        def key(p):
+            return key_fn(p.get(field)), p["id"]
+
+        if stop is None:
+            pool.sort(key=key, reverse=descending)
+            return pool[offset:]
+        pick = heapq.nlargest if descending else heapq.nsmallest
+        return pick(stop, pool, key=key)[offset:]
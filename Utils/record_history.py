@@ -0,0 +1,387 @@
+
+
+# ./Utils/record_history.py
+
+"""
+Utils/record_history.py
+
+Historial de cambios por registro de clients.json / projects.json con
+consultas a un instante ("¿qué estado tenía este proyecto el mes pasado?").
+
+    history = RecordHistory(projects_path, "projects")
+    history.record_at("p-123", "2026-09-01")     # registro a esa fecha (o None)
+    history.records_at("2026-09-01")             # todos los registros a esa fecha
+    list(history.changes("p-123"))               # versiones del registro
+
+DBManager(history=True) lo alimenta en cada confirmación (ver Utils/db_manager.py);
+SQLiteDBManager(history=True) igual, con un historial por tabla junto a la base.
+
+Almacenamiento, en '<archivo>.history/', por segmentos:
+  NNNNNN-<ms>.ckpt   checkpoint: todos los registros al inicio del segmento
+                     ({"version", "t", "records": [...]}, JSON compacto)
+  NNNNNN.log         una línea por registro modificado después del checkpoint:
+                     {"t": epoch, "id": ..., "s": {campo: valor nuevo}, "u": [campos quitados]}
+                     {"t": epoch, "id": ..., "n": 1, "s": {registro completo}}   (alta)
+                     {"t": epoch, "id": ..., "d": 1}                             (baja)
+
+Sólo se guardan los campos que cambiaron respecto de la versión anterior
+(varios cambios al mismo registro dentro de una transacción o de una ventana
+de write-behind quedan en una sola línea). Los reemplazos completos
+(save_clients / save_projects_data) abren un segmento nuevo.
+
+Costo acotado y crecimiento proporcional a los cambios:
+ - Un segmento se cierra cuando su log alcanza checkpoint_ratio veces el
+   tamaño de su checkpoint (mínimo MIN_SEGMENT_BYTES). El checkpoint del
+   segmento siguiente se amortiza contra esos cambios: el historial ocupa
+   ~(1 + 1 / checkpoint_ratio) veces lo que ocupan los cambios.
+ - Reconstruir un instante lee un checkpoint más, como mucho, un log de ese
+   tamaño, sin importar cuánta historia haya antes. record_at lee el
+   checkpoint en streaming y corta al encontrar el registro.
+ - Retención: al abrir un segmento se eliminan los que quedaron enteros antes
+   de retention_days (0 = conservar todo). compact() lo fuerza.
+
+Los instantes se aceptan como epoch (float), datetime o ISO 8601
+("2026-09-01", "2026-09-01T10:00:00Z"); sin zona horaria se toman como UTC,
+igual que created_at / updated_at.
+"""
+
+import os
+import re
+import json
+import math
+import time
+import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from Utils.logger import log_info, log_error
+from Utils.json_stream import iter_array
+from Utils.serialization import dumps, read_file
+
+HISTORY_VERSION = 1
+DEFAULT_CHECKPOINT_RATIO = 1.0
+DEFAULT_RETENTION_DAYS = 365
+MIN_SEGMENT_BYTES = 1024 * 1024
+
+_CKPT = re.compile(r"^(\d{6})-(\d+)\.ckpt$")
+_MISSING = object()
+
+
+def history_dir(path: str) -> str:
+    """Carpeta del historial de un archivo de datos."""
+    return path + ".history"
+
+
+def to_epoch(when) -> float:
+    """Instante como epoch: float/int, datetime o ISO 8601 (sin zona = UTC). ValueError si no se entiende."""
+    if isinstance(when, (int, float)):
+        return float(when)
+    if isinstance(when, str):
+        text = when.strip()
+        try:
+            return float(text)
+        except ValueError:
+            pass
+        if text.endswith("Z"):
+            text = text[:-1] + "+00:00"
+        when = datetime.datetime.fromisoformat(text)
+    if isinstance(when, datetime.datetime):
+        if when.tzinfo is None:
+            when = when.replace(tzinfo=datetime.timezone.utc)
+        return when.timestamp()
+    if isinstance(when, datetime.date):
+        return datetime.datetime(when.year, when.month, when.day, tzinfo=datetime.timezone.utc).timestamp()
+    raise ValueError(f"instante inválido: {when!r}")
+
+
+def _iso(epoch: float) -> str:
+    return datetime.datetime.fromtimestamp(epoch, datetime.timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+
+def diff_record(before: Optional[Dict], after: Optional[Dict]) -> Optional[Dict]:
+    """
+    Delta de 'before' a 'after' (None = no existe) en el formato del log, sin
+    "t" ni "id". None si no hay diferencias.
+    """
+    if before is None and after is None:
+        return None
+    if before is None:
+        return {"n": 1, "s": dict(after)}
+    if after is None:
+        return {"d": 1}
+    changed = {k: v for k, v in after.items() if before.get(k, _MISSING) != v}
+    removed = [k for k in before if k not in after]
+    if not changed and not removed:
+        return None
+    delta = {"s": changed}
+    if removed:
+        delta["u"] = removed
+    return delta
+
+
+def apply_delta(record: Optional[Dict], delta: Dict) -> Optional[Dict]:
+    """Aplica una línea del log a 'record' (copia nueva; None si la línea es una baja)."""
+    if delta.get("d"):
+        return None
+    if delta.get("n"):
+        return dict(delta["s"])
+    record = dict(record) if record is not None else {}
+    record.update(delta.get("s", {}))
+    for field in delta.get("u", ()):
+        record.pop(field, None)
+    return record
+
+
+def _pre_state(records: List[Dict], bases: Dict[str, Optional[Dict]]) -> List[Dict]:
+    """Registros antes de los cambios de 'bases' (id -> versión previa, None = alta)."""
+    out = []
+    present = set()
+    for r in records:
+        rid = r.get("id")
+        present.add(rid)
+        if rid not in bases:
+            out.append(r)
+        elif bases[rid] is not None:
+            out.append(bases[rid])
+    out.extend(b for rid, b in bases.items() if b is not None and rid not in present)
+    return out
+
+
+class RecordHistory:
+    """
+    Historial por segmentos de un archivo de datos (ver el docstring del
+    módulo). Las escrituras las hace DBManager con el candado del archivo
+    tomado: varios procesos comparten el historial sin intercalar segmentos.
+    """
+
+    def __init__(self, path: str, list_key: str, retention_days: Optional[float] = DEFAULT_RETENTION_DAYS,
+                 checkpoint_ratio: float = DEFAULT_CHECKPOINT_RATIO):
+        self.path = path
+        self.list_key = list_key
+        self.dir = history_dir(path)
+        self.retention_days = float(retention_days or 0)
+        self.checkpoint_ratio = max(0.1, float(checkpoint_ratio))
+
+    # -------------------------
+    # SEGMENTOS
+    # -------------------------
+    def segments(self) -> List[Tuple[int, float, str, str]]:
+        """Segmentos existentes en orden: (número, inicio epoch, ruta .ckpt, ruta .log)."""
+        try:
+            names = os.listdir(self.dir)
+        except OSError:
+            return []
+        out = []
+        for name in names:
+            match = _CKPT.match(name)
+            if match:
+                seq = int(match.group(1))
+                out.append((seq, int(match.group(2)) / 1000.0, os.path.join(self.dir, name),
+                            os.path.join(self.dir, f"{seq:06d}.log")))
+        out.sort()
+        return out
+
+    def _segment_at(self, when: float) -> Optional[Tuple[int, float, str, str]]:
+        """Segmento que cubre 'when' (el último que empezó antes), o None si es anterior al historial."""
+        found = None
+        for segment in self.segments():
+            if segment[1] > when:
+                break
+            found = segment
+        return found
+
+    def _write_checkpoint(self, seq: int, records: Iterable[Dict], when: float, round_up: bool = False) -> bool:
+        """
+        Escribe el checkpoint del segmento 'seq' con inicio en 'when' (en ms).
+        round_up: los cambios de 'when' ya están en el log del segmento anterior
+        (cierre por tamaño); redondear hacia arriba hace que una consulta en
+        'when' use ese segmento. Si no, hacia abajo: el checkpoint (o su log)
+        ya refleja lo confirmado en 'when'.
+        """
+        os.makedirs(self.dir, exist_ok=True)
+        start = math.ceil(when * 1000) if round_up else math.floor(when * 1000)
+        path = os.path.join(self.dir, f"{seq:06d}-{start}.ckpt")
+        tmp = path + ".tmp"
+        try:
+            with open(tmp, "wb") as f:
+                f.write(dumps({"version": HISTORY_VERSION, "t": when, "records": list(records)}, "json"))
+            os.replace(tmp, path)
+            return True
+        except Exception as e:
+            log_error("./Utils", "record_history.py", f"No se pudo escribir el checkpoint {path}: {e}")
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            return False
+
+    # -------------------------
+    # ESCRITURA (desde DBManager, con el candado del archivo tomado)
+    # -------------------------
+    def append(self, changes: List[Tuple[str, Dict]], records,
+               bases: Dict[str, Optional[Dict]], when: Optional[float] = None) -> bool:
+        """
+        Agrega los deltas [(id, delta de diff_record)] de una confirmación.
+        records: estado ya confirmado (para el checkpoint al abrir segmento), o
+        una función sin argumentos que lo retorna: sólo se llama si hace falta;
+        bases: versiones previas de los registros cambiados (para el primer
+        checkpoint, si todavía no hay historial).
+        """
+        if not changes:
+            return True
+        when = time.time() if when is None else when
+        segments = self.segments()
+        if not segments:
+            # primer uso: el checkpoint inicial es el estado ANTES de estos cambios
+            if callable(records):
+                records = records()
+            if not self._write_checkpoint(0, _pre_state(records, bases), when):
+                return False
+            segments = self.segments()
+        seq, _, ckpt_path, log_path = segments[-1]
+        encode = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+        lines = []
+        for record_id, delta in changes:
+            line = {"t": when, "id": record_id}
+            line.update(delta)
+            lines.append(encode(line))
+        try:
+            with open(log_path, "a", encoding="utf-8") as f:
+                f.write("\n".join(lines) + "\n")
+        except OSError as e:
+            log_error("./Utils", "record_history.py", f"No se pudo agregar al historial {log_path}: {e}")
+            return False
+        try:
+            threshold = max(MIN_SEGMENT_BYTES, self.checkpoint_ratio * os.path.getsize(ckpt_path))
+            full = os.path.getsize(log_path) >= threshold
+        except OSError:
+            full = False
+        if full:
+            self._roll(seq + 1, records() if callable(records) else records, when, round_up=True)
+        return True
+
+    def checkpoint(self, records: List[Dict], when: Optional[float] = None) -> bool:
+        """Abre un segmento nuevo con 'records' como estado (reemplazos completos de la lista)."""
+        segments = self.segments()
+        return self._roll(segments[-1][0] + 1 if segments else 0, records, time.time() if when is None else when)
+
+    def _roll(self, seq: int, records: List[Dict], when: float, round_up: bool = False) -> bool:
+        ok = self._write_checkpoint(seq, records, when, round_up)
+        if ok:
+            self.compact()
+        return ok
+
+    def compact(self, retention_days: Optional[float] = None) -> int:
+        """
+        Elimina los segmentos enteramente anteriores a la retención (un segmento
+        sirve hasta que empieza el siguiente). Retorna cuántos eliminó.
+        """
+        days = self.retention_days if retention_days is None else float(retention_days)
+        if days <= 0:
+            return 0
+        cutoff = time.time() - days * 86400
+        segments = self.segments()
+        removed = 0
+        for segment, following in zip(segments, segments[1:]):
+            if following[1] > cutoff:
+                break
+            for path in segment[2:]:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                except OSError as e:
+                    log_error("./Utils", "record_history.py", f"No se pudo eliminar {path}: {e}")
+            removed += 1
+        if removed:
+            log_info("./Utils", "record_history.py",
+                     f"Historial de {os.path.basename(self.path)}: {removed} segmentos fuera de retención eliminados")
+        return removed
+
+    # -------------------------
+    # CONSULTAS
+    # -------------------------
+    @staticmethod
+    def _iter_log(log_path: str, until: Optional[float] = None, record_id=None) -> Iterator[Dict]:
+        """Líneas del log en orden; corta en la primera posterior a 'until'. record_id filtra antes de parsear."""
+        needle = None if record_id is None else '"id":' + json.dumps(record_id, ensure_ascii=False) + ","
+        try:
+            f = open(log_path, "r", encoding="utf-8")
+        except FileNotFoundError:
+            return
+        with f:
+            for line in f:
+                if not line.endswith("\n"):
+                    continue  # línea incompleta (escritura interrumpida)
+                try:
+                    if until is not None:
+                        # cada línea empieza con {"t":<epoch>,
+                        if float(line[5:line.index(",", 5)]) > until:
+                            return
+                    if needle is not None and needle not in line:
+                        continue
+                    delta = json.loads(line)
+                except ValueError:
+                    continue  # línea dañada
+                yield delta
+
+    def record_at(self, record_id: str, when) -> Optional[Dict]:
+        """Registro 'record_id' tal como estaba en 'when', o None si no existía (o es anterior al historial)."""
+        when = to_epoch(when)
+        segment = self._segment_at(when)
+        if segment is None:
+            return None
+        record = None
+        try:
+            for r in iter_array(segment[2], "records"):
+                if r.get("id") == record_id:
+                    record = r
+                    break
+        except (OSError, ValueError) as e:
+            log_error("./Utils", "record_history.py", f"Checkpoint ilegible {segment[2]}: {e}")
+            return None
+        for delta in self._iter_log(segment[3], when, record_id):
+            record = apply_delta(record, delta)
+        return record
+
+    def records_at(self, when) -> Optional[List[Dict]]:
+        """Todos los registros en 'when' (orden del checkpoint, altas al final), o None si es anterior al historial."""
+        when = to_epoch(when)
+        segment = self._segment_at(when)
+        if segment is None:
+            return None
+        try:
+            state = read_file(segment[2])
+        except (OSError, ValueError) as e:
+            log_error("./Utils", "record_history.py", f"Checkpoint ilegible {segment[2]}: {e}")
+            return None
+        records = {r.get("id"): r for r in state.get("records", [])}
+        for delta in self._iter_log(segment[3], when):
+            record = apply_delta(records.get(delta["id"]), delta)
+            if record is None:
+                records.pop(delta["id"], None)
+            else:
+                records[delta["id"]] = record
+        return list(records.values())
+
+    def changes(self, record_id: str) -> Iterator[Dict]:
+        """
+        Cambios registrados de 'record_id', del más viejo al más nuevo:
+        {"at": ISO, "t": epoch, "op": "create" | "update" | "delete",
+         "fields": {campo: valor nuevo}, "removed": [campos]}.
+        Los reemplazos completos (checkpoints) no generan entradas.
+        """
+        for segment in self.segments():
+            for delta in self._iter_log(segment[3], record_id=record_id):
+                op = "delete" if delta.get("d") else "create" if delta.get("n") else "update"
+                yield {"at": _iso(delta["t"]), "t": delta["t"], "op": op,
+                       "fields": delta.get("s", {}), "removed": delta.get("u", [])}
+
+    def stats(self) -> Dict:
+        """Segmentos, bytes de checkpoints y de logs, y primer instante disponible."""
+        segments = self.segments()
+        ckpt = log = 0
+        for _, _, ckpt_path, log_path in segments:
+            ckpt += os.path.getsize(ckpt_path)
+            log += os.path.getsize(log_path) if os.path.exists(log_path) else 0
+        return {"segments": len(segments), "checkpoint_bytes": ckpt, "log_bytes": log,
+                "since": _iso(segments[0][1]) if segments else None}
@@ -0,0 +1,283 @@
+
+
+# ./Utils/records.py
+
+"""
+Utils/records.py
+
+Registros tipados de clientes y proyectos con __slots__: sin dict por
+instancia (menos memoria que el dict equivalente) y con la misma forma JSON
+que usan clients.json / projects.json.
+
+    project = Project.from_dict({"name": "Tablero", "status": "En proceso"})
+    project.status                # "En proceso" (internado)
+    project.to_dict()             # dict con todos los campos, listo para guardar
+
+Los campos tipo enumerado (status, type) se internan con sys.intern: los
+100k proyectos comparten un puñado de strings en lugar de una copia cada uno.
+
+Claves desconocidas del JSON se conservan en '_extra' y vuelven a salir en
+to_dict, así el ida y vuelta no pierde datos. Los registros también se leen
+y modifican como un dict (rec["name"], rec.get("name"), rec["status"] = ...,
+dict(rec)) para que el código que usa dicts funcione sin cambios.
+
+Los campos ausentes del dict de origen quedan en '_unset': given() los omite
+mientras conserven su valor por defecto, así add_or_update_* no pisa con
+defaults lo que el registro no trae (igual que con un dict parcial). En los
+registros construidos con Client(...)/Project(...) todos los campos empiezan
+en '_unset'.
+
+DBManager(records=True) los retorna en lugar de dicts (ver Utils/db_manager.py).
+"""
+
+import sys
+from operator import attrgetter, itemgetter
+from typing import Dict, Optional
+
+_intern = sys.intern
+_REV = frozenset(("_rev",))
+
+
+def intern_value(value):
+    """Interna 'value' si es un str (los demás tipos se retornan igual)."""
+    return _intern(value) if type(value) is str else value
+
+
+def intern_project(project: Dict) -> Dict:
+    """Interna in situ los campos enumerados (status, type) de un proyecto dict."""
+    for field in Project.ENUM_FIELDS:
+        value = project.get(field)
+        if type(value) is str:
+            project[field] = _intern(value)
+    return project
+
+
+class _Record:
+    """Base común: acceso tipo dict, igualdad, repr y conversión a dict."""
+
+    __slots__ = ()
+    FIELDS = ()
+    _KEYS = frozenset()
+
+    def to_dict(self) -> Dict:
+        """Forma JSON del registro (dict nuevo; incluye las claves desconocidas)."""
+        data = dict(zip(self.FIELDS, self._values()))
+        if not data["_rev"]:
+            del data["_rev"]  # registro sin versión (anterior a '_rev'): no inventarla
+        if self._extra:
+            data.update(self._extra)
+        return data
+
+    def _values(self) -> tuple:
+        return self._ATTRS(self)
+
+    def given(self, fields) -> Dict:
+        """Campos de 'fields' que el registro trae (los de '_unset' sólo si cambiaron su valor por defecto)."""
+        unset = self._unset
+        data = {}
+        for field in fields:
+            value = getattr(self, field)
+            if not unset or field not in unset or value != self._DEFAULTS[field]:
+                data[field] = value
+        return data
+
+    def copy(self):
+        return type(self).from_dict(self.to_dict())
+
+    # acceso tipo dict (compatibilidad con el código que recibe dicts)
+    def keys(self):
+        return self.to_dict().keys()
+
+    def __getitem__(self, key: str):
+        if key in self._KEYS:
+            return getattr(self, key)
+        if self._extra and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value):
+        if key in self._KEYS:
+            if self._unset and key in self._unset:
+                self._unset = self._unset - {key}
+            setattr(self, key, intern_value(value) if key in ("status", "type") else value)
+        elif self._extra is None:
+            self._extra = {key: value}
+        else:
+            self._extra[key] = value
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._KEYS or bool(self._extra and key in self._extra)
+
+    def get(self, key: str, default=None):
+        if key in self._KEYS:
+            return getattr(self, key)
+        if self._extra:
+            return self._extra.get(key, default)
+        return default
+
+    def __eq__(self, other) -> bool:
+        if type(other) is not type(self):
+            return NotImplemented
+        return self._values() == other._values() and (self._extra or None) == (other._extra or None)
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(id={self.id!r}, name={self.name!r})"
+
+    def __getstate__(self):
+        return self.to_dict()
+
+    def __setstate__(self, state):
+        type(self)._fill(self, state)
+
+
+class Client(_Record):
+    """Cliente (clients.json)."""
+
+    FIELDS = ("id", "name", "cuit", "address", "contact_name", "contact_email", "contact_phone",
+              "created_at", "updated_at", "_rev")
+    _KEYS = frozenset(FIELDS)
+    _ATTRS = attrgetter(*FIELDS)
+    _ITEMS = itemgetter(*FIELDS[:-1])  # todo menos '_rev' (los registros viejos no lo tienen)
+    _DEFAULTS = dict.fromkeys(FIELDS, "")
+    _DEFAULTS["_rev"] = 0
+    __slots__ = FIELDS + ("_extra", "_unset")
+
+    def __init__(self, id: str = "", name: str = "", cuit: str = "", address: str = "",
+                 contact_name: str = "", contact_email: str = "", contact_phone: str = "",
+                 created_at: str = "", updated_at: str = "", _rev: int = 0,
+                 _extra: Optional[Dict] = None):
+        self.id = id
+        self.name = name
+        self.cuit = cuit
+        self.address = address
+        self.contact_name = contact_name
+        self.contact_email = contact_email
+        self.contact_phone = contact_phone
+        self.created_at = created_at
+        self.updated_at = updated_at
+        self._rev = _rev
+        self._extra = _extra
+        self._unset = self._KEYS
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Client":
+        """Construye el registro desde la forma JSON (campos ausentes con su valor por defecto)."""
+        self = cls.__new__(cls)
+        cls._fill(self, data)
+        return self
+
+    @staticmethod
+    def _fill(self, data: Dict):
+        get = data.get
+        if len(data) - ("_rev" in data) == 9:
+            # caso habitual (todos los campos, sin claves extra): una sola búsqueda en C
+            try:
+                (self.id, self.name, self.cuit, self.address, self.contact_name, self.contact_email,
+                 self.contact_phone, self.created_at, self.updated_at) = Client._ITEMS(data)
+                self._rev = get("_rev", 0)
+                self._extra = None
+                self._unset = None
+                return
+            except KeyError:
+                pass
+        self.id = get("id", "")
+        self.name = get("name", "")
+        self.cuit = get("cuit", "")
+        self.address = get("address", "")
+        self.contact_name = get("contact_name", "")
+        self.contact_email = get("contact_email", "")
+        self.contact_phone = get("contact_phone", "")
+        self.created_at = get("created_at", "")
+        self.updated_at = get("updated_at", "")
+        self._rev = get("_rev", 0)
+        self._extra = None if data.keys() <= Client._KEYS else {
+            k: v for k, v in data.items() if k not in Client._KEYS}
+        self._unset = Client._KEYS - data.keys() - _REV or None
+
+
+class Project(_Record):
+    """Proyecto (projects.json). status y type se internan."""
+
+    FIELDS = ("id", "name", "code", "path", "template", "type", "purpose", "client_id", "status",
+              "version", "is_macro", "created_at", "updated_at", "_rev")
+    ENUM_FIELDS = ("status", "type")
+    _KEYS = frozenset(FIELDS)
+    _ATTRS = attrgetter(*FIELDS)
+    _ITEMS = itemgetter(*FIELDS[:-1])
+    _DEFAULTS = dict(dict.fromkeys(FIELDS, ""), status="En proceso", version="0.1.0", is_macro=False, _rev=0)
+    __slots__ = FIELDS + ("_extra", "_unset")
+
+    def __init__(self, id: str = "", name: str = "", code: str = "", path: str = "", template: str = "",
+                 type: str = "", purpose: str = "", client_id: str = "", status: str = "En proceso",
+                 version: str = "0.1.0", is_macro: bool = False, created_at: str = "",
+                 updated_at: str = "", _rev: int = 0, _extra: Optional[Dict] = None):
+        self.id = id
+        self.name = name
+        self.code = code
+        self.path = path
+        self.template = template
+        self.type = intern_value(type)
+        self.purpose = purpose
+        self.client_id = client_id
+        self.status = intern_value(status)
+        self.version = version
+        self.is_macro = is_macro
+        self.created_at = created_at
+        self.updated_at = updated_at
+        self._rev = _rev
+        self._extra = _extra
+        self._unset = self._KEYS
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Project":
+        """Construye el registro desde la forma JSON (campos ausentes con su valor por defecto)."""
+        self = cls.__new__(cls)
+        cls._fill(self, data)
+        return self
+
+    @staticmethod
+    def _fill(self, data: Dict):
+        get = data.get
+        if len(data) - ("_rev" in data) == 13:
+            try:
+                (self.id, self.name, self.code, self.path, self.template, self.type, self.purpose,
+                 self.client_id, self.status, self.version, self.is_macro, self.created_at,
+                 self.updated_at) = Project._ITEMS(data)
+                if self.type.__class__ is str:
+                    self.type = _intern(self.type)
+                if self.status.__class__ is str:
+                    self.status = _intern(self.status)
+                self._rev = get("_rev", 0)
+                self._extra = None
+                self._unset = None
+                return
+            except KeyError:
+                pass
+        self.id = get("id", "")
+        self.name = get("name", "")
+        self.code = get("code", "")
+        self.path = get("path", "")
+        self.template = get("template", "")
+        value = get("type", "")
+        self.type = _intern(value) if value.__class__ is str else value
+        self.purpose = get("purpose", "")
+        self.client_id = get("client_id", "")
+        value = get("status", "En proceso")
+        self.status = _intern(value) if value.__class__ is str else value
+        self.version = get("version", "0.1.0")
+        self.is_macro = get("is_macro", False)
+        self.created_at = get("created_at", "")
+        self.updated_at = get("updated_at", "")
+        self._rev = get("_rev", 0)
+        self._extra = None if data.keys() <= Project._KEYS else {
+            k: v for k, v in data.items() if k not in Project._KEYS}
+        self._unset = Project._KEYS - data.keys() - _REV or None
+
+
+def as_dict(record) -> Dict:
+    """Forma JSON de un registro (Client/Project) o copia de un dict."""
+    if isinstance(record, _Record):
+        return record.to_dict()
+    return dict(record)
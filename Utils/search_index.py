@@ -0,0 +1,441 @@
+
+
+# ./Utils/search_index.py
+
+"""
+Utils/search_index.py
+
+Índice invertido con trigramas para búsqueda de clientes y proyectos.
+
+ - Tokens normalizados (minúsculas, sin acentos) por campo, con peso por campo.
+ - Cada registro recibe un ordinal entero interno (conjuntos de ints: más
+   rápidos de construir, intersecar y persistir que conjuntos de strings).
+ - Postings token -> {peso: {ordinales}} (por niveles de peso), mantenidos
+   incrementalmente (add / remove). Los niveles permiten recorrer los mejores
+   candidatos primero y cortar al llegar a 'limit', y las intersecciones de
+   conjuntos se resuelven en C.
+ - Vocabulario ordenado para consultas por prefijo (bisect).
+ - Trigramas del vocabulario para tolerar errores de tipeo (se construyen en
+   la primera consulta aproximada).
+ - Ranking: primero los registros que contienen todos los términos de la
+   consulta; dentro de cada grupo, por score (exacto > prefijo > aproximado,
+   ponderado por campo). Empates por id (resultado determinista).
+ - Persistencia en disco compacta asociada a la firma del archivo de origen:
+   si la firma no coincide al cargar, el índice se reconstruye. Al cargar,
+   los postings quedan empaquetados y cada token se desempaqueta la primera
+   vez que se usa.
+
+Formato de <archivo>.search (sin pickle: el archivo vive en la carpeta de
+datos, que puede ser compartida, y leerlo no debe poder ejecutar código):
+  b"EWSI" + largo de la cabecera (uint32 little-endian) + cabecera JSON
+  {"version", "signature", "fields", "byteorder", "ids", "docs", "tokens",
+   "levels", "size"} + arreglos crudos (orden de bytes de la cabecera):
+  niveles por token (int32), peso (float64) y cantidad (int32) de cada
+  nivel, y los ordinales (int32): primero los de docs y luego los de cada
+  nivel, en orden.
+
+Para quitar o reindexar un registro se pasa el registro tal como estaba
+indexado (remove(record_anterior)): sus tokens se recalculan, así el índice
+no guarda una copia de los tokens de cada registro.
+"""
+
+import os
+import re
+import heapq
+import sys
+import json
+import array
+import struct
+import bisect
+import unicodedata
+from collections import defaultdict
+from itertools import accumulate
+from typing import Dict, List, Optional, Iterable, Iterator, Tuple
+
+INDEX_VERSION = 1
+_MAGIC = b"EWSI"
+_HEADER_LEN = struct.Struct("<I")
+
+# Campos indexados y su peso en el ranking
+CLIENT_FIELDS = {
+    "name": 3.0,
+    "cuit": 2.0,
+    "address": 1.0,
+    "contact_name": 1.5,
+    "contact_email": 1.0,
+    "contact_phone": 0.5,
+}
+
+PROJECT_FIELDS = {
+    "name": 3.0,
+    "code": 2.5,
+    "purpose": 1.0,
+    "type": 0.5,
+    "status": 0.5,
+}
+
+# Factores por tipo de coincidencia
+EXACT, PREFIX, FUZZY = 1.0, 0.7, 0.5
+MAX_PREFIX_EXPANSIONS = 64
+MIN_FUZZY_SIMILARITY = 0.35
+# Términos presentes en más de esta fracción de registros no generan candidatos
+# por sí solos cuando la consulta tiene términos más selectivos (sólo puntúan)
+COMMON_FRACTION = 0.5
+
+_TOKEN_RE = re.compile(r"[0-9a-z]+")
+
+
+def normalize(text) -> str:
+    """Minúsculas y sin acentos/diacríticos."""
+    text = str(text).lower()
+    if text.isascii():
+        return text
+    text = unicodedata.normalize("NFKD", text)
+    return "".join(ch for ch in text if not unicodedata.combining(ch))
+
+
+def tokenize(text) -> List[str]:
+    if not text:
+        return []
+    return _TOKEN_RE.findall(normalize(text))
+
+
+def trigrams(token: str) -> set:
+    padded = f"  {token} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class SearchIndex:
+    """
+    Índice de un tipo de registro (clientes o proyectos), por id de registro.
+    """
+
+    def __init__(self, fields: Dict[str, float]):
+        self.fields = fields
+        # id <-> ordinal interno; los ordinales de registros quitados no se reutilizan
+        # salvo que vuelva el mismo id
+        self.ids: List[str] = []
+        self.ordinal: Dict[str, int] = {}
+        self.docs: set = set()  # ordinales vigentes
+        self.postings: Dict[str, Dict[float, set]] = {}
+        # postings cargados de disco y aún no usados: token -> posición en el
+        # directorio; sus niveles son _first[i]:_first[i + 1] y los ordinales de
+        # cada nivel j están en _blob[_offsets[j]:_offsets[j + 1]]
+        self._packed: Dict[str, int] = {}
+        self._first = self._offsets = self._weights = self._blob = None
+        self.vocab: List[str] = []  # ordenado
+        self.grams: Optional[Dict[str, set]] = None  # trigrama -> tokens (lazy)
+
+    def __len__(self):
+        return len(self.docs)
+
+    # -------------------------
+    # MANTENIMIENTO
+    # -------------------------
+    def _doc_weights(self, record: Dict) -> Dict[str, float]:
+        weights: Dict[str, float] = {}
+        for field, w in self.fields.items():
+            value = record.get(field)
+            if not value:
+                continue
+            tokens = tokenize(value)
+            if field == "cuit":
+                # CUIT con o sin guiones
+                digits = re.sub(r"\D", "", str(value))
+                if digits:
+                    tokens.append(digits)
+            for t in tokens:
+                if w > weights.get(t, 0.0):
+                    weights[t] = w
+        return weights
+
+    def _tiers(self, token: str) -> Optional[Dict[float, set]]:
+        tiers = self.postings.get(token)
+        if tiers is None and token in self._packed:
+            tiers = self.postings[token] = {w: set(docs) for w, docs in self._packed_levels(self._packed.pop(token))}
+        return tiers
+
+    def _packed_levels(self, i: int) -> Iterator[Tuple[float, array.array]]:
+        """Niveles (peso, ordinales) del token empaquetado en la posición i del directorio."""
+        offsets, blob = self._offsets, self._blob
+        for j in range(self._first[i], self._first[i + 1]):
+            yield self._weights[j], blob[offsets[j]:offsets[j + 1]]
+
+    def _ordinal_for(self, doc_id: str) -> int:
+        n = self.ordinal.get(doc_id)
+        if n is None:
+            n = self.ordinal[doc_id] = len(self.ids)
+            self.ids.append(doc_id)
+        return n
+
+    def _add_token(self, token: str):
+        bisect.insort(self.vocab, token)
+        if self.grams is not None:
+            for g in trigrams(token):
+                self.grams.setdefault(g, set()).add(token)
+
+    def _drop_token(self, token: str):
+        del self.postings[token]
+        i = bisect.bisect_left(self.vocab, token)
+        if i < len(self.vocab) and self.vocab[i] == token:
+            del self.vocab[i]
+        if self.grams is not None:
+            for g in trigrams(token):
+                bucket = self.grams.get(g)
+                if bucket is not None:
+                    bucket.discard(token)
+                    if not bucket:
+                        del self.grams[g]
+
+    def add(self, record: Dict):
+        """Indexa un registro (para reindexar: remove(anterior) y luego add(nuevo))."""
+        doc_id = record.get("id")
+        if not doc_id:
+            return
+        n = self._ordinal_for(doc_id)
+        for t, w in self._doc_weights(record).items():
+            tiers = self._tiers(t)
+            if tiers is None:
+                tiers = self.postings[t] = {}
+                self._add_token(t)
+            tiers.setdefault(w, set()).add(n)
+        self.docs.add(n)
+
+    def remove(self, record: Dict):
+        """Quita un registro del índice (con los valores con que fue indexado)."""
+        n = self.ordinal.get(record.get("id"))
+        if n is None or n not in self.docs:
+            return
+        for t, w in self._doc_weights(record).items():
+            tiers = self._tiers(t)
+            if tiers is None or w not in tiers:
+                continue
+            tiers[w].discard(n)
+            if not tiers[w]:
+                del tiers[w]
+                if not tiers:
+                    self._drop_token(t)
+        self.docs.discard(n)
+
+    @classmethod
+    def build(cls, fields: Dict[str, float], records: Iterable[Dict]) -> "SearchIndex":
+        """Construcción completa (más rápida que add() uno a uno: ordena el vocabulario al final)."""
+        index = cls(fields)
+        postings = index.postings
+        for record in records:
+            doc_id = record.get("id")
+            if not doc_id or doc_id in index.ordinal:
+                continue
+            n = index._ordinal_for(doc_id)
+            for t, w in index._doc_weights(record).items():
+                tiers = postings.get(t)
+                if tiers is None:
+                    tiers = postings[t] = {}
+                bucket = tiers.get(w)
+                if bucket is None:
+                    bucket = tiers[w] = set()
+                bucket.add(n)
+        index.docs = set(range(len(index.ids)))
+        index.vocab = sorted(postings)
+        return index
+
+    def _trigram_index(self) -> Dict[str, set]:
+        if self.grams is None:
+            grams: Dict[str, set] = defaultdict(set)
+            for t in self.vocab:
+                padded = f"  {t} "
+                for i in range(len(padded) - 2):
+                    grams[padded[i:i + 3]].add(t)
+            self.grams = dict(grams)
+        return self.grams
+
+    # -------------------------
+    # CONSULTA
+    # -------------------------
+    def _prefix_tokens(self, q: str) -> List[str]:
+        i = bisect.bisect_left(self.vocab, q)
+        out = []
+        while i < len(self.vocab) and self.vocab[i].startswith(q) and len(out) < MAX_PREFIX_EXPANSIONS:
+            if self.vocab[i] != q:
+                out.append(self.vocab[i])
+            i += 1
+        return out
+
+    def _fuzzy_tokens(self, q: str) -> List[Tuple[str, float]]:
+        grams = self._trigram_index()
+        q_grams = trigrams(q)
+        shared: Dict[str, int] = defaultdict(int)
+        for g in q_grams:
+            for t in grams.get(g, ()):
+                shared[t] += 1
+        out = []
+        for t, n in shared.items():
+            sim = n / (len(q_grams) + len(t) + 1 - n)  # len(trigrams(t)) == len(t) + 1
+            if sim >= MIN_FUZZY_SIMILARITY and t != q:
+                out.append((t, sim))
+        out.sort(key=lambda x: -x[1])
+        return out[:MAX_PREFIX_EXPANSIONS]
+
+    def _term_tiers(self, q: str, prefix: bool, fuzzy: bool) -> List[Tuple[float, set]]:
+        """Niveles (score, ordinales) de un término de la consulta, de mayor a menor score."""
+        matches = []
+        if self._tiers(q) is not None:
+            matches.append((q, EXACT))
+        if prefix:
+            # prefijos más cortos respecto del token valen menos
+            matches.extend((t, PREFIX * len(q) / len(t)) for t in self._prefix_tokens(q))
+        if fuzzy and not matches and len(q) >= 3:
+            matches.extend((t, FUZZY * sim) for t, sim in self._fuzzy_tokens(q))
+        tiers = [(w * factor, docs) for t, factor in matches for w, docs in self._tiers(t).items()]
+        tiers.sort(key=lambda x: -x[0])
+        return tiers
+
+    @staticmethod
+    def _best_scores(tiers: List[Tuple[float, set]], candidates: Optional[set]) -> Dict[int, float]:
+        """Mejor score de cada ordinal (restringido a 'candidates' si se indica)."""
+        best: Dict[int, float] = {}
+        for score, docs in tiers:
+            if candidates is not None:
+                docs = docs & candidates
+            for n in docs:
+                if n not in best:
+                    best[n] = score
+        return best
+
+    def search(self, query: str, limit: int = 10, prefix: bool = True, fuzzy: bool = True) -> List[Tuple[str, float]]:
+        """
+        Retorna [(id, score)] ordenado por relevancia (máximo 'limit').
+        prefix: cada término también coincide como prefijo de tokens más largos.
+        fuzzy: términos sin coincidencia exacta/prefijo se buscan por trigramas.
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms or limit <= 0:
+            return []
+        per_term = [self._term_tiers(q, prefix, fuzzy) for q in terms]
+        ids = self.ids
+
+        if len(per_term) == 1:
+            # un término: recorrer niveles de mayor a menor y cortar en 'limit'
+            out: List[Tuple[str, float]] = []
+            seen = set()
+            for score, docs in per_term[0]:
+                fresh = docs - seen if seen else docs
+                take = heapq.nsmallest(limit - len(out), fresh, key=ids.__getitem__)
+                out.extend((ids[n], score) for n in take)
+                seen.update(take)
+                if len(out) >= limit:
+                    break
+            return out
+
+        # varios términos: primero los que coinciden con todos (intersección en C)
+        matching = [set().union(*(docs for _, docs in tiers)) for tiers in per_term]
+        everyone = set.intersection(*sorted(matching, key=len))
+        if len(everyone) >= limit:
+            scope = everyone
+        else:
+            # completar con coincidencias parciales de los términos selectivos
+            rare = [m for m in matching if len(m) <= COMMON_FRACTION * len(self.docs)]
+            scope = set().union(*rare) if rare and len(rare) < len(matching) else None
+        totals: Dict[int, float] = defaultdict(float)
+        matched: Dict[int, int] = defaultdict(int)
+        for tiers in per_term:
+            for n, score in self._best_scores(tiers, scope).items():
+                totals[n] += score
+                matched[n] += 1
+        best = heapq.nsmallest(limit, totals.items(), key=lambda x: (-matched[x[0]], -x[1], ids[x[0]]))
+        return [(ids[n], total) for n, total in best]
+
+    # -------------------------
+    # PERSISTENCIA
+    # -------------------------
+    def save(self, path: str, signature) -> bool:
+        """Guarda el índice junto con la firma del archivo de datos del que proviene."""
+        tmp = path + ".tmp"
+        tokens = []
+        levels = array.array("i")
+        weights = array.array("d")
+        counts = array.array("i")
+        blob = array.array("i", self.docs)
+
+        def add(token, tiers):
+            tokens.append(token)
+            levels.append(0)
+            for w, docs in tiers:
+                levels[-1] += 1
+                weights.append(w)
+                counts.append(len(docs))
+                blob.extend(docs)
+
+        for token, i in self._packed.items():
+            add(token, self._packed_levels(i))
+        for token, tiers in self.postings.items():
+            add(token, tiers.items())
+        header = json.dumps({
+            "version": INDEX_VERSION,
+            "signature": signature,
+            "fields": self.fields,
+            "byteorder": sys.byteorder,
+            "ids": self.ids,
+            "docs": len(self.docs),
+            "tokens": tokens,
+            "levels": len(weights),
+            "size": len(blob),
+        }, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        try:
+            with open(tmp, "wb") as f:
+                f.write(_MAGIC + _HEADER_LEN.pack(len(header)))
+                f.write(header)
+                for values in (levels, weights, counts, blob):
+                    values.tofile(f)
+            os.replace(tmp, path)
+            return True
+        except Exception:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            return False
+
+    @classmethod
+    def load(cls, path: str, signature, fields: Dict[str, float]) -> Optional["SearchIndex"]:
+        """Carga el índice si existe y corresponde a 'signature' y a los mismos campos; si no, None."""
+        try:
+            with open(path, "rb") as f:
+                prefix = f.read(len(_MAGIC) + _HEADER_LEN.size)
+                if len(prefix) != len(_MAGIC) + _HEADER_LEN.size or prefix[:len(_MAGIC)] != _MAGIC:
+                    return None
+                state = json.loads(f.read(_HEADER_LEN.unpack_from(prefix, len(_MAGIC))[0]))
+                if (
+                    not isinstance(state, dict)
+                    or state.get("version") != INDEX_VERSION
+                    or state.get("signature") != json.loads(json.dumps(signature))
+                    or state.get("fields") != fields
+                ):
+                    return None
+                tokens = state["tokens"]
+                arrays = []
+                for code, n in (("i", len(tokens)), ("d", state["levels"]), ("i", state["levels"]),
+                                ("i", state["size"])):
+                    values = array.array(code)
+                    values.fromfile(f, n)  # EOFError si el archivo está truncado
+                    arrays.append(values)
+            levels, weights, counts, blob = arrays
+            if state.get("byteorder") != sys.byteorder:
+                for values in arrays:
+                    values.byteswap()
+            docs = state["docs"]
+            index = cls(fields)
+            index._first = array.array("q", accumulate(levels, initial=0))
+            index._offsets = array.array("q", accumulate(counts, initial=docs))
+            if index._first[-1] != len(weights) or index._offsets[-1] != len(blob):
+                return None
+            index.ids = state["ids"]
+            index.docs = set(blob[:docs])
+        except Exception:
+            return None
+        index.ordinal = {doc_id: i for i, doc_id in enumerate(index.ids)}
+        index._weights = weights
+        index._blob = blob
+        index._packed = dict(zip(tokens, range(len(tokens))))
+        index.vocab = sorted(tokens)
+        return index
@@ -0,0 +1,115 @@
+
+
+# ./Utils/serialization.py
+
+"""
+Utils/serialization.py
+
+Formato en disco de los archivos de datos (clients.json / projects.json).
+
+Formatos de escritura:
+  "json"    JSON compacto (sin indentación, codificador en C de json). Por defecto.
+  "orjson"  JSON compacto con orjson si está instalado (si no, igual que "json").
+  "binary"  snapshot binario: cabecera versionada + marshal (sólo tipos
+            planos: dict, list, str, int, float, bool, None). El más rápido
+            de leer y escribir; no editable a mano.
+  "pretty"  JSON indentado y legible (el formato histórico). Pensado para
+            exportar (ver DBManager.export_json), no para el uso diario.
+
+La lectura autodetecta el formato: cabecera binaria o JSON (con o sin
+indentación), así cambiar el setting Database/format no requiere migrar: el
+archivo se reescribe en el formato nuevo en la próxima escritura.
+
+Cabecera binaria (6 bytes): b"EWDB" + versión de formato (1 byte) + codec (1 byte).
+
+Seguridad: la carpeta de datos puede ser compartida (varias instancias, un
+NAS), así que un archivo de datos no debe poder ejecutar código al leerse.
+marshal sólo reconstruye valores (un archivo malformado da ValueError). Un
+codec desconocido (cualquiera distinto de marshal) también es un error.
+
+Sólo usa la librería estándar (orjson es opcional) para poder importarse desde Utils.paths.
+"""
+
+import json
+import marshal
+from typing import Optional
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+FORMATS = ("json", "orjson", "binary", "pretty")
+DEFAULT_FORMAT = "json"
+
+MAGIC = b"EWDB"
+BINARY_VERSION = 1
+CODEC_MARSHAL = 2
+MARSHAL_VERSION = 4
+_HEADER_SIZE = len(MAGIC) + 2
+
+
+def resolve_format(fmt: Optional[str]) -> str:
+    """Normaliza el nombre del formato ("json" si es desconocido; "orjson" sin orjson -> "json")."""
+    fmt = str(fmt or DEFAULT_FORMAT).strip().lower()
+    if fmt not in FORMATS:
+        return DEFAULT_FORMAT
+    if fmt == "orjson" and orjson is None:
+        return "json"
+    return fmt
+
+
+def dumps(data, fmt: str = DEFAULT_FORMAT) -> bytes:
+    """Serializa 'data' en el formato pedido (ver resolve_format)."""
+    fmt = resolve_format(fmt)
+    if fmt == "binary":
+        return MAGIC + bytes((BINARY_VERSION, CODEC_MARSHAL)) + marshal.dumps(data, MARSHAL_VERSION)
+    if fmt == "pretty":
+        return json.dumps(data, indent=4, ensure_ascii=False).encode("utf-8")
+    if fmt == "orjson":
+        try:
+            return orjson.dumps(data)
+        except TypeError:
+            pass  # tipos que orjson no acepta (claves no str, enteros > 64 bits): json estándar
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def loads(raw: bytes):
+    """Deserializa el contenido de un archivo de datos, autodetectando el formato."""
+    if raw[:len(MAGIC)] == MAGIC:
+        if len(raw) < _HEADER_SIZE:
+            raise ValueError("cabecera binaria incompleta")
+        version, codec = raw[len(MAGIC)], raw[len(MAGIC) + 1]
+        if version > BINARY_VERSION or codec != CODEC_MARSHAL:
+            raise ValueError(f"snapshot binario no soportado (versión {version}, codec {codec})")
+        try:
+            return marshal.loads(raw[_HEADER_SIZE:])
+        except (EOFError, TypeError, ValueError) as e:
+            raise ValueError(f"snapshot binario inválido: {e}") from None
+    if orjson is not None:
+        try:
+            return orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            pass  # json estándar es más permisivo (BOM, NaN): reintentar
+    return json.loads(raw)
+
+
+def read_file(path: str):
+    """Lee y deserializa 'path' (cualquier formato)."""
+    with open(path, "rb") as f:
+        return loads(f.read())
+
+
+def write_file(path: str, data, fmt: str = DEFAULT_FORMAT):
+    """Escribe 'data' en 'path' (no atómico: para atomicidad escribir a un .tmp y renombrar)."""
+    with open(path, "wb") as f:
+        f.write(dumps(data, fmt))
+
+
+def is_binary(path: str) -> bool:
+    """True si 'path' es un snapshot binario (según la cabecera)."""
+    try:
+        with open(path, "rb") as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
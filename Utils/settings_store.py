@@ -0,0 +1,356 @@
+
+
+# ./Utils/settings_store.py
+
+"""
+Utils/settings_store.py
+
+Almacén clave-valor de settings con caché en memoria por grupo.
+
+Dos backends con la misma caché:
+  - FreeCAD.ParamGet (dentro de FreeCAD): el grupo de parámetros se lee una vez
+    (GetContents) y los valores se guardan con el setter nativo según el tipo.
+  - Archivos <grupo>.cfg (fuera de FreeCAD): una línea por escritura (append
+    barato), última escritura gana, y compactación atómica (tmp + os.replace)
+    cuando el archivo acumula demasiadas líneas repetidas.
+
+Valores tipados: str, int, float, bool y JSON (dict/list). En los .cfg el tipo
+va en la clave ("ancho:int=10", "activo:bool=true", "cols:json=[1,2]"); las
+líneas antiguas "clave=valor" se leen como str.
+
+Con un vigilante de archivos (attach_watcher, Utils/file_watcher.py) los .cfg
+cargados se suscriben: si otro proceso los modifica, el grupo se descarta y
+la próxima lectura relee. Las escrituras propias no invalidan (se compara con
+la firma registrada tras cada carga/escritura).
+
+Sólo usa la librería estándar: Utils.config lo importa antes que el logger.
+"""
+
+import os
+import json
+import threading
+from typing import Optional, Dict, Any
+
+PARAM_PATH = "User parameter:Plugins/ElectricalWorkbench"
+
+# Compactar cuando haya más de max(COMPACT_MIN_LINES, 2 * claves) líneas
+COMPACT_MIN_LINES = 64
+
+_TRUE = ("1", "true", "yes", "si", "sí", "on")
+
+_TYPE_TAGS = {bool: "bool", int: "int", float: "float", dict: "json", list: "json"}
+_MISSING = object()
+
+
+def _type_tag(value) -> Optional[str]:
+    # bool antes que int (bool es subclase de int)
+    for t, tag in _TYPE_TAGS.items():
+        if isinstance(value, t):
+            return tag
+    return None
+
+
+def _encode(value) -> str:
+    tag = _type_tag(value)
+    if tag == "bool":
+        return "true" if value else "false"
+    if tag == "json":
+        return json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+    return str(value)
+
+
+def _decode(tag: Optional[str], raw: str):
+    if tag == "bool":
+        return raw.strip().lower() in _TRUE
+    if tag == "int":
+        return int(raw)
+    if tag == "float":
+        return float(raw)
+    if tag == "json":
+        return json.loads(raw)
+    return raw
+
+
+def coerce(value, type_):
+    """
+    Convierte 'value' al tipo pedido (str, int, float, bool, dict/list o "json").
+    Si no se puede, retorna el valor sin cambios.
+    """
+    if type_ is None or value is None:
+        return value
+    try:
+        if type_ is bool:
+            return value if isinstance(value, bool) else str(value).strip().lower() in _TRUE
+        if type_ in (int, float):
+            return type_(value)
+        if type_ in (dict, list, "json"):
+            return json.loads(value) if isinstance(value, str) else value
+        if type_ is str:
+            return value if isinstance(value, str) else _encode(value)
+    except (TypeError, ValueError):
+        pass
+    return value
+
+
+def _format_line(key: str, value) -> str:
+    tag = _type_tag(value)
+    if tag is None and isinstance(value, str) and "\n" in value:
+        # strings multilínea: JSON en una sola línea
+        tag, text = "json", json.dumps(value, ensure_ascii=False)
+    else:
+        text = _encode(value)
+    return f"{key}:{tag}={text}" if tag else f"{key}={text}"
+
+
+def _file_signature(path: str):
+    try:
+        st = os.stat(path)
+        return (st.st_ino, st.st_size, st.st_mtime_ns)
+    except OSError:
+        return None
+
+
+def _parse_line(line: str):
+    if "=" not in line:
+        return None
+    k, raw = line.rstrip("\n").split("=", 1)
+    tag = None
+    if ":" in k:
+        base, maybe_tag = k.rsplit(":", 1)
+        if maybe_tag in ("bool", "int", "float", "json"):
+            k, tag = base, maybe_tag
+    try:
+        return k, _decode(tag, raw)
+    except ValueError:
+        return k, raw
+
+
+class SettingsStore:
+    """
+    Caché de settings por grupo, con ParamGet o archivos .cfg como respaldo.
+    Las lecturas calientes no tocan disco ni el árbol de parámetros.
+    """
+
+    def __init__(self, base_dir: str, freecad=None):
+        self.base_dir = base_dir
+        self._freecad = freecad
+        self._param = None
+        # versiones de FreeCAD sin GetContents: lectura por clave bajo demanda
+        self._param_contents_unavailable = False
+        self._lock = threading.RLock()
+        # grupo -> {clave: valor}; sólo se cargan grupos completos
+        self._groups: Dict[str, Dict[str, Any]] = {}
+        # grupo -> líneas actuales del .cfg (para decidir compactación)
+        self._lines: Dict[str, int] = {}
+        # vigilante de archivos (opcional) y, por grupo .cfg, firma tras la
+        # última carga/escritura propia y token de suscripción
+        self._watcher = None
+        self._signatures: Dict[str, Any] = {}
+        self._watch_tokens: Dict[str, int] = {}
+
+    # -------------------------
+    # CACHÉ
+    # -------------------------
+    def invalidate(self, group: Optional[str] = None):
+        """Descarta la caché (de un grupo o completa): la próxima lectura relee."""
+        with self._lock:
+            if group is None:
+                self._groups.clear()
+                self._lines.clear()
+                self._param = None
+            else:
+                self._groups.pop(group, None)
+                self._lines.pop(group, None)
+
+    def _group(self, group: str) -> Dict[str, Any]:
+        values = self._groups.get(group)
+        if values is None:
+            values = self._load_param_group(group) if self._freecad else self._load_file_group(group)
+            self._groups[group] = values
+        return values
+
+    def attach_watcher(self, watcher):
+        """
+        Suscribe los .cfg (los ya cargados y los que se carguen) a 'watcher'
+        (Utils/file_watcher.FileWatcher). Sin efecto con ParamGet.
+        """
+        if self._freecad:
+            return
+        with self._lock:
+            self._watcher = watcher
+            self._watch_tokens.clear()
+            for group in list(self._groups):
+                self._watch_group(group)
+
+    def _watch_group(self, group: str):
+        if self._watcher is not None and group not in self._watch_tokens:
+            self._watch_tokens[group] = self._watcher.subscribe([self._file_path(group)], self._on_file_event)
+
+    def _on_file_event(self, path: str, event: str):
+        """Aviso del vigilante: si el .cfg no es el que dejamos nosotros, descartar el grupo."""
+        group = os.path.basename(path)[:-4]
+        with self._lock:
+            if group in self._groups and _file_signature(path) != self._signatures.get(group):
+                self._groups.pop(group, None)
+                self._lines.pop(group, None)
+
+    # -------------------------
+    # API
+    # -------------------------
+    def get(self, group: str, key: str, default=None, type_=None):
+        """
+        Valor de group/key (default si no existe), convertido a type_ si se indica;
+        si no, al tipo de default cuando default no es None.
+        """
+        if type_ is None and default is not None:
+            type_ = type(default)
+        with self._lock:
+            values = self._group(group)
+            if key in values:
+                value = values[key]
+            elif self._freecad and self._param_contents_unavailable:
+                # se cachea también la ausencia (_MISSING) para no volver a consultar
+                value = values[key] = self._read_param(group, key, type_)
+            else:
+                value = _MISSING
+        if value is _MISSING or value is None:
+            return default
+        return coerce(value, type_)
+
+    def set(self, group: str, key: str, value) -> bool:
+        """Guarda group/key = value (tipado). Retorna True si se persistió."""
+        with self._lock:
+            values = self._group(group)
+            if self._freecad:
+                self._write_param(group, key, value)
+            else:
+                self._append_file(group, key, value, values)
+            values[key] = value
+        return True
+
+    # -------------------------
+    # BACKEND: FreeCAD.ParamGet
+    # -------------------------
+    def _param_group(self):
+        if self._param is None:
+            self._param = self._freecad.ParamGet(PARAM_PATH)
+        return self._param
+
+    def _load_param_group(self, group: str) -> Dict[str, Any]:
+        """Lee de una vez todos los parámetros 'group/...' del grupo del workbench."""
+        values: Dict[str, Any] = {}
+        prefix = f"{group}/"
+        try:
+            contents = self._param_group().GetContents() or []
+        except Exception:
+            self._param_contents_unavailable = True
+            return values
+        for item in contents:
+            try:
+                _kind, name, value = item[0], item[1], item[2]
+            except (TypeError, IndexError):
+                continue
+            if name.startswith(prefix):
+                values[name[len(prefix):]] = value
+        return values
+
+    def _read_param(self, group: str, key: str, type_):
+        param = self._param_group()
+        name = f"{group}/{key}"
+        if type_ is bool:
+            return param.GetBool(name, False) if name in self._param_keys(param, "GetBools") else _MISSING
+        if type_ is int:
+            return param.GetInt(name, 0) if name in self._param_keys(param, "GetInts") else _MISSING
+        if type_ is float:
+            return param.GetFloat(name, 0.0) if name in self._param_keys(param, "GetFloats") else _MISSING
+        value = param.GetString(name, "")
+        return value if value != "" else _MISSING
+
+    @staticmethod
+    def _param_keys(param, getter: str):
+        try:
+            return set(getattr(param, getter)())
+        except Exception:
+            return set()
+
+    def _write_param(self, group: str, key: str, value):
+        param = self._param_group()
+        name = f"{group}/{key}"
+        tag = _type_tag(value)
+        if tag == "bool":
+            param.SetBool(name, bool(value))
+        elif tag == "int":
+            param.SetInt(name, int(value))
+        elif tag == "float":
+            param.SetFloat(name, float(value))
+        else:
+            param.SetString(name, _encode(value))
+
+    # -------------------------
+    # BACKEND: archivos .cfg
+    # -------------------------
+    def _file_path(self, group: str) -> str:
+        return os.path.join(self.base_dir, f"{group}.cfg")
+
+    def _load_file_group(self, group: str) -> Dict[str, Any]:
+        values: Dict[str, Any] = {}
+        lines = 0
+        self._watch_group(group)
+        # firma antes de leer: un cambio durante la lectura difiere y vuelve a invalidar
+        self._signatures[group] = _file_signature(self._file_path(group))
+        try:
+            with open(self._file_path(group), "r", encoding="utf-8") as f:
+                for line in f:
+                    parsed = _parse_line(line)
+                    if parsed is None:
+                        continue
+                    lines += 1
+                    values[parsed[0]] = parsed[1]  # última escritura gana
+        except OSError:
+            pass
+        self._lines[group] = lines
+        return values
+
+    def _append_file(self, group: str, key: str, value, values: Dict[str, Any]):
+        os.makedirs(self.base_dir, exist_ok=True)
+        with open(self._file_path(group), "a", encoding="utf-8") as f:
+            f.write(_format_line(key, value) + "\n")
+        self._lines[group] = self._lines.get(group, 0) + 1
+        self._signatures[group] = _file_signature(self._file_path(group))
+
+        unique = len(values) + (0 if key in values else 1)
+        if self._lines[group] > max(COMPACT_MIN_LINES, 2 * unique):
+            values = dict(values, **{key: value})
+            self._compact_file(group, values)
+
+    def _compact_file(self, group: str, values: Dict[str, Any]):
+        """Reescribe el .cfg con una línea por clave (tmp + os.replace)."""
+        path = self._file_path(group)
+        tmp = path + ".tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                for k, v in values.items():
+                    f.write(_format_line(k, v) + "\n")
+            os.replace(tmp, path)
+            self._lines[group] = len(values)
+            self._signatures[group] = _file_signature(path)
+        except OSError:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+
+    def compact(self, group: Optional[str] = None):
+        """Compacta los .cfg (sin efecto con ParamGet)."""
+        if self._freecad:
+            return
+        with self._lock:
+            if group:
+                groups = [group]
+            elif os.path.isdir(self.base_dir):
+                groups = [f[:-4] for f in os.listdir(self.base_dir) if f.endswith(".cfg")]
+            else:
+                groups = []
+            for g in groups:
+                values = {k: v for k, v in self._group(g).items() if v is not _MISSING}
+                self._compact_file(g, values)
@@ -0,0 +1,105 @@
+
+
+# ./benchmarks/bench_commands.py
+
+"""
+Benchmark de register_all_commands() sobre N carpetas de comandos sintéticas.
+
+Cada medición corre en un subproceso nuevo (imports en frío, como al abrir
+FreeCAD). Se copia Commands/__init__.py a un paquete temporal para no tocar
+el árbol del repo. Se mide sin manifiesto (primer arranque / archivos
+modificados) y con manifiesto vigente (arranques siguientes).
+"""
+
+import os
+import json
+import shutil
+import subprocess
+import sys
+
+from common import REPO_ROOT, STUB_DIR, WORK_DIR, measure
+
+_MODULE_TEMPLATE = '''
+import json
+import os
+
+TABLE = {{i: str(i) * 4 for i in range(200)}}
+
+
+def _helper_{idx}(value):
+    return json.dumps({{"value": value, "idx": {idx}}})
+
+
+class Bench{idx}:
+    def GetResources(self):
+        return {{"MenuText": "Bench {idx}", "ToolTip": "Comando sintético {idx}"}}
+
+    def Activated(self):
+        return _helper_{idx}(os.getcwd())
+'''
+
+_CHILD = r'''
+import json, os, sys, time
+sys.path[:0] = [{stub!r}, {pkg!r}, {repo!r}]
+os.environ["EW_DATA_DIR"] = {data!r}
+t0 = time.perf_counter_ns()
+import Commands
+t1 = time.perf_counter_ns()
+registered = Commands.register_all_commands()
+t2 = time.perf_counter_ns()
+print(json.dumps({{"import_ms": (t1 - t0) / 1e6, "register_ms": (t2 - t1) / 1e6, "count": len(registered)}}))
+'''
+
+
+def _build_tree(n: int) -> str:
+    pkg_root = os.path.join(WORK_DIR, f"commands_{n}")
+    shutil.rmtree(pkg_root, ignore_errors=True)
+    cmd_dir = os.path.join(pkg_root, "Commands")
+    os.makedirs(cmd_dir)
+    shutil.copy(os.path.join(REPO_ROOT, "Commands", "__init__.py"), cmd_dir)
+    for i in range(n):
+        folder = os.path.join(cmd_dir, f"Bench{i}")
+        os.makedirs(folder)
+        with open(os.path.join(folder, f"Bench{i}_Command.py"), "w", encoding="utf-8") as f:
+            f.write(_MODULE_TEMPLATE.format(idx=i))
+    return pkg_root
+
+
+def _run_child(pkg_root: str, data_dir: str) -> dict:
+    code = _CHILD.format(stub=STUB_DIR, pkg=pkg_root, repo=REPO_ROOT, data=data_dir)
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def run(results, counts, quick: bool = False):
+    repeat = 3 if quick else 5
+    for n in counts:
+        print(f"[commands] folders={n}", flush=True)
+        pkg_root = _build_tree(n)
+        data_dir = os.path.join(WORK_DIR, f"commands_data_{n}")
+        manifest = os.path.join(data_dir, "commands_manifest.json")
+
+        def drop_manifest():
+            if os.path.exists(manifest):
+                os.remove(manifest)
+
+        for label, setup in (("no manifest", drop_manifest), ("manifest", None)):
+            samples = []
+
+            def once():
+                samples.append(_run_child(pkg_root, data_dir))
+
+            if setup is None:
+                _run_child(pkg_root, data_dir)  # genera el manifiesto
+            stats = measure(once, repeat=repeat, setup=setup)
+            # el tiempo relevante es el de register_all_commands dentro del hijo
+            register = sorted(s["register_ms"] for s in samples)
+            stats.update({
+                "process_median_ms": stats["median_ms"],
+                "min_ms": register[0],
+                "median_ms": register[len(register) // 2],
+                "p95_ms": register[-1],
+                "mean_ms": sum(register) / len(register),
+                "ops_per_s": None,
+            })
+            results.add("commands", f"register_all_commands ({label})", stats, folders=n)
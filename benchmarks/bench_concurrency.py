@@ -0,0 +1,110 @@
+
+
+# ./benchmarks/bench_concurrency.py
+
+"""
+Prueba de estrés de DBManager con varios procesos escritores sobre la misma
+carpeta de datos (varias instancias de FreeCAD o una .data compartida).
+
+Cada proceso da de alta sus propios clientes y modifica repetidamente un
+cliente propio ya existente (cambios que no entran en conflicto entre sí).
+Al terminar se verifica que no se perdió ninguna actualización: todas las
+altas presentes y el último valor de cada cliente modificado. Se mide el
+throughput total con y sin candado entre procesos (sin candado se esperan
+actualizaciones perdidas). run() retorna los casos con candado que perdieron
+datos: benchmarks/run.py sale con código 1 si hay alguno. La misma garantía
+se verifica en tests/test_concurrency.py.
+"""
+
+import os
+import json
+import subprocess
+import sys
+
+from common import REPO_ROOT, STUB_DIR, reset_data_dir, make_clients
+
+_CHILD = r'''
+import json, os, sys, time
+sys.path[:0] = [{stub!r}, {repo!r}]
+os.environ["EW_DATA_DIR"] = {data!r}
+import FreeCAD  # stub: Utils sólo usa FreeCAD si ya está cargado
+from Utils.db_manager import DBManager
+worker, ops = {worker}, {ops}
+db = DBManager(journal={journal}, locking={locking}, write_behind=False)
+db.load_clients()
+go = {go!r}
+while not os.path.exists(go):
+    time.sleep(0.001)
+start = time.time()
+for i in range(ops):
+    db.add_or_update_client({{"cuit": "9%02d%08d" % (worker, i), "name": "W%d-%d" % (worker, i)}})
+    db.add_or_update_client({{"cuit": {own!r}, "address": "w%d #%d" % (worker, i)}})
+end = time.time()
+print(json.dumps({{"start": start, "end": end, "merges": db.merges, "conflicts": db.conflicts}}))
+'''
+
+
+def _stress(data_dir: str, writers: int, ops: int, journal: bool, locking: bool) -> dict:
+    from Utils.db_manager import DBManager
+
+    seed = make_clients(writers)
+    DBManager(journal=journal, locking=True).save_clients(seed)
+    go = os.path.join(data_dir, "go")
+    children = []
+    for w in range(writers):
+        code = _CHILD.format(stub=STUB_DIR, repo=REPO_ROOT, data=data_dir, worker=w, ops=ops,
+                             journal=journal, locking=locking, go=go, own=seed[w]["cuit"])
+        children.append(subprocess.Popen([sys.executable, "-c", code], stdout=subprocess.PIPE, text=True))
+    open(go, "w").close()
+    reports = []
+    for child in children:
+        out, _ = child.communicate()
+        if child.returncode != 0:
+            raise RuntimeError(f"escritor falló (código {child.returncode})")
+        reports.append(json.loads(out.strip().splitlines()[-1]))
+
+    clients = {c["cuit"]: c for c in DBManager(journal=journal).load_clients()}
+    created = sum(1 for w in range(writers) for i in range(ops) if "9%02d%08d" % (w, i) in clients)
+    updated = sum(1 for w in range(writers)
+                  if clients.get(seed[w]["cuit"], {}).get("address") == "w%d #%d" % (w, ops - 1))
+    expected = writers * ops
+    wall = max(r["end"] for r in reports) - min(r["start"] for r in reports)
+    return {
+        "wall_ms": wall * 1000,
+        "ops_per_s": (2 * expected / wall) if wall > 0 else None,
+        "lost_creates": expected - created,
+        "lost_updates": writers - updated,
+        "merges": sum(r["merges"] for r in reports),
+        "conflicts": sum(r["conflicts"] for r in reports),
+    }
+
+
+def run(results, writer_counts, quick: bool = False) -> list:
+    """Corre la prueba de estrés; retorna la lista de casos con candado que perdieron datos."""
+    ops = 50 if quick else 200
+    failures = []
+    for writers in writer_counts:
+        print(f"[concurrency] writers={writers}", flush=True)
+        for journal in (False, True):
+            for locking in (True, False):
+                data_dir = reset_data_dir(f"stress_{writers}_{int(journal)}_{int(locking)}")
+                out = _stress(data_dir, writers, ops, journal, locking)
+                if locking and (out["lost_creates"] or out["lost_updates"] or out["conflicts"]):
+                    print(f"  ERROR: actualizaciones perdidas con candado: {out}", file=sys.stderr, flush=True)
+                    failures.append(f"writers={writers} {'journal' if journal else 'json'}")
+                stats = {
+                    "repeat": 1,
+                    "number": 2 * writers * ops,
+                    "min_ms": out["wall_ms"],
+                    "median_ms": out["wall_ms"],
+                    "p95_ms": out["wall_ms"],
+                    "mean_ms": out["wall_ms"],
+                    "ops_per_s": out["ops_per_s"],
+                    "lost_creates": out["lost_creates"],
+                    "lost_updates": out["lost_updates"],
+                    "merges": out["merges"],
+                    "conflicts": out["conflicts"],
+                }
+                name = f"{'journal' if journal else 'json'} {'locking' if locking else 'no lock'}"
+                results.add("concurrency", name, stats, writers=writers, ops=ops)
+    return failures
@@ -0,0 +1,517 @@
+
+
+# ./benchmarks/bench_db.py
+
+"""
+Benchmarks de la capa de datos: DBManager (JSON, JSON+journal, JSON
+write-behind, SQLite),
+búsqueda de texto, consultas paginadas, lectura en streaming vs carga
+completa (tiempo y pico de memoria), serialización, registros tipados
+(memoria por registro, costo de upsert), get_project_path, get_setting,
+lecturas con caché vigente con y sin vigilante de archivos (inotify),
+importación / exportación CSV y NDJSON (filas/s, pico de memoria),
+historial de cambios (costo por commit, consultas en una fecha, bytes por
+cambio) e índice de carpetas de proyecto (escaneo completo vs incremental).
+"""
+
+import itertools
+import random
+import statistics
+from typing import Tuple
+
+from common import measure, reset_data_dir, make_clients, make_projects
+
+
+def _repeat_for(size: int, small: int, large: int) -> int:
+    return small if size <= 10_000 else large
+
+
+def _bench_manager(results, size: int, backend: str, quick: bool):
+    from Utils.db_manager import DBManager
+    from Utils.db_sqlite import SQLiteDBManager
+
+    reset_data_dir(f"data_{backend}_{size}")
+    clients = make_clients(size)
+    projects = make_projects(size, size)
+
+    def new_manager():
+        if backend == "sqlite":
+            return SQLiteDBManager()
+        return DBManager(journal=(backend == "journal"), write_behind=(backend == "write-behind"))
+
+    db = new_manager()
+    labels = {"backend": backend, "size": size}
+    rnd = random.Random(7)
+    few = _repeat_for(size, 5, 3)
+    many = 200 if quick else 2000
+
+    results.add("db", "save_clients", measure(lambda: db.save_clients(clients), repeat=few), **labels)
+    results.add("db", "save_projects_data",
+                measure(lambda: db.save_projects_data({"projects": projects, "current_project_id": projects[0]["id"]}),
+                        repeat=few), **labels)
+
+    # lectura en frío: instancia nueva, primer acceso parsea el archivo
+    results.add("db", "load_projects (cold)", measure(lambda: new_manager().load_projects(), repeat=few), **labels)
+    results.add("db", "load_clients (warm)", measure(db.load_clients, repeat=few), **labels)
+
+    cuits = itertools.cycle([c["cuit"] for c in rnd.sample(clients, min(len(clients), 1000))])
+    ids = itertools.cycle([p["id"] for p in rnd.sample(projects, min(len(projects), 1000))])
+    results.add("db", "find_client_by_cuit", measure(lambda: db.find_client_by_cuit(next(cuits)), repeat=5, number=many), **labels)
+    results.add("db", "find_project_by_id", measure(lambda: db.find_project_by_id(next(ids)), repeat=5, number=many), **labels)
+    results.add("db", "get_current_project", measure(db.get_current_project, repeat=5, number=many), **labels)
+
+    # mutaciones de un registro (en modo JSON reescriben el archivo completo)
+    upd = itertools.cycle(clients[:100])
+    results.add("db", "add_or_update_client (update)",
+                measure(lambda: db.add_or_update_client(dict(next(upd), contact_phone="1")), repeat=few), **labels)
+    pupd = itertools.cycle(projects[:100])
+    results.add("db", "add_or_update_project (update)",
+                measure(lambda: db.add_or_update_project(dict(next(pupd), status="Aprobado"), mark_current=False),
+                        repeat=few), **labels)
+    results.add("db", "set_current_project",
+                measure(lambda: db.set_current_project(next(ids)), repeat=few), **labels)
+
+    batch = make_clients(1000, seed=99)
+    for c in batch:
+        c["cuit"] = "9" + c["cuit"]
+    results.add("db", "bulk_upsert_clients (1000)", measure(lambda: db.bulk_upsert_clients(batch), repeat=3), **labels)
+
+    if backend == "write-behind":
+        # N mutaciones en memoria + un único volcado por archivo
+        def burst():
+            for c in clients[:100]:
+                db.add_or_update_client(dict(c, contact_phone="2"))
+            db.flush()
+        results.add("db", "100 x add_or_update_client + flush", measure(burst, repeat=few), **labels)
+        db.flush()
+
+    if backend == "sqlite":
+        db.close()
+
+
+def _bench_search(results, size: int, quick: bool):
+    import os
+    from Utils.db_manager import DBManager
+
+    reset_data_dir(f"data_search_{size}")
+    clients = make_clients(max(1, size // 10))
+    projects = make_projects(size, len(clients))
+    db = DBManager()
+    db.save_clients(clients)
+    db.save_projects_data({"projects": projects, "current_project_id": None})
+    db.load_projects()
+    labels = {"size": size}
+    few = _repeat_for(size, 5, 3)
+
+    def drop_persisted():
+        db.reload()
+        for kind in ("clients", "projects"):
+            path = db._search_path(kind)
+            if os.path.exists(path):
+                os.remove(path)
+        db._data("clients"), db._data("projects")
+
+    # construcción desde la caché vs carga del índice persistido (archivo JSON ya parseado)
+    results.add("search", "index build", measure(lambda: db.search("x"), repeat=few, setup=drop_persisted), **labels)
+    results.add("search", "index load (persisted)",
+                measure(lambda: db.search("x"), repeat=few,
+                        setup=lambda: (db.reload(), db._data("clients"), db._data("projects"))), **labels)
+
+    many = 20 if quick else 200
+    queries = {
+        "exact (1 term)": "hospital",
+        "prefix": "sanat",
+        "multi term": "planta industrial solar",
+        "code": projects[size // 2]["code"],
+        "typo (fuzzy)": "frigorfico",
+    }
+    db.search(queries["typo (fuzzy)"])  # trigramas: se construyen en la primera consulta aproximada
+    for name, query in queries.items():
+        results.add("search", f"search {name}", measure(lambda: db.search(query), repeat=5, number=many), **labels)
+
+    upd = itertools.cycle(projects[:100])
+    results.add("search", "add_or_update_project (indexed)",
+                measure(lambda: db.add_or_update_project(dict(next(upd), name="Renombrado"), mark_current=False),
+                        repeat=few), **labels)
+
+
+def _bench_query(results, size: int, quick: bool):
+    from Utils.db_manager import DBManager
+
+    reset_data_dir(f"data_query_{size}")
+    projects = make_projects(size, max(1, size // 10))
+    db = DBManager()
+    db.save_projects_data({"projects": projects, "current_project_id": None})
+    db.query_projects(limit=1)  # construye los índices secundarios
+    labels = {"size": size}
+    many = 20 if quick else 200
+
+    def full_scan():
+        # lo que hacía la GUI: materializar todo, filtrar y ordenar
+        rows = [p for p in db.load_projects() if p.get("status") == "En proceso"]
+        rows.sort(key=lambda p: p.get("updated_at") or "", reverse=True)
+        return rows[:50]
+
+    results.add("query", "load+filter+sort (page 50)", measure(full_scan, repeat=_repeat_for(size, 5, 3)), **labels)
+    results.add("query", "query_projects status -updated_at (page 50)",
+                measure(lambda: db.query_projects({"status": "En proceso"}, "-updated_at", limit=50),
+                        repeat=5, number=many), **labels)
+    results.add("query", "query_projects -updated_at (page 50, offset 1000)",
+                measure(lambda: db.query_projects(order_by="-updated_at", limit=50, offset=min(1000, size // 2)),
+                        repeat=5, number=many), **labels)
+    client_id = projects[0]["client_id"]
+    results.add("query", "query_projects client_id+is_macro",
+                measure(lambda: db.query_projects({"client_id": client_id, "is_macro": False}, "created_at", limit=50),
+                        repeat=5, number=many), **labels)
+    results.add("query", "count_projects status",
+                measure(lambda: db.count_projects({"status": ["Aprobado", "Finalizado"]}), repeat=5, number=many), **labels)
+
+    # agregados por cliente (dashboards)
+    clients = make_clients(max(1, size // 10))
+    db.save_clients(clients)
+    db.query_projects(limit=1)
+    results.add("query", "get_client_summary", measure(lambda: db.get_client_summary(client_id), repeat=5, number=many), **labels)
+    results.add("query", "get_client_summaries (all clients)",
+                measure(db.get_client_summaries, repeat=_repeat_for(size, 5, 3)), **labels)
+
+
+def _peak_kb(fn) -> float:
+    """Pico de memoria asignada (tracemalloc) durante una ejecución de fn, en KB."""
+    import tracemalloc
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1] / 1024
+    finally:
+        tracemalloc.stop()
+
+
+def _bench_stream(results, size: int, quick: bool):
+    from Utils.db_manager import DBManager
+    from Utils.paths import get_project_path, invalidate_project_path_cache
+
+    reset_data_dir(f"data_stream_{size}")
+    projects = make_projects(size, max(1, size // 10))
+    DBManager().save_projects_data({"projects": projects, "current_project_id": projects[size // 2]["id"]})
+    labels = {"size": size}
+    few = _repeat_for(size, 5, 3)
+    first, middle = projects[0]["id"], projects[size // 2]["id"]
+
+    # caché fría en todos los casos: instancia nueva por medición
+    cases = {
+        "load_projects (full)": lambda: len(DBManager().load_projects()),
+        "iter_projects (count)": lambda: sum(1 for _ in DBManager().iter_projects()),
+        "find_project_by_id first (full load)": lambda: DBManager()._find_project(first),
+        "find_project_by_id first (stream)": lambda: DBManager().find_project_by_id(first),
+        "find_project_by_id middle (stream)": lambda: DBManager().find_project_by_id(middle),
+    }
+    for name, fn in cases.items():
+        stats = measure(fn, repeat=few)
+        stats["peak_kb"] = _peak_kb(fn)
+        results.add("stream", name, stats, **labels)
+
+    def project_path():
+        invalidate_project_path_cache()
+        return get_project_path()
+
+    stats = measure(project_path, repeat=few)
+    stats["peak_kb"] = _peak_kb(project_path)
+    results.add("stream", "get_project_path (cold, current in middle)", stats, **labels)
+
+
+def _bench_serialization(results, size: int, quick: bool):
+    from Utils.serialization import FORMATS, dumps, loads, resolve_format
+
+    data = {"current_project_id": None, "projects": make_projects(size, max(1, size // 10))}
+    labels = {"size": size}
+    few = _repeat_for(size, 5, 3)
+    for fmt in FORMATS:
+        if resolve_format(fmt) != fmt:
+            continue  # orjson no instalado
+        raw = dumps(data, fmt)
+        stats = measure(lambda: dumps(data, fmt), repeat=few)
+        stats["size_kb"] = len(raw) / 1024
+        results.add("serialization", f"encode {fmt}", stats, **labels)
+        stats = measure(lambda: loads(raw), repeat=few)
+        stats["size_kb"] = len(raw) / 1024
+        results.add("serialization", f"decode {fmt}", stats, **labels)
+
+
+def _retained_kb(build) -> Tuple[float, object]:
+    """Memoria que queda asignada (tracemalloc) por el resultado de build(), en KB."""
+    import tracemalloc
+    tracemalloc.start()
+    try:
+        value = build()
+        return tracemalloc.get_traced_memory()[0] / 1024, value
+    finally:
+        tracemalloc.stop()
+
+
+def _bench_records(results, size: int, quick: bool):
+    from Utils.db_manager import DBManager
+    from Utils.records import Project, intern_project
+    from Utils.serialization import dumps, loads
+
+    reset_data_dir(f"data_records_{size}")
+    projects = make_projects(size, max(1, size // 10))
+    DBManager().save_projects_data({"projects": projects, "current_project_id": None})
+    labels = {"size": size}
+    few = _repeat_for(size, 5, 3)
+
+    # memoria por registro: contenedor (dict vs __slots__) y strings de status/type
+    raw = dumps({"projects": projects}, "json")
+    for name, build in (
+        ("dict", lambda: loads(raw)["projects"]),
+        ("dict (interned)", lambda: [intern_project(p) for p in loads(raw)["projects"]]),
+        ("Project", lambda: [Project.from_dict(p) for p in loads(raw)["projects"]]),
+    ):
+        kb, _ = _retained_kb(build)
+        stats = measure(build, repeat=few)
+        stats["bytes_per_record"] = kb * 1024 / size
+        results.add("records", f"decode -> {name}", stats, **labels)
+
+    # costo de CPU de add_or_update_project (dentro de una transacción: sin escritura por llamada)
+    many = 1000 if quick else 10_000
+    for records in (False, True):
+        db = DBManager(records=records)
+        loaded = db.load_projects()
+        rnd = random.Random(7)
+        batch = [loaded[rnd.randrange(size)] for _ in range(many)]
+        for p in batch:
+            p["status"] = "Aprobado"  # funciona igual con dict y con Project
+
+        def upserts():
+            for p in batch:
+                db.add_or_update_project(p, mark_current=False)
+
+        with db.transaction():
+            stats = measure(upserts, repeat=few)
+        results.add("records", f"add_or_update_project x{many} ({'Project' if records else 'dict'})",
+                    stats, **labels)
+
+
+def _bench_project_files(results, quick: bool):
+    import os
+    from Utils.db_manager import DBManager
+    from Utils.project_files import ProjectFileIndex
+
+    count = 50 if quick else 200
+    data_dir = reset_data_dir("data_project_files")
+    root = os.path.join(os.path.dirname(data_dir), "project_tree")
+    db = DBManager()
+    projects = []
+    for i in range(count):
+        path = os.path.join(root, f"p{i:04d}")
+        for sub in ("", "planos", "calculos", os.path.join("planos", "rev")):
+            os.makedirs(os.path.join(path, sub), exist_ok=True)
+            for j in range(20):
+                with open(os.path.join(path, sub, f"doc{j}.FCStd" if j < 3 else f"f{j}.txt"), "w") as f:
+                    f.write("x" * (j * 64))
+        projects.append({"name": f"P{i}", "path": path})
+    projects.append({"name": "sin carpeta", "path": os.path.join(root, "no-existe")})
+    db.bulk_upsert_projects(projects)
+    labels = {"projects": count, "dirs": count * 4}
+    index_path = os.path.join(data_dir, "project_files.index")
+
+    def drop_index():
+        if os.path.exists(index_path):
+            os.remove(index_path)
+
+    for workers in (1, 8):
+        results.add("project_files", f"scan full (workers={workers})",
+                    measure(lambda: ProjectFileIndex().scan(db, workers=workers), repeat=3, setup=drop_index), **labels)
+    ProjectFileIndex().scan(db)
+    results.add("project_files", "rescan unchanged (workers=8)",
+                measure(lambda: ProjectFileIndex().scan(db), repeat=3), **labels)
+    index = ProjectFileIndex()
+    results.add("project_files", "missing + largest(10) (index only)",
+                measure(lambda: (index.missing(), index.largest(10)), repeat=5, number=100), **labels)
+
+
+def _bench_paths_and_settings(results, size: int, quick: bool):
+    from Utils.db_manager import DBManager
+    from Utils.paths import get_project_path, invalidate_project_path_cache
+    from Utils.config import get_setting, save_setting, get_settings_store
+
+    reset_data_dir(f"data_paths_{size}")
+    projects = make_projects(size, size)
+    db = DBManager()
+    db.save_projects_data({"projects": projects, "current_project_id": projects[-1]["id"]})
+    many = 200 if quick else 2000
+    labels = {"size": size}
+
+    results.add("paths", "get_project_path (cached)", measure(get_project_path, repeat=5, number=many), **labels)
+    results.add("paths", "get_project_path (cold)",
+                measure(get_project_path, repeat=_repeat_for(size, 5, 3), setup=invalidate_project_path_cache), **labels)
+
+    save_setting("Bench", "key", "value")
+    results.add("config", "get_setting (hot)",
+                measure(lambda: get_setting("Bench", "key", "x"), repeat=5, number=many * 10), **labels)
+    results.add("config", "get_setting (cold group)",
+                measure(lambda: get_setting("Bench", "key", "x"), repeat=5,
+                        setup=lambda: get_settings_store().invalidate("Bench")), **labels)
+    counter = itertools.count()
+    results.add("config", "save_setting",
+                measure(lambda: save_setting("Bench", "key", next(counter)), repeat=5, number=100), **labels)
+
+
+def _bench_watcher(results, size: int, quick: bool):
+    import time
+    from Utils.db_manager import DBManager
+    from Utils.file_watcher import get_watcher
+
+    watcher = get_watcher()
+    if watcher is None or watcher.backend != "inotify":
+        print("[db] watcher: sin inotify, se omite", flush=True)
+        return
+    reset_data_dir(f"data_watcher_{size}")
+    projects = make_projects(size, size)
+    DBManager().save_projects_data({"projects": projects, "current_project_id": None})
+    ids = [p["id"] for p in random.Random(3).sample(projects, 100)]
+    many = 20 if quick else 200
+    labels = {"size": size}
+
+    for journal in (False, True):
+        mode = "journal" if journal else "json"
+        for watch in (False, True):
+            db = DBManager(journal=journal, watch=watch, write_behind=False)
+            db.load_projects()  # carga la caché (find_project_by_id en frío lee en streaming)
+            time.sleep(0.05)  # avisos de la escritura inicial
+            db.find_project_by_id(ids[0])
+            results.add("watcher", f"find_project_by_id hit x100 ({mode}, watch={watch})",
+                        measure(lambda: [db.find_project_by_id(i) for i in ids], repeat=5, number=many), **labels)
+            db.close()
+
+    # demora desde que otro escritor terminó (os.replace) hasta que la caché queda invalidada
+    db = DBManager(watch=True, write_behind=False)
+    db.load_projects()
+    entry = db._files["projects"]
+    writer = DBManager(watch=False, write_behind=False)
+    samples = []
+    for n in range(5 if quick else 20):
+        db.find_project_by_id(ids[0])
+        writer.add_or_update_project({"id": ids[1], "name": f"cambio {n}"}, mark_current=False)
+        start = time.perf_counter_ns()
+        while entry.verified:
+            time.sleep(0.0001)
+        samples.append((time.perf_counter_ns() - start) / 1e6)
+    db.close()
+    samples.sort()
+    median = statistics.median(samples)
+    results.add("watcher", "invalidation delay after write",
+                {"repeat": len(samples), "number": 1, "min_ms": samples[0], "median_ms": median,
+                 "p95_ms": samples[min(len(samples) - 1, int(round(0.95 * (len(samples) - 1))))],
+                 "mean_ms": statistics.fmean(samples), "ops_per_s": 1000.0 / median}, **labels)
+
+
+def _bench_exchange(results, size: int, quick: bool):
+    import os
+    from Utils.db_manager import DBManager
+    from Utils.data_exchange import export_file, import_file, cuit_check_digit
+
+    data_dir = reset_data_dir(f"data_exchange_{size}")
+    n_clients = max(1, size // 10)
+    clients = make_clients(n_clients)
+    for client in clients:
+        # CUIT con dígito verificador válido (la importación los valida)
+        base = client["cuit"][:10]
+        digit = cuit_check_digit(base)
+        client["cuit"] = client["id"] = base + str(digit if digit is not None else 0)
+    projects = make_projects(size, n_clients)
+    for i, project in enumerate(projects):
+        project["client_id"] = clients[i % n_clients]["id"]
+    DBManager().save_clients(clients)
+    DBManager().save_projects_data({"projects": projects, "current_project_id": None})
+    del projects
+    labels = {"size": size}
+    repeat = _repeat_for(size, 3, 1)
+
+    for fmt in ("csv", "ndjson"):
+        path = os.path.join(data_dir, f"projects.{fmt}")
+
+        # manager nuevo por muestra: caché fría, los proyectos se leen en streaming
+        def export():
+            return export_file(DBManager(watch=False), "projects", path)
+
+        stats = measure(export, repeat=repeat)
+        stats["peak_kb"] = _peak_kb(export)
+        results.add("exchange", f"export projects + client join ({fmt})", stats, **labels)
+
+    path = os.path.join(data_dir, "projects.csv")
+
+    def fresh_projects():
+        DBManager(watch=False).save_projects_data({"projects": [], "current_project_id": None})
+
+    results.add("exchange", "import projects csv (new, client_cuit -> id)",
+                measure(lambda: import_file(DBManager(watch=False), "projects", path), repeat=repeat,
+                        setup=fresh_projects), **labels)
+    results.add("exchange", "import projects csv (update existing)",
+                measure(lambda: import_file(DBManager(watch=False), "projects", path), repeat=repeat), **labels)
+
+
+def _bench_history(results, size: int, quick: bool):
+    import time
+    from Utils.db_manager import DBManager
+
+    reset_data_dir(f"data_history_{size}")
+    projects = make_projects(size, max(1, size // 10))
+    DBManager(watch=False, history=True).save_projects_data({"projects": projects, "current_project_id": None})
+    del projects
+    labels = {"size": size}
+    few = _repeat_for(size, 5, 3)
+    many = 200 if quick else 1000
+
+    # costo por commit de add_or_update_project (journal: sin reescribir el archivo por llamada)
+    marks = []
+    for history in (False, True):
+        db = DBManager(journal=True, write_behind=False, watch=False, history=history)
+        loaded = db.load_projects()
+        rnd = random.Random(11)
+        batch = [loaded[rnd.randrange(size)] for _ in range(many)]
+
+        def upserts():
+            for p in batch:
+                p["status"] = rnd.choice(("Aprobado", "En proceso", "Cerrado"))
+                db.add_or_update_project(p, mark_current=False)
+                if history:
+                    marks.append((p["id"], time.time()))
+
+        stats = measure(upserts, repeat=few)
+        stats["ms_per_commit"] = stats["median_ms"] / many
+        results.add("history", f"add_or_update_project x{many} ({'with' if history else 'without'} history)",
+                    stats, **labels)
+        db.close()
+
+    # consultas puntuales: checkpoint en streaming + log del segmento
+    db = DBManager(watch=False, history=True)
+    rnd = random.Random(13)
+    probes = [marks[rnd.randrange(len(marks))] for _ in range(20)]
+    it = itertools.cycle(probes)
+    results.add("history", "record_at (random change)",
+                measure(lambda: db.record_at("projects", *next(it)), repeat=len(probes)), **labels)
+    stats = measure(lambda: db.records_at("projects", probes[0][1]), repeat=few)
+    # almacenamiento proporcional a los cambios: bytes de log por cambio registrado
+    storage = db.history_stats("projects")
+    stats.update(segments=storage["segments"], checkpoint_bytes=storage["checkpoint_bytes"],
+                 log_bytes=storage["log_bytes"], log_bytes_per_change=storage["log_bytes"] / max(1, len(marks)))
+    results.add("history", "records_at (whole dataset)", stats, **labels)
+    db.close()
+
+
+def run(results, sizes, quick: bool = False, backends=("json", "journal", "write-behind", "sqlite")):
+    for size in sizes:
+        print(f"[db] size={size}", flush=True)
+        for backend in backends:
+            _bench_manager(results, size, backend, quick)
+        _bench_search(results, size, quick)
+        _bench_query(results, size, quick)
+        _bench_stream(results, size, quick)
+        _bench_serialization(results, size, quick)
+        _bench_records(results, size, quick)
+        _bench_paths_and_settings(results, size, quick)
+        _bench_watcher(results, size, quick)
+        _bench_exchange(results, size, quick)
+        _bench_history(results, size, quick)
+    print("[db] project_files", flush=True)
+    _bench_project_files(results, quick)
@@ -0,0 +1,159 @@
+
+
+# ./benchmarks/common.py
+
+"""
+Utilidades compartidas por los benchmarks: entorno aislado con el stub de
+FreeCAD, medición de tiempos y generación de datasets sintéticos.
+
+Importar este módulo ANTES que cualquier módulo de Utils/Commands: ajusta
+sys.path y las variables de entorno (EW_DATA_DIR, EW_BENCH_HOME).
+"""
+
+import os
+import sys
+import time
+import random
+import shutil
+import tempfile
+import statistics
+from typing import Callable, Dict, List, Optional
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCH_DIR)
+STUB_DIR = os.path.join(BENCH_DIR, "freecad_stub")
+
+WORK_DIR = tempfile.mkdtemp(prefix="ew_bench_")
+os.environ.setdefault("EW_BENCH_HOME", os.path.join(WORK_DIR, "home"))
+os.environ["EW_DATA_DIR"] = os.path.join(WORK_DIR, "data")
+
+# El stub sólo se usa si no hay un FreeCAD real importable. Se importa acá:
+# Utils usa FreeCAD sólo si ya está cargado (ver Utils.config.get_freecad).
+try:
+    import FreeCAD  # noqa: F401  (efecto: queda en sys.modules y Utils lo usa)
+except ImportError:
+    sys.path.insert(0, STUB_DIR)
+    import FreeCAD  # noqa: F401  (efecto: carga el stub en sys.modules)
+if REPO_ROOT not in sys.path:
+    sys.path.insert(1, REPO_ROOT)
+
+
+def cleanup():
+    shutil.rmtree(WORK_DIR, ignore_errors=True)
+
+
+def reset_data_dir(name: str = "data") -> str:
+    """Carpeta de datos vacía y nueva para el próximo caso (invalida cachés de paths)."""
+    from Utils.paths import clear_path_cache
+    path = os.path.join(WORK_DIR, name)
+    shutil.rmtree(path, ignore_errors=True)
+    os.makedirs(path)
+    os.environ["EW_DATA_DIR"] = path
+    clear_path_cache()
+    return path
+
+
+# ---------------------------------------------------------------------------
+# Medición
+# ---------------------------------------------------------------------------
+
+def measure(fn: Callable, repeat: int = 5, number: int = 1, setup: Optional[Callable] = None) -> Dict:
+    """
+    Ejecuta fn 'number' veces por muestra, 'repeat' muestras (setup antes de cada muestra).
+    Retorna latencias por operación en ms y throughput.
+    """
+    samples = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter_ns()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter_ns() - start) / number / 1e6)
+    samples.sort()
+    median = statistics.median(samples)
+    return {
+        "repeat": repeat,
+        "number": number,
+        "min_ms": samples[0],
+        "median_ms": median,
+        "p95_ms": samples[min(len(samples) - 1, int(round(0.95 * (len(samples) - 1))))],
+        "mean_ms": statistics.fmean(samples),
+        "ops_per_s": (1000.0 / median) if median > 0 else None,
+    }
+
+
+class Results:
+    """Acumula resultados en una lista de dicts plana (fácil de comparar entre versiones)."""
+
+    def __init__(self):
+        self.rows: List[Dict] = []
+
+    def add(self, group: str, name: str, stats: Dict, **labels):
+        row = {"group": group, "name": name}
+        row.update(labels)
+        row.update(stats)
+        self.rows.append(row)
+        label = " ".join(f"{k}={v}" for k, v in labels.items())
+        print(f"  {group:<10} {name:<34} {label:<28} median {stats['median_ms']:10.3f} ms", flush=True)
+        return row
+
+
+# ---------------------------------------------------------------------------
+# Datasets sintéticos
+# ---------------------------------------------------------------------------
+
+_WORDS = (
+    "hospital escuela municipal planta industrial tablero general obra ampliacion "
+    "edificio oficinas deposito nave galpon barrio privado clinica sanatorio hotel "
+    "shopping supermercado frigorifico molino parque solar estacion bombeo"
+).split()
+_STREETS = ("San Martin", "Belgrano", "Rivadavia", "Mitre", "Sarmiento", "Moreno", "Alem", "Urquiza")
+_STATUSES = ("En proceso", "Presupuestado", "Aprobado", "Finalizado", "Cancelado")
+_TYPES = ("Residencial", "Comercial", "Industrial", "Obra publica")
+
+
+def make_cuit(i: int) -> str:
+    return f"30{i:08d}{i % 10}"
+
+
+def make_clients(n: int, seed: int = 1) -> List[Dict]:
+    rnd = random.Random(seed)
+    clients = []
+    for i in range(n):
+        cuit = make_cuit(i)
+        name = " ".join(rnd.choice(_WORDS) for _ in range(2)).title() + f" {i}"
+        clients.append({
+            "id": cuit,
+            "name": name,
+            "cuit": cuit,
+            "address": f"{rnd.choice(_STREETS)} {rnd.randint(1, 9999)}",
+            "contact_name": f"Contacto {i}",
+            "contact_email": f"contacto{i}@example.com",
+            "contact_phone": f"+54 11 {rnd.randint(4000, 4999)}-{rnd.randint(1000, 9999)}",
+            "created_at": f"2024-01-{1 + i % 28:02d}T10:00:00Z",
+            "updated_at": f"2024-02-{1 + i % 28:02d}T10:00:00Z",
+        })
+    return clients
+
+
+def make_projects(n: int, n_clients: int, seed: int = 2) -> List[Dict]:
+    rnd = random.Random(seed)
+    projects = []
+    for i in range(n):
+        projects.append({
+            "id": f"p-{i:08d}",
+            "name": " ".join(rnd.choice(_WORDS) for _ in range(3)).title(),
+            "code": f"EW-{i:06d}",
+            "path": f"/srv/proyectos/{i:08d}",
+            "template": "default",
+            "type": rnd.choice(_TYPES),
+            "purpose": " ".join(rnd.choice(_WORDS) for _ in range(6)),
+            "client_id": make_cuit(rnd.randrange(max(1, n_clients))),
+            "status": rnd.choice(_STATUSES),
+            "version": "0.1.0",
+            "is_macro": rnd.random() < 0.1,
+            "created_at": f"2024-{1 + i % 12:02d}-{1 + i % 28:02d}T{i % 24:02d}:00:00Z",
+            "updated_at": f"2025-{1 + i % 12:02d}-{1 + i % 28:02d}T{i % 24:02d}:{i % 60:02d}:00Z",
+        })
+    return projects
@@ -0,0 +1,60 @@
+
+
+# ./benchmarks/compare.py
+
+"""
+Compara dos corridas de benchmarks/run.py y marca regresiones.
+
+Uso:
+    python benchmarks/compare.py base.json nuevo.json [--threshold 0.10]
+
+Sale con código 1 si alguna mediana empeoró más que el umbral (10% por defecto).
+"""
+
+import argparse
+import json
+import sys
+
+_STAT_KEYS = {"repeat", "number", "min_ms", "median_ms", "p95_ms", "mean_ms", "ops_per_s", "process_median_ms"}
+
+
+def _key(row):
+    labels = tuple(sorted((k, str(v)) for k, v in row.items() if k not in _STAT_KEYS))
+    return labels
+
+
+def _load(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return {_key(r): r for r in json.load(f)["results"]}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compara resultados de benchmarks")
+    parser.add_argument("base")
+    parser.add_argument("new")
+    parser.add_argument("--threshold", type=float, default=0.10, help="empeoramiento relativo tolerado")
+    args = parser.parse_args(argv)
+
+    base, new = _load(args.base), _load(args.new)
+    regressions = 0
+    for key in sorted(set(base) & set(new)):
+        b, n = base[key]["median_ms"], new[key]["median_ms"]
+        if not b:
+            continue
+        change = (n - b) / b
+        flag = ""
+        if change > args.threshold:
+            flag = "  <-- REGRESIÓN"
+            regressions += 1
+        label = " ".join(f"{k}={v}" for k, v in key)
+        print(f"{b:10.3f} -> {n:10.3f} ms  {change:+7.1%}  {label}{flag}")
+
+    for key in sorted(set(new) - set(base)):
+        print(f"{'':10}    {new[key]['median_ms']:10.3f} ms   (nuevo)  {' '.join(f'{k}={v}' for k, v in key)}")
+
+    print(f"\n{regressions} regresión(es) sobre el umbral de {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+
+
+# ./benchmarks/freecad_stub/FreeCAD.py
+
+"""
+Sustituto mínimo del módulo FreeCAD para correr benchmarks en un Linux sin FreeCAD.
+
+Sólo implementa lo que usa el workbench: Console, getUserAppDataDir y ParamGet
+(en memoria, con GetContents y setters/getters tipados).
+"""
+
+import os
+import tempfile
+
+
+class _Console:
+    """Consola silenciosa: los benchmarks no miden la salida de FreeCAD."""
+
+    def PrintMessage(self, msg):
+        pass
+
+    def PrintWarning(self, msg):
+        pass
+
+    def PrintError(self, msg):
+        pass
+
+    def PrintLog(self, msg):
+        pass
+
+
+Console = _Console()
+
+
+def getUserAppDataDir():
+    path = os.environ.get("EW_BENCH_HOME") or os.path.join(tempfile.gettempdir(), "ew_bench_home")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+class _ParamGroup:
+    _TYPES = {"String": str, "Integer": int, "Float": float, "Boolean": bool}
+
+    def __init__(self):
+        self._values = {}
+
+    def _get(self, kind, name, default):
+        value = self._values.get((kind, name))
+        return default if value is None else value
+
+    def GetString(self, name, default=""):
+        return self._get("String", name, default)
+
+    def SetString(self, name, value):
+        self._values[("String", name)] = str(value)
+
+    def GetInt(self, name, default=0):
+        return self._get("Integer", name, default)
+
+    def SetInt(self, name, value):
+        self._values[("Integer", name)] = int(value)
+
+    def GetFloat(self, name, default=0.0):
+        return self._get("Float", name, default)
+
+    def SetFloat(self, name, value):
+        self._values[("Float", name)] = float(value)
+
+    def GetBool(self, name, default=False):
+        return self._get("Boolean", name, default)
+
+    def SetBool(self, name, value):
+        self._values[("Boolean", name)] = bool(value)
+
+    def GetContents(self):
+        return [(kind, name, value) for (kind, name), value in self._values.items()]
+
+
+_PARAMS = {}
+
+
+def ParamGet(path):
+    return _PARAMS.setdefault(path, _ParamGroup())
@@ -0,0 +1,28 @@
+
+
+# ./benchmarks/freecad_stub/FreeCADGui.py
+
+"""
+Sustituto mínimo de FreeCADGui para benchmarks: registra comandos en un dict.
+"""
+
+COMMANDS = {}
+
+
+def addCommand(name, command):
+    # FreeCAD consulta los recursos al registrar
+    command.GetResources()
+    COMMANDS[name] = command
+
+
+def addWorkbench(workbench):
+    pass
+
+
+class Workbench:
+
+    def appendMenu(self, name, commands):
+        pass
+
+    def appendToolbar(self, name, commands):
+        pass
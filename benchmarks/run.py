@@ -0,0 +1,94 @@
+
+
+# ./benchmarks/run.py
+
+"""
+Benchmarks de ElectricalWorkbench sin FreeCAD (usa benchmarks/freecad_stub).
+
+Uso:
+    python benchmarks/run.py                       # 1k/10k/100k, todos los grupos
+    python benchmarks/run.py --quick               # 1k/10k, menos repeticiones
+    python benchmarks/run.py --sizes 1000 --only db --output resultados.json
+
+Resultados: JSON con metadatos (versión de Python, commit, fecha) y una fila
+por medición (group, name, etiquetas, min/median/p95/mean en ms, ops/s).
+Comparar dos corridas con benchmarks/compare.py.
+Código de salida 1 si la prueba de concurrencia perdió datos con candado.
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+
+from common import Results, cleanup, REPO_ROOT  # prepara sys.path/entorno antes de importar Utils
+
+GROUPS = ("db", "commands", "concurrency")
+
+
+def _git_revision() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return "unknown"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks de ElectricalWorkbench")
+    parser.add_argument("--sizes", default=None, help="tamaños de dataset separados por coma (default 1000,10000,100000)")
+    parser.add_argument("--commands", default=None, help="cantidades de carpetas de comandos (default 10,50,200)")
+    parser.add_argument("--writers", default=None, help="procesos escritores concurrentes (default 2,4,8)")
+    parser.add_argument("--only", default=",".join(GROUPS), help=f"grupos a correr: {', '.join(GROUPS)}")
+    parser.add_argument("--quick", action="store_true", help="menos tamaños y repeticiones")
+    parser.add_argument("--output", default=None, help="archivo JSON de salida (default: stdout al final)")
+    args = parser.parse_args(argv)
+
+    sizes = [int(s) for s in (args.sizes or ("1000,10000" if args.quick else "1000,10000,100000")).split(",")]
+    counts = [int(s) for s in (args.commands or ("10,50" if args.quick else "10,50,200")).split(",")]
+    writers = [int(s) for s in (args.writers or ("2,4" if args.quick else "2,4,8")).split(",")]
+    only = set(args.only.split(","))
+
+    results = Results()
+    failures = []
+    try:
+        if "db" in only:
+            import bench_db
+            bench_db.run(results, sizes, quick=args.quick)
+        if "commands" in only:
+            import bench_commands
+            bench_commands.run(results, counts, quick=args.quick)
+        if "concurrency" in only:
+            import bench_concurrency
+            failures = bench_concurrency.run(results, writers, quick=args.quick)
+    finally:
+        cleanup()
+
+    report = {
+        "meta": {
+            "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+            "revision": _git_revision(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "quick": args.quick,
+        },
+        "results": results.rows,
+    }
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+        print(f"Resultados en {os.path.abspath(args.output)}")
+    else:
+        print(text)
+    if failures:
+        print(f"Datos perdidos con candado entre procesos: {', '.join(failures)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
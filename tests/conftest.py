@@ -0,0 +1,59 @@
+
+
+# ./tests/conftest.py
+
+"""
+Configuración común de los tests de la capa de datos (pytest, sin FreeCAD).
+
+Cada test corre con su propia carpeta de datos (EW_DATA_DIR) y su propia
+carpeta de settings (.cfg): los gestores y cachés de un test no ven los
+archivos de otro.
+"""
+
+import os
+import sys
+import tempfile
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+# antes de importar Utils: Config.USER_APP_DIR se calcula desde HOME al importar
+os.environ["HOME"] = tempfile.mkdtemp(prefix="ew_tests_home_")
+
+import pytest  # noqa: E402
+
+from Utils import config  # noqa: E402
+from Utils.paths import clear_path_cache  # noqa: E402
+from Utils.file_watcher import stop_watcher  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def data_dir(tmp_path, monkeypatch):
+    """Carpeta de datos y de settings vacías; rutas y settings sin memorizar."""
+    path = tmp_path / "data"
+    path.mkdir()
+    monkeypatch.setenv("EW_DATA_DIR", str(path))
+    monkeypatch.setattr(config.Config, "USER_APP_DIR", str(tmp_path / "home"))
+    monkeypatch.setattr(config, "_STORE", None)
+    clear_path_cache()
+    yield str(path)
+    stop_watcher()
+    clear_path_cache()
+
+
+@pytest.fixture
+def make_db():
+    """Fábrica de DBManager (sin vigilante por defecto); cierra las instancias al terminar."""
+    from Utils.db_manager import DBManager
+    managers = []
+
+    def make(**kwargs):
+        kwargs.setdefault("watch", False)
+        db = DBManager(**kwargs)
+        managers.append(db)
+        return db
+
+    yield make
+    for db in managers:
+        db.close()
@@ -0,0 +1,50 @@
+
+
+# ./tests/test_benchmarks.py
+
+"""Humo de benchmarks/run.py y benchmarks/compare.py (en subprocesos, dataset mínimo)."""
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_DIR = os.path.join(REPO_ROOT, "benchmarks")
+
+
+def _run(script, *args):
+    return subprocess.run([sys.executable, os.path.join(BENCH_DIR, script), *args],
+                          cwd=BENCH_DIR, capture_output=True, text=True, timeout=300)
+
+
+@pytest.fixture(scope="module")
+def results(tmp_path_factory):
+    out = str(tmp_path_factory.mktemp("bench") / "base.json")
+    proc = _run("run.py", "--quick", "--only", "db,commands", "--sizes", "100", "--commands", "2", "--output", out)
+    assert proc.returncode == 0, proc.stderr
+    return out
+
+
+def test_run_writes_report(results):
+    with open(results, encoding="utf-8") as f:
+        report = json.load(f)
+    assert report["meta"]["quick"] is True
+    groups = {r["group"] for r in report["results"]}
+    assert {"db", "commands"} <= groups
+    assert all(r["median_ms"] >= 0 for r in report["results"])
+
+
+def test_compare_flags_regressions(results, tmp_path):
+    assert _run("compare.py", results, results).returncode == 0
+
+    with open(results, encoding="utf-8") as f:
+        report = json.load(f)
+    for row in report["results"]:
+        row["median_ms"] = row["median_ms"] * 3 + 1
+    slower = str(tmp_path / "slower.json")
+    with open(slower, "w", encoding="utf-8") as f:
+        json.dump(report, f)
+    assert _run("compare.py", results, slower).returncode == 1
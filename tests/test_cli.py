@@ -0,0 +1,95 @@
+
+
+# ./tests/test_cli.py
+
+"""Línea de comandos sin FreeCAD (python -m Utils, Utils/cli.py)."""
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from Utils.cli import main
+from Utils.config import save_setting
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _run(capsys, *argv):
+    code = main(list(argv))
+    out = capsys.readouterr().out
+    return code, out
+
+
+def _ndjson(text):
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+def test_upsert_list_and_search(capsys):
+    code, out = _run(capsys, "upsert", "clients", "--set", "cuit=30712345678", "--set", "name=ACME SA")
+    assert code == 0 and _ndjson(out)[0]["cuit"] == "30712345678"
+    for i, status in enumerate(("En proceso", "Aprobado", "Aprobado")):
+        record = {"id": f"p{i}", "name": f"Tablero {i}", "status": status, "client_id": "30712345678"}
+        assert _run(capsys, "upsert", "projects", "--json", json.dumps(record), "--no-current")[0] == 0
+
+    code, out = _run(capsys, "list", "projects", "--status", "Aprobado", "--order", "-id", "--limit", "1")
+    assert [p["id"] for p in _ndjson(out)] == ["p2"]
+    code, out = _run(capsys, "list", "clients", "--format", "table")
+    assert out.splitlines()[0].split("\t")[:3] == ["id", "name", "cuit"] and "ACME SA" in out
+    code, out = _run(capsys, "list", "clients", "--where", "name=Otro")
+    assert out == ""
+    code, out = _run(capsys, "search", "tablero 1", "--kind", "projects", "--limit", "1")
+    assert _ndjson(out)[0]["id"] == "p1"
+
+
+def test_import_and_export(capsys, tmp_path, data_dir):
+    source = tmp_path / "clientes.json"
+    source.write_text(json.dumps({"clients": [{"cuit": "20000000001", "name": "A"},
+                                              {"cuit": "20000000002", "name": "B"}]}), encoding="utf-8")
+    code, out = _run(capsys, "import", str(source), "--kind", "clients")
+    assert code == 0 and json.loads(out) == {"kind": "clients", "imported": 2}
+
+    target = tmp_path / "backup"
+    assert _run(capsys, "export", "--dir", str(target))[0] == 0
+    with open(target / "clients.json", encoding="utf-8") as f:
+        assert [c["name"] for c in json.load(f)["clients"]] == ["A", "B"]
+    # la carpeta de datos en uso no se puede pisar
+    assert _run(capsys, "export", "--dir", data_dir)[0] == 1
+    assert _run(capsys, "compact")[0] == 0
+
+
+def test_sqlite_backend(capsys):
+    save_setting("Database", "backend", "sqlite")
+    assert _run(capsys, "upsert", "clients", "--set", "cuit=20000000001", "--set", "name=A")[0] == 0
+    code, out = _run(capsys, "list", "clients")
+    assert code == 0 and [c["name"] for c in _ndjson(out)] == ["A"]
+    assert _run(capsys, "compact")[0] == 0
+    # opción que sólo existe en el backend JSON: error de uso, sin traceback
+    assert _run(capsys, "--journal", "list", "clients")[0] == 2
+
+
+def test_argument_errors(capsys):
+    assert _run(capsys, "upsert", "clients")[0] == 1
+    assert _run(capsys, "upsert", "clients", "--set", "sin_igual")[0] == 1
+    assert _run(capsys, "import", "/no/existe.json", "--kind", "clients")[0] == 1
+    with pytest.raises(SystemExit) as exc:
+        main(["list", "otra_cosa"])
+    assert exc.value.code == 2
+
+
+def test_runs_headless_and_help_skips_data_modules(tmp_path):
+    env = dict(os.environ, EW_DATA_DIR=str(tmp_path / "datos"))
+    probe = ("import sys, runpy; sys.argv = ['Utils'] + sys.argv[1:]\n"
+             "try:\n    runpy.run_module('Utils', run_name='__main__')\n"
+             "except SystemExit as e:\n    code = e.code\n"
+             "print('MODULES', int('FreeCAD' in sys.modules), int('Utils.db_manager' in sys.modules), code)")
+    out = subprocess.run([sys.executable, "-c", probe, "--help"], cwd=REPO_ROOT, env=env,
+                         capture_output=True, text=True, timeout=60).stdout
+    assert out.splitlines()[-1] == "MODULES 0 0 0"
+
+    out = subprocess.run([sys.executable, "-c", probe, "list", "clients"], cwd=REPO_ROOT, env=env,
+                         capture_output=True, text=True, timeout=60).stdout
+    assert out.splitlines()[-1] == "MODULES 0 1 0"
+    assert os.path.exists(tmp_path / "datos" / "clients.json")
@@ -0,0 +1,77 @@
+
+
+# ./tests/test_client_summaries.py
+
+"""Índice inverso cliente -> proyectos y agregados por cliente (get_client_summary/ies)."""
+
+import random
+
+import pytest
+
+STATUSES = ("En proceso", "Aprobado", "Cerrado")
+CLIENTS = ("c1", "c2", "c3")
+
+
+def _expected(projects, client_id):
+    own = [p for p in projects if (p.get("client_id") or "") == client_id]
+    by_status = {}
+    for p in own:
+        by_status[p.get("status") or ""] = by_status.get(p.get("status") or "", 0) + 1
+    return {
+        "projects": len(own),
+        "by_status": by_status,
+        "macro": sum(1 for p in own if p.get("is_macro")),
+        "last_updated": max((p["updated_at"] for p in own), default=None),
+    }
+
+
+def _check(db):
+    projects = db.load_projects()
+    summaries = db.get_client_summaries(include_orphans=True)
+    for client_id in CLIENTS + ("",):
+        expected = _expected(projects, client_id)
+        summary = summaries.get(client_id)
+        if not expected["projects"]:
+            assert summary is None or summary["projects"] == 0
+            continue
+        assert {k: summary[k] for k in expected} == expected, client_id
+        assert db.get_client_summary(client_id) == summary
+        own = sorted((p["created_at"], p["id"]) for p in projects if (p.get("client_id") or "") == client_id)
+        if client_id:
+            assert [p["id"] for p in db.get_client_projects(client_id, order_by="created_at")] == [i for _, i in own]
+
+
+@pytest.mark.parametrize("seed", [3, 4])
+def test_summaries_follow_incremental_changes(make_db, seed):
+    rng = random.Random(seed)
+    db = make_db()
+    db.save_clients([{"id": c, "cuit": c, "name": c} for c in CLIENTS])
+    db.save_projects_data({"current_project_id": None, "projects": [
+        {"id": f"p{i:02d}", "client_id": rng.choice(CLIENTS + (None,)), "status": rng.choice(STATUSES),
+         "is_macro": rng.random() < 0.3, "created_at": f"2025-01-{i % 28 + 1:02d}T00:00:00Z",
+         "updated_at": f"2025-02-{rng.randint(1, 28):02d}T00:00:00Z"}
+        for i in range(40)
+    ]})
+    _check(db)
+
+    for step in range(40):
+        pid = f"p{rng.randrange(45):02d}"
+        if rng.random() < 0.3:
+            # quitar el proyecto más reciente de un cliente fuerza recalcular last_updated
+            db.remove_project(pid)
+        else:
+            db.add_or_update_project({"id": pid, "client_id": rng.choice(CLIENTS), "status": rng.choice(STATUSES)},
+                                     mark_current=False)
+        _check(db)
+
+
+def test_client_without_projects_and_orphans(make_db):
+    db = make_db()
+    db.add_or_update_client({"cuit": "20000000001", "name": "Sin proyectos"})
+    db.add_or_update_project({"id": "p1", "client_id": "borrado"}, mark_current=False)
+
+    summaries = db.get_client_summaries()
+    assert set(summaries) == {"20000000001"}
+    assert summaries["20000000001"]["projects"] == 0 and summaries["20000000001"]["by_status"] == {}
+    assert db.get_client_projects("20000000001") == []
+    assert db.get_client_summaries(include_orphans=True)["borrado"]["projects"] == 1
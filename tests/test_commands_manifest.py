@@ -0,0 +1,114 @@
+
+
+# ./tests/test_commands_manifest.py
+
+"""
+Registro diferido de comandos desde el manifiesto (Commands/__init__.py).
+
+Cada arranque corre en un subproceso, sobre una copia de Commands/__init__.py
+con comandos sintéticos y un FreeCADGui mínimo que sólo registra los comandos.
+"""
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+
+import pytest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_FREECAD_GUI = '''
+COMMANDS = {}
+
+
+def addCommand(name, command):
+    command.GetResources()
+    COMMANDS[name] = command
+'''
+
+_PLAIN = '''
+class Plain:
+    def GetResources(self):
+        return {"MenuText": "Plain %s"}
+
+    def Activated(self):
+        return "activado %s"
+'''
+
+_STATEFUL = '''
+class Stateful:
+    def GetResources(self):
+        return {"MenuText": "Stateful"}
+
+    def IsActive(self):
+        return False
+
+    def Activated(self):
+        pass
+'''
+
+_CHILD = r'''
+import json, sys
+sys.path[:0] = sys.argv[1:4]
+import FreeCADGui
+import Commands
+registered = Commands.register_all_commands()
+before = sorted(m for m in sys.modules if m.startswith("Commands."))
+menu = FreeCADGui.COMMANDS["EW_Plain"].GetResources()["MenuText"]
+result = FreeCADGui.COMMANDS["EW_Plain"].Activated()
+after = sorted(m for m in sys.modules if m.startswith("Commands."))
+print(json.dumps({"registered": sorted(registered), "imported": before, "after": after,
+                  "menu": menu, "result": result}))
+'''
+
+
+@pytest.fixture
+def commands_tree(tmp_path):
+    cmd_dir = tmp_path / "pkg" / "Commands"
+    (cmd_dir / "Demo").mkdir(parents=True)
+    (cmd_dir / "Gated").mkdir()
+    shutil.copy(os.path.join(REPO_ROOT, "Commands", "__init__.py"), cmd_dir)
+    (cmd_dir / "Demo" / "__init__.py").write_text("")
+    (cmd_dir / "Gated" / "__init__.py").write_text("")
+    (cmd_dir / "Demo" / "Plain_Command.py").write_text(_PLAIN % ("v1", "v1"))
+    (cmd_dir / "Gated" / "Stateful_Command.py").write_text(_STATEFUL)
+    (tmp_path / "gui").mkdir()
+    (tmp_path / "gui" / "FreeCADGui.py").write_text(_FREECAD_GUI)
+    return cmd_dir
+
+
+def _start(cmd_dir) -> dict:
+    root = cmd_dir.parent.parent
+    argv = [str(root / "gui"), str(cmd_dir.parent), REPO_ROOT]
+    out = subprocess.run([sys.executable, "-c", _CHILD] + argv,
+                         capture_output=True, text=True, check=True, cwd=REPO_ROOT)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def test_second_start_registers_from_manifest(commands_tree, data_dir):
+    first = _start(commands_tree)
+    assert first["registered"] == ["EW_Plain", "EW_Stateful"]
+    assert "Commands.Demo.Plain_Command" in first["imported"]
+    assert os.path.exists(os.path.join(data_dir, "commands_manifest.json"))
+
+    second = _start(commands_tree)
+    assert second["registered"] == first["registered"]
+    # sin IsActive propio: proxy desde el manifiesto, import recién al activarse
+    assert "Commands.Demo.Plain_Command" not in second["imported"]
+    assert second["menu"] == "Plain v1"
+    assert "Commands.Demo.Plain_Command" in second["after"]
+    assert second["result"] == "activado v1"
+    # con IsActive propio se importa siempre
+    assert "Commands.Gated.Stateful_Command" in second["imported"]
+
+
+def test_modified_file_is_reimported(commands_tree):
+    _start(commands_tree)
+    path = commands_tree / "Demo" / "Plain_Command.py"
+    path.write_text(_PLAIN % ("v2 con más texto", "v2"))
+    again = _start(commands_tree)
+    assert "Commands.Demo.Plain_Command" in again["imported"]
+    assert again["menu"] == "Plain v2 con más texto"
+    assert _start(commands_tree)["menu"] == "Plain v2 con más texto"
@@ -0,0 +1,80 @@
+
+
+# ./tests/test_concurrency.py
+
+"""
+Varios procesos escribiendo la misma carpeta de datos: candado entre procesos
+(file_lock) y fusión por '_rev' (_rebase). No se puede perder ninguna alta ni
+ninguna actualización.
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from Utils.db_manager import DBManager, _rebase_record
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WRITERS = 4
+OPS = 25
+SHARED_CUIT = "20999999999"
+# cada escritor edita su propio campo del cliente compartido: fusiones sin conflicto
+FIELDS = ("address", "contact_name", "contact_email", "contact_phone")
+
+_CHILD = r'''
+import json, os, sys, time
+from Utils.db_manager import DBManager
+worker, ops, field, shared = int(sys.argv[1]), int(sys.argv[2]), sys.argv[3], sys.argv[6]
+db = DBManager(journal=sys.argv[4] == "1", write_behind=False, watch=False)
+db.load_clients()
+while not os.path.exists(sys.argv[5]):
+    time.sleep(0.001)
+for i in range(ops):
+    db.add_or_update_client({"cuit": "9%02d%08d" % (worker, i), "name": "W%d-%d" % (worker, i)})
+    db.add_or_update_client({"cuit": shared, field: "w%d #%d" % (worker, i)})
+db.close()
+print(json.dumps({"merges": db.merges, "conflicts": db.conflicts}))
+'''
+
+
+def test_rebase_record_merges_fields_and_keeps_disk_on_conflict():
+    base = {"id": "c", "name": "A", "address": "x", "_rev": 1}
+    theirs = dict(base, address="disco", _rev=2)
+    merged, conflict = _rebase_record(base, dict(base, name="mío", _rev=2), theirs)
+    assert (merged["name"], merged["address"], merged["_rev"], conflict) == ("mío", "disco", 3, False)
+
+    merged, conflict = _rebase_record(base, dict(base, address="mío", _rev=2), theirs)
+    assert merged["address"] == "disco" and conflict
+
+    assert _rebase_record(base, None, dict(base)) == (None, False)      # baja sin cambios en disco
+    assert _rebase_record(None, {"id": "n"}, None) == ({"id": "n"}, False)  # alta nueva
+
+
+@pytest.mark.parametrize("journal", [False, True])
+def test_concurrent_writers_lose_nothing(data_dir, journal):
+    DBManager(journal=journal, watch=False).save_clients([{"id": SHARED_CUIT, "cuit": SHARED_CUIT, "name": "compartido"}])
+    go = os.path.join(data_dir, "go")
+    env = dict(os.environ, PYTHONPATH=REPO_ROOT)
+    children = [
+        subprocess.Popen([sys.executable, "-c", _CHILD, str(w), str(OPS), FIELDS[w], str(int(journal)), go, SHARED_CUIT],
+                         env=env, cwd=REPO_ROOT, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+        for w in range(WRITERS)
+    ]
+    open(go, "w").close()
+    reports = []
+    for child in children:
+        out, _ = child.communicate(timeout=120)
+        assert child.returncode == 0
+        reports.append(json.loads(out.strip().splitlines()[-1]))
+
+    clients = {c["cuit"]: c for c in DBManager(journal=journal, watch=False).load_clients()}
+    lost_creates = [(w, i) for w in range(WRITERS) for i in range(OPS) if "9%02d%08d" % (w, i) not in clients]
+    shared = clients[SHARED_CUIT]
+    lost_updates = [f for w, f in enumerate(FIELDS) if shared.get(f) != "w%d #%d" % (w, OPS - 1)]
+    assert lost_creates == []
+    assert lost_updates == []
+    assert sum(r["conflicts"] for r in reports) == 0
+    assert len(clients) == WRITERS * OPS + 1
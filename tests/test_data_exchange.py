@@ -0,0 +1,136 @@
+
+
+# ./tests/test_data_exchange.py
+
+"""Importación / exportación CSV y NDJSON (Utils/data_exchange.py)."""
+
+import json
+
+import pytest
+
+from Utils.data_exchange import cuit_check_digit, export_file, import_file, normalize_cuit, iter_import_rows
+
+ACME = "30712345671"
+JUAN = "20123456786"
+ANA = "27000000014"
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("30-71234567-1", ACME), ("30.71234567.1", ACME), (" 20123456786 ", JUAN),
+    ("30712345672", None), ("3071234567", None), ("3O712345671", None), (None, None),
+])
+def test_normalize_cuit(value, expected):
+    assert normalize_cuit(value) == expected
+
+
+def _seed(db):
+    db.bulk_upsert_clients([{"cuit": ACME, "name": "ACME SA", "address": "Calle, 1"},
+                            {"cuit": JUAN, "name": "Juan \"el\" Pérez"}])
+    db.bulk_upsert_projects([
+        {"id": "p1", "name": "Tablero; norte", "client_id": ACME, "status": "Aprobado", "is_macro": True},
+        {"id": "p2", "name": "Sin cliente\ncon salto", "status": "En proceso"},
+        {"id": "p3", "name": "Huérfano", "client_id": "borrado"},
+    ])
+
+
+@pytest.mark.parametrize("ext", ["csv", "ndjson"])
+def test_export_joins_clients_and_round_trips(make_db, tmp_path, monkeypatch, ext):
+    db = make_db()
+    _seed(db)
+    clients_file, projects_file = str(tmp_path / f"c.{ext}"), str(tmp_path / f"p.{ext}")
+
+    reader = make_db()
+    assert export_file(reader, "projects", projects_file)["rows"] == 3
+    # streaming: exportar no carga la caché
+    assert reader._files["projects"].data is None
+    assert export_file(db, "clients", clients_file)["rows"] == 2
+
+    rows = {r["id"]: r for _, r in iter_import_rows(projects_file)}
+    assert (rows["p1"]["client_name"], rows["p1"]["client_cuit"]) == ("ACME SA", ACME)
+    assert (rows["p3"]["client_name"], rows["p3"]["client_cuit"]) == ("", "")
+
+    # a otra carpeta de datos: mismos registros
+    monkeypatch.setenv("EW_DATA_DIR", str(tmp_path / "otra"))
+    from Utils.paths import clear_path_cache
+    clear_path_cache()
+    target = make_db()
+    assert import_file(target, "clients", clients_file)["imported"] == 2
+    stats = import_file(target, "projects", projects_file)
+    assert stats["imported"] == 3 and stats["rejected"] == 0
+
+    def shape(records, fields):
+        return sorted(tuple(r.get(f) for f in fields) for r in records)
+
+    fields = ("id", "name", "client_id", "status", "is_macro")
+    assert shape(target.load_projects(), fields) == shape(db.load_projects(), fields)
+    assert shape(target.load_clients(), ("id", "name", "address")) == shape(db.load_clients(), ("id", "name", "address"))
+
+
+def test_export_from_sqlite_backend(tmp_path):
+    from Utils.db_sqlite import SQLiteDBManager
+    sdb = SQLiteDBManager()
+    try:
+        _seed(sdb)
+        path = str(tmp_path / "p.ndjson")
+        assert export_file(sdb, "projects", path)["rows"] == 3
+        rows = {r["id"]: r for _, r in iter_import_rows(path)}
+        assert (rows["p1"]["client_name"], rows["p3"]["client_name"]) == ("ACME SA", "")
+    finally:
+        sdb.close()
+
+
+def test_csv_import_validates_and_does_not_blank_fields(make_db, tmp_path):
+    db = make_db()
+    db.add_or_update_client({"cuit": ACME, "name": "ACME SA", "address": "Calle 1"})
+    source = tmp_path / "clientes.csv"
+    source.write_text("\ufeffcuit;name;address;_rev\n"
+                      "30-71234567-1;ACME Nueva;;99\n"      # actualiza sin pisar address
+                      "20123456787;Dígito malo;;\n"         # verificador incorrecto
+                      ";Sin CUIT;;\n"
+                      "27-00000001-4;Ana;Av. 2;\n", encoding="utf-8")
+    stats = import_file(db, "clients", str(source))
+    assert (stats["rows"], stats["imported"], stats["rejected"]) == (4, 2, 2)
+    assert [e["line"] for e in stats["errors"]] == [3, 4]
+
+    acme = db.find_client_by_cuit(ACME)
+    assert (acme["name"], acme["address"]) == ("ACME Nueva", "Calle 1")
+    assert db.find_client_by_cuit(ANA)["address"] == "Av. 2"
+    assert len(db.load_clients()) == 2
+
+    lenient = import_file(db, "clients", str(source), validate_cuit=False)
+    assert lenient["rejected"] == 1
+
+
+def test_ndjson_projects_resolve_client_cuit(make_db, tmp_path):
+    db = make_db()
+    db.add_or_update_client({"cuit": "30-71234567-1", "name": "guardado con guiones"})
+    source = tmp_path / "proyectos.ndjson"
+    source.write_text("\n".join([
+        json.dumps({"id": "p1", "name": "A", "client_cuit": ACME, "is_macro": "sí"}),
+        "{no es json",
+        json.dumps({"id": "p2", "name": "B", "client_cuit": JUAN}),
+        json.dumps(["no", "es", "objeto"]),
+        "",
+    ]), encoding="utf-8")
+    stats = import_file(db, "projects", str(source))
+    assert (stats["imported"], stats["rejected"]) == (1, 3)
+    p1 = db.find_project_by_id("p1")
+    assert p1["client_id"] == "30-71234567-1" and p1["is_macro"] is True
+
+
+def test_import_commits_once_for_all_batches(make_db, tmp_path, monkeypatch):
+    db = make_db(journal=True, compact_threshold=10)
+    db.load_clients()
+    source = tmp_path / "muchos.ndjson"
+    bases = (f"20{i:08d}" for i in range(1000, 2000))
+    cuits = [b + str(cuit_check_digit(b)) for b in bases if cuit_check_digit(b) is not None][:100]
+    with open(source, "w", encoding="utf-8") as f:
+        for cuit in cuits:
+            f.write(json.dumps({"cuit": cuit, "name": cuit}) + "\n")
+    writes = []
+    persist = db._persist
+    monkeypatch.setattr(db, "_persist", lambda kind: writes.append(kind) or persist(kind))
+    stats = import_file(db, "clients", str(source), batch_size=7)
+    assert (stats["imported"], stats["rejected"]) == (100, 0)
+    assert writes == ["clients"]
+    assert len(make_db(journal=True).load_clients()) == 100
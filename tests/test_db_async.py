@@ -0,0 +1,72 @@
+
+
+# ./tests/test_db_async.py
+
+"""Fachada asíncrona (Utils/db_async.py): orden, unificación de lecturas y transacciones."""
+
+import json
+import time
+
+import pytest
+
+from Utils.db_async import AsyncDBManager
+
+
+@pytest.fixture
+def adb(make_db):
+    db = AsyncDBManager(make_db(write_behind=False), max_workers=2, dispatcher=lambda fn: fn())
+    yield db
+    db.close()
+
+
+def test_writes_same_file_run_in_submission_order(adb):
+    futures = [adb.submit("add_or_update_project", {"id": "p1", "name": f"v{i}"}) for i in range(20)]
+    for f in futures:
+        f.result(timeout=10)
+    assert adb.submit("find_project_by_id", "p1").result(timeout=10)["name"] == "v19"
+
+
+def test_read_waits_for_previous_write(adb):
+    adb.submit("add_or_update_client", {"cuit": "20123456789", "name": "ACME"})
+    clients = adb.submit("load_clients").result(timeout=10)
+    assert [c["name"] for c in clients] == ["ACME"]
+
+
+def test_failed_bulk_does_not_swallow_concurrent_write(adb, make_db):
+    """Una escritura de proyectos no debe quedar dentro de la transacción de un alta masiva de clientes."""
+    def failing():
+        yield {"cuit": "20111111112", "name": "A"}
+        time.sleep(0.3)
+        raise RuntimeError("lote inválido")
+
+    bulk = adb.submit("bulk_upsert_clients", failing())
+    time.sleep(0.05)
+    project = adb.submit("add_or_update_project", {"id": "p1", "name": "Tablero"})
+
+    with pytest.raises(RuntimeError):
+        bulk.result(timeout=10)
+    assert project.result(timeout=10)["id"] == "p1"
+
+    with open(adb.manager.projects_path, encoding="utf-8") as f:
+        assert [p["id"] for p in json.load(f)["projects"]] == ["p1"]
+    assert make_db().load_clients() == []
+
+
+def test_identical_reads_in_flight_are_coalesced(adb):
+    adb.submit("add_or_update_project", {"id": "p1"})
+    first = adb.submit("load_projects")
+    second = adb.submit("load_projects")
+    assert (first is second) == (adb.coalesced == 1)
+    assert first.result(timeout=10) == second.result(timeout=10)
+
+
+def test_call_delivers_result_to_callback(adb):
+    results = []
+    adb.call("load_clients", callback=results.append).result(timeout=10)
+    time.sleep(0.05)
+    assert results == [[]]
+
+
+def test_unknown_method_raises(adb):
+    with pytest.raises(AttributeError):
+        adb.submit("drop_everything")
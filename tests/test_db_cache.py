@@ -0,0 +1,50 @@
+
+
+# ./tests/test_db_cache.py
+
+"""Caché de DBManager: revalidación por firma del archivo, copias defensivas y reintento tras errores."""
+
+
+def test_repeated_reads_hit_the_cache(make_db):
+    db = make_db()
+    db.add_or_update_client({"cuit": "20000000001", "name": "A"})
+    db.load_clients()
+    misses = db.cache_misses
+    for _ in range(5):
+        db.load_clients()
+        db.find_client_by_cuit("20000000001")
+    assert db.cache_misses == misses
+    assert db.cache_hits >= 10
+
+
+def test_external_write_is_picked_up(make_db):
+    reader, writer = make_db(), make_db()
+    assert reader.load_clients() == []
+    writer.add_or_update_client({"cuit": "20000000001", "name": "escrito por otro"})
+    misses = reader.cache_misses
+    assert [c["name"] for c in reader.load_clients()] == ["escrito por otro"]
+    assert reader.find_client_by_cuit("20000000001")["name"] == "escrito por otro"
+    assert reader.cache_misses == misses + 1
+
+
+def test_returned_records_are_copies(make_db):
+    db = make_db()
+    db.add_or_update_client({"cuit": "20000000001", "name": "A"})
+    db.load_clients()[0]["name"] = "mutado"
+    db.find_client_by_cuit("20000000001")["name"] = "mutado"
+    db.load_projects_data()["projects"].append({"id": "fantasma"})
+    assert db.find_client_by_cuit("20000000001")["name"] == "A"
+    assert db.load_projects() == []
+
+
+def test_unreadable_file_is_retried(make_db):
+    db = make_db()
+    db.add_or_update_client({"cuit": "20000000001", "name": "A"})
+    with open(db.clients_path, "w", encoding="utf-8") as f:
+        f.write("{roto")
+    other = make_db()
+    assert other.load_clients() == []
+    # la firma de la lectura fallida no se cachea: al repararse se relee
+    with open(db.clients_path, "w", encoding="utf-8") as f:
+        f.write('{"clients": [{"id": "x", "cuit": "20000000009", "name": "reparado"}]}')
+    assert [c["name"] for c in other.load_clients()] == ["reparado"]
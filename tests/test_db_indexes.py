@@ -0,0 +1,68 @@
+
+
+# ./tests/test_db_indexes.py
+
+"""Índices hash de DBManager (cuit/id de clientes, id/path de proyectos) y bajas."""
+
+import pytest
+
+
+def _dup_clients():
+    return [
+        {"id": "c1", "cuit": "20111111111", "name": "A"},
+        {"id": "c2", "cuit": "20111111111", "name": "A bis"},
+        {"id": "c3", "cuit": "20333333333", "name": "C"},
+        {"id": "c1", "cuit": "20444444444", "name": "A otra vez"},
+    ]
+
+
+def test_lookups_follow_upserts(make_db):
+    db = make_db()
+    saved = db.add_or_update_client({"cuit": "20123456789", "name": "Uno"})
+    assert db.find_client_by_cuit("20123456789")["id"] == saved["id"]
+    db.add_or_update_client({"cuit": "20123456789", "name": "Uno SA"})
+    assert db.find_client_by_cuit("20123456789")["name"] == "Uno SA"
+    assert len(db.load_clients()) == 1
+
+    p = db.add_or_update_project({"id": "p1", "name": "P", "path": "/tmp/p1"}, mark_current=False)
+    assert db.find_project_by_id(p["id"])["path"] == "/tmp/p1"
+    db.remove_project("p1")
+    assert db.find_project_by_id("p1") is None
+
+
+def test_duplicates_resolve_to_first_like_a_linear_scan(make_db):
+    db = make_db()
+    db.save_clients(_dup_clients())
+    assert db.find_client_by_cuit("20111111111")["id"] == "c1"
+
+
+@pytest.mark.parametrize("journal", [False, True])
+@pytest.mark.parametrize("key, left", [
+    ("20111111111", ["c3", "c1"]),   # dos por cuit; el otro c1 (cuit distinto) queda
+    ("c1", ["c2", "c3"]),            # dos por id
+    ("20333333333", ["c1", "c2", "c1"]),
+])
+def test_remove_client_removes_every_match(make_db, journal, key, left):
+    db = make_db(journal=journal)
+    db.save_clients(_dup_clients())
+    assert db.remove_client(key)
+    assert [c["id"] for c in db.load_clients()] == left
+    assert [c["id"] for c in make_db(journal=journal).load_clients()] == left
+
+
+def test_survivor_keeps_its_index_entry(make_db):
+    db = make_db()
+    db.save_clients(_dup_clients())
+    db.remove_client("c1")
+    # c1 ocupaba la entrada del cuit compartido con c2
+    assert db.find_client_by_cuit("20111111111")["id"] == "c2"
+    assert db.find_client_by_cuit("20444444444") is None
+    assert [c["id"] for c in db.search_clients("bis")] == ["c2"]
+
+
+def test_remove_without_match_does_not_rewrite(make_db):
+    db = make_db()
+    db.save_clients(_dup_clients())
+    before = db._files["clients"].signature
+    assert db.remove_client("nope")
+    assert db._files["clients"].signature == before
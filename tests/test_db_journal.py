@@ -0,0 +1,78 @@
+
+
+# ./tests/test_db_journal.py
+
+"""Modo journal (Utils/db_journal.py + DBManager(journal=True)): replay, compactación y cambio de modo."""
+
+import os
+
+from Utils.db_journal import journal_path, iter_journaled, read_ops, file_signature
+
+
+def _ids(db):
+    return [c["id"] for c in db.load_clients()]
+
+
+def test_mutations_append_to_journal_without_rewriting_snapshot(make_db):
+    db = make_db(journal=True)
+    db.add_or_update_client({"cuit": "20000000001", "name": "A"})
+    snapshot = file_signature(db.clients_path)
+    db.add_or_update_client({"cuit": "20000000002", "name": "B"})
+    db.remove_client("20000000001")
+
+    assert file_signature(db.clients_path) == snapshot
+    ops = read_ops(db.clients_path, snapshot)
+    assert [op["op"] for op in ops][-2:] == ["put", "del"]
+    assert _ids(make_db(journal=True)) == ["20000000002"]
+
+
+def test_streaming_matches_replay(make_db):
+    db = make_db(journal=True)
+    for i in range(5):
+        db.add_or_update_client({"cuit": f"2000000000{i}", "name": str(i)})
+    db.remove_client("20000000002")
+    db.add_or_update_client({"cuit": "20000000002", "name": "again"})
+    streamed = [v["id"] for k, v in iter_journaled(db.clients_path, "clients") if k == "clients"]
+    assert streamed == _ids(make_db(journal=True))
+
+
+def test_threshold_compacts_into_snapshot(make_db):
+    db = make_db(journal=True, compact_threshold=3)
+    for i in range(4):
+        db.add_or_update_client({"cuit": f"2000000000{i}", "name": str(i)})
+    assert len(_ids(make_db(journal=True))) == 4
+    assert len(read_ops(db.clients_path, file_signature(db.clients_path)) or []) < 3
+    db.compact()
+    assert not os.path.exists(journal_path(db.clients_path))
+    assert len(_ids(make_db(journal=False))) == 4
+
+
+def test_stale_journal_is_ignored(make_db):
+    db = make_db(journal=True)
+    db.add_or_update_client({"cuit": "20000000001", "name": "A"})
+    db.add_or_update_client({"cuit": "20000000002", "name": "B"})
+    # otra herramienta reescribe el snapshot: la cabecera del journal ya no coincide
+    with open(db.clients_path, "w", encoding="utf-8") as f:
+        f.write('{"clients": []}')
+    assert _ids(make_db(journal=True)) == []
+
+
+def test_non_journal_manager_replays_and_folds_pending_journal(make_db):
+    """Con el setting desactivado no se pierden las operaciones que quedaron en el journal."""
+    writer = make_db(journal=True)
+    for i in range(5):
+        writer.add_or_update_client({"cuit": f"2000000000{i}", "name": str(i)})
+    writer.compact()
+    for i in range(5, 9):
+        writer.add_or_update_client({"cuit": f"2000000000{i}", "name": str(i)})
+    assert os.path.exists(journal_path(writer.clients_path))
+
+    plain = make_db(journal=False)
+    assert len(_ids(plain)) == 9
+    assert len([c for c in plain.iter_clients()]) == 9
+    plain.add_or_update_client({"cuit": "20999999999", "name": "new"})
+
+    # la escritura volcó el journal al snapshot y lo eliminó
+    assert not os.path.exists(journal_path(plain.clients_path))
+    assert len(_ids(make_db(journal=True))) == 10
+    assert len(_ids(make_db(journal=False))) == 10
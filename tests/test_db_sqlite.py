@@ -0,0 +1,141 @@
+
+
+# ./tests/test_db_sqlite.py
+
+"""Backend SQLite (Utils/db_sqlite.py): misma API que DBManager, migración, exportación e historial."""
+
+import json
+import os
+import time
+
+import pytest
+
+from Utils.config import save_setting
+from Utils.db_manager import DBManager, get_db_manager
+from Utils.db_sqlite import SQLiteDBManager, migrate_json_to_sqlite, export_sqlite_to_json
+
+
+@pytest.fixture
+def sdb():
+    db = SQLiteDBManager()
+    yield db
+    db.close()
+
+
+def _public(cls):
+    return {name for name in dir(cls) if not name.startswith("_")}
+
+
+def test_exposes_the_db_manager_api():
+    assert _public(DBManager) <= _public(SQLiteDBManager)
+
+
+def test_crud_matches_json_semantics(sdb):
+    client = sdb.add_or_update_client({"cuit": "30712345678", "name": "ACME"})
+    assert client["id"] == "30712345678"
+    sdb.add_or_update_client({"cuit": "30712345678", "address": "Calle 1"})
+    assert sdb.find_client_by_cuit("30712345678")["address"] == "Calle 1"
+    assert sdb.find_client_by_cuit("30712345678")["_rev"] == 2
+
+    project = sdb.add_or_update_project({"name": "Tablero", "path": "/p1", "status": "Nuevo"})
+    assert sdb.get_current_project()["id"] == project["id"]
+    sdb.add_or_update_project({"path": "/p1", "status": "Aprobado"}, mark_current=False)
+    assert [p["status"] for p in sdb.load_projects()] == ["Aprobado"]
+    assert sdb.remove_project(project["id"])
+    assert sdb.get_current_project() is None
+    assert sdb.remove_client("30712345678")
+    assert sdb.load_clients() == []
+
+
+def test_unknown_keys_survive_in_extra(sdb):
+    sdb.save_clients([{"id": "c1", "name": "A", "custom": {"k": [1, 2]}}])
+    assert sdb.load_clients()[0]["custom"] == {"k": [1, 2]}
+
+
+def test_iterators_stream_rows(sdb):
+    sdb.bulk_upsert_projects([{"id": f"p{i}", "name": str(i)} for i in range(5)])
+    it = sdb.iter_projects()
+    assert next(it)["id"] == "p0"
+    assert [p["id"] for p in it] == ["p1", "p2", "p3", "p4"]
+    assert list(sdb.iter_clients()) == []
+    assert sdb.flush()
+
+
+def test_query_projects(sdb):
+    sdb.bulk_upsert_projects([{"id": f"p{i}", "status": "A" if i % 2 else "B", "client_id": "c"}
+                              for i in range(6)])
+    assert [p["id"] for p in sdb.query_projects({"status": "A"}, "-id", limit=2)] == ["p5", "p3"]
+    assert sdb.count_projects({"status": ["A", "B"]}) == 6
+    assert sdb.get_client_summary("c")["by_status"] == {"A": 3, "B": 3}
+
+
+def test_transaction_rolls_back(sdb):
+    with pytest.raises(RuntimeError):
+        with sdb.transaction():
+            sdb.add_or_update_client({"cuit": "20000000001", "name": "A"})
+            raise RuntimeError("abort")
+    assert sdb.load_clients() == []
+
+
+def test_migration_round_trip(make_db, sdb):
+    json_db = make_db()
+    json_db.add_or_update_client({"cuit": "20000000001", "name": "A"})
+    json_db.add_or_update_project({"id": "p1", "path": "/p1"})
+    assert migrate_json_to_sqlite(sdb.db_path) == {"clients": 1, "projects": 1}
+    assert sdb.get_current_project()["id"] == "p1"
+
+    sdb.add_or_update_client({"cuit": "20000000002", "name": "B"})
+    assert export_sqlite_to_json(sdb.db_path)
+    assert [c["name"] for c in make_db().load_clients()] == ["A", "B"]
+
+
+def test_export_json_never_touches_live_files(sdb, data_dir):
+    sdb.add_or_update_client({"cuit": "20000000001", "name": "A"})
+    live = open(sdb.clients_path, "rb").read() if os.path.exists(sdb.clients_path) else None
+
+    assert sdb.export_json()
+    with open(os.path.join(data_dir, "export", "clients.json"), encoding="utf-8") as f:
+        assert [c["name"] for c in json.load(f)["clients"]] == ["A"]
+    assert not sdb.export_json(sdb.clients_path, os.path.join(data_dir, "x.json"))
+    assert (open(sdb.clients_path, "rb").read() if os.path.exists(sdb.clients_path) else None) == live
+
+    nested = os.path.join(data_dir, "backups", "2026")
+    assert sdb.export_json(os.path.join(nested, "c.json"), os.path.join(nested, "p.json"))
+    assert os.path.exists(os.path.join(nested, "p.json"))
+
+
+def test_history(data_dir):
+    db = SQLiteDBManager(history=True)
+    try:
+        db.add_or_update_project({"id": "p1", "name": "A"}, mark_current=False)
+        time.sleep(0.01)
+        middle = time.time()
+        time.sleep(0.01)
+        db.add_or_update_project({"id": "p1", "name": "B"}, mark_current=False)
+        with pytest.raises(RuntimeError):
+            with db.transaction():
+                db.add_or_update_project({"id": "p1", "name": "rolled back"}, mark_current=False)
+                raise RuntimeError("abort")
+
+        assert db.record_at("projects", "p1", middle)["name"] == "A"
+        assert db.record_at("projects", "p1", time.time())["name"] == "B"
+        assert [c["op"] for c in db.record_changes("projects", "p1")] == ["create", "update"]
+        assert [p["name"] for p in db.records_at("projects", time.time())] == ["B"]
+        assert db.history_stats("projects")["segments"] == 1
+        assert db.compact_history() == 0
+    finally:
+        db.close()
+
+
+def test_get_db_manager_sqlite_kwargs():
+    save_setting("Database", "backend", "sqlite")
+    db = get_db_manager(write_behind=False, journal=None, watch=False, history=True)
+    try:
+        assert isinstance(db, SQLiteDBManager)
+        assert db._history is not None
+    finally:
+        db.close()
+    with pytest.raises(ValueError):
+        get_db_manager(journal=True)
+    with pytest.raises(ValueError):
+        get_db_manager(write_behind=True)
@@ -0,0 +1,89 @@
+
+
+# ./tests/test_db_transactions.py
+
+"""transaction() y bulk_upsert_* de DBManager: una escritura por archivo, rollback y anidamiento."""
+
+import os
+
+import pytest
+
+from Utils import db_manager
+from Utils.db_journal import file_signature
+
+
+@pytest.mark.parametrize("journal", [False, True])
+def test_changes_are_invisible_until_commit(make_db, journal):
+    db, other = make_db(journal=journal), make_db(journal=journal)
+    with db.transaction():
+        db.add_or_update_client({"cuit": "20000000001", "name": "A"})
+        project = db.add_or_update_project({"name": "P", "client_id": "20000000001"})
+        # dentro del bloque: visible para esta instancia, no escrito en disco
+        assert db.find_client_by_cuit("20000000001")["name"] == "A"
+        assert other.load_clients() == [] and other.load_projects() == []
+    assert other.find_client_by_cuit("20000000001")["name"] == "A"
+    assert other.load_projects_data()["current_project_id"] == project["id"]
+
+
+def test_commit_writes_each_file_once(make_db, monkeypatch):
+    db = make_db()
+    db.load_clients()
+    db.load_projects()
+    writes = []
+    write = db_manager._atomic_write_signed
+    monkeypatch.setattr(db_manager, "_atomic_write_signed",
+                        lambda path, *args: writes.append(os.path.basename(path)) or write(path, *args))
+    with db.transaction():
+        for i in range(10):
+            db.add_or_update_client({"cuit": f"2000000000{i}", "name": str(i)})
+        project = db.add_or_update_project({"name": "P"}, mark_current=False)
+        db.remove_project(project["id"])
+    assert sorted(writes) == ["clients.json", "projects.json"]
+    assert len(db.load_clients()) == 10
+
+
+def test_exception_rolls_back_memory_and_indexes(make_db):
+    db = make_db()
+    db.add_or_update_client({"cuit": "20000000001", "name": "A"})
+    before = file_signature(db.clients_path)
+    with pytest.raises(RuntimeError):
+        with db.transaction():
+            db.add_or_update_client({"cuit": "20000000001", "name": "cambiado"})
+            db.add_or_update_client({"cuit": "20000000002", "name": "nuevo"})
+            db.remove_client("20000000001")
+            raise RuntimeError("falla a mitad del lote")
+    assert file_signature(db.clients_path) == before
+    assert [c["name"] for c in db.load_clients()] == ["A"]
+    assert db.find_client_by_cuit("20000000001")["name"] == "A"
+    assert db.find_client_by_cuit("20000000002") is None
+
+
+def test_nested_transactions_join_the_outer_one(make_db):
+    db = make_db()
+    with pytest.raises(ValueError):
+        with db.transaction():
+            db.add_or_update_client({"cuit": "20000000001", "name": "exterior"})
+            with db.transaction():
+                db.add_or_update_client({"cuit": "20000000002", "name": "interior"})
+            # el bloque interior no confirmó por su cuenta
+            assert make_db().load_clients() == []
+            raise ValueError()
+    assert db.load_clients() == []
+
+
+def test_bulk_upsert_creates_and_updates(make_db):
+    db = make_db()
+    db.add_or_update_client({"cuit": "20000000001", "name": "viejo", "address": "calle 1"})
+    saved = db.bulk_upsert_clients([
+        {"cuit": "20000000001", "name": "nuevo"},
+        {"cuit": "20000000002", "name": "B"},
+    ])
+    assert [c["id"] for c in saved] == ["20000000001", "20000000002"]
+    fresh = make_db()
+    assert fresh.find_client_by_cuit("20000000001")["name"] == "nuevo"
+    assert fresh.find_client_by_cuit("20000000001")["address"] == "calle 1"
+    assert len(fresh.load_clients()) == 2
+
+    projects = db.bulk_upsert_projects([{"name": "uno"}, {"name": "dos"}], mark_current=True)
+    assert [p["name"] for p in projects] == ["uno", "dos"]
+    assert fresh.load_projects_data()["current_project_id"] == projects[1]["id"]
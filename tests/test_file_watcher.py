@@ -0,0 +1,161 @@
+
+
+# ./tests/test_file_watcher.py
+
+"""Vigilante de archivos (Utils/file_watcher.py) y su uso en DBManager y get_project_path()."""
+
+import gc
+import json
+import os
+import time
+
+import pytest
+
+from Utils import file_watcher, paths
+from Utils.file_watcher import FileWatcher, get_watcher
+
+
+def _wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return predicate()
+
+
+def _replace(path, text):
+    tmp = str(path) + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+@pytest.fixture(params=["inotify", "poll"])
+def watcher(request):
+    watcher = FileWatcher(request.param, poll_interval=0.05)
+    if request.param == "inotify" and watcher.backend != "inotify":
+        pytest.skip("inotify no disponible")
+    yield watcher
+    watcher.stop()
+
+
+def test_atomic_replace_is_reported(watcher, tmp_path):
+    target = tmp_path / "datos.json"
+    target.write_text("{}", encoding="utf-8")
+    events = []
+    watcher.subscribe([str(target)], lambda path, event: events.append((path, event)))
+    assert watcher.is_precise(str(target)) == (watcher.backend == "inotify")
+
+    (tmp_path / "otro.json").write_text("x", encoding="utf-8")
+    _replace(target, '{"a": 1}')
+    assert _wait_for(lambda: (str(target), "changed") in events)
+    # sólo los archivos suscriptos
+    assert all(path == str(target) for path, _ in events)
+
+    time.sleep(0.2)  # que terminen de llegar los avisos del reemplazo
+    count = len(events)
+    os.remove(target)
+    assert _wait_for(lambda: len(events) > count)
+
+
+def test_bound_methods_are_weak_and_stop_unwatches(watcher, tmp_path):
+    target = tmp_path / "a.cfg"
+    target.write_text("", encoding="utf-8")
+
+    class Subscriber:
+        def __init__(self):
+            self.events = []
+
+        def on_event(self, path, event):
+            self.events.append(event)
+
+    keep, dropped = Subscriber(), Subscriber()
+    watcher.subscribe([str(target)], keep.on_event)
+    watcher.subscribe([str(target)], dropped.on_event)
+    del dropped
+    gc.collect()
+    _replace(target, "k=v\n")
+    assert _wait_for(lambda: "changed" in keep.events)
+    assert _wait_for(lambda: len(watcher._subscribers) == 1)
+
+    watcher.stop()
+    assert keep.events[-1] == "unwatched"
+
+
+def test_db_manager_sees_external_writes_without_stat(make_db):
+    if get_watcher() is None or get_watcher().backend != "inotify":
+        pytest.skip("inotify no disponible")
+    db = make_db(watch=True)
+    db.load_clients()
+    assert db._files["clients"].verified
+
+    writer = make_db()
+    writer.add_or_update_client({"cuit": "20000000001", "name": "de otro proceso"})
+    assert _wait_for(lambda: [c["name"] for c in db.load_clients()] == ["de otro proceso"])
+    # sin avisos nuevos, las lecturas no revalidan
+    misses = db.cache_misses
+    for _ in range(3):
+        db.load_clients()
+    assert db.cache_misses == misses
+
+
+def test_project_path_follows_watcher_events(data_dir):
+    if get_watcher() is None or get_watcher().backend != "inotify":
+        pytest.skip("inotify no disponible")
+    projects_file = os.path.join(data_dir, "projects.json")
+    _replace(projects_file, json.dumps({"current_project_id": "a", "projects": [{"id": "a", "path": "/p/a"}]}))
+    assert paths.get_project_path() == "/p/a"
+    _replace(projects_file, json.dumps({"current_project_id": "a", "projects": [{"id": "a", "path": "/p/otro"}]}))
+    assert _wait_for(lambda: paths.get_project_path() == "/p/otro")
+
+
+def test_settings_cfg_changes_invalidate_the_group(tmp_path):
+    from Utils.settings_store import SettingsStore
+    watcher = FileWatcher("true", poll_interval=0.05)
+    try:
+        store = SettingsStore(str(tmp_path))
+        store.set("G", "k", "propio")
+        store.attach_watcher(watcher)
+        # escritura propia: no invalida
+        store.set("G", "k", "propio 2")
+        assert store.get("G", "k") == "propio 2"
+        _replace(tmp_path / "G.cfg", "k=externo\n")
+        assert _wait_for(lambda: store.get("G", "k") == "externo")
+    finally:
+        watcher.stop()
+
+
+def test_mount_fstype_picks_the_closest_mount(tmp_path):
+    mounts = tmp_path / "mounts"
+    mounts.write_text("/dev/sda1 / ext4 rw 0 0\n"
+                      "srv:/datos /mnt/datos\\040compartidos nfs4 rw 0 0\n"
+                      "tmpfs /mnt/datos\\040compartidos/local tmpfs rw 0 0\n", encoding="utf-8")
+    assert file_watcher._mount_fstype("/mnt/datos compartidos/ew", str(mounts)) == "nfs4"
+    assert file_watcher._mount_fstype("/mnt/datos compartidos/local/x", str(mounts)) == "tmpfs"
+    assert file_watcher._mount_fstype("/mnt/datos compartidos2", str(mounts)) == "ext4"
+    assert file_watcher._mount_fstype("/x", str(tmp_path / "no_existe")) is None
+
+
+def test_network_fs_is_polled_and_db_keeps_revalidating(make_db, data_dir, monkeypatch):
+    monkeypatch.setattr(file_watcher, "is_network_fs", lambda path: True)
+    watcher = FileWatcher("true", poll_interval=0.05)
+    try:
+        target = os.path.join(data_dir, "clients.json")
+        events = []
+        watcher.subscribe([target], lambda path, event: events.append(event))
+        assert not watcher.is_precise(target)
+        _replace(target, '{"clients": []}')
+        assert _wait_for(lambda: "changed" in events)
+    finally:
+        watcher.stop()
+
+    monkeypatch.setattr(file_watcher, "_WATCHER", FileWatcher("true", poll_interval=0.05))
+    try:
+        db = make_db(watch=True)
+        db.load_clients()
+        assert not db._files["clients"].verified
+        make_db().add_or_update_client({"cuit": "20000000001", "name": "de otro host"})
+        assert [c["name"] for c in db.load_clients()] == ["de otro host"]
+    finally:
+        file_watcher._WATCHER.stop()
@@ -0,0 +1,81 @@
+
+
+# ./tests/test_json_stream.py
+
+"""Lectura incremental de los JSON de datos (Utils/json_stream.py) e iter_clients/iter_projects."""
+
+import json
+
+import pytest
+
+from Utils.json_stream import iter_document, iter_array
+
+DOC = {
+    "current_project_id": "p2",
+    "projects": [
+        {"id": "p1", "name": "con ] y } y \"comillas\" y \\", "n": 1.5e3, "tags": [], "x": {}},
+        {"id": "p2", "name": "ñandú ✓ é", "n": -12, "ok": True, "none": None, "big": 12345678901234567890},
+        {"id": "p3", "nested": {"a": [1, [2, [3]]], "b": "]}"}, "n": 0.000125},
+    ],
+    "meta": {"version": 2},
+}
+
+
+@pytest.fixture
+def doc_path(tmp_path):
+    path = tmp_path / "projects.json"
+    path.write_text(json.dumps(DOC, ensure_ascii=False, indent=2), encoding="utf-8")
+    return str(path)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 64, 65536])
+def test_stream_matches_json_load(doc_path, chunk_size):
+    items = list(iter_document(doc_path, "projects", chunk_size))
+    assert items == [("current_project_id", "p2")] + [("projects", p) for p in DOC["projects"]] + [("meta", DOC["meta"])]
+    assert list(iter_array(doc_path, "projects", chunk_size)) == DOC["projects"]
+
+
+def test_consumer_can_stop_before_the_rest_is_read(tmp_path):
+    path = tmp_path / "projects.json"
+    path.write_text('{"projects": [{"id": "a"}, {"id": "b"}, ' + "x" * 10000, encoding="utf-8")
+    stream = iter_array(str(path), "projects", chunk_size=16)
+    assert next(stream) == {"id": "a"}
+    assert next(stream) == {"id": "b"}
+    with pytest.raises(ValueError):
+        next(stream)
+
+
+@pytest.mark.parametrize("text", ['[]', '{"projects": [1 2]}', '{"projects": [{"id": "a"}', '{"a" 1}', '{1: 2}'])
+def test_invalid_documents_raise(tmp_path, text):
+    path = tmp_path / "bad.json"
+    path.write_text(text, encoding="utf-8")
+    with pytest.raises(ValueError):
+        list(iter_document(str(path), "projects"))
+
+
+def test_non_list_array_and_empty_object(tmp_path):
+    path = tmp_path / "doc.json"
+    path.write_text('{"projects": null, "current_project_id": "x"}', encoding="utf-8")
+    assert list(iter_document(str(path), "projects")) == [("current_project_id", "x")]
+    path.write_text("{ }", encoding="utf-8")
+    assert list(iter_document(str(path), "projects")) == []
+
+
+def test_iter_projects_streams_without_loading_the_cache(make_db):
+    make_db().save_projects_data({"current_project_id": None,
+                                  "projects": [{"id": f"p{i}", "name": str(i)} for i in range(50)]})
+    db = make_db()
+    first = next(db.iter_projects())
+    assert first["id"] == "p0"
+    assert sum(1 for _ in db.iter_projects()) == 50
+    assert db._files["projects"].data is None
+    assert db.find_project_by_id("p42")["name"] == "42"
+    assert db._files["projects"].data is None
+
+
+def test_iter_clients_sees_unflushed_changes(make_db):
+    db = make_db(write_behind=True)
+    db.add_or_update_client({"cuit": "20000000001", "name": "pendiente"})
+    assert [c["name"] for c in db.iter_clients()] == ["pendiente"]
+    db.flush()
+    assert [c["name"] for c in make_db().iter_clients()] == ["pendiente"]
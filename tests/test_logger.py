@@ -0,0 +1,76 @@
+
+
+# ./tests/test_logger.py
+
+"""Logger con niveles (Utils/logger.py): filtrado antes de formatear, buffer circular y sink a archivo."""
+
+import pytest
+
+from Utils import logger
+
+
+@pytest.fixture(autouse=True)
+def level():
+    logger.flush()
+    logger._recent.clear()
+    previous = logger.get_level()
+    yield
+    logger.set_level(previous)
+    logger.disable_file_sink()
+
+
+def _messages():
+    return [r["message"] for r in logger.get_recent_records()]
+
+
+def test_off_neither_formats_nor_records(monkeypatch):
+    calls = []
+    monkeypatch.setattr(logger, "_ensure_flusher", lambda: calls.append("thread") or True)
+    logger.set_level("OFF")
+    logger.log_info("./tests", "test_logger.py", lambda: calls.append("format") or "x")
+    logger.log_error("./tests", "test_logger.py", "%s", "y")
+
+    assert not logger._queue
+    assert logger.get_recent_records() == []
+    assert calls == []
+
+
+def test_level_raised_after_enqueue_drops_record():
+    calls = []
+    logger.set_level("INFO")
+    logger.log_info("./tests", "test_logger.py", lambda: calls.append("format") or "late")
+    logger.set_level("ERROR")
+    assert logger.get_recent_records() == []
+    assert calls == []
+
+
+def test_enabled_levels_are_formatted_lazily_and_kept(capsys):
+    logger.set_level("WARNING")
+    logger.log_info("./tests", "test_logger.py", "oculto %d", 1)
+    logger.log_warning("./tests", "test_logger.py", "%d clientes", 3)
+    logger.log_error("./tests", "test_logger.py", "falló")
+
+    assert _messages() == ["[EW]-[./tests/test_logger.py] → 3 clientes",
+                           "[EW]-[./tests/test_logger.py] → falló"]
+    assert [r["level"] for r in logger.get_recent_records()] == ["WARNING", "ERROR"]
+    assert "oculto" not in capsys.readouterr().err
+
+
+def test_bad_format_is_reported_not_raised():
+    logger.set_level("INFO")
+    logger.log_info("./tests", "test_logger.py", "%d", "no es número")
+    assert "error de formato" in _messages()[-1]
+
+
+def test_file_sink_rotates(tmp_path):
+    logger.set_level("INFO")
+    path = str(tmp_path / "logs" / "ew.log")
+    assert logger.enable_file_sink(path, max_bytes=200, backups=2) == path
+    for i in range(20):
+        logger.log_info("./tests", "test_logger.py", "línea %d", i)
+        logger.flush()
+    logger.disable_file_sink()
+
+    assert (tmp_path / "logs" / "ew.log.1").exists()
+    assert not (tmp_path / "logs" / "ew.log.3").exists()
+    assert "línea 19" in (tmp_path / "logs" / "ew.log").read_text(encoding="utf-8")
@@ -0,0 +1,69 @@
+
+
+# ./tests/test_paths.py
+
+"""Rutas memorizadas y caché de get_project_path() (Utils/paths.py)."""
+
+import json
+import os
+
+import pytest
+
+from Utils import paths
+from Utils.config import save_setting
+
+
+@pytest.fixture(autouse=True)
+def no_watcher():
+    """Sin vigilante: cada llamada revalida por firma (ver tests/test_file_watcher.py)."""
+    save_setting("Files", "watch", "false")
+
+
+def _write_projects(data_dir, data):
+    with open(os.path.join(data_dir, "projects.json"), "w", encoding="utf-8") as f:
+        json.dump(data, f)
+
+
+def test_paths_follow_the_data_dir_after_clear(data_dir, tmp_path, monkeypatch):
+    assert paths.get_clients_db_path() == os.path.join(data_dir, "clients.json")
+    other = str(tmp_path / "otra")
+    monkeypatch.setenv("EW_DATA_DIR", other)
+    # memorizada hasta limpiar la caché
+    assert paths.get_clients_db_path() == os.path.join(data_dir, "clients.json")
+    paths.clear_path_cache()
+    assert paths.get_projects_db_path() == os.path.join(other, "projects.json")
+    assert os.path.isdir(other)
+
+
+def test_project_path_is_cached_by_file_signature(data_dir, monkeypatch):
+    _write_projects(data_dir, {"current_project_id": "a", "projects": [{"id": "a", "path": "/p/a"}]})
+    reads = []
+    read = paths._read_project_path
+    monkeypatch.setattr(paths, "_read_project_path", lambda f: reads.append(f) or read(f))
+
+    assert paths.get_project_path() == "/p/a"
+    assert paths.get_project_path() == "/p/a"
+    assert len(reads) == 1
+
+    # escritura externa (tamaño distinto): se relee
+    _write_projects(data_dir, {"current_project_id": "b", "projects": [{"id": "a", "path": "/p/a"},
+                                                                        {"id": "b", "path": "/p/bb"}]})
+    assert paths.get_project_path() == "/p/bb"
+    assert len(reads) == 2
+
+
+def test_list_before_current_id_and_missing_current(data_dir):
+    with open(os.path.join(data_dir, "projects.json"), "w", encoding="utf-8") as f:
+        f.write('{"projects": [{"id": "a", "path": "/p/a"}, {"id": "b", "path": "/p/b"}], "current_project_id": "b"}')
+    assert paths.get_project_path() == "/p/b"
+    _write_projects(data_dir, {"current_project_id": None, "projects": [{"id": "a", "path": "/p/a"}]})
+    assert paths.get_project_path() is None
+
+
+def test_current_project_only_in_journal(make_db):
+    db = make_db(journal=True)
+    a = db.add_or_update_project({"name": "A", "path": "/p/a"}, mark_current=True)
+    db.add_or_update_project({"name": "B", "path": "/p/b"}, mark_current=True)
+    assert paths.get_project_path() == "/p/b"
+    db.set_current_project(a["id"])
+    assert paths.get_project_path() == "/p/a"
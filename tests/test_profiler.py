@@ -0,0 +1,90 @@
+
+
+# ./tests/test_profiler.py
+
+"""Instrumentación de arranque (Utils/profiler.py): spans anidados, resumen y modo desactivado."""
+
+import json
+import tracemalloc
+
+import pytest
+
+from Utils import profiler
+
+
+@pytest.fixture
+def enabled(monkeypatch):
+    monkeypatch.setattr(profiler, "ENABLED", True)
+    profiler.reset()
+    yield
+    profiler.reset()
+
+
+def test_disabled_records_nothing(monkeypatch):
+    monkeypatch.setattr(profiler, "ENABLED", False)
+    profiler.reset()
+
+    def func():
+        return 1
+
+    assert profiler.profiled("f")(func) is func
+    with profiler.profile("bloque"):
+        pass
+    assert profiler.get_report()["spans"] == []
+    assert profiler.format_report().startswith("Profiling desactivado")
+
+
+def test_nested_spans_and_categories(enabled):
+    @profiler.profiled("register", "commands")
+    def register():
+        for name in ("a", "b"):
+            with profiler.profile(f"import {name}", "import"):
+                pass
+        return "ok"
+
+    assert register() == "ok"
+    report = profiler.get_report()
+    spans = {s["name"]: s for s in report["spans"]}
+    assert spans["register"]["parent"] is None and spans["register"]["depth"] == 0
+    assert spans["import a"]["parent"] == "register" and spans["import a"]["depth"] == 1
+    assert spans["import a"]["start_ms"] <= spans["import b"]["start_ms"]
+    assert report["by_category"]["import"]["count"] == 2
+    assert report["by_category"]["commands"]["total_ms"] >= report["by_category"]["import"]["max_ms"]
+    assert "[commands] register" in profiler.format_report()
+
+
+def test_span_is_recorded_when_the_block_raises(enabled):
+    with pytest.raises(KeyError):
+        with profiler.profile("falla"):
+            raise KeyError()
+    assert [s["name"] for s in profiler.get_report()["spans"]] == ["falla"]
+    assert profiler._STACK == []
+
+
+def test_dump_report_writes_json(enabled, tmp_path):
+    with profiler.profile("x", "startup"):
+        pass
+    path = profiler.dump_report(str(tmp_path / "profile.json"))
+    with open(path, encoding="utf-8") as f:
+        assert json.load(f)["by_category"]["startup"]["count"] == 1
+
+
+def test_nested_span_keeps_the_parent_peak(enabled, monkeypatch):
+    monkeypatch.setattr(profiler, "TRACE_MEMORY", True)
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    try:
+        with profiler.profile("padre"):
+            big = bytearray(2 * 1024 * 1024)
+            del big
+            with profiler.profile("hijo"):
+                small = bytearray(256 * 1024)
+                del small
+    finally:
+        if started:
+            tracemalloc.stop()
+    spans = {s["name"]: s for s in profiler.get_report()["spans"]}
+    assert spans["hijo"]["mem_peak_kb"] >= 256
+    assert spans["padre"]["mem_peak_kb"] >= max(2048, spans["hijo"]["mem_peak_kb"])
+    assert profiler._PEAKS == []
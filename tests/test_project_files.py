@@ -0,0 +1,87 @@
+
+
+# ./tests/test_project_files.py
+
+"""Índice de archivos de las carpetas de proyecto (Utils/project_files.py): escaneo incremental y consultas."""
+
+import os
+
+import pytest
+
+from Utils.project_files import ProjectFileIndex
+
+
+def _touch_dir(path):
+    """Adelanta el mtime de la carpeta: el reloj del sistema de archivos puede no avanzar entre dos cambios seguidos."""
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10 ** 9))
+
+
+@pytest.fixture
+def projects(tmp_path, make_db):
+    root = tmp_path / "proyectos"
+    (root / "uno" / "planos" / "viejos").mkdir(parents=True)
+    (root / "uno" / "Tablero.FCStd").write_bytes(b"x" * 100)
+    (root / "uno" / "planos" / "Unifilar.fcstd").write_bytes(b"x" * 50)
+    (root / "uno" / "planos" / "notas.txt").write_bytes(b"x" * 7)
+    (root / "uno" / "planos" / "viejos" / "v1.FCStd").write_bytes(b"x" * 3)
+    (root / "dos").mkdir()
+    (root / "dos" / "a.txt").write_bytes(b"x" * 1000)
+    db = make_db()
+    db.save_projects_data({"current_project_id": None, "projects": [
+        {"id": "p1", "path": str(root / "uno")},
+        {"id": "p2", "path": str(root / "dos")},
+        {"id": "p3", "path": str(root / "no_existe")},
+        {"id": "p4", "path": ""},
+    ]})
+    return db, root
+
+
+def test_scan_and_queries(projects):
+    db, root = projects
+    index = ProjectFileIndex()
+    stats = index.scan(db, workers=2)
+    assert stats["projects"] == 4 and stats["missing"] == 2 and stats["listed_dirs"] == 4
+
+    assert index.get("p1")["size"] == 160 and index.get("p1")["files"] == 4
+    assert index.documents("p1") == sorted(["Tablero.FCStd", os.path.join("planos", "Unifilar.fcstd"),
+                                            os.path.join("planos", "viejos", "v1.FCStd")])
+    assert {m["project_id"]: m["error"] for m in index.missing()} == {"p3": "no existe", "p4": "sin carpeta asignada"}
+    assert [p["project_id"] for p in index.largest(2)] == ["p2", "p1"]
+    assert index.totals()["documents"] == 3
+    assert "dirs" not in index.get("p1")
+
+    # persistido: otra instancia consulta sin escanear
+    assert ProjectFileIndex().totals() == index.totals()
+
+
+def test_rescan_reuses_unchanged_folders(projects):
+    db, root = projects
+    index = ProjectFileIndex()
+    index.scan(db)
+    stats = index.scan(db)
+    assert stats["listed_dirs"] == 0 and stats["reused_dirs"] == 4
+
+    (root / "uno" / "planos" / "Nuevo.FCStd").write_bytes(b"x" * 10)
+    _touch_dir(root / "uno" / "planos")
+    stats = index.scan(db)
+    assert stats["listed_dirs"] == 1 and stats["reused_dirs"] == 3
+    assert os.path.join("planos", "Nuevo.FCStd") in index.documents("p1")
+    assert index.get("p1")["size"] == 170
+
+    assert index.scan(db, full=True)["listed_dirs"] == 4
+
+
+def test_partial_scan_and_removed_projects(projects):
+    db, root = projects
+    index = ProjectFileIndex()
+    index.scan(db)
+    (root / "dos" / "b.txt").write_bytes(b"x")
+    _touch_dir(root / "dos")
+    db.remove_project("p4")
+
+    stats = index.scan(db, project_ids=["p2"])
+    assert stats["projects"] == 1
+    assert index.get("p2")["files"] == 2
+    assert index.get("p1")["files"] == 4
+    assert index.get("p4") is None
@@ -0,0 +1,90 @@
+
+
+# ./tests/test_project_queries.py
+
+"""
+query_projects / count_projects (Utils/project_index.py) contrastados con una
+evaluación lineal sobre la lista completa, también después de modificaciones
+incrementales.
+"""
+
+import random
+
+import pytest
+
+STATUSES = ("En proceso", "Aprobado", "Cerrado", None)
+CLIENTS = ("c1", "c2", "c3", None)
+
+
+def _project(i, rng):
+    return {
+        "id": f"p{i:03d}",
+        "name": f"Proyecto {i}",
+        "status": rng.choice(STATUSES),
+        "client_id": rng.choice(CLIENTS),
+        "type": rng.choice(("A", "B")),
+        "is_macro": rng.random() < 0.3,
+        "version": rng.randint(1, 4),
+        "created_at": f"2025-01-{rng.randint(1, 28):02d}T00:00:00Z",
+        "updated_at": f"2025-02-{rng.randint(1, 28):02d}T00:00:00Z",
+    }
+
+
+def _matches(p, filters):
+    for field, wanted in filters.items():
+        values = wanted if isinstance(wanted, (list, tuple, set)) else [wanted]
+        value = bool(p.get(field)) if field == "is_macro" else p.get(field)
+        if value not in values and not (value is None and "" in values):
+            return False
+    return True
+
+
+def _expected(projects, filters, order_by, limit, offset):
+    found = [p for p in projects if _matches(p, filters or {})]
+    if order_by:
+        field = order_by.lstrip("-")
+        found.sort(key=lambda p: ("" if p.get(field) is None else str(p.get(field)), p["id"]),
+                   reverse=order_by.startswith("-"))
+    stop = None if limit is None else offset + limit
+    return [p["id"] for p in found[offset:stop]]
+
+
+QUERIES = [
+    ({}, None, None, 0),
+    ({}, "updated_at", 5, 3),
+    ({}, "-created_at", 7, 0),
+    ({"status": "Aprobado"}, None, None, 0),
+    ({"status": ["Aprobado", "Cerrado"], "is_macro": False}, "-updated_at", 4, 2),
+    ({"client_id": "c2", "type": "B"}, "created_at", None, 1),
+    ({"client_id": ["c1", "c3"]}, "-updated_at", 3, 0),
+    ({"version": [2, 3]}, "updated_at", 6, 1),       # campo no indexado
+    ({"status": "Aprobado"}, "-version", None, 0),   # orden por campo no indexado
+    ({"status": "No existe"}, "updated_at", 5, 0),
+]
+
+
+def _check(db):
+    projects = db.load_projects()
+    for filters, order_by, limit, offset in QUERIES:
+        got = [p["id"] for p in db.query_projects(filters, order_by, limit, offset)]
+        assert got == _expected(projects, filters, order_by, limit, offset), (filters, order_by, limit, offset)
+        assert db.count_projects(filters) == len(_expected(projects, filters, None, None, 0))
+
+
+@pytest.mark.parametrize("seed", [1, 2])
+def test_queries_match_linear_scan(make_db, seed):
+    rng = random.Random(seed)
+    db = make_db()
+    db.save_projects_data({"current_project_id": None, "projects": [_project(i, rng) for i in range(60)]})
+    _check(db)
+
+    # cambios incrementales: los índices se actualizan sin reconstruirse
+    for step in range(30):
+        pid = f"p{rng.randrange(70):03d}"
+        if rng.random() < 0.25:
+            db.remove_project(pid)
+        else:
+            db.add_or_update_project({"id": pid, "status": rng.choice(STATUSES[:3]),
+                                      "client_id": rng.choice(CLIENTS[:3]), "name": f"v{step}"},
+                                     mark_current=False)
+    _check(db)
@@ -0,0 +1,164 @@
+
+
+# ./tests/test_record_history.py
+
+"""Historial de cambios (Utils/record_history.py): deltas, consultas a un instante, checkpoints y retención."""
+
+import os
+import time
+import json
+
+import pytest
+
+import Utils.record_history as record_history
+from Utils.record_history import RecordHistory, diff_record, apply_delta, to_epoch
+
+
+def _pause():
+    """Instante entre dos confirmaciones (los checkpoints tienen resolución de ms)."""
+    time.sleep(0.01)
+    now = time.time()
+    time.sleep(0.01)
+    return now
+
+
+def test_diff_and_apply_delta():
+    before = {"id": "p1", "name": "A", "status": "Nuevo", "tmp": 1}
+    after = {"id": "p1", "name": "A", "status": "Aprobado"}
+    delta = diff_record(before, after)
+    assert delta == {"s": {"status": "Aprobado"}, "u": ["tmp"]}
+    assert apply_delta(before, delta) == after
+    assert diff_record(after, dict(after)) is None
+    assert apply_delta(None, diff_record(None, after)) == after
+    assert apply_delta(after, diff_record(after, None)) is None
+
+
+def test_to_epoch_accepts_iso_dates_and_numbers():
+    assert to_epoch("1970-01-02") == 86400.0
+    assert to_epoch("1970-01-01T00:01:00Z") == 60.0
+    assert to_epoch("120") == 120.0
+    with pytest.raises(ValueError):
+        to_epoch("yesterday")
+
+
+@pytest.mark.parametrize("mode", ["plain", "journal", "write-behind"])
+def test_point_in_time_queries(make_db, mode):
+    kwargs = {"journal": mode == "journal", "write_behind": mode == "write-behind", "history": True}
+    make_db(history=False).save_projects_data(
+        {"projects": [{"id": "old", "name": "pre", "status": "A"}], "current_project_id": None})
+    db = make_db(**kwargs)
+    db.add_or_update_project({"id": "x1", "name": "uno", "status": "En proceso"}, mark_current=False)
+    db.flush()
+    t1 = _pause()
+    db.add_or_update_project({"id": "x1", "status": "Aprobado"}, mark_current=False)
+    db.add_or_update_project({"id": "old", "status": "B"}, mark_current=False)
+    db.flush()
+    t2 = _pause()
+    with db.transaction():
+        db.add_or_update_project({"id": "x1", "status": "Cerrado"}, mark_current=False)
+        db.add_or_update_project({"id": "x1", "name": "UNO"}, mark_current=False)
+    db.remove_project("old")
+    db.flush()
+    t3 = _pause()
+
+    assert db.record_at("projects", "x1", t1)["status"] == "En proceso"
+    assert db.record_at("projects", "x1", t2)["status"] == "Aprobado"
+    assert (db.record_at("projects", "x1", t3)["status"], db.record_at("projects", "x1", t3)["name"]) == \
+        ("Cerrado", "UNO")
+    assert db.record_at("projects", "old", t1)["status"] == "A"
+    assert db.record_at("projects", "old", t3) is None
+    assert db.record_at("projects", "x1", t1 - 60) is None  # anterior al historial
+    assert {r["id"]: r["status"] for r in db.records_at("projects", t1)} == {"old": "A", "x1": "En proceso"}
+    assert {r["id"]: r["status"] for r in db.records_at("projects", t3)} == {"x1": "Cerrado"}
+
+    changes = db.record_changes("projects", "x1")
+    assert [c["op"] for c in changes] == ["create", "update", "update"]
+    assert {"status", "name"} <= set(changes[2]["fields"])
+
+    # reemplazo completo: checkpoint nuevo
+    db.save_projects_data({"projects": [{"id": "z", "name": "z"}], "current_project_id": None})
+    db.flush()
+    assert [r["id"] for r in db.records_at("projects", time.time())] == ["z"]
+
+
+def test_log_stores_only_changed_fields(make_db):
+    db = make_db(history=True)
+    db.add_or_update_project({"id": "p1", "name": "A", "purpose": "x" * 500}, mark_current=False)
+    db.add_or_update_project({"id": "p1", "status": "Aprobado"}, mark_current=False)
+    history = RecordHistory(db.projects_path, "projects")
+    with open(history.segments()[-1][3], encoding="utf-8") as f:
+        last = json.loads(f.read().splitlines()[-1])
+    assert set(last["s"]) == {"status", "updated_at", "_rev"}
+
+
+def test_truncated_last_line_is_skipped(make_db):
+    db = make_db(history=True)
+    db.add_or_update_project({"id": "p1", "name": "A"}, mark_current=False)
+    t1 = _pause()
+    history = RecordHistory(db.projects_path, "projects")
+    with open(history.segments()[-1][3], "a", encoding="utf-8") as f:
+        f.write('{"t":17000')
+    assert db.record_at("projects", "p1", t1)["name"] == "A"
+    assert [p["id"] for p in db.records_at("projects", t1)] == ["p1"]
+    assert len(db.record_changes("projects", "p1")) == 1
+
+
+def test_history_disabled_writes_nothing(make_db):
+    db = make_db(history=False)
+    db.add_or_update_project({"id": "p1"}, mark_current=False)
+    assert not os.path.exists(db.projects_path + ".history")
+    assert db.record_changes("projects", "p1") == []
+
+
+def test_rollover_bounds_segments_and_retention_drops_old_ones(make_db, monkeypatch):
+    monkeypatch.setattr(record_history, "MIN_SEGMENT_BYTES", 2000)
+    db = make_db(history=True, write_behind=False)
+    db.bulk_upsert_projects([{"id": f"p{i}", "name": f"n{i}"} for i in range(20)])
+    stamps = []
+    for k in range(60):
+        db.add_or_update_project({"id": f"p{k % 20}", "name": f"v{k}"}, mark_current=False)
+        stamps.append((time.time(), k))
+    history = RecordHistory(db.projects_path, "projects")
+    segments = history.segments()
+    assert len(segments) > 2
+    for t, k in stamps[::7]:
+        assert db.record_at("projects", f"p{k % 20}", t)["name"] == f"v{k}"
+        assert db.records_at("projects", t)[k % 20]["name"] == f"v{k}"
+
+    # envejecer todos los segmentos menos el último: sólo sobrevive el que cubre el corte
+    old = time.time() - 400 * 86400
+    for seq, _, ckpt, _ in segments[:-1]:
+        os.rename(ckpt, os.path.join(history.dir, f"{seq:06d}-{int((old + seq) * 1000)}.ckpt"))
+    assert db.compact_history() == len(segments) - 2
+    assert db.record_at("projects", "p0", time.time())["name"] == "v40"
+    assert db.compact_history() == 0
+
+
+def test_zero_retention_keeps_everything(tmp_path):
+    history = RecordHistory(str(tmp_path / "projects.json"), "projects", retention_days=0)
+    history.checkpoint([{"id": "a"}], when=1.0)
+    history.checkpoint([{"id": "b"}], when=2.0)
+    assert history.compact() == 0
+    assert history.records_at(1.5) == [{"id": "a"}]
+
+
+@pytest.mark.parametrize("backend", ["json", "sqlite"])
+def test_cli_history_on_both_backends(backend, capsys):
+    from Utils.cli import main
+    from Utils.config import save_setting
+    save_setting("Database", "backend", backend)
+    save_setting("Database", "history", "true")
+    assert main(["upsert", "projects", "--set", "id=p1", "--set", "name=A", "--no-current"]) == 0
+    t = _pause()
+    assert main(["upsert", "projects", "--set", "id=p1", "--set", "name=B", "--no-current"]) == 0
+    capsys.readouterr()
+
+    assert main(["history", "projects", "p1"]) == 0
+    ops = [json.loads(line)["op"] for line in capsys.readouterr().out.splitlines()]
+    assert ops == ["create", "update"]
+    assert main(["history", "projects", "p1", "--at", str(t)]) == 0
+    assert json.loads(capsys.readouterr().out)["name"] == "A"
+    assert main(["history", "projects", "--stats"]) == 0
+    assert json.loads(capsys.readouterr().out)["segments"] == 1
+    assert main(["history", "projects", "--compact"]) == 0
+    assert main(["history", "projects", "--at", "not-a-date"]) == 1
@@ -0,0 +1,92 @@
+
+
+# ./tests/test_records.py
+
+"""Registros tipados Client/Project (Utils/records.py) y DBManager(records=True)."""
+
+import copy
+import json
+import pickle
+import sys
+
+import pytest
+
+from Utils.records import Client, Project, as_dict
+
+FULL_CLIENT = {"id": "c1", "name": "A", "cuit": "20000000001", "address": "calle", "contact_name": "x",
+               "contact_email": "x@y", "contact_phone": "1", "created_at": "t0", "updated_at": "t1", "_rev": 3}
+
+
+@pytest.mark.parametrize("data", [
+    FULL_CLIENT,
+    {k: v for k, v in FULL_CLIENT.items() if k != "_rev"},          # anterior a '_rev'
+    dict(FULL_CLIENT, extra={"a": 1}, otra=None),                     # claves desconocidas
+    {k: v for k, v in FULL_CLIENT.items() if k != "address"} | {"nuevo": 1},  # mismo tamaño, otra clave
+])
+def test_client_round_trip(data):
+    client = Client.from_dict(data)
+    expected = {**{f: "" for f in Client.FIELDS if f != "_rev"}, **data}
+    assert client.to_dict() == expected
+    assert client.copy() == client
+    assert pickle.loads(pickle.dumps(client)) == client
+
+
+def test_project_defaults_and_interning():
+    project = Project.from_dict({"name": "Tablero", "status": "".join(["En ", "proceso"])})
+    assert project.status is sys.intern("En proceso")
+    assert project.version == "0.1.0" and project.is_macro is False
+    assert "_rev" not in project.to_dict()
+    project["type"] = "".join(["Ta", "blero"])
+    assert project.type is sys.intern("Tablero")
+
+
+def test_dict_like_access():
+    project = Project.from_dict({"id": "p1", "name": "P", "extra": 5})
+    assert project["name"] == "P" and project.get("extra") == 5 and project.get("falta", 1) == 1
+    assert "extra" in project and "falta" not in project
+    project["otro"] = [1]
+    assert dict(project)["otro"] == [1]
+    with pytest.raises(KeyError):
+        project["falta"]
+    assert as_dict(project) == project.to_dict()
+    assert as_dict({"a": 1}) == {"a": 1}
+    assert copy.deepcopy(project) == project
+
+
+def test_db_manager_with_records(make_db):
+    db = make_db(records=True)
+    saved = db.add_or_update_client({"cuit": "20000000001", "name": "A"})
+    assert isinstance(saved, Client) and saved.cuit == "20000000001"
+    project = db.add_or_update_project({"name": "P", "client_id": saved.id})
+    assert isinstance(project, Project)
+    assert isinstance(db.load_projects()[0], Project)
+    assert isinstance(next(make_db(records=True).iter_projects()), Project)
+
+    # devuelve copias: modificar el registro no toca la caché
+    project.name = "cambiado"
+    assert db.find_project_by_id(project.id).name == "P"
+
+    # guardar registros deja el archivo con la forma JSON de siempre
+    db.save_clients([saved, Client.from_dict(dict(FULL_CLIENT, id="c2", extra=1))])
+    with open(db.clients_path, encoding="utf-8") as f:
+        stored = json.load(f)["clients"]
+    assert stored[1]["extra"] == 1 and stored[1]["_rev"] == 3
+    assert [c["id"] for c in make_db().load_clients()] == [saved.id, "c2"]
+
+
+def test_partial_record_does_not_blank_stored_fields(make_db):
+    db = make_db(records=True)
+    db.add_or_update_client(dict(FULL_CLIENT, id="20000000001"))
+    db.add_or_update_client(Client.from_dict({"cuit": "20000000001", "name": "B", "contact_name": ""}))
+    db.add_or_update_client(Client(cuit="20000000001", contact_phone="2"))
+    client = make_db().find_client_by_cuit("20000000001")
+    assert (client["name"], client["address"], client["contact_email"]) == ("B", "calle", "x@y")
+    assert (client["contact_name"], client["contact_phone"]) == ("", "2")
+
+    db.add_or_update_project({"id": "p1", "name": "P", "status": "Aprobado", "is_macro": True})
+    partial = Project.from_dict({"id": "p1"})
+    partial["purpose"] = "nuevo"
+    db.add_or_update_project(partial, mark_current=False)
+    project = make_db().find_project_by_id("p1")
+    assert (project["name"], project["status"], project["is_macro"]) == ("P", "Aprobado", True)
+    assert project["purpose"] == "nuevo"
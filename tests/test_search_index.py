@@ -0,0 +1,115 @@
+
+
+# ./tests/test_search_index.py
+
+"""Búsqueda rankeada (Utils/search_index.py): ranking, mantenimiento incremental y persistencia."""
+
+import os
+import pickle
+
+import pytest
+
+from Utils.search_index import SearchIndex, CLIENT_FIELDS, PROJECT_FIELDS, normalize
+
+PROJECTS = [
+    {"id": "p1", "name": "Tablero Norte", "code": "TN-01", "purpose": "Iluminación"},
+    {"id": "p2", "name": "Tablero Sur", "code": "TS-02", "purpose": "Fuerza motriz"},
+    {"id": "p3", "name": "Subestación Norte", "code": "SE-03", "purpose": "Media tensión"},
+    {"id": "p4", "name": "Nortesur", "code": "NS-04", "purpose": ""},
+]
+SIGNATURE = ((1, 2, 3), None)
+
+
+@pytest.fixture
+def index():
+    return SearchIndex.build(PROJECT_FIELDS, PROJECTS)
+
+
+def _ids(results):
+    return [doc_id for doc_id, _ in results]
+
+
+def test_normalize_strips_accents_and_case():
+    assert normalize("Subestación ÑANDÚ") == "subestacion nandu"
+
+
+def test_all_terms_rank_first(index):
+    assert _ids(index.search("tablero norte"))[0] == "p1"
+
+
+def test_exact_beats_prefix(index):
+    results = _ids(index.search("norte"))
+    assert set(results[:2]) == {"p1", "p3"}
+    assert "p4" in results  # prefijo
+
+
+def test_fuzzy_tolerates_typos(index):
+    assert "p3" in _ids(index.search("subestasion"))
+    assert _ids(index.search("subestasion", fuzzy=False)) == []
+
+
+def test_cuit_matches_with_and_without_dashes():
+    clients = SearchIndex.build(CLIENT_FIELDS, [{"id": "c1", "cuit": "30-71234567-8", "name": "ACME"}])
+    assert _ids(clients.search("30712345678")) == ["c1"]
+
+
+def test_incremental_add_and_remove(index):
+    index.remove(PROJECTS[0])
+    assert "p1" not in _ids(index.search("tablero"))
+    index.add({"id": "p5", "name": "Tablero Oeste"})
+    assert set(_ids(index.search("tablero"))) == {"p2", "p5"}
+    assert len(index) == 4
+
+
+def test_save_and_load_round_trip(index, tmp_path):
+    path = str(tmp_path / "projects.json.search")
+    assert index.save(path, SIGNATURE)
+    loaded = SearchIndex.load(path, SIGNATURE, PROJECT_FIELDS)
+    assert loaded is not None and len(loaded) == len(index)
+    for query in ("tablero", "norte", "subestasion", "ts-02", "fuerza"):
+        assert loaded.search(query) == index.search(query)
+
+    # con algunos tokens ya desempaquetados y cambios incrementales, se vuelve a guardar igual
+    loaded.remove(PROJECTS[1])
+    loaded.add({"id": "p5", "name": "Tablero Oeste"})
+    assert loaded.save(path, SIGNATURE)
+    again = SearchIndex.load(path, SIGNATURE, PROJECT_FIELDS)
+    assert again.search("tablero") == loaded.search("tablero")
+
+
+def test_load_rejects_other_signature_or_fields(index, tmp_path):
+    path = str(tmp_path / "projects.json.search")
+    index.save(path, SIGNATURE)
+    assert SearchIndex.load(path, ((9, 9, 9), None), PROJECT_FIELDS) is None
+    assert SearchIndex.load(path, SIGNATURE, CLIENT_FIELDS) is None
+
+
+class _Exploit:
+    def __reduce__(self):
+        return (os.system, ("echo hacked > /dev/null",))
+
+
+def test_load_never_unpickles(tmp_path, monkeypatch):
+    path = tmp_path / "projects.json.search"
+    path.write_bytes(pickle.dumps({"version": 1, "x": _Exploit()}))
+    monkeypatch.setattr(pickle, "loads", lambda *a, **k: pytest.fail("pickle.loads"))
+    monkeypatch.setattr(pickle, "load", lambda *a, **k: pytest.fail("pickle.load"))
+    assert SearchIndex.load(str(path), SIGNATURE, PROJECT_FIELDS) is None
+
+
+def test_truncated_file_is_rebuilt(index, tmp_path):
+    path = tmp_path / "projects.json.search"
+    index.save(str(path), SIGNATURE)
+    raw = path.read_bytes()
+    path.write_bytes(raw[:-8])
+    assert SearchIndex.load(str(path), SIGNATURE, PROJECT_FIELDS) is None
+
+
+def test_db_manager_search_persists_index(make_db):
+    db = make_db()
+    db.bulk_upsert_projects(PROJECTS)
+    assert [p["id"] for p in db.search_projects("tablero norte")][:1] == ["p1"]
+    assert db.persist_search_index()
+    assert os.path.exists(db.projects_path + ".search")
+    fresh = make_db()
+    assert [p["id"] for p in fresh.search_projects("subestacion")] == ["p3"]
@@ -0,0 +1,51 @@
+
+
+# ./tests/test_serialization.py
+
+"""Formatos en disco (Utils/serialization.py): ida y vuelta, autodetección y snapshots binarios seguros."""
+
+import pytest
+
+from Utils.serialization import FORMATS, MAGIC, dumps, loads, read_file, resolve_format, is_binary
+
+DATA = {
+    "current_project_id": "p1",
+    "projects": [{"id": "p1", "name": "Tablero ñandú", "n": 3, "f": 1.5, "ok": True, "none": None,
+                  "tags": ["a", "b"], "meta": {"k": "v"}}],
+}
+
+
+@pytest.mark.parametrize("fmt", FORMATS)
+def test_round_trip(fmt):
+    assert loads(dumps(DATA, fmt)) == DATA
+
+
+def test_unknown_format_falls_back_to_json():
+    assert resolve_format("yaml") == "json"
+    assert dumps(DATA, "yaml") == dumps(DATA, "json")
+
+
+def test_binary_header_is_detected(tmp_path):
+    path = tmp_path / "clients.json"
+    path.write_bytes(dumps(DATA, "binary"))
+    assert is_binary(str(path))
+    assert read_file(str(path)) == DATA
+
+
+@pytest.mark.parametrize("raw", [MAGIC, MAGIC + bytes((1, 2)) + b"\xff\x00", MAGIC + bytes((1, 9)) + b"x",
+                                 MAGIC + bytes((1, 1)) + b"\x80\x04N.",  # codec 1: nunca hubo snapshots con pickle
+                                 MAGIC + bytes((99, 2)) + b"x"])
+def test_malformed_binary_raises_value_error(raw):
+    with pytest.raises(ValueError):
+        loads(raw)
+
+
+def test_db_manager_reads_any_format(make_db):
+    db = make_db(file_format="binary")
+    db.add_or_update_client({"cuit": "20000000001", "name": "A"})
+    assert is_binary(db.clients_path)
+    other = make_db(file_format="json")
+    assert [c["name"] for c in other.load_clients()] == ["A"]
+    other.add_or_update_client({"cuit": "20000000002", "name": "B"})
+    assert not is_binary(other.clients_path)
+    assert len(make_db(file_format="binary").load_clients()) == 2
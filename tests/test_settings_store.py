@@ -0,0 +1,103 @@
+
+
+# ./tests/test_settings_store.py
+
+"""Almacén de settings (Utils/settings_store.py): valores tipados, compactación de .cfg y caché."""
+
+import pytest
+
+from Utils import settings_store
+from Utils.settings_store import SettingsStore
+
+
+def _lines(tmp_path, group):
+    return (tmp_path / f"{group}.cfg").read_text(encoding="utf-8").splitlines()
+
+
+def test_typed_values_round_trip(tmp_path):
+    store = SettingsStore(str(tmp_path))
+    values = {"s": "texto", "i": 10, "f": 1.5, "b": False, "d": {"a": [1, 2]}, "l": [1, "x"], "m": "a\nb"}
+    for k, v in values.items():
+        store.set("Grupo", k, v)
+    fresh = SettingsStore(str(tmp_path))
+    assert {k: fresh.get("Grupo", k) for k in values} == values
+    assert fresh.get("Grupo", "falta", 7) == 7
+    # el tipo del default convierte
+    assert fresh.get("Grupo", "i", "0") == "10"
+    assert fresh.get("Grupo", "b", True) is False
+
+
+def test_legacy_lines_and_last_write_wins(tmp_path):
+    (tmp_path / "Database.cfg").write_text("backend=json\nbackend=sqlite\nlimit=5\n", encoding="utf-8")
+    store = SettingsStore(str(tmp_path))
+    assert store.get("Database", "backend") == "sqlite"
+    assert store.get("Database", "limit") == "5"
+    assert store.get("Database", "limit", 0) == 5
+
+
+def test_repeated_writes_are_compacted(tmp_path):
+    store = SettingsStore(str(tmp_path))
+    for i in range(settings_store.COMPACT_MIN_LINES * 3):
+        store.set("G", "contador", i)
+        store.set("G", "fijo", "x")
+    assert len(_lines(tmp_path, "G")) <= settings_store.COMPACT_MIN_LINES + 1
+    fresh = SettingsStore(str(tmp_path))
+    assert fresh.get("G", "contador") == settings_store.COMPACT_MIN_LINES * 3 - 1
+    assert fresh.get("G", "fijo") == "x"
+
+    store.compact()
+    assert sorted(_lines(tmp_path, "G")) == [f"contador:int={settings_store.COMPACT_MIN_LINES * 3 - 1}", "fijo=x"]
+
+
+def test_reads_are_cached_until_invalidated(tmp_path):
+    store = SettingsStore(str(tmp_path))
+    store.set("G", "k", "uno")
+    SettingsStore(str(tmp_path)).set("G", "k", "dos")
+    assert store.get("G", "k") == "uno"
+    store.invalidate("G")
+    assert store.get("G", "k") == "dos"
+
+
+class _FakeParams:
+    """Grupo de parámetros mínimo con GetContents y setters tipados."""
+
+    def __init__(self):
+        self.values = {}
+        self.contents_calls = 0
+
+    def GetContents(self):
+        self.contents_calls += 1
+        return [("String", k, v) for k, v in self.values.items()]
+
+    def SetString(self, name, value):
+        self.values[name] = value
+
+    def SetInt(self, name, value):
+        self.values[name] = value
+
+    def SetBool(self, name, value):
+        self.values[name] = value
+
+    def SetFloat(self, name, value):
+        self.values[name] = value
+
+
+class _FakeFreeCAD:
+
+    def __init__(self):
+        self.params = _FakeParams()
+
+    def ParamGet(self, path):
+        assert path == settings_store.PARAM_PATH
+        return self.params
+
+
+@pytest.mark.parametrize("value", [3, True, "texto", {"a": 1}])
+def test_param_backend_reads_group_once(tmp_path, value):
+    freecad = _FakeFreeCAD()
+    store = SettingsStore(str(tmp_path), freecad=freecad)
+    store.set("G", "k", value)
+    for _ in range(5):
+        assert store.get("G", "k", type_=type(value)) == value
+    assert freecad.params.contents_calls == 1
+    assert not list(tmp_path.glob("*.cfg"))
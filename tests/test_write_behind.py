@@ -0,0 +1,58 @@
+
+
+# ./tests/test_write_behind.py
+
+"""Modo write-behind de DBManager: volcado diferido, coalescencia y proyecto actual."""
+
+import json
+
+from Utils.paths import get_project_path
+
+
+def _disk_projects(db):
+    with open(db.projects_path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_changes_are_deferred_and_coalesced(make_db):
+    db = make_db(write_behind=True, debounce=60, max_dirty=60)
+    for i in range(10):
+        db.add_or_update_client({"cuit": f"2000000000{i}", "name": str(i)})
+    assert make_db().load_clients() == []
+    assert len(db.load_clients()) == 10
+    assert db.flush()
+    assert db.flush_count == 1
+    assert len(make_db().load_clients()) == 10
+
+
+def test_background_flush_after_debounce(make_db):
+    import time
+    db = make_db(write_behind=True, debounce=0.05, max_dirty=0.5)
+    db.add_or_update_client({"cuit": "20000000001", "name": "A"})
+    deadline = time.monotonic() + 5
+    while not make_db().load_clients() and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert [c["name"] for c in make_db().load_clients()] == ["A"]
+
+
+def test_current_project_change_is_visible_to_get_project_path(make_db):
+    db = make_db(write_behind=True, debounce=60, max_dirty=60)
+    db.add_or_update_project({"id": "p1", "path": "/p1"}, mark_current=True)
+    assert get_project_path() == "/p1"
+    db.add_or_update_project({"id": "p2", "path": "/p2"}, mark_current=True)
+    assert db.get_current_project()["path"] == "/p2"
+    assert get_project_path() == "/p2"
+
+    db.add_or_update_project({"id": "p2", "path": "/p2-moved"})
+    assert get_project_path() == "/p2-moved"
+    db.set_current_project(None)
+    assert get_project_path() is None
+
+
+def test_unrelated_project_change_stays_deferred(make_db):
+    db = make_db(write_behind=True, debounce=60, max_dirty=60)
+    db.add_or_update_project({"id": "p1", "path": "/p1"}, mark_current=True)
+    db.add_or_update_project({"id": "p2", "path": "/p2"}, mark_current=False)
+    assert [p["id"] for p in _disk_projects(db)["projects"]] == ["p1"]
+    db.flush()
+    assert [p["id"] for p in _disk_projects(db)["projects"]] == ["p1", "p2"]
@@ -5,6 +5,9 @@
 # Importa el módulo 'os' para trabajar con rutas del sistema de archivos.
 import os
 
+# Importa 'sys' para consultar módulos ya cargados sin forzar su importación.
+import sys
+
 # Importa los módulos de FreeCAD. `FreeCAD` para la funcionalidad principal (no-GUI) y `FreeCADGui` para la interfaz gráfica.
 import FreeCAD, FreeCADGui
 
@@ -16,10 +19,14 @@ from Utils.logger import log_info, log_error
 # Estos se encuentran en el paquete `Commands`, que presumiblemente escanea un directorio de comandos.
 from Commands.__init__ import register_all_commands, REGISTERED_COMMANDS
 
+# Instrumentación de arranque (activa con EW_PROFILE=1 o setting Diagnostics/profile).
+from Utils.profiler import profiled, dump_report, ENABLED as PROFILING_ENABLED
+
 # Define la clase `ElectricalWorkbenchClass` que hereda de `FreeCADGui.Workbench`.
 # Esta herencia es obligatoria para que FreeCAD la reconozca como un entorno de trabajo.
 class ElectricalWorkbenchClass(FreeCADGui.Workbench):
 
+    @profiled("ElectricalWorkbenchClass.__init__", "workbench")
     def __init__(self):
         """
         Constructor de la clase. Se ejecuta cuando FreeCAD carga la definición del entorno de trabajo.
@@ -70,6 +77,7 @@ static char * ew_letters_xpm[] = {
         # Utiliza la función de registro para indicar que el entorno de trabajo se está inicializando.
         log_info(".", "workbench.py", "Inicializando Electrical Workbench")
         
+    @profiled("ElectricalWorkbenchClass.Initialize", "workbench")
     def Initialize(self):
         """
         Se llama cuando el entorno de trabajo se activa por primera vez en la sesión de FreeCAD.
@@ -98,6 +106,25 @@ static char * ew_letters_xpm[] = {
         # Informa que los comandos se han registrado correctamente, mostrando cuáles son.
         log_info(".", "workbench.py", f"Comandos registrados: [{' | '.join(registered_commands)}]")
 
+        # Con profiling activo, deja el reporte de arranque en disco (startup_profile.json).
+        if PROFILING_ENABLED:
+            log_info(".", "workbench.py", f"Reporte de arranque: {dump_report()}")
+
+    def Deactivated(self):
+        """
+        Se llama cuando el usuario cambia a otro entorno de trabajo.
+        Vuelca los cambios de datos pendientes (modo write-behind de DBManager).
+        """
+        # Sólo si la capa de datos ya se cargó: si no, no hay nada pendiente.
+        db_manager = sys.modules.get("Utils.db_manager")
+        if db_manager is None:
+            return
+        try:
+            if not db_manager.flush_all():
+                log_error(".", "workbench.py", "No se pudieron volcar todos los cambios pendientes")
+        except Exception as e:
+            log_error(".", "workbench.py", f"Error volcando cambios pendientes: {e}")
+
     def GetClassName(self):
         """
         Este método devuelve el nombre de la clase C++ subyacente que maneja el entorno de trabajo.